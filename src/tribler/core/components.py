@@ -107,7 +107,8 @@ class ComponentLauncher(CommunityLauncherWEndpoints):
 @precondition('session.config.get("torrent_checker/enabled")')
 @precondition('session.config.get("content_discovery_community/enabled")')
 @overlay("tribler.core.content_discovery.community", "ContentDiscoveryCommunity")
-@kwargs(metadata_store="session.mds", torrent_checker="session.torrent_checker", notifier="session.notifier")
+@kwargs(metadata_store="session.mds", torrent_checker="session.torrent_checker", notifier="session.notifier",
+        max_concurrent_queries="session.mds.read_pool_size")
 class ContentDiscoveryComponent(BaseLauncher):
     """
     Launch instructions for the content discovery community.
@@ -118,6 +119,7 @@ class ContentDiscoveryComponent(BaseLauncher):
         When we are done launching, register our REST API.
         """
         session.rest_manager.get_endpoint("/api/search").content_discovery_community = community
+        session.rest_manager.get_endpoint("/api/statistics").content_discovery_community = community
 
     def get_endpoints(self) -> list[RESTEndpoint]:
         """
@@ -153,7 +155,12 @@ class DatabaseComponent(ComponentLauncher):
             mds_path,
             session.ipv8.keys["anonymous id"].key,
             notifier=session.notifier,
-            disable_sync=False
+            disable_sync=False,
+            wal_mode=session.config.get("database/wal_mode"),
+            read_pool_size=session.config.get("database/read_pool_size"),
+            mmap_size=session.config.get("database/mmap_size"),
+            cache_size=session.config.get("database/cache_size"),
+            ingestion_processes=session.config.get("database/ingestion_processes")
         )
         session.notifier.add(Notification.torrent_metadata_added, session.mds.TorrentMetadata.add_ffa_from_dict)
 
@@ -255,7 +262,10 @@ class TorrentCheckerComponent(ComponentLauncher):
                                          notifier=session.notifier,
                                          tracker_manager=tracker_manager,
                                          metadata_store=session.mds,
-                                         socks_listen_ports=[s.port for s in session.socks_servers])
+                                         socks_listen_ports=[s.port for s in session.socks_servers],
+                                         round_size=session.config.get("torrent_checker/round_size"),
+                                         max_concurrent=session.config.get("torrent_checker/max_concurrent"),
+                                         max_dht_checks=session.config.get("torrent_checker/max_dht_checks"))
         session.torrent_checker = torrent_checker
 
     def finalize(self, ipv8: IPv8, session: Session, community: Community) -> None:
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from tribler.core.database.ranks import item_rank
+
+if TYPE_CHECKING:
+    from ipv8.types import Peer
+
+DEFAULT_TOP_K = 50
+DEFAULT_STABLE_RESPONSES = 3
+
+
+class ResultAggregator:
+    """
+    Merge the results of a remote search from many peers into a single top-K, ranked by relevance.
+
+    Results are deduplicated by infohash. The ranking is handed out as diffs: the entries that were inserted (or whose
+    data changed), the entries that moved and the entries that dropped out of the top-K since the previous diff.
+    """
+
+    def __init__(self, query: str, top_k: int = DEFAULT_TOP_K,
+                 stable_responses: int = DEFAULT_STABLE_RESPONSES) -> None:
+        """
+        Create a new aggregator for the results of the given query.
+
+        :param query: the text that is searched for, to rank the results by.
+        :param top_k: the number of best results to keep.
+        :param stable_responses: the number of responses without changes after which a full top-K is stable.
+        """
+        self.query = query
+        self.top_k = top_k
+        self.stable_responses = stable_responses
+
+        self.entries: dict[str, tuple[float, dict[str, Any]]] = {}  # The rank and data of the top-K, by infohash
+        self.heap: list[tuple[float, str]] = []  # Min-heap of the ranks of the entries, can contain outdated ranks
+        self.changed: set[str] = set()  # The infohashes that were inserted or updated since the last diff
+        self.emitted: list[str] = []  # The ranking of the last diff
+        self.unchanged_responses = 0
+
+    def add(self, results: list[dict[str, Any]]) -> bool:
+        """
+        Merge the results of a single response.
+
+        :returns: whether the top-K changed.
+        """
+        changed = False
+        for item in results:
+            changed = self.add_item(item) or changed
+        self.unchanged_responses = 0 if changed else self.unchanged_responses + 1
+        return changed
+
+    def add_item(self, item: dict[str, Any]) -> bool:
+        """
+        Merge a single result, if it ranks better than its earlier version and than the worst result of a full top-K.
+        """
+        infohash = item["infohash"]
+        rank = item_rank(self.query, item)
+        current = self.entries.get(infohash)
+        if current is not None:
+            if rank <= current[0]:
+                return False
+        elif len(self.entries) >= self.top_k:
+            lowest_rank, lowest = self.get_lowest()
+            if rank <= lowest_rank:
+                return False
+            heapq.heappop(self.heap)
+            del self.entries[lowest]
+            self.changed.discard(lowest)
+
+        self.entries[infohash] = (rank, item)
+        heapq.heappush(self.heap, (rank, infohash))
+        self.changed.add(infohash)
+        return True
+
+    def get_lowest(self) -> tuple[float, str]:
+        """
+        Get the rank and infohash of the worst entry, discarding outdated ranks from the heap.
+        """
+        while True:
+            rank, infohash = self.heap[0]
+            entry = self.entries.get(infohash)
+            if entry is not None and entry[0] == rank:
+                return rank, infohash
+            heapq.heappop(self.heap)
+
+    def is_stable(self) -> bool:
+        """
+        Whether the top-K is full and did not change for the last few responses.
+        """
+        return len(self.entries) >= self.top_k and self.unchanged_responses >= self.stable_responses
+
+    def get_ranking(self) -> list[str]:
+        """
+        Get the infohashes of the top-K, best first.
+        """
+        return sorted(self.entries, key=lambda infohash: (-self.entries[infohash][0], infohash))
+
+    def get_diff(self) -> dict[str, list]:
+        """
+        Get the changes to the ranking since the last diff.
+
+        Inserted entries are the full result dicts with their ``position``, moved entries only have an ``infohash``
+        and a ``position`` and removed entries are given by their infohash.
+        """
+        ranking = self.get_ranking()
+        previous = {infohash: position for position, infohash in enumerate(self.emitted)}
+        inserted = [dict(self.entries[infohash][1], position=position)
+                    for position, infohash in enumerate(ranking) if infohash in self.changed]
+        moved = [{"infohash": infohash, "position": position} for position, infohash in enumerate(ranking)
+                 if infohash not in self.changed and previous.get(infohash, position) != position]
+        removed = [infohash for infohash in self.emitted if infohash not in self.entries]
+
+        self.emitted = ranking
+        self.changed.clear()
+        return {"inserted": inserted, "moved": moved, "removed": removed}
+
+
+@dataclass
+class RemoteSearch:
+    """
+    The state of a remote search that queries peers in waves.
+    """
+
+    aggregator: ResultAggregator
+    query_kwargs: dict[str, Any]
+    remaining_peers: list[Peer]
+    outstanding: set[int] = field(default_factory=set)  # The numbers of the requests of the current wave
+    last_update: float = 0.0
+    update_scheduled: bool = False
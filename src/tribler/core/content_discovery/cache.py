@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from binascii import hexlify
 from typing import TYPE_CHECKING, Callable
 
@@ -34,6 +35,8 @@ class SelectRequest(RandomNumberCache):
         self.peer = peer
         # Indicate if at least a single packet was returned by the queried peer.
         self.peer_responded = False
+        # The time at which the request was sent, to measure the response latency of the peer.
+        self.sent_at = time.time()
 
         self.timeout_callback = timeout_callback
 
@@ -6,6 +6,8 @@ import sys
 import time
 import uuid
 from binascii import hexlify, unhexlify
+from collections import OrderedDict
+from functools import partial
 from itertools import count
 from typing import TYPE_CHECKING, Any, Callable, Sequence
 
@@ -14,8 +16,10 @@ from ipv8.lazy_community import lazy_wrapper
 from ipv8.requestcache import RequestCache
 from pony.orm import OperationalError, db_session
 
+from tribler.core.content_discovery.aggregator import RemoteSearch, ResultAggregator
 from tribler.core.content_discovery.cache import SelectRequest
 from tribler.core.content_discovery.payload import (
+    HealthSketchPayload,
     PopularTorrentsRequest,
     RemoteSelectPayload,
     SelectResponsePayload,
@@ -23,20 +27,43 @@ from tribler.core.content_discovery.payload import (
     VersionRequest,
     VersionResponse,
 )
+from tribler.core.content_discovery.peer_scores import PeerScores
+from tribler.core.content_discovery.query_scheduler import DEFAULT_MAX_CONCURRENT, QueryScheduler
+from tribler.core.content_discovery.reconciliation import (
+    MAX_FILTER_SIZE,
+    MAX_NUM_HASHES,
+    BloomFilter,
+    create_health_sketch,
+    get_missing_health,
+)
+from tribler.core.database.compression import announce_dictionary_versions, select_dictionary_version
 from tribler.core.database.layers.knowledge import ResourceType
 from tribler.core.database.orm_bindings.torrent_metadata import LZ4_EMPTY_ARCHIVE, entries_to_chunk
+from tribler.core.database.search_cache import SearchCache, make_key
 from tribler.core.database.store import MetadataStore, ObjState, ProcessingResult
 from tribler.core.knowledge.community import is_valid_resource
 from tribler.core.notifier import Notification, Notifier
 from tribler.core.torrent_checker.dataclasses import HealthInfo
 
 if TYPE_CHECKING:
-    from ipv8.types import Peer
+    from ipv8.messaging.payload import (
+        IntroductionRequestPayload,
+        IntroductionResponsePayload,
+        NewIntroductionRequestPayload,
+        NewIntroductionResponsePayload,
+    )
+    from ipv8.messaging.payload_headers import GlobalTimeDistributionPayload
+    from ipv8.types import Address, Peer
 
     from tribler.core.database.orm_bindings.torrent_metadata import TorrentMetadata
     from tribler.core.database.tribler_database import TriblerDatabase
     from tribler.core.torrent_checker.torrent_checker import TorrentChecker
 
+# Capability flags that we announce after the compression dictionary versions in the extra bytes of introductions.
+# Dictionary versions never reach these values, so peers that do not know a flag ignore it.
+CAPABILITY_INFOHASH_SET = 0xFF  # We answer remote selects for an ``infohash_set``
+CAPABILITY_HEALTH_SKETCH = 0xFE  # We answer health sketches
+
 
 class ContentDiscoverySettings(CommunitySettings):
     """
@@ -45,11 +72,32 @@ class ContentDiscoverySettings(CommunitySettings):
 
     random_torrent_interval: float = 5  # seconds
     random_torrent_count: int = 10
+    reconcile_health: bool = True  # Exchange sketches of known health with the peers that support it
+    health_sketch_capacity: int = 800  # Max number of checks in a single health sketch
+    health_sketch_false_positive_rate: float = 0.01
+    max_health_response: int = 30  # Max number of checks to send in response to a health sketch
+    max_known_health: int = 1000  # Max number of checks received from other peers to remember
     max_query_peers: int = 20
+    search_wave_size: int = 5  # The number of peers to query at once during a remote search
+    search_top_k: int = 50  # The number of best results to merge during a remote search
+    search_stable_responses: int = 3  # The number of responses without changes after which a search is stable
+    search_update_interval: float = 0.5  # Min number of seconds between ranking updates of a remote search
+    search_exploration: float = 0.2  # The fraction of the peers to search that is chosen randomly instead of by score
     maximum_payload_size: int = 1300
     max_response_size: int = 100  # Max number of entries returned by SQL query
+    max_resolve_batch_size: int = 20  # Max number of infohashes to resolve in a single remote select
+    max_concurrent_queries: int = DEFAULT_MAX_CONCURRENT  # Max number of text queries to process at once
+    max_queued_queries: int = 50
+    query_peer_rate: float = 0.5  # Cost of text queries that a single peer may spend per second
+    query_peer_burst: float = 5.0  # Cost of text queries that a single peer may spend at once
+    max_query_wait: float = 5.0  # seconds
+    response_cache_size: int = 128  # Max number of responses to remember
+    response_cache_ttl: float = 30.0  # seconds
+    compression_dictionaries: bool = True  # Announce and use shared dictionaries to compress responses
+    max_dictionary_peers: int = 1000  # Max number of peers to remember the dictionaries and capabilities of
 
     binary_fields: Sequence[str] = ("infohash", "channel_pk")
+    binary_set_fields: Sequence[str] = ("infohash_set",)
     deprecated_parameters: Sequence[str] = ("subscribed", "attribute_ranges", "complete_channel")
 
     metadata_store: MetadataStore
@@ -75,6 +123,7 @@ class ContentDiscoveryCommunity(Community):
 
         self.add_message_handler(TorrentsHealthPayload, self.on_torrents_health)
         self.add_message_handler(PopularTorrentsRequest, self.on_popular_torrents_request)
+        self.add_message_handler(HealthSketchPayload, self.on_health_sketch)
         self.add_message_handler(VersionRequest, self.on_version_request)
         self.add_message_handler(VersionResponse, self.on_version_response)
         self.add_message_handler(RemoteSelectPayload, self.on_remote_select)
@@ -85,7 +134,31 @@ class ContentDiscoveryCommunity(Community):
 
         self.request_cache = RequestCache()
 
-        self.remote_queries_in_progress = 0
+        # The freshest health that other peers sent us, to include in our health sketches and pass on
+        self.known_health: OrderedDict[bytes, HealthInfo] = OrderedDict()
+
+        # The infohashes that we asked a peer for and did not get a response for yet
+        self.infohashes_in_flight: set[bytes] = set()
+
+        self.query_scheduler = QueryScheduler(
+            max_concurrent=settings.max_concurrent_queries,
+            max_queue_size=settings.max_queued_queries,
+            peer_rate=settings.query_peer_rate,
+            peer_burst=settings.query_peer_burst,
+            max_wait=settings.max_query_wait
+        )
+        self.remote_searches: dict[uuid.UUID, RemoteSearch] = {}
+
+        # The track record of peers in answering our remote selects
+        self.peer_scores = PeerScores()
+        # The newest compression dictionary version that we share with a peer, by peer mid
+        self.peer_dictionaries: OrderedDict[bytes, int] = OrderedDict()
+        # The mids of the peers that announced that they answer remote selects for an infohash set
+        self.infohash_set_peers: OrderedDict[bytes, None] = OrderedDict()
+        # The mids of the peers that announced that they answer health sketches
+        self.health_sketch_peers: OrderedDict[bytes, None] = OrderedDict()
+        # The compressed response chunks of recent remote selects, until they expire or the database changes
+        self.response_cache = SearchCache(max_size=settings.response_cache_size, ttl=settings.response_cache_ttl)
         self.next_remote_query_num = count().__next__  # generator of sequential numbers, for logging & debug purposes
 
         self.logger.info("Content Discovery Community initialized (peer mid %s)", hexlify(self.my_peer.mid))
@@ -99,14 +172,103 @@ class ContentDiscoveryCommunity(Community):
         await self.request_cache.shutdown()
         await super().unload()
 
+    def create_introduction_request(self, socket_address: Address, extra_bytes: bytes = b"",
+                                    new_style: bool = False, prefix: bytes | None = None) -> bytes:
+        """
+        Create an introduction request that announces the compression dictionaries that we know and our capabilities.
+        """
+        if not extra_bytes:
+            extra_bytes = self.get_announcement()
+        return super().create_introduction_request(socket_address, extra_bytes, new_style, prefix)
+
+    def create_introduction_response(self, lan_socket_address: Address, socket_address: Address,  # noqa: PLR0913, PLR0917
+                                     identifier: int, introduction: Peer | None = None, extra_bytes: bytes = b"",
+                                     prefix: bytes | None = None, new_style: bool = False) -> bytes:
+        """
+        Create an introduction response that announces the compression dictionaries that we know and our capabilities.
+        """
+        if not extra_bytes:
+            extra_bytes = self.get_announcement()
+        return super().create_introduction_response(lan_socket_address, socket_address, identifier, introduction,
+                                                     extra_bytes, prefix, new_style)
+
+    def introduction_request_callback(self, peer: Peer, dist: GlobalTimeDistributionPayload,
+                                      payload: IntroductionRequestPayload | NewIntroductionRequestPayload) -> None:
+        """
+        Remember the compression dictionaries and capabilities that the peer announced in its introduction request.
+        """
+        self.on_dictionary_announcement(peer, payload.extra_bytes)
+        self.on_capability_announcement(peer, payload.extra_bytes)
+
+    def introduction_response_callback(self, peer: Peer, dist: GlobalTimeDistributionPayload,
+                                       payload: IntroductionResponsePayload | NewIntroductionResponsePayload) -> None:
+        """
+        Remember the compression dictionaries and capabilities that the peer announced in its introduction response.
+        """
+        self.on_dictionary_announcement(peer, payload.extra_bytes)
+        self.on_capability_announcement(peer, payload.extra_bytes)
+
+    def get_announcement(self) -> bytes:
+        """
+        Get the compression dictionary versions and the capabilities to announce in our introductions.
+        """
+        dictionaries = announce_dictionary_versions() if self.composition.compression_dictionaries else b""
+        return dictionaries + bytes([CAPABILITY_INFOHASH_SET, CAPABILITY_HEALTH_SKETCH])
+
+    def on_dictionary_announcement(self, peer: Peer, announced: bytes) -> None:
+        """
+        Select the compression dictionary to send the given peer responses with.
+
+        Peers that do not announce any dictionaries (older versions) get plain LZ4 frames.
+        """
+        version = select_dictionary_version(announced) if self.composition.compression_dictionaries else None
+        if version is None:
+            self.peer_dictionaries.pop(peer.mid, None)
+            return
+        self.peer_dictionaries[peer.mid] = version
+        self.peer_dictionaries.move_to_end(peer.mid)
+        while len(self.peer_dictionaries) > self.composition.max_dictionary_peers:
+            self.peer_dictionaries.popitem(last=False)
+
+    def on_capability_announcement(self, peer: Peer, announced: bytes) -> None:
+        """
+        Remember whether the peer answers remote selects for an infohash set and whether it answers health sketches.
+
+        Older versions fail on an ``infohash_set`` and never answer, after which we would drop them as unresponsive.
+        They also drop health sketches, so they only get the health that we push to them.
+        """
+        self.remember_capability(self.infohash_set_peers, peer, CAPABILITY_INFOHASH_SET in announced)
+        self.remember_capability(self.health_sketch_peers, peer, CAPABILITY_HEALTH_SKETCH in announced)
+
+    def remember_capability(self, capable_peers: OrderedDict[bytes, None], peer: Peer, capable: bool) -> None:
+        """
+        Add the peer to, or remove it from, the bounded collection of the peers with some capability.
+        """
+        if not capable:
+            capable_peers.pop(peer.mid, None)
+            return
+        capable_peers[peer.mid] = None
+        capable_peers.move_to_end(peer.mid)
+        while len(capable_peers) > self.composition.max_dictionary_peers:
+            capable_peers.popitem(last=False)
+
     def sanitize_dict(self, parameters: dict[str, Any], decode: bool = True) -> None:
         """
         Convert the binary values in the given dictionary to (decode=True) and from (decode=False) hex format.
         """
         for field in self.composition.binary_fields:
             value = parameters.get(field)
-            if value is not None:
-                parameters[field] = unhexlify(value.encode()) if decode else hexlify(value.encode()).decode()
+            if value is None:
+                continue
+            if decode:
+                parameters[field] = unhexlify(value.encode())
+            else:
+                parameters[field] = hexlify(value if isinstance(value, bytes) else value.encode()).decode()
+        for field in self.composition.binary_set_fields:
+            values = parameters.get(field)
+            if values is not None:
+                parameters[field] = ({unhexlify(value.encode()) for value in values} if decode
+                                     else [hexlify(value).decode() for value in values])
 
     def sanitize_query(self, query_dict: dict[str, Any], cap: int = 100) -> dict[str, Any]:
         """
@@ -123,6 +285,11 @@ class ContentDiscoveryCommunity(Community):
         # convert hex fields to binary
         self.sanitize_dict(sanitized_dict, decode=True)
 
+        # We also cap the number of infohashes to look up
+        for field in self.composition.binary_set_fields:
+            if field in sanitized_dict and len(sanitized_dict[field]) > cap:
+                sanitized_dict[field] = set(list(sanitized_dict[field])[:cap])
+
         return sanitized_dict
 
     def convert_to_json(self, parameters: dict[str, Any]) -> str:
@@ -155,16 +322,82 @@ class ContentDiscoveryCommunity(Community):
     def gossip_random_torrents_health(self) -> None:
         """
         Gossip random torrent health information to another peer.
+
+        In reconciliation mode, we send a sketch of the health that we know to a few of the peers that answer health
+        sketches instead, so that they only send us what we are missing. The other peers still get pushed health.
         """
         peers = self.get_peers()
         if not peers or not self.composition.torrent_checker:
             return
 
+        if self.composition.reconcile_health:
+            sketch_peers = [p for p in peers if p.mid in self.health_sketch_peers]
+            if sketch_peers:
+                self.gossip_health_sketch(sketch_peers)
+            peers = [p for p in peers if p.mid not in self.health_sketch_peers]
+            if not peers:
+                return
+
         self.ez_send(random.choice(peers), TorrentsHealthPayload.create(self.get_random_torrents(), {}))
 
         for p in random.sample(peers, min(len(peers), 5)):
             self.ez_send(p, PopularTorrentsRequest())
 
+    def get_fresh_health(self) -> dict[bytes, HealthInfo]:
+        """
+        Get the freshest health that we know of, checked by us or received from others, by infohash.
+        """
+        fresh = {infohash: health for infohash, health in self.known_health.items() if not health.old()}
+        if self.composition.torrent_checker:
+            for infohash, health in self.composition.torrent_checker.torrents_checked.items():
+                known = fresh.get(infohash)
+                if not health.old() and (known is None or known.last_check < health.last_check):
+                    fresh[infohash] = health
+        return fresh
+
+    def gossip_health_sketch(self, peers: list[Peer]) -> None:
+        """
+        Send a sketch of the health that we know to a few of the given peers.
+        """
+        fresh = self.get_fresh_health()
+        sketch = create_health_sketch({infohash: health.last_check for infohash, health in fresh.items()},
+                                      self.composition.health_sketch_capacity,
+                                      self.composition.health_sketch_false_positive_rate)
+        payload = HealthSketchPayload(sketch.salt, sketch.num_hashes, bytes(sketch.data))
+        for p in random.sample(peers, min(len(peers), 5)):
+            self.ez_send(p, payload)
+
+    @lazy_wrapper(HealthSketchPayload)
+    async def on_health_sketch(self, peer: Peer, payload: HealthSketchPayload) -> None:
+        """
+        Callback for when we receive a health sketch: send the peer the live torrents that it is missing.
+
+        Torrents of which the peer knows an older check than we do are not in the sketch, so they are sent as well.
+        """
+        if (not payload.bloom_filter or len(payload.bloom_filter) > MAX_FILTER_SIZE
+                or not 0 < payload.num_hashes <= MAX_NUM_HASHES):
+            self.logger.debug("Dropping invalid health sketch from %s", peer)
+            return
+
+        sketch = BloomFilter(len(payload.bloom_filter), payload.num_hashes, payload.salt, payload.bloom_filter)
+        alive = [health for health in self.get_fresh_health().values() if health.seeders > 0]
+        missing = get_missing_health(sketch, alive, self.composition.max_health_response)
+        if missing:
+            self.ez_send(peer, TorrentsHealthPayload.create(missing, []))
+
+    def remember_health(self, health_list: list[HealthInfo]) -> None:
+        """
+        Remember the given health received from other peers, if it is fresher than what we knew.
+        """
+        for health in health_list:
+            known = self.known_health.get(health.infohash)
+            if not health.is_valid() or (known is not None and known.last_check >= health.last_check):
+                continue
+            self.known_health[health.infohash] = health
+            self.known_health.move_to_end(health.infohash)
+        while len(self.known_health) > self.composition.max_known_health:
+            self.known_health.popitem(last=False)
+
     @lazy_wrapper(TorrentsHealthPayload)
     async def on_torrents_health(self, peer: Peer, payload: TorrentsHealthPayload) -> None:
         """
@@ -176,25 +409,55 @@ class ContentDiscoveryCommunity(Community):
         health_tuples = payload.random_torrents + payload.torrents_checked
         health_list = [HealthInfo(infohash, last_check=last_check, seeders=seeders, leechers=leechers)
                        for infohash, seeders, leechers, last_check in health_tuples]
+        self.remember_health(health_list)
 
-        for health_info in health_list:
-            # Get a single result per infohash to avoid duplicates
-            with db_session:
-                self.composition.metadata_store.process_torrent_health(health_info)
-            infohash = hexlify(health_info.infohash).decode()
-            self.send_remote_select(peer=peer, infohash=infohash, last=1)
+        unknown_infohashes = await self.composition.metadata_store.run_threaded_write(self.process_torrents_health,
+                                                                                      health_list)
+        self.resolve_infohashes(peer, unknown_infohashes)
 
-    @db_session
     def process_torrents_health(self, health_list: list[HealthInfo]) -> set[bytes]:
         """
-        Get the infohashes that we did not know about before from the given health list.
+        Store the given health list and get the infohashes from it that we have no metadata for.
         """
-        infohashes_to_resolve = set()
-        for health in health_list:
-            added = self.composition.metadata_store.process_torrent_health(health)
-            if added:
-                infohashes_to_resolve.add(health.infohash)
-        return infohashes_to_resolve
+        metadata_store = self.composition.metadata_store
+        metadata_store.process_torrent_health_batch(health_list)
+        return metadata_store.get_unknown_infohashes({health.infohash for health in health_list})
+
+    def resolve_infohashes(self, peer: Peer, infohashes: set[bytes]) -> list[SelectRequest]:
+        """
+        Ask the given peer for the metadata of the given infohashes, in as few remote selects as possible.
+
+        Infohashes that we are already asking another peer for are skipped. Peers that did not announce that they
+        answer remote selects for an infohash set get a remote select per infohash.
+        """
+        to_resolve = sorted(infohashes - self.infohashes_in_flight)
+        requests = []
+        if peer.mid not in self.infohash_set_peers:
+            for infohash in to_resolve:
+                self.infohashes_in_flight.add(infohash)
+                requests.append(self.send_remote_select(peer=peer, infohash=infohash, last=1,
+                                                        processing_callback=self.on_infohashes_resolved))
+            return requests
+        batch_size = self.composition.max_resolve_batch_size
+        for start in range(0, len(to_resolve), batch_size):
+            batch = set(to_resolve[start:start + batch_size])
+            self.infohashes_in_flight.update(batch)
+            requests.append(self.send_remote_select(peer=peer, infohash_set=batch, last=len(batch),
+                                                    processing_callback=self.on_infohashes_resolved))
+        return requests
+
+    def on_infohashes_resolved(self, request: SelectRequest, _: list[ProcessingResult]) -> None:
+        """
+        Allow the infohashes of a request to be asked for again, now that the peer responded.
+        """
+        self.infohashes_in_flight.difference_update(self.get_requested_infohashes(request))
+
+    def get_requested_infohashes(self, request: SelectRequest) -> set[bytes]:
+        """
+        Get the infohashes that the given remote select asked for.
+        """
+        kwargs = request.request_kwargs
+        return set(kwargs.get("infohash_set", ())) | ({kwargs["infohash"]} if "infohash" in kwargs else set())
 
     @lazy_wrapper(PopularTorrentsRequest)
     async def on_popular_torrents_request(self, peer: Peer, payload: PopularTorrentsRequest) -> None:
@@ -223,31 +486,120 @@ class ContentDiscoveryCommunity(Community):
         all_peers = self.get_peers()
         return random.sample(all_peers, min(sample_size or len(all_peers), len(all_peers)))
 
+    def get_scored_peers(self, sample_size: int) -> list[Peer]:
+        """
+        Sample sample_size peers, preferring the peers that respond fast and often, with new results.
+        """
+        return self.peer_scores.select({peer.mid: peer for peer in self.get_peers()}, sample_size,
+                                       self.composition.search_exploration)
+
     def send_search_request(self, **kwargs) -> tuple[uuid.UUID, list[Peer]]:
         """
-        Send a remote query request to multiple random peers to search for some terms.
+        Send a remote query request to multiple peers to search for some terms.
+
+        The peers are chosen by their score, except for a few random peers. They are queried in waves of
+        ``search_wave_size`` peers, until the merged top results are stable or all peers have been queried.
+
+        :returns: the uuid of the search and the peers of the first wave.
         """
         request_uuid = uuid.uuid4()
+        aggregator = ResultAggregator(kwargs.get("txt_filter") or "", self.composition.search_top_k,
+                                      self.composition.search_stable_responses)
+        search = RemoteSearch(aggregator, kwargs, self.get_scored_peers(self.composition.max_query_peers))
+        self.remote_searches[request_uuid] = search
+        return request_uuid, self.send_search_wave(request_uuid, search)
+
+    def send_search_wave(self, request_uuid: uuid.UUID, search: RemoteSearch) -> list[Peer]:
+        """
+        Query the next wave of peers for the given search, or finish the search if there are no peers left.
+        """
+        wave = search.remaining_peers[:self.composition.search_wave_size]
+        del search.remaining_peers[:self.composition.search_wave_size]
+        for peer in wave:
+            request = self.send_remote_select(peer, **search.query_kwargs,
+                                              processing_callback=partial(self.on_search_results, request_uuid))
+            request.timeout_callback = partial(self.on_search_timeout, request_uuid)
+            search.outstanding.add(request.number)
+        if not wave:
+            self.finish_search(request_uuid)
+        return wave
+
+    def on_search_results(self, request_uuid: uuid.UUID, request: SelectRequest,
+                          processing_results: list[ProcessingResult]) -> None:
+        """
+        Notify about the new results of a search and merge the new and updated results into its ranking.
+
+        The simple dicts of these results are created by the writer thread of the metadata store.
+        """
+        results = [r.simple_dict for r in processing_results if r.simple_dict is not None]
+        if self.composition.notifier:
+            self.composition.notifier.notify(Notification.remote_query_results,
+                                             query=request.request_kwargs.get("txt_filter"),
+                                             results=[r.simple_dict for r in processing_results
+                                                      if r.simple_dict is not None
+                                                      and r.obj_state == ObjState.NEW_OBJECT],
+                                             uuid=str(request_uuid),
+                                             peer=hexlify(request.peer.mid).decode())
+
+        search = self.remote_searches.get(request_uuid)
+        if search is None:
+            return
+        if search.aggregator.add(results):
+            self.schedule_search_update(request_uuid, search)
+        search.outstanding.discard(request.number)
+        self.advance_search(request_uuid, search)
 
-        def notify_gui(request: SelectRequest, processing_results: list[ProcessingResult]) -> None:
-            results = [
-                r.md_obj.to_simple_dict()
-                for r in processing_results
-                if r.obj_state == ObjState.NEW_OBJECT
-            ]
-            if self.composition.notifier:
-                self.composition.notifier.notify(Notification.remote_query_results,
-                                                 query=kwargs.get("txt_filter"),
-                                                 results=results,
-                                                 uuid=str(request_uuid),
-                                                 peer=hexlify(request.peer.mid).decode())
+    def on_search_timeout(self, request_uuid: uuid.UUID, request: SelectRequest) -> None:
+        """
+        Stop waiting for a peer that did not respond to a search.
+        """
+        self._on_query_timeout(request)
+        search = self.remote_searches.get(request_uuid)
+        if search is not None and request.number in search.outstanding:
+            search.outstanding.discard(request.number)
+            self.advance_search(request_uuid, search)
+
+    def advance_search(self, request_uuid: uuid.UUID, search: RemoteSearch) -> None:
+        """
+        Once all peers of a wave responded, finish the search if its ranking is stable or query the next wave.
+        """
+        if search.outstanding:
+            return
+        if search.aggregator.is_stable():
+            self.finish_search(request_uuid)
+        else:
+            self.send_search_wave(request_uuid, search)
 
-        peers_to_query = self.get_random_peers(self.composition.max_query_peers)
+    def schedule_search_update(self, request_uuid: uuid.UUID, search: RemoteSearch) -> None:
+        """
+        Schedule a ranking update of the given search, at most once per ``search_update_interval`` seconds.
+        """
+        if search.update_scheduled:
+            return
+        search.update_scheduled = True
+        delay = max(0.0, search.last_update + self.composition.search_update_interval - time.time())
+        self.register_anonymous_task("Search update", self.notify_search_update, request_uuid, delay=delay)
 
-        for p in peers_to_query:
-            self.send_remote_select(p, **kwargs, processing_callback=notify_gui)
+    def notify_search_update(self, request_uuid: uuid.UUID, complete: bool = False) -> None:
+        """
+        Notify about the changes to the ranking of a search since its previous update.
+        """
+        search = self.remote_searches.get(request_uuid)
+        if search is None:
+            return
+        search.update_scheduled = False
+        search.last_update = time.time()
+        if self.composition.notifier:
+            self.composition.notifier.notify(Notification.remote_query_update, uuid=str(request_uuid),
+                                             query=search.aggregator.query, complete=complete,
+                                             **search.aggregator.get_diff())
 
-        return request_uuid, peers_to_query
+    def finish_search(self, request_uuid: uuid.UUID) -> None:
+        """
+        Notify about the final ranking of a search and forget about it.
+        """
+        self.notify_search_update(request_uuid, complete=True)
+        self.remote_searches.pop(request_uuid, None)
 
     @lazy_wrapper(VersionRequest)
     async def on_version_request(self, peer: Peer, _: VersionRequest) -> None:
@@ -271,6 +623,7 @@ class ContentDiscoveryCommunity(Community):
         """
         request = SelectRequest(self.request_cache, kwargs, peer, processing_callback, self._on_query_timeout)
         self.request_cache.add(request)
+        self.peer_scores.record_request(peer.mid)
 
         self.logger.debug("Select to %s with (%s)", hexlify(peer.mid).decode(), str(kwargs))
         self.ez_send(peer, RemoteSelectPayload(request.number, self.convert_to_json(kwargs).encode()))
@@ -282,25 +635,37 @@ class ContentDiscoveryCommunity(Community):
         """
         return "txt_filter" in sanitized_parameters
 
-    async def process_rpc_query_rate_limited(self, sanitized_parameters: dict[str, Any]) -> list:
+    def estimate_query_cost(self, sanitized_parameters: dict[str, Any]) -> float:
         """
-        Process the given query and return results.
+        Estimate the relative database load of a text query.
+
+        The base cost grows with the number of requested results. Short search terms match many rows in the full-text
+        index, so these cost extra.
         """
-        query_num = self.next_remote_query_num()
-        if self.remote_queries_in_progress and self.should_limit_rate_for_query(sanitized_parameters):
-            self.logger.warning("Ignore remote query %d as another one is already processing. The ignored query: %s",
-                                query_num, sanitized_parameters)
-            return []
+        cost = 1 + (sanitized_parameters["last"] - sanitized_parameters["first"]) / self.composition.max_response_size
+        if len(str(sanitized_parameters.get("txt_filter") or "").strip('*" ')) < 3:
+            cost += 1
+        return cost
 
-        self.logger.info("Process remote query %d: %s", query_num, sanitized_parameters)
-        self.remote_queries_in_progress += 1
-        t = time.time()
-        try:
+    async def process_rpc_query_rate_limited(self, sanitized_parameters: dict[str, Any],
+                                             peer: Peer | None = None) -> list | None:
+        """
+        Process the given query and return results, or None if the query was dropped.
+
+        Text queries are scheduled by the query scheduler, other (cheap) lookups are processed immediately.
+        """
+        if not self.should_limit_rate_for_query(sanitized_parameters):
             return await self.process_rpc_query(sanitized_parameters)
-        finally:
-            self.remote_queries_in_progress -= 1
-            self.logger.info("Remote query %d processed in %f seconds: %s",
-                             query_num, time.time() - t, sanitized_parameters)
+
+        query_num = self.next_remote_query_num()
+        self.logger.info("Schedule remote query %d: %s", query_num, sanitized_parameters)
+        t = time.time()
+        cost = self.estimate_query_cost(sanitized_parameters)
+        results = await self.query_scheduler.run(peer.mid if peer else b"", cost,
+                                                 lambda: self.process_rpc_query(sanitized_parameters))
+        self.logger.info("Remote query %d %s in %f seconds: %s", query_num,
+                         "dropped" if results is None else "processed", time.time() - t, sanitized_parameters)
+        return results
 
     async def process_rpc_query(self, sanitized_parameters: dict[str, Any]) -> list:
         """
@@ -338,26 +703,47 @@ class ContentDiscoveryCommunity(Community):
             case_sensitive=False
         )
 
-    def send_db_results(self, peer: Peer, request_payload_id: int, db_results: list[TorrentMetadata]) -> None:
+    def get_db_results_chunks(self, db_results: list[TorrentMetadata],
+                              dictionary_version: int | None = None) -> list[bytes]:
         """
-        Send the given results to the given peer.
+        Get the compressed chunks that the given results are sent in, each fitting in a single payload.
+
+        :param dictionary_version: the compression dictionary to use, or None for plain LZ4 frames.
         """
         # Special case of empty results list - sending empty lz4 archive
         if len(db_results) == 0:
-            self.ez_send(peer, SelectResponsePayload(request_payload_id, LZ4_EMPTY_ARCHIVE))
-            return
+            return [LZ4_EMPTY_ARCHIVE]
 
+        chunks = []
         index = 0
         while index < len(db_results):
             transfer_size = self.composition.maximum_payload_size
-            data, index = entries_to_chunk(db_results, transfer_size, start_index=index, include_health=True)
-            payload = SelectResponsePayload(request_payload_id, data)
-            self.ez_send(peer, payload)
+            data, index = entries_to_chunk(db_results, transfer_size, start_index=index, include_health=True,
+                                           dictionary_version=dictionary_version)
+            chunks.append(data)
+        return chunks
+
+    def send_chunks(self, peer: Peer, request_payload_id: int, chunks: list[bytes]) -> None:
+        """
+        Send the given compressed chunks to the given peer, as the response to the given request.
+        """
+        for data in chunks:
+            self.ez_send(peer, SelectResponsePayload(request_payload_id, data))
+
+    def send_db_results(self, peer: Peer, request_payload_id: int, db_results: list[TorrentMetadata]) -> None:
+        """
+        Send the given results to the given peer.
+        """
+        self.send_chunks(peer, request_payload_id,
+                         self.get_db_results_chunks(db_results, self.peer_dictionaries.get(peer.mid)))
 
     @lazy_wrapper(RemoteSelectPayload)
     async def on_remote_select(self, peer: Peer, request_payload: RemoteSelectPayload) -> None:
         """
         Callback for when another peer queries us.
+
+        Identical queries are answered from the response cache, as long as no torrent metadata was written. Changes in
+        the health of torrents are only included in new responses after the cached responses expire.
         """
         try:
             sanitized_parameters = self.parse_parameters(request_payload.json)
@@ -366,9 +752,19 @@ class ContentDiscoveryCommunity(Community):
                 self.logger.warning("Remote select with deprecated parameters: %s", str(sanitized_parameters))
                 self.ez_send(peer, SelectResponsePayload(request_payload.id, LZ4_EMPTY_ARCHIVE))
                 return
-            db_results = await self.process_rpc_query_rate_limited(sanitized_parameters)
 
-            self.send_db_results(peer, request_payload.id, db_results)
+            metadata_store = self.composition.metadata_store
+            dictionary_version = self.peer_dictionaries.get(peer.mid)
+            key = (dictionary_version, make_key(**sanitized_parameters))
+            version = metadata_store.get_metadata_version()
+            chunks = self.response_cache.get(key, version)
+            if chunks is None:
+                db_results = await self.process_rpc_query_rate_limited(sanitized_parameters, peer)
+                chunks = self.get_db_results_chunks(db_results or [], dictionary_version)
+                if db_results is not None:
+                    self.response_cache.put(key, version, chunks)
+
+            self.send_chunks(peer, request_payload.id, chunks)
         except (OperationalError, TypeError, ValueError) as error:
             self.logger.exception("Remote select error: %s. Request content: %s",
                                   str(error), repr(request_payload.json))
@@ -393,6 +789,9 @@ class ContentDiscoveryCommunity(Community):
         if request is None:
             return None
 
+        if isinstance(request, SelectRequest) and not request.peer_responded:
+            self.peer_scores.record_response(peer.mid, time.time() - request.sent_at)
+
         # Check for limit on the number of packets per request
         if request.packets_limit > 1:
             request.packets_limit -= 1
@@ -403,6 +802,8 @@ class ContentDiscoveryCommunity(Community):
             response_payload.raw_blob
         )
         self.logger.debug("Response result: %s", str(processing_results))
+        self.peer_scores.record_new_objects(peer.mid, sum(1 for r in processing_results
+                                                          if r.obj_state == ObjState.NEW_OBJECT))
 
         if isinstance(request, SelectRequest) and request.processing_callback:
             request.processing_callback(request, processing_results)
@@ -415,9 +816,10 @@ class ContentDiscoveryCommunity(Community):
 
     def _on_query_timeout(self, request_cache: SelectRequest) -> None:
         """
-        Remove a peer if it failed to respond to our select request.
+        Remove a peer, and forget its score, if it failed to respond to our select request.
         """
         if not request_cache.peer_responded:
+            self.infohashes_in_flight.difference_update(self.get_requested_infohashes(request_cache))
             self.logger.debug(
                 "Remote query timeout, deleting peer: %s %s %s",
                 str(request_cache.peer.address),
@@ -425,6 +827,7 @@ class ContentDiscoveryCommunity(Community):
                 str(request_cache.request_kwargs),
             )
             self.network.remove_peer(request_cache.peer)
+            self.peer_scores.remove(request_cache.peer.mid)
 
     def send_ping(self, peer: Peer) -> None:
         """
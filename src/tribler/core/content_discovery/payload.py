@@ -107,6 +107,23 @@ class PopularTorrentsRequest(VariablePayload):
     msg_id = 2
 
 
+@vp_compile
+class HealthSketchPayload(VariablePayload):
+    """
+    A Bloom filter of the (infohash, last_check) pairs of the torrent health that a peer knows about.
+
+    The receiver answers with a TorrentsHealthPayload of the health information that is not in the filter.
+    """
+
+    msg_id = 3
+    format_list = ["I", "B", "varlenH"]
+    names = ["salt", "num_hashes", "bloom_filter"]
+
+    salt: int
+    num_hashes: int
+    bloom_filter: bytes
+
+
 @vp_compile
 class VersionRequest(VariablePayload):
     """
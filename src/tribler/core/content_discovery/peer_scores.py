@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, TypeVar
+
+PeerType = TypeVar("PeerType")
+
+LATENCY_SMOOTHING = 0.3  # The weight of a new latency measurement in the moving average
+DEFAULT_LATENCY = 2.0  # The latency (in seconds) that we assume for peers that never responded
+MAX_SCORED_PEERS = 1000  # The number of peers to remember the scores of
+
+
+@dataclass
+class PeerScore:
+    """
+    The track record of a peer in answering our remote selects.
+    """
+
+    requests: int = 0
+    responses: int = 0
+    latency: float = DEFAULT_LATENCY
+    new_objects: int = 0
+
+    @property
+    def response_rate(self) -> float:
+        """
+        The fraction of requests that the peer responded to, starting at 0.5 for unknown peers.
+        """
+        return (self.responses + 1) / (self.requests + 2)
+
+    @property
+    def score(self) -> float:
+        """
+        How useful it is to query this peer: peers that respond often and fast with new results score best.
+        """
+        return self.response_rate * (1 + math.log1p(self.new_objects)) / (1 + self.latency)
+
+
+class PeerScores:
+    """
+    A table of the scores of peers, to select the peers to query.
+    """
+
+    def __init__(self, max_size: int = MAX_SCORED_PEERS) -> None:
+        """
+        Create a new empty table that remembers at most ``max_size`` peers.
+        """
+        self.max_size = max_size
+        self.scores: OrderedDict[Hashable, PeerScore] = OrderedDict()
+
+    def get(self, peer_key: Hashable) -> PeerScore:
+        """
+        Get the score of the given peer, creating it if it is unknown.
+
+        The least recently updated peers are forgotten first.
+        """
+        score = self.scores.get(peer_key)
+        if score is None:
+            score = self.scores[peer_key] = PeerScore()
+            while len(self.scores) > self.max_size:
+                self.scores.popitem(last=False)
+        else:
+            self.scores.move_to_end(peer_key)
+        return score
+
+    def record_request(self, peer_key: Hashable) -> None:
+        """
+        Count a request to the given peer.
+        """
+        self.get(peer_key).requests += 1
+
+    def record_response(self, peer_key: Hashable, latency: float) -> None:
+        """
+        Count the first response of the given peer to a request, that arrived after the given number of seconds.
+        """
+        score = self.get(peer_key)
+        score.responses += 1
+        score.latency += LATENCY_SMOOTHING * (latency - score.latency)
+
+    def record_new_objects(self, peer_key: Hashable, count: int) -> None:
+        """
+        Count the new entries that the given peer sent us.
+        """
+        self.get(peer_key).new_objects += count
+
+    def remove(self, peer_key: Hashable) -> None:
+        """
+        Forget about the given peer.
+        """
+        self.scores.pop(peer_key, None)
+
+    def select(self, candidates: dict[Hashable, PeerType], count: int, exploration: float = 0.0) -> list[PeerType]:
+        """
+        Select the given number of peers with the best scores.
+
+        A fraction ``exploration`` of the selection is random instead, so that peers can build up a score.
+
+        :param candidates: the peers to select from, by their key in the score table.
+        :param count: the number of peers to select.
+        :param exploration: the fraction of the selection that is random.
+        """
+        keys = list(candidates)
+        random.shuffle(keys)  # Break ties randomly
+        count = min(count, len(keys))
+        explore_count = min(count, round(count * exploration))
+        default = PeerScore().score
+        keys.sort(key=lambda key: self.scores[key].score if key in self.scores else default, reverse=True)
+        chosen = keys[:count - explore_count] + random.sample(keys[count - explore_count:], explore_count)
+        return [candidates[key] for key in chosen]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import logging
+import time
+from asyncio import Future, get_running_loop
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+ResultType = TypeVar("ResultType")
+
+DEFAULT_MAX_CONCURRENT = 4  # The size of the default read pool of the MetadataStore
+DEFAULT_MAX_QUEUE_SIZE = 50
+DEFAULT_PEER_RATE = 0.5  # Cost units per second
+DEFAULT_PEER_BURST = 5.0  # Cost units
+DEFAULT_MAX_WAIT = 5.0  # Seconds, after this the querying peer has likely moved on
+MAX_BUCKETS = 1000  # The number of peers to remember the token buckets of
+
+
+class TokenBucket:
+    """
+    A token bucket that refills at a constant rate, up to its capacity.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        """
+        Create a new, full, token bucket.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_update = now
+
+    def refill(self, now: float) -> None:
+        """
+        Add the tokens that accumulated since the last update.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.rate)
+        self.last_update = now
+
+    def take(self, amount: float, now: float) -> bool:
+        """
+        Take the given amount of tokens, if they are available.
+        """
+        self.refill(now)
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+
+@dataclass
+class QueuedQuery:
+    """
+    A query that is waiting for a free slot.
+    """
+
+    deadline: float
+    enqueued_at: float
+    granted: Future[bool] = field(default_factory=lambda: get_running_loop().create_future())
+
+
+class QueryScheduler:
+    """
+    Run expensive remote queries with bounded concurrency.
+
+    Every peer has a token bucket that its queries pay their estimated cost from. Queries that cannot run immediately
+    wait in a bounded queue that is served round-robin per peer, so a single peer cannot monopolize our database.
+    Queries that waited longer than ``max_wait`` seconds are dropped instead of run.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+                 peer_rate: float = DEFAULT_PEER_RATE, peer_burst: float = DEFAULT_PEER_BURST,
+                 max_wait: float = DEFAULT_MAX_WAIT) -> None:
+        """
+        Create a new scheduler.
+
+        :param max_concurrent: the maximum number of queries to run at the same time.
+        :param max_queue_size: the maximum number of queries to wait for a free slot.
+        :param peer_rate: the cost that a peer may spend per second.
+        :param peer_burst: the cost that a peer may spend at once.
+        :param max_wait: the number of seconds that a query may wait for a free slot.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.max_concurrent = max_concurrent
+        self.max_queue_size = max_queue_size
+        self.peer_rate = peer_rate
+        self.peer_burst = peer_burst
+        self.max_wait = max_wait
+
+        self.running = 0
+        self.queue_depth = 0
+        self.queues: OrderedDict[Hashable, deque[QueuedQuery]] = OrderedDict()
+        self.buckets: dict[Hashable, TokenBucket] = {}
+
+        self.processed = 0
+        self.total_wait = 0.0
+        self.dropped = {"rate_limited": 0, "queue_full": 0, "expired": 0}
+
+    def get_bucket(self, peer_key: Hashable, now: float) -> TokenBucket:
+        """
+        Get the token bucket of the given peer, forgetting about the full buckets of other peers if we know too many.
+        """
+        bucket = self.buckets.get(peer_key)
+        if bucket is None:
+            if len(self.buckets) >= MAX_BUCKETS:
+                for key, other in list(self.buckets.items()):
+                    other.refill(now)
+                    if other.tokens >= other.capacity:
+                        del self.buckets[key]
+            bucket = self.buckets[peer_key] = TokenBucket(self.peer_rate, self.peer_burst, now)
+        return bucket
+
+    async def run(self, peer_key: Hashable, cost: float,
+                  query: Callable[[], Awaitable[ResultType]]) -> ResultType | None:
+        """
+        Run the given query of the given peer, once there is a free slot.
+
+        :param peer_key: the identifier of the querying peer.
+        :param cost: the estimated cost of the query.
+        :param query: the function that creates the coroutine of the query.
+        :returns: the result of the query or None if the query was dropped.
+        """
+        now = time.monotonic()
+        if not self.get_bucket(peer_key, now).take(cost, now):
+            self.drop("rate_limited", peer_key)
+            return None
+
+        if self.running < self.max_concurrent and self.queue_depth == 0:
+            self.running += 1
+        else:
+            if self.queue_depth >= self.max_queue_size:
+                self.drop("queue_full", peer_key)
+                return None
+            queued = QueuedQuery(now + self.max_wait, now)
+            self.queues.setdefault(peer_key, deque()).append(queued)
+            self.queue_depth += 1
+            if not await queued.granted:
+                return None
+
+        self.processed += 1
+        try:
+            return await query()
+        finally:
+            self.running -= 1
+            self.dispatch()
+
+    def dispatch(self) -> None:
+        """
+        Give the free slots to the queued queries, round-robin per peer.
+        """
+        while self.running < self.max_concurrent and self.queues:
+            peer_key, queue = next(iter(self.queues.items()))
+            queued = queue.popleft()
+            self.queue_depth -= 1
+            if queue:
+                self.queues.move_to_end(peer_key)
+            else:
+                del self.queues[peer_key]
+
+            if queued.granted.done():
+                continue
+            now = time.monotonic()
+            if now > queued.deadline:
+                self.drop("expired", peer_key)
+                queued.granted.set_result(False)
+                continue
+            self.total_wait += now - queued.enqueued_at
+            self.running += 1
+            queued.granted.set_result(True)
+
+    def drop(self, reason: str, peer_key: Hashable) -> None:
+        """
+        Count a query that is not run.
+        """
+        self.logger.warning("Dropping remote query of %s: %s", str(peer_key), reason)
+        self.dropped[reason] += 1
+
+    def get_stats(self) -> dict[str, int | float | dict[str, int]]:
+        """
+        Get the queue depth, the number of running and processed queries, the mean wait time and the drop counts.
+        """
+        return {
+            "queue_depth": self.queue_depth,
+            "running": self.running,
+            "processed": self.processed,
+            "mean_wait": self.total_wait / self.processed if self.processed else 0.0,
+            "dropped": dict(self.dropped)
+        }
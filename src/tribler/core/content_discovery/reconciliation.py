@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import math
+import random
+import struct
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from tribler.core.torrent_checker.dataclasses import HealthInfo
+
+MAX_FILTER_SIZE = 1000  # bytes, to fit the sketch in a single packet
+MAX_NUM_HASHES = 16  # Every hash takes 4 bytes of a single blake2b digest of at most 64 bytes
+
+
+def health_key(infohash: bytes, last_check: int) -> bytes:
+    """
+    Get the sketch key of the given check of a torrent.
+    """
+    return infohash + struct.pack(">Q", last_check)
+
+
+class BloomFilter:
+    """
+    A Bloom filter of byte strings.
+
+    Every filter has its own salt, so that the false positives of subsequent filters of the same set differ.
+    """
+
+    def __init__(self, size: int, num_hashes: int, salt: int, data: bytes | None = None) -> None:
+        """
+        Create a new filter of ``size`` bytes that sets ``num_hashes`` bits per key.
+
+        :param data: the bits of an existing filter.
+        """
+        self.size = size
+        self.num_bits = size * 8
+        self.num_hashes = num_hashes
+        self.salt = salt
+        self.data = bytearray(data) if data is not None else bytearray(size)
+
+    @classmethod
+    def for_capacity(cls: type[BloomFilter], capacity: int, false_positive_rate: float,
+                     max_size: int = MAX_FILTER_SIZE) -> BloomFilter:
+        """
+        Create an empty filter that has the given false positive rate when it holds ``capacity`` keys.
+
+        The filter is never larger than ``max_size`` bytes, at the cost of a higher false positive rate.
+        """
+        num_bits = -max(capacity, 1) * math.log(false_positive_rate) / math.log(2) ** 2
+        size = min(max_size, max(1, math.ceil(num_bits / 8)))
+        num_hashes = min(MAX_NUM_HASHES, max(1, round(size * 8 / max(capacity, 1) * math.log(2))))
+        return cls(size, num_hashes, random.getrandbits(32))
+
+    def indices(self, key: bytes) -> Iterator[int]:
+        """
+        Get the bit indices of the given key, each from its own 4 bytes of a single digest.
+
+        Double hashing is avoided: with a filter size that is not prime, it sets all bits of a residue class for some
+        keys, which makes false positives far more likely than the target rate.
+        """
+        digest = blake2b(key, digest_size=4 * self.num_hashes, salt=self.salt.to_bytes(4, "big")).digest()
+        for offset in range(0, len(digest), 4):
+            yield int.from_bytes(digest[offset:offset + 4], "big") % self.num_bits
+
+    def add(self, key: bytes) -> None:
+        """
+        Add the given key to the filter.
+        """
+        for index in self.indices(key):
+            self.data[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        """
+        Whether the given key is (probably) in the filter.
+        """
+        return all(self.data[index >> 3] & (1 << (index & 7)) for index in self.indices(key))
+
+
+def create_health_sketch(known: dict[bytes, int], capacity: int, false_positive_rate: float) -> BloomFilter:
+    """
+    Create a sketch of the freshest ``capacity`` checks of the given last checks, by infohash.
+    """
+    freshest = sorted(known.items(), key=lambda item: item[1], reverse=True)[:capacity]
+    sketch = BloomFilter.for_capacity(len(freshest), false_positive_rate)
+    for infohash, last_check in freshest:
+        sketch.add(health_key(infohash, last_check))
+    return sketch
+
+
+def get_missing_health(sketch: BloomFilter, health_list: list[HealthInfo], limit: int) -> list[HealthInfo]:
+    """
+    Get the freshest health info of the given list that is not in the sketch, at most ``limit`` items.
+    """
+    missing = [health for health in health_list if health_key(health.infohash, health.last_check) not in sketch]
+    missing.sort(key=lambda health: health.last_check, reverse=True)
+    return missing[:limit]
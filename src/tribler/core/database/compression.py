@@ -0,0 +1,156 @@
+"""
+Dictionary compression of metadata chunks.
+
+A single chunk fits in a UDP packet, which is too small for LZ4 to find many repetitions in. Therefore, chunks can
+be compressed with a shared dictionary of strings that are common in torrent metadata. Peers announce which
+dictionary versions they know and only receive chunks in a dictionary format that they announced.
+
+The dictionary format is:
+
+    <magic: 2 bytes><version: 1 byte><decompressed size: 2 bytes><compressed size: 2 bytes>
+    <LZ4 block, compressed with the dictionary of the given version>
+    [<optional HealthItemsPayload>]
+
+Chunks without the magic are plain LZ4 frames. The dictionaries of released versions must never change.
+"""
+from __future__ import annotations
+
+import struct
+
+from lz4.block import LZ4BlockError, compress, decompress
+
+from tribler.core.database.serialization import REGULAR_TORRENT
+
+DICTIONARY_CHUNK_MAGIC = b"\xd1\xc7"  # Not a valid start of an LZ4 frame
+DICTIONARY_CHUNK_HEADER = struct.Struct(">2sBHH")
+MAX_DECOMPRESSED_SIZE = 0xFFFF  # bytes
+
+_TRACKERS_V1 = (
+    "udp://tracker.opentrackr.org:1337/announce",
+    "udp://open.stealth.si:80/announce",
+    "udp://tracker.torrent.eu.org:451/announce",
+    "udp://exodus.desync.com:6969/announce",
+    "udp://open.demonii.com:1337/announce",
+    "udp://tracker.openbittorrent.com:6969/announce",
+    "udp://explodie.org:6969/announce",
+    "udp://tracker.tiny-vps.com:6969/announce",
+    "udp://tracker.moeking.me:6969/announce",
+    "udp://opentracker.i2p.rocks:6969/announce",
+    "udp://tracker.dler.org:6969/announce",
+    "udp://tracker1.bt.moack.co.kr:80/announce",
+    "udp://tracker.theoks.net:6969/announce",
+    "udp://tracker.bittor.pw:1337/announce",
+    "udp://9.rarbg.com:2810/announce",
+    "udp://tracker.leechers-paradise.org:6969/announce",
+    "udp://tracker.coppersurfer.tk:6969/announce",
+    "udp://ipv4.tracker.harry.lu:80/announce",
+    "udp://tracker.cyberia.is:6969/announce",
+    "udp://retracker.lanta-net.ru:2710/announce",
+    "http://tracker.opentrackr.org:1337/announce",
+    "http://tracker.files.fm:6969/announce",
+    "http://bt.t-ru.org/ann",
+    "http://tracker.gbitt.info:80/announce",
+    "https://tracker.tamersunion.org:443/announce",
+    "https://tracker.gbitt.info:443/announce",
+    "http://torrent.ubuntu.com:6969/announce",
+    "https://torrent.ubuntu.com/announce",
+    "http://linuxtracker.org:2710/announce",
+    "http://academictorrents.com/announce.php",
+    "udp://tracker.publicbt.com:80/announce",
+)
+
+_TAGS_V1 = (
+    "video", "audio", "music", "movie", "movies", "tv", "series", "episode", "season", "documentary", "anime",
+    "ebook", "book", "books", "games", "game", "software", "application", "linux", "ubuntu", "debian", "fedora",
+    "xxx", "other", "compressed", "document", "picture", "image", "sport", "comedy", "drama", "action", "horror",
+    "thriller", "science fiction", "animation", "adventure", "fantasy", "crime", "romance", "family", "history",
+)
+
+_TITLE_WORDS_V1 = (
+    "2160p", "1080p", "720p", "480p", "4K", "UHD", "HDR", "HDR10", "DV", "SDR", "10bit", "8bit",
+    "x264", "x265", "H.264", "H.265", "H264", "H265", "HEVC", "AVC", "XviD", "DivX", "VP9", "AV1",
+    "WEB-DL", "WEBRip", "WEB", "BluRay", "BRRip", "BDRip", "HDRip", "DVDRip", "HDTV", "REMUX", "PROPER", "REPACK",
+    "AAC", "AAC2.0", "AC3", "DTS", "DTS-HD", "DD5.1", "DDP5.1", "TrueHD", "Atmos", "FLAC", "MP3", "320kbps",
+    "5.1", "7.1", "2.0", "Dual Audio", "Multi", "MULTi", "Subs", "ESub", "English", "ENG", "Hindi", "Eng",
+    "Complete", "COMPLETE", "Season", "S01", "S02", "S03", "S04", "S05", "E01", "E02", "E03", "E04", "E05",
+    "Discography", "Album", "Deluxe Edition", "Remastered", "Extended", "Director's Cut", "Collection", "Pack",
+    "amd64", "x86_64", "i386", "arm64", "desktop", "server", "live", "iso", "LTS", "Ubuntu", "Debian", "Fedora",
+    "Windows", "macOS", "Linux", "Portable", "Crack", "Repack", "Setup", "Pre-Activated", "Multilingual",
+    "PDF", "EPUB", "MOBI", "AZW3", "Edition", "Vol", "Volume", "Chapter", "Part",
+    "YTS", "YIFY", "RARBG", "EZTV", "ettv", "eztv", "GalaxyRG", "TGx", "PSA", "NTb", "FLUX", "ION10", "MeGusta",
+    "mkv", "mp4", "avi", "[", "]", " - ", ".", "(", ")",
+    "2019", "2020", "2021", "2022", "2023", "2024", "2025", "2026",
+)
+
+
+def _build_dictionary(*groups: tuple[str, ...]) -> bytes:
+    """
+    Join groups of common strings into a dictionary, in the length-prefixed form that they are serialized in.
+    """
+    parts = [struct.pack(">HH", REGULAR_TORRENT, 0) + b"\x00" * 64]
+    for group in groups:
+        for string in group:
+            encoded = string.encode()
+            parts.append(struct.pack(">I", len(encoded)) + encoded)
+    return b"".join(parts)
+
+
+DICTIONARIES = {
+    1: _build_dictionary(_TRACKERS_V1, _TAGS_V1, _TITLE_WORDS_V1),
+}
+LATEST_DICTIONARY_VERSION = max(DICTIONARIES)
+
+
+def is_dictionary_chunk(chunk: bytes) -> bool:
+    """
+    Whether the given chunk is in the dictionary format, instead of a plain LZ4 frame.
+    """
+    return chunk[:len(DICTIONARY_CHUNK_MAGIC)] == DICTIONARY_CHUNK_MAGIC
+
+
+def compress_with_dictionary(data: bytes, version: int) -> bytes:
+    """
+    Compress the given data with the dictionary of the given version, including the chunk header.
+    """
+    compressed = compress(data, mode="high_compression", dict=DICTIONARIES[version], store_size=False)
+    return DICTIONARY_CHUNK_HEADER.pack(DICTIONARY_CHUNK_MAGIC, version, len(data), len(compressed)) + compressed
+
+
+def decompress_with_dictionary(chunk: bytes) -> tuple[bytes, bytes]:
+    """
+    Decompress the given chunk in the dictionary format.
+
+    :returns: the decompressed data and the data that follows the compressed block.
+    :raises RuntimeError: if the chunk is malformed or uses an unknown dictionary.
+    """
+    if len(chunk) < DICTIONARY_CHUNK_HEADER.size:
+        msg = "Dictionary chunk is too short"
+        raise RuntimeError(msg)
+    _, version, decompressed_size, compressed_size = DICTIONARY_CHUNK_HEADER.unpack_from(chunk)
+    dictionary = DICTIONARIES.get(version)
+    if dictionary is None:
+        msg = f"Unknown compression dictionary version {version}"
+        raise RuntimeError(msg)
+
+    end = DICTIONARY_CHUNK_HEADER.size + compressed_size
+    try:
+        data = decompress(chunk[DICTIONARY_CHUNK_HEADER.size:end], uncompressed_size=decompressed_size,
+                          dict=dictionary)
+    except LZ4BlockError as e:
+        raise RuntimeError(str(e)) from e
+    return data, chunk[end:]
+
+
+def select_dictionary_version(announced: bytes) -> int | None:
+    """
+    Select the newest dictionary version that we share with a peer that announced the given versions.
+    """
+    shared = set(announced) & set(DICTIONARIES)
+    return max(shared) if shared else None
+
+
+def announce_dictionary_versions() -> bytes:
+    """
+    Get the announcement of the dictionary versions that we know.
+    """
+    return bytes(sorted(DICTIONARIES))
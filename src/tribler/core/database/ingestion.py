@@ -0,0 +1,167 @@
+"""
+The CPU-bound stages of processing remote metadata: decompression, parsing and signature verification.
+
+These stages do not touch the database. Therefore, they can run in a (process) pool, leaving only the verified
+payloads for the writer thread of the database.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from lz4.frame import LZ4FrameDecompressor
+
+from tribler.core.database.compression import decompress_with_dictionary, is_dictionary_chunk
+from tribler.core.database.serialization import (
+    HealthItemsPayload,
+    TorrentMetadataPayload,
+    read_torrent_metadata_batch,
+)
+from tribler.core.torrent_checker.dataclasses import HealthInfo
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageCounter:
+    """
+    The number of items that a stage has processed and the time it spent doing so.
+    """
+
+    items: int = 0
+    seconds: float = 0.0
+
+    def add(self, items: int, seconds: float) -> None:
+        """
+        Count the given number of items that were processed in the given number of seconds.
+        """
+        self.items += items
+        self.seconds += seconds
+
+    @property
+    def throughput(self) -> float:
+        """
+        The number of items per second, while the stage was busy.
+        """
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class IngestionStats:
+    """
+    Per-stage counters of the mdblob ingestion pipeline.
+
+    Decompression counts bytes, the other stages count payloads.
+    """
+
+    decompress: StageCounter = field(default_factory=StageCounter)
+    parse: StageCounter = field(default_factory=StageCounter)
+    verify: StageCounter = field(default_factory=StageCounter)
+    write: StageCounter = field(default_factory=StageCounter)
+    rejected: int = 0
+
+    def add(self, contents: MdblobContents) -> None:
+        """
+        Count the work that was done to read the given contents.
+        """
+        for stage, (items, seconds) in contents.timings.items():
+            getattr(self, stage).add(items, seconds)
+        self.rejected += contents.rejected
+
+    def to_dict(self) -> dict[str, dict[str, float] | int]:
+        """
+        Convert these counters to a JSON-serializable dict.
+        """
+        stages = {name: getattr(self, name) for name in ("decompress", "parse", "verify", "write")}
+        return {
+            **{name: {"items": stage.items, "seconds": stage.seconds, "throughput": stage.throughput}
+               for name, stage in stages.items()},
+            "rejected": self.rejected
+        }
+
+
+@dataclass
+class MdblobContents:
+    """
+    The verified contents of a compressed mdblob.
+    """
+
+    payloads: list[dict] = field(default_factory=list)
+    health: list[HealthInfo] = field(default_factory=list)
+    rejected: int = 0
+    timings: dict[str, tuple[int, float]] = field(default_factory=dict)
+
+
+def decompress_mdblob(compressed_data: bytes) -> tuple[bytes, list[tuple[int, int, int]] | None]:
+    """
+    Decompress the given data and return the concatenated payloads and the health info it contains.
+
+    Chunks can be plain LZ4 frames or compressed with a shared dictionary.
+
+    :raises RuntimeError: if the data cannot be decompressed.
+    """
+    if is_dictionary_chunk(compressed_data):
+        decompressed_data, unused_data = decompress_with_dictionary(compressed_data)
+    else:
+        with LZ4FrameDecompressor() as decompressor:
+            decompressed_data = decompressor.decompress(compressed_data)
+            unused_data = decompressor.unused_data
+
+    health_info = None
+    if unused_data:
+        try:
+            health_info = HealthItemsPayload.unpack(unused_data)
+        except Exception as e:
+            logger.warning("Unable to parse health information: %s: %s", type(e).__name__, str(e))
+            raise
+    return decompressed_data, health_info
+
+
+def parse_mdblob(chunk_data: bytes) -> list[TorrentMetadataPayload]:
+    """
+    Read all payloads from a raw concatenated payloads blob.
+    """
+    batch = read_torrent_metadata_batch(chunk_data)
+    return [batch.to_payload(index) for index in range(len(batch))]
+
+
+def get_health_list(infohashes: list[bytes], health_info: list[tuple[int, int, int]] | None) -> list[HealthInfo]:
+    """
+    Combine the health info that accompanies a list of payloads with the infohashes of the payloads.
+    """
+    if not health_info or len(health_info) != len(infohashes):
+        return []
+    return [HealthInfo(infohash, last_check=last_check, seeders=seeders, leechers=leechers)
+            for infohash, (seeders, leechers, last_check) in zip(infohashes, health_info)]
+
+
+def read_mdblob(compressed_data: bytes) -> MdblobContents:
+    """
+    Decompress, parse and verify a compressed mdblob.
+
+    This function is the entry point of the worker processes: its argument and return value are picklable.
+    Payloads with an invalid signature are dropped and only counted.
+    """
+    start = time.perf_counter()
+    try:
+        decompressed_data, health_info = decompress_mdblob(compressed_data)
+    except RuntimeError as e:
+        logger.warning("Unable to decompress mdblob: %s", str(e))
+        return MdblobContents()
+    parse_start = time.perf_counter()
+    batch = read_torrent_metadata_batch(decompressed_data)
+    verify_start = time.perf_counter()
+    verified = [index for index, valid in enumerate(batch.check_signatures()) if valid]
+    end = time.perf_counter()
+
+    return MdblobContents(
+        payloads=[batch.to_dict(index) for index in verified],
+        health=get_health_list(batch.infohashes, health_info),
+        rejected=len(batch) - len(verified),
+        timings={
+            "decompress": (len(compressed_data), parse_start - start),
+            "parse": (len(batch), verify_start - parse_start),
+            "verify": (len(batch), end - verify_start)
+        }
+    )
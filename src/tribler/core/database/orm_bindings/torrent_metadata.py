@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import random
+import threading
 from binascii import hexlify, unhexlify
+from collections import OrderedDict
 from datetime import datetime
 from struct import unpack
 from typing import TYPE_CHECKING, Any
@@ -11,6 +13,7 @@ from pony import orm
 from pony.orm import Database, db_session
 from typing_extensions import Self
 
+from tribler.core.database.compression import MAX_DECOMPRESSED_SIZE, compress_with_dictionary
 from tribler.core.database.serialization import (
     EPOCH,
     REGULAR_TORRENT,
@@ -18,6 +21,7 @@ from tribler.core.database.serialization import (
     TorrentMetadataPayload,
     time2int,
 )
+from tribler.core.database.write_queue import TransactionListener
 from tribler.core.libtorrent.trackers import get_uniformed_tracker_url
 from tribler.core.notifier import Notification, Notifier
 
@@ -40,6 +44,8 @@ UPDATED = 6  # One of the entry's properties was updated. It will be committed a
 
 PUBLIC_KEY_LEN = 64
 
+SERIALIZED_CACHE_SIZE = 10000  # The number of serialized entries to remember
+
 if TYPE_CHECKING:
     from dataclasses import dataclass
 
@@ -113,7 +119,7 @@ def tdef_to_metadata_dict(tdef: TorrentDef) -> dict:
 
 
 def entries_to_chunk(metadata_list: list[TorrentMetadata], chunk_size: int, start_index: int = 0,
-                     include_health: bool = False) -> tuple[bytes, int]:
+                     include_health: bool = False, dictionary_version: int | None = None) -> tuple[bytes, int]:
     """
     Put serialized data of one or more metadata entries into a single binary chunk. The data is added
     incrementally until it stops fitting into the designated chunk size. The first entry is added
@@ -126,23 +132,29 @@ def entries_to_chunk(metadata_list: list[TorrentMetadata], chunk_size: int, star
 
     For the details of the health info format see the documentation: doc/metadata_store/serialization_format.rst
 
+    If a dictionary version is given, the entries are compressed with that shared dictionary instead, see
+    ``tribler.core.database.compression``. Only peers that announced the dictionary version can read such chunks.
+
     :param metadata_list: the list of metadata to process.
     :param chunk_size: the desired chunk size limit, in bytes.
     :param start_index: the index of the element of metadata_list from which the processing should start.
     :param include_health: if True, put metadata health information into the chunk.
+    :param dictionary_version: the version of the compression dictionary to use, or None for a plain LZ4 frame.
     :return: (chunk, last_entry_index) tuple, where chunk is the resulting chunk in string form and
         last_entry_index is the index of the element of the input list that was put into the chunk the last.
     """
     if start_index >= len(metadata_list):
         msg = "Could not serialize chunk: incorrect start_index"
         raise Exception(msg, metadata_list, chunk_size, start_index)
+    if dictionary_version is not None:
+        return entries_to_dictionary_chunk(metadata_list, chunk_size, start_index, include_health, dictionary_version)
 
     compressor = LZ4FrameCompressor(auto_flush=True)
-    metadata_buffer = compressor.begin()
-    health_buffer = b''
+    metadata_parts = [compressor.begin()]
+    health_parts = []
 
     index = 0
-    size = len(metadata_buffer) + LZ4_END_MARK_SIZE
+    size = len(metadata_parts[0]) + LZ4_END_MARK_SIZE
     if include_health:
         size += HEALTH_ITEM_HEADER_SIZE
 
@@ -157,16 +169,199 @@ def entries_to_chunk(metadata_list: list[TorrentMetadata], chunk_size: int, star
             # This lets higher levels to decide what to do in this case, e.g. send it through EVA protocol.
             break
 
-        metadata_buffer += metadata_bytes
+        metadata_parts.append(metadata_bytes)
         if include_health:
-            health_buffer += health_bytes
+            health_parts.append(health_bytes)
         index = count
 
-    result = metadata_buffer + compressor.flush()
+    metadata_parts.append(compressor.flush())
     if include_health:
-        result += HealthItemsPayload(health_buffer).serialize()
+        metadata_parts.append(HealthItemsPayload(b"".join(health_parts)).serialize())
+
+    return b"".join(metadata_parts), index + 1
+
+
+def entries_to_dictionary_chunk(metadata_list: list[TorrentMetadata], chunk_size: int, start_index: int,
+                                include_health: bool, dictionary_version: int) -> tuple[bytes, int]:
+    """
+    Put serialized data of one or more metadata entries into a single chunk, compressed with a shared dictionary.
+
+    Entries are added while the compressed chunk fits into the designated chunk size. The first entry is added
+    regardless of violating the chunk size limit.
+
+    Compressing is expensive, so entries are added and removed in steps: the compression ratio of the previous step
+    estimates how many entries fit, and the chunk is only compressed once per step.
+    """
+    if start_index >= len(metadata_list):
+        msg = "Could not serialize chunk: incorrect start_index"
+        raise Exception(msg, metadata_list, chunk_size, start_index)
 
-    return result, index + 1
+    metadata_parts: list[bytes] = []
+    health_parts: list[bytes] = []
+    decompressed_size = 0
+    health_size = HEALTH_ITEM_HEADER_SIZE if include_health else 0
+    ratio = 1.0  # The compressed size per decompressed byte, as measured by the previous step
+    can_grow = True
+    compressed = b""
+    compressed_count = 0  # The number of entries in the compressed chunk
+
+    while True:
+        index = start_index + len(metadata_parts)
+        while can_grow and index < len(metadata_list):
+            metadata = metadata_list[index]
+            metadata_bytes = metadata.serialized()
+            health_bytes = metadata.serialized_health() if include_health else b''
+            if metadata_parts and (decompressed_size + len(metadata_bytes) > MAX_DECOMPRESSED_SIZE
+                                   or (decompressed_size + len(metadata_bytes)) * ratio + health_size
+                                   + len(health_bytes) > chunk_size):
+                break
+            metadata_parts.append(metadata_bytes)
+            decompressed_size += len(metadata_bytes)
+            health_parts.append(health_bytes)
+            health_size += len(health_bytes)
+            index += 1
+        if compressed_count == len(metadata_parts):
+            break
+
+        compressed = compress_with_dictionary(b"".join(metadata_parts), dictionary_version)
+        compressed_count = len(metadata_parts)
+        ratio = len(compressed) / decompressed_size
+        if len(metadata_parts) == 1 or len(compressed) + health_size <= chunk_size:
+            continue
+
+        # Too large: remove the entries that do not fit according to the new ratio, and never add entries again
+        can_grow = False
+        while True:
+            decompressed_size -= len(metadata_parts.pop())
+            health_size -= len(health_parts.pop())
+            if len(metadata_parts) == 1 or decompressed_size * ratio + health_size <= chunk_size:
+                break
+
+    if include_health:
+        compressed += HealthItemsPayload(b"".join(health_parts)).serialize()
+    return compressed, start_index + len(metadata_parts)
+
+
+class SerializedEntryCache:
+    """
+    A least-recently-used cache of the signed serialized form of torrent metadata entries, by rowid.
+
+    Entries are sent to many peers, so we avoid converting them to a payload and packing it for every remote query.
+    Every serialized form is stored with the timestamp of the entry that it was created from: a reader that serialized
+    an entry before a concurrent update may still store its result, but it is never handed out for the updated entry.
+    """
+
+    def __init__(self, max_size: int = SERIALIZED_CACHE_SIZE) -> None:
+        """
+        Create a new cache that holds at most ``max_size`` serialized entries.
+        """
+        self.max_size = max_size
+        self.entries: OrderedDict[int, tuple[int, bytes]] = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, rowid: int, timestamp: int) -> bytes | None:
+        """
+        Get the serialized form of the entry with the given rowid and timestamp, if it is known.
+        """
+        with self.lock:
+            cached = self.entries.get(rowid)
+            if cached is None or cached[0] != timestamp:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(rowid)
+            self.hits += 1
+            return cached[1]
+
+    def put(self, rowid: int, timestamp: int, serialized: bytes) -> None:
+        """
+        Store the serialized form of the entry with the given rowid and timestamp.
+
+        The serialized form of a newer version of the entry is not replaced.
+        """
+        with self.lock:
+            cached = self.entries.get(rowid)
+            if cached is not None and cached[0] > timestamp:
+                return
+            self.entries[rowid] = (timestamp, serialized)
+            self.entries.move_to_end(rowid)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, rowid: int) -> None:
+        """
+        Forget the serialized form of the entry with the given rowid, because it changed.
+        """
+        with self.lock:
+            self.entries.pop(rowid, None)
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Get the number of cached entries and the number of hits and misses.
+        """
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+class MetadataVersion(TransactionListener):
+    """
+    The version of the torrent metadata in the database, which is updated by the thread that writes the metadata.
+
+    The version changes whenever an entry is inserted, updated or deleted, but not when only its health changes.
+    The changes of a write transaction of the write queue are only published once that transaction is committed, so
+    that readers never see a version of data that they cannot read yet.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a new version, for an empty database.
+        """
+        self.generation = 0
+        self.max_rowid = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()  # The rowids of the pending changes of the transaction of a thread
+
+    def changed(self, rowid: int) -> None:
+        """
+        Signal that the entry with the given rowid was inserted, updated or deleted.
+        """
+        pending = getattr(self.local, "pending", None)
+        if pending is None:
+            self.publish([rowid])
+        else:
+            pending.append(rowid)
+
+    def publish(self, rowids: list[int]) -> None:
+        """
+        Make the given changes visible to readers.
+        """
+        if rowids:
+            with self.lock:
+                self.generation += len(rowids)
+                self.max_rowid = max(self.max_rowid, *rowids)
+
+    def on_transaction_start(self) -> None:
+        """
+        Hold back the changes of the write transaction of the current thread.
+        """
+        self.local.pending = []
+
+    def on_transaction_end(self, committed: bool) -> None:
+        """
+        Publish the changes of the write transaction of the current thread, if it was committed.
+        """
+        pending, self.local.pending = self.local.pending, None
+        if committed:
+            self.publish(pending)
+
+    def get(self) -> tuple[int, int]:
+        """
+        Get the number of changes and the highest rowid that was written.
+        """
+        with self.lock:
+            return self.generation, self.max_rowid
 
 
 def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
@@ -216,6 +411,8 @@ def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
 
         # Special class-level properties
         payload_class = TorrentMetadataPayload
+        serialized_cache = SerializedEntryCache()
+        metadata_version = MetadataVersion()
 
         def __init__(self, *args: Any, **kwargs) -> None:  # noqa: ANN401
             # Any public keys + signatures are considered to be correct at this point, and should
@@ -256,9 +453,20 @@ def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
                 tracker = db.TrackerState.get_for_update(url=sanitized_url) or db.TrackerState(url=sanitized_url)
                 self.health.trackers.add(tracker)
 
+        def after_insert(self) -> None:
+            self.metadata_version.changed(self.rowid)
+
         def before_update(self) -> None:
+            self.serialized_cache.invalidate(self.rowid)
             self.add_tracker(self.tracker_info)
 
+        def after_update(self) -> None:
+            self.metadata_version.changed(self.rowid)
+
+        def before_delete(self) -> None:
+            self.serialized_cache.invalidate(self.rowid)
+            self.metadata_version.changed(self.rowid)
+
         def get_magnet(self) ->  str:
             return f"magnet:?xt=urn:btih:{hexlify(self.infohash).decode()}&dn={self.title}" + (
                 f"&tr={self.tracker_info}" if self.tracker_info else ""
@@ -335,9 +543,27 @@ def define_binding(db: Database, notifier: Notifier | None,  # noqa: C901
             """
             Serializes the object and returns the result with added signature (blob output).
 
+            Without a key, the result is cached until the entry is updated. Only entries that are loaded from the
+            database without changes are cached: changes of the current transaction may still be rolled back.
+
             :param key: private key to sign object with
             :return: serialized_data+signature binary string
             """
+            cacheable = key is None and self._status_ == "loaded"
+            if cacheable:
+                cached = self.serialized_cache.get(self.rowid, self.timestamp)
+                if cached is not None:
+                    return cached
+
+            serialized = self.serialize_payload(key)
+            if cacheable:
+                self.serialized_cache.put(self.rowid, self.timestamp, serialized)
+            return serialized
+
+        def serialize_payload(self, key: bytes | None = None) -> bytes:
+            """
+            Convert the object to a payload and serialize it, with its signature.
+            """
             kwargs = self.to_dict()
             payload = self.payload_class.from_dict(**kwargs)
             payload.signature = kwargs.pop("signature", None) or payload.signature
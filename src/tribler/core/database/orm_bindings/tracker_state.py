@@ -26,6 +26,9 @@ if TYPE_CHECKING:
         alive: bool | None
         torrents: set[TorrentState]
         failures: int | None
+        latency: float | None
+        latency_deviation: float | None
+        success_rate: float | None
 
         def __init__(self, url: str) -> None: ...  # noqa: D107
 
@@ -53,6 +56,9 @@ def define_binding(db: Database) -> type[TrackerState]:
         alive = orm.Optional(bool, default=True)
         torrents = orm.Set('TorrentState', reverse='trackers')
         failures = orm.Optional(int, size=32, default=0)
+        latency = orm.Optional(float, default=0)  # EWMA of the response time in seconds, 0 if never answered
+        latency_deviation = orm.Optional(float, default=0)  # EWMA of the deviation from the mean response time
+        success_rate = orm.Optional(float, default=1)  # EWMA of the fraction of checks that the tracker answered
 
         def __init__(self, *args: Any, **kwargs) -> None:  # noqa: ANN401
             # Sanitize and canonicalize the tracker URL
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+from typing import TYPE_CHECKING, Sequence
+
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
+
+    CursorValue: TypeAlias = "float | str | bytes | datetime | None"
+
+
+def encode_value(value: CursorValue) -> float | str | dict | None:
+    """
+    Convert a sort key value to a JSON-compatible value.
+    """
+    if isinstance(value, bytes):
+        return {"b": value.hex()}
+    if isinstance(value, datetime):
+        return {"d": value.isoformat()}
+    return value
+
+
+def decode_value(value: float | str | dict | None) -> CursorValue:
+    """
+    Convert a JSON-compatible value back to a sort key value.
+    """
+    if isinstance(value, dict):
+        if "b" in value:
+            return bytes.fromhex(value["b"])
+        return datetime.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(sort_order: str, key: Sequence[CursorValue]) -> str:
+    """
+    Create an opaque cursor that points just after the given sort key.
+
+    :param sort_order: a description of the sort order that the key belongs to.
+    :param key: the values of the sort key of the last entry of a page.
+    """
+    data = json.dumps([sort_order, [encode_value(value) for value in key]], separators=(",", ":"))
+    return urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_order: str) -> list[CursorValue]:
+    """
+    Get the sort key from a cursor that was created by ``encode_cursor``.
+
+    :raises ValueError: if the cursor is malformed or if it belongs to a different sort order.
+    """
+    try:
+        cursor_sort_order, key = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        key = [decode_value(value) for value in key]
+    except (BinasciiError, UnicodeDecodeError, TypeError, KeyError, ValueError) as e:
+        msg = f"Malformed cursor: {cursor}"
+        raise ValueError(msg) from e
+    if cursor_sort_order != sort_order:
+        msg = f"Cursor for sort order {cursor_sort_order} used with sort order {sort_order}"
+        raise ValueError(msg)
+    return key
@@ -122,6 +122,8 @@ class DatabaseEndpoint(RESTEndpoint):
             sanitized["channel_pk"] = unhexlify(parameters["channel_pk"])
         if "origin_id" in parameters:
             sanitized["origin_id"] = int(parameters["origin_id"])
+        if "cursor" in parameters:
+            sanitized["cursor"] = parameters["cursor"]
         return sanitized
 
     @db_session
@@ -213,6 +215,7 @@ class DatabaseEndpoint(RESTEndpoint):
                         "results": [TorrentSchema],
                         "first": Integer(),
                         "last": Integer(),
+                        "next_cursor": String(),
                     }
                 )
             }
@@ -228,8 +231,12 @@ class DatabaseEndpoint(RESTEndpoint):
         if t_filter := request.query.get("filter"):
             sanitized["txt_filter"] = t_filter
 
-        with db_session:
-            contents_list = [entry.to_simple_dict() for entry in request.context[0].get_entries(**sanitized)]
+        try:
+            with db_session:
+                entries, next_cursor = request.context[0].get_entries_page(**sanitized)
+                contents_list = [entry.to_simple_dict() for entry in entries]
+        except ValueError as e:
+            return RESTResponse({"error": f"Error processing request parameters: {e}"}, status=HTTP_BAD_REQUEST)
 
         self.add_download_progress_to_metadata_list(contents_list)
         self.add_statements_to_metadata_list(contents_list)
@@ -237,6 +244,7 @@ class DatabaseEndpoint(RESTEndpoint):
             "results": contents_list,
             "first": sanitized["first"],
             "last": sanitized["last"],
+            "next_cursor": next_cursor,
         }
 
         return RESTResponse(response_dict)
@@ -254,6 +262,7 @@ class DatabaseEndpoint(RESTEndpoint):
                         "sort_by": String(),
                         "sort_desc": Integer(),
                         "total": Integer(),
+                        "next_cursor": String(),
                     }
                 )
             }
@@ -286,20 +295,13 @@ class DatabaseEndpoint(RESTEndpoint):
 
         mds: MetadataStore = request.context[0]
 
-        def search_db() -> tuple[list[dict], int, int]:
-            with db_session:
-                pony_query = mds.get_entries(**sanitized)
-                search_results = [r.to_simple_dict() for r in pony_query]
-                if include_total:
-                    total = mds.get_total_count(**sanitized)
-                    max_rowid = mds.get_max_rowid()
-                else:
-                    total = max_rowid = None
+        def search_db() -> tuple[list[dict], int, int, str | None]:
+            search_results, total, max_rowid, next_cursor = mds.get_search_results(bool(include_total), **sanitized)
             if self.download_manager is not None:
                 self.download_manager.notifier.notify(Notification.local_query_results,
                                                       query=request.query.get("fts_text"),
                                                       results=list(search_results))
-            return search_results, total, max_rowid
+            return search_results, total, max_rowid, next_cursor
 
         try:
             with db_session:
@@ -312,7 +314,7 @@ class DatabaseEndpoint(RESTEndpoint):
                     if infohash_set:
                         sanitized["infohash_set"] = {bytes.fromhex(s) for s in infohash_set}
 
-            search_results, total, max_rowid = await mds.run_threaded(search_db)
+            search_results, total, max_rowid, next_cursor = await mds.run_threaded(search_db)
         except Exception as e:
             self._logger.exception("Error while performing DB search: %s: %s", type(e).__name__, e)
             return RESTResponse(status=HTTP_BAD_REQUEST)
@@ -325,6 +327,7 @@ class DatabaseEndpoint(RESTEndpoint):
             "last": sanitized["last"],
             "sort_by": sanitized["sort_by"],
             "sort_desc": sanitized["sort_desc"],
+            "next_cursor": next_cursor,
         }
         if include_total:
             response_dict.update(total=total, max_rowid=max_rowid)
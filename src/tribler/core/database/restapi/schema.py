@@ -9,6 +9,8 @@ class MetadataParameters(Schema):
 
     first = Integer(default=1, description="Limit the range of the query")
     last = Integer(default=50, description="Limit the range of the query")
+    cursor = String(description="Continue after the last result of a previous query (returned as next_cursor), "
+                                "first and last then only determine the number of results")
     sort_by = String(description='Sorts results in forward or backward, based on column name (e.g. "id" vs "-id")')
     sort_desc = Boolean(default=True)
     txt_filter = String(description="FTS search on the chosen word* terms")
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+DEFAULT_MAX_SIZE = 128  # The number of searches to remember
+
+
+def make_key(**kwargs) -> tuple:
+    """
+    Normalize the given search parameters to a hashable key.
+    """
+    items = []
+    for name, value in sorted(kwargs.items()):
+        if isinstance(value, (set, frozenset)):
+            value = tuple(sorted(value))  # noqa: PLW2901
+        elif isinstance(value, list):
+            value = tuple(value)  # noqa: PLW2901
+        items.append((name, value))
+    return tuple(items)
+
+
+class SearchCache:
+    """
+    A least-recently-used cache of search results.
+
+    Every result is stored with the version of the database that it was computed from. A result of an older version is
+    never returned: it is dropped when it is looked up. The same goes for results that are older than the ``ttl``, if
+    one is given.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: float | None = None) -> None:
+        """
+        Create a new search cache that holds at most ``max_size`` results, for at most ``ttl`` seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[Hashable, tuple[Hashable, float, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Hashable) -> Any | None:  # noqa: ANN401
+        """
+        Get the result for the given key, if it was computed from the given version of the database.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version or self.expired(entry[1]):
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def expired(self, stored_at: float) -> bool:
+        """
+        Whether a result that was stored at the given (monotonic) time is too old to be returned.
+        """
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+    def put(self, key: Hashable, version: Hashable, result: Any) -> None:  # noqa: ANN401
+        """
+        Store the result for the given key, computed from the given version of the database.
+        """
+        with self.lock:
+            self.entries[key] = (version, time.monotonic(), result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Forget all results.
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Get the number of cached results and the number of hits and misses.
+        """
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import struct
 from binascii import hexlify
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
 
@@ -11,7 +12,7 @@ from ipv8.messaging.serialization import VarLenUtf8, default_serializer
 from typing_extensions import Self
 
 if TYPE_CHECKING:
-    from ipv8.types import PrivateKey
+    from ipv8.types import PrivateKey, PublicKey
 
 default_serializer.add_packer("varlenIutf8", VarLenUtf8(">I"))
 EPOCH = datetime(1970, 1, 1)  # noqa: DTZ001
@@ -247,3 +248,157 @@ class HealthItemsPayload(VariablePayload):
             return 0, 0, 0
 
         return seeders, leechers, last_check
+
+
+# The fixed-size fields of a TorrentMetadataPayload, up to (and including) the torrent date.
+TORRENT_METADATA_HEADER = struct.Struct(">HH64sQQQ20sQI")
+VARLEN_LENGTH = struct.Struct(">I")
+
+
+@dataclass
+class TorrentMetadataBatch:
+    """
+    The columns of a list of serialized TorrentMetadataPayloads, read in a single pass over their blob.
+
+    The strings and signatures are not copied out of the blob: they are stored as offsets and decoded on demand.
+    """
+
+    data: memoryview
+    starts: list[int] = field(default_factory=list)
+    metadata_types: list[int] = field(default_factory=list)
+    reserved_flags: list[int] = field(default_factory=list)
+    public_keys: list[bytes] = field(default_factory=list)
+    ids: list[int] = field(default_factory=list)
+    origin_ids: list[int] = field(default_factory=list)
+    timestamps: list[int] = field(default_factory=list)
+    infohashes: list[bytes] = field(default_factory=list)
+    sizes: list[int] = field(default_factory=list)
+    torrent_dates: list[int] = field(default_factory=list)
+    title_offsets: list[tuple[int, int]] = field(default_factory=list)
+    tags_offsets: list[tuple[int, int]] = field(default_factory=list)
+    tracker_info_offsets: list[tuple[int, int]] = field(default_factory=list)
+    signature_offsets: list[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        """
+        Get the number of payloads in this batch.
+        """
+        return len(self.starts)
+
+    def get_string(self, offsets: tuple[int, int]) -> str:
+        """
+        Decode the string at the given (offset, length).
+        """
+        offset, length = offsets
+        return str(self.data[offset: offset + length], "utf-8")
+
+    def get_signed_data(self, index: int) -> memoryview:
+        """
+        Get the serialized form of the payload at the given index, without its signature.
+        """
+        return self.data[self.starts[index]: self.signature_offsets[index]]
+
+    def get_signature(self, index: int) -> memoryview:
+        """
+        Get the signature of the payload at the given index.
+        """
+        offset = self.signature_offsets[index]
+        return self.data[offset: offset + SIGNATURE_SIZE]
+
+    def has_signature(self, index: int) -> bool:
+        """
+        Check if the payload at the given index has an attached signature.
+        """
+        return self.public_keys[index] != NULL_KEY or self.get_signature(index) != NULL_SIG
+
+    def check_signatures(self) -> list[bool]:
+        """
+        Check the signatures of all payloads that have one, against their original serialized form.
+
+        :return: for every payload, whether it has no signature or a valid signature.
+        """
+        keys: dict[bytes, PublicKey] = {}
+        valid = []
+        for index, public_key in enumerate(self.public_keys):
+            if not self.has_signature(index):
+                valid.append(True)
+                continue
+            key = keys.get(public_key)
+            if key is None:
+                key = keys[public_key] = default_eccrypto.key_from_public_bin(b"LibNaCLPK:" + public_key)
+            valid.append(bool(default_eccrypto.is_valid_signature(key, bytes(self.get_signed_data(index)),
+                                                                  bytes(self.get_signature(index)))))
+        return valid
+
+    def to_dict(self, index: int) -> dict:
+        """
+        Convert the payload at the given index to a dictionary, like ``TorrentMetadataPayload.to_dict``.
+        """
+        return {
+            "metadata_type": self.metadata_types[index],
+            "reserved_flags": self.reserved_flags[index],
+            "public_key": self.public_keys[index],
+            "id_": self.ids[index],
+            "origin_id": self.origin_ids[index],
+            "timestamp": self.timestamps[index],
+            "infohash": self.infohashes[index],
+            "size": self.sizes[index],
+            "torrent_date": int2time(self.torrent_dates[index]),
+            "title": self.get_string(self.title_offsets[index]),
+            "tags": self.get_string(self.tags_offsets[index]),
+            "tracker_info": self.get_string(self.tracker_info_offsets[index]),
+            "signature": bytes(self.get_signature(index))
+        }
+
+    def to_payload(self, index: int) -> TorrentMetadataPayload:
+        """
+        Create the payload at the given index.
+        """
+        return TorrentMetadataPayload.from_dict(**self.to_dict(index))
+
+
+def read_torrent_metadata_batch(data: bytes | memoryview) -> TorrentMetadataBatch:
+    """
+    Read all payloads from a blob of concatenated TorrentMetadataPayloads (each followed by its signature).
+
+    :raises UnknownBlobTypeException: if the blob contains a payload of another type.
+    :raises ValueError: if the blob is truncated.
+    """
+    view = memoryview(data)
+    batch = TorrentMetadataBatch(view)
+    end = len(view)
+    offset = 0
+    while offset < end:
+        if offset + TORRENT_METADATA_HEADER.size > end:
+            msg = f"Truncated payload at offset {offset}"
+            raise ValueError(msg)
+        (metadata_type, reserved_flags, public_key, id_, origin_id, timestamp, infohash, size,
+         torrent_date) = TORRENT_METADATA_HEADER.unpack_from(view, offset)
+        if metadata_type != REGULAR_TORRENT:
+            raise UnknownBlobTypeException(metadata_type)
+        batch.starts.append(offset)
+        offset += TORRENT_METADATA_HEADER.size
+        for column in (batch.title_offsets, batch.tags_offsets, batch.tracker_info_offsets):
+            if offset + VARLEN_LENGTH.size > end:
+                msg = f"Truncated payload at offset {offset}"
+                raise ValueError(msg)
+            length, = VARLEN_LENGTH.unpack_from(view, offset)
+            offset += VARLEN_LENGTH.size
+            column.append((offset, length))
+            offset += length
+        if offset + SIGNATURE_SIZE > end:
+            msg = f"Truncated payload at offset {offset}"
+            raise ValueError(msg)
+        batch.signature_offsets.append(offset)
+        offset += SIGNATURE_SIZE
+
+        batch.metadata_types.append(metadata_type)
+        batch.reserved_flags.append(reserved_flags)
+        batch.public_keys.append(public_key)
+        batch.ids.append(id_)
+        batch.origin_ids.append(origin_id)
+        batch.timestamps.append(timestamp)
+        batch.infohashes.append(infohash)
+        batch.sizes.append(size)
+        batch.torrent_dates.append(torrent_date)
+    return batch
@@ -2,35 +2,42 @@ from __future__ import annotations
 
 import enum
 import logging
+import multiprocessing
 import re
 import threading
-from asyncio import get_running_loop
+from asyncio import gather, get_running_loop, wrap_future
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
 from os.path import getsize
 from pathlib import Path
-from time import sleep, time
+from time import time
 from typing import TYPE_CHECKING, Any, Callable
 
-from lz4.frame import LZ4FrameDecompressor
 from pony import orm
 from pony.orm import Database, db_session, desc, left_join, raw_sql, select
-from pony.orm.dbproviders.sqlite import keep_exception
 
+from tribler.core.database.ingestion import (
+    IngestionStats,
+    decompress_mdblob,
+    get_health_list,
+    parse_mdblob,
+    read_mdblob,
+)
 from tribler.core.database.orm_bindings import misc, torrent_metadata, tracker_state
 from tribler.core.database.orm_bindings import torrent_state as torrent_state_
 from tribler.core.database.orm_bindings.torrent_metadata import NULL_KEY_SUBST
-from tribler.core.database.ranks import torrent_rank
+from tribler.core.database.pagination import decode_cursor, encode_cursor
+from tribler.core.database.ranks import torrent_ranks
+from tribler.core.database.search_cache import SearchCache, make_key
 from tribler.core.database.serialization import (
     CHANNEL_TORRENT,
     COLLECTION_NODE,
     NULL_KEY,
     REGULAR_TORRENT,
-    HealthItemsPayload,
     TorrentMetadataPayload,
-    read_payload_with_offset,
+    time2int,
 )
-from tribler.core.torrent_checker.dataclasses import HealthInfo
+from tribler.core.database.write_queue import WriteQueue
 
 if TYPE_CHECKING:
     from sqlite3 import Connection
@@ -41,6 +48,7 @@ if TYPE_CHECKING:
     from tribler.core.database.layers.layer import EntityImpl
     from tribler.core.database.orm_bindings.torrent_metadata import TorrentMetadata
     from tribler.core.notifier import Notifier
+    from tribler.core.torrent_checker.dataclasses import HealthInfo
 
 
 class ObjState(enum.Enum):
@@ -62,18 +70,46 @@ class ProcessingResult:
     It includes the ORM object created as a result of processing, the state of the object
     as indicated by ObjState enum, and missing dependencies list that includes a list of query
     arguments for get_entries to query the sender back through Remote Query Community.
+    New and updated objects that were written by the write queue also include their simple dict.
     """
 
     md_obj: EntityImpl
     obj_state: object
     missing_deps: list = field(default_factory=list)
+    simple_dict: dict | None = None
 
 
 BETA_DB_VERSIONS = [0, 1, 2, 3, 4, 5]
 CURRENT_DB_VERSION = 15
 
-MIN_BATCH_SIZE = 10
-MAX_BATCH_SIZE = 1000
+# Columns that were added to existing tables, with their SQL definitions, to add to databases that were created before.
+ADDED_COLUMNS = {
+    "TrackerState": (
+        ("latency", "REAL DEFAULT 0"),
+        ("latency_deviation", "REAL DEFAULT 0"),
+        ("success_rate", "REAL DEFAULT 1"),
+    ),
+}
+
+DEFAULT_READ_POOL_SIZE = 4
+# The number of values per SELECT ... IN query, well below SQLite's default limit of 999 variables.
+SELECT_IN_BATCH_SIZE = 500
+
+# The Pony expressions of the attributes that cursors can point into. Numeric attributes are compared as-is, the other
+# columns are compared using their (case-insensitive) raw SQL value, the same way that they are sorted.
+SORT_EXPRESSIONS = {
+    "rowid": "g.rowid",
+    "size": "g.size",
+    "status": "g.status",
+    "health.seeders": "g.health.seeders",
+    "health.leechers": "g.health.leechers",
+    "infohash": 'raw_sql("g.infohash COLLATE NOCASE")',
+    "tags": 'raw_sql("g.tags COLLATE NOCASE")',
+    "title": 'raw_sql("g.title COLLATE NOCASE")',
+    "torrent_date": 'raw_sql("g.torrent_date COLLATE NOCASE")',
+}
+# The sort order of the cursors of text search results that are ranked by relevance.
+RANKED_SORT_ORDER = "rank"
 
 POPULAR_TORRENTS_FRESHNESS_PERIOD = 60 * 60 * 24  # Last day
 POPULAR_TORRENTS_COUNT = 100
@@ -137,10 +173,26 @@ class MetadataStore:
             disable_sync: bool = False,
             notifier: Notifier | None = None,
             check_tables: bool = True,
-            db_version: int = CURRENT_DB_VERSION
+            db_version: int = CURRENT_DB_VERSION,
+            *,
+            wal_mode: bool = False,
+            read_pool_size: int = DEFAULT_READ_POOL_SIZE,
+            mmap_size: int = 0,
+            cache_size: int | None = None,
+            ingestion_processes: int = 0
     ) -> None:
         """
         Create a new metadata store.
+
+        By default, every threaded database call runs on the default executor and opens a fresh connection. With
+        ``wal_mode`` enabled (for on-disk databases), the database uses write-ahead logging instead and threaded reads
+        go to a bounded pool of ``read_pool_size`` threads with persistent connections. This way, readers do not block
+        on write transactions. Threaded writes always go to the single writer thread of the ``write_queue``.
+
+        :param mmap_size: the maximum number of bytes of the database file to memory-map, 0 to disable.
+        :param cache_size: the SQLite page cache size (``PRAGMA cache_size`` semantics), None for the SQLite default.
+        :param ingestion_processes: the number of worker processes that decompress, parse and verify remote metadata,
+                                    0 to do this on the default executor.
         """
         self.notifier = notifier  # Reference to app-level notification service
         self.db_path = db_filename
@@ -149,34 +201,24 @@ class MetadataStore:
         self._logger = logging.getLogger(self.__class__.__name__)
 
         self._shutting_down = False
-        self.batch_size = 10  # reasonable number, a little bit more than typically fits in a single UDP packet
-        self.reference_timedelta = timedelta(milliseconds=100)
-        self.sleep_on_external_thread = 0.05  # sleep this amount of seconds between batches executed on external thread
+
+        # Search results are cached until the database changes: either through one of our own writes (that increment
+        # the write generation) or through an insert elsewhere (that changes the max rowid).
+        self.write_generation = 0
+        self.search_cache = SearchCache()
+
+        # The connection pool is only useful for on-disk databases: every connection to ":memory:" is a new database.
+        self.pooled_connections = wal_mode and db_filename != ":memory:"
+        self.read_pool_size = read_pool_size
+        self.read_executor = self.create_read_executor()
+        self.ingestion_executor = self.create_ingestion_executor(ingestion_processes)
+        self.ingestion_stats = IngestionStats()
 
         # We have to dynamically define/init ORM-managed entities here to be able to support
         # multiple sessions in Tribler. ORM-managed classes are bound to the database instance
         # at definition.
-        self.db = Database()
-
-        # This attribute is internally called by Pony on startup, though pylint cannot detect it
-        # with the static analysis.
-        @self.db.on_connect
-        def on_connect(_: Database, connection: Connection) -> None:
-            cursor = connection.cursor()
-            cursor.execute("PRAGMA journal_mode = DELETE")
-            cursor.execute("PRAGMA synchronous = NORMAL")
-            cursor.execute("PRAGMA temp_store = MEMORY")
-            cursor.execute("PRAGMA foreign_keys = ON")
-
-            # Disable disk sync for special cases
-            if disable_sync:
-                # !!! ACHTUNG !!! This should be used only for special cases (e.g. DB upgrades), because
-                # losing power during a write will corrupt the database.
-                cursor.execute("PRAGMA journal_mode = 0")
-                cursor.execute("PRAGMA synchronous = 0")
-
-            sqlite_rank = keep_exception(torrent_rank)
-            connection.create_function('search_rank', 5, sqlite_rank)
+        self.db = self.create_database(wal_mode, disable_sync, mmap_size, cache_size)
+        self.write_queue = WriteQueue(self.db)
 
         self.MiscData = misc.define_binding(self.db)
 
@@ -196,6 +238,8 @@ class MetadataStore:
             db_path_string = str(db_filename)
 
         self.db.bind(provider="sqlite", filename=db_path_string, create_db=create_db, timeout=120.0)
+        if not create_db:
+            self.add_missing_columns()
         self.db.generate_mapping(
             create_tables=create_db, check_tables=check_tables
         )  # Must be run out of session scope
@@ -208,6 +252,68 @@ class MetadataStore:
         if create_db:
             with db_session:
                 self.MiscData(name="db_version", value=str(db_version))
+        self.TorrentMetadata.metadata_version.max_rowid = self.get_max_rowid()
+        self.write_queue.add_listener(self.TorrentMetadata.metadata_version)
+
+    def create_read_executor(self) -> ThreadPoolExecutor | None:
+        """
+        Create the bounded pool of reader threads, if this store uses pooled connections.
+        """
+        if not self.pooled_connections:
+            return None
+        return ThreadPoolExecutor(max_workers=self.read_pool_size, thread_name_prefix="MetadataStoreReader")
+
+    def create_ingestion_executor(self, ingestion_processes: int) -> Executor | None:
+        """
+        Create the worker processes that decompress, parse and verify remote metadata, if any.
+        """
+        if ingestion_processes <= 0:
+            return None
+        # Spawned (instead of forked) workers do not inherit the threads and locks of this process.
+        return ProcessPoolExecutor(max_workers=ingestion_processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def create_database(self, wal_mode: bool, disable_sync: bool, mmap_size: int,
+                        cache_size: int | None) -> Database:
+        """
+        Create the database, of which every new connection is configured with the given options.
+        """
+        db = Database()
+
+        # This attribute is internally called by Pony on startup, though pylint cannot detect it
+        # with the static analysis.
+        @db.on_connect
+        def on_connect(_: Database, connection: Connection) -> None:
+            cursor = connection.cursor()
+            cursor.execute("PRAGMA journal_mode = WAL" if wal_mode else "PRAGMA journal_mode = DELETE")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+            cursor.execute("PRAGMA temp_store = MEMORY")
+            cursor.execute("PRAGMA foreign_keys = ON")
+            if mmap_size:
+                cursor.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+            if cache_size is not None:
+                cursor.execute(f"PRAGMA cache_size = {int(cache_size)}")
+
+            # Disable disk sync for special cases
+            if disable_sync:
+                # !!! ACHTUNG !!! This should be used only for special cases (e.g. DB upgrades), because
+                # losing power during a write will corrupt the database.
+                cursor.execute("PRAGMA journal_mode = 0")
+                cursor.execute("PRAGMA synchronous = 0")
+
+        return db
+
+    @db_session(ddl=True)
+    def add_missing_columns(self) -> None:
+        """
+        Add the columns that were added to the tables after the database was created.
+        """
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {row[1] for row in self.db.execute(f'PRAGMA table_info("{table}")')}
+            if not existing:
+                continue  # The table does not exist yet, it is created with all of its columns
+            for name, definition in columns:
+                if name not in existing:
+                    self.db.execute(f'ALTER TABLE "{table}" ADD COLUMN "{name}" {definition}')
 
     def set_value(self, key: str, value: str) -> None:
         """
@@ -287,38 +393,75 @@ class MetadataStore:
         Disconnect the connection to the database.
         """
         self._shutting_down = True
+        self.write_queue.shutdown()
+        for executor in (self.read_executor, self.ingestion_executor):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
         self.db.disconnect()
 
     async def run_threaded(self, func: Callable, *args: Any, **kwargs) -> Any:  # noqa: ANN401
         """
         Run ``func`` threaded and close DB connection at the end of the execution.
 
+        If pooled connections are enabled, ``func`` runs on the reader pool and the connection stays open instead.
+
         :param func: the function to be executed threaded
         :param args: args for the function call
         :param kwargs: kwargs for the function call
         :return: a result of the func call.
         """
+        pooled = self.read_executor is not None
 
         def wrapper():  # noqa: ANN202
             try:
                 return func(*args, **kwargs)
             finally:
                 is_main_thread = threading.current_thread() is threading.main_thread()
-                if not is_main_thread:
+                if not is_main_thread and (not pooled or self._shutting_down):
                     self.db.disconnect()
 
-        return await get_running_loop().run_in_executor(None, wrapper)
+        return await get_running_loop().run_in_executor(self.read_executor, wrapper)
+
+    async def run_threaded_write(self, func: Callable, *args: Any, **kwargs) -> Any:  # noqa: ANN401
+        """
+        Run ``func`` on the writer thread, inside a write transaction that may be shared with other writes.
 
-    async def process_compressed_mdblob_threaded(self, compressed_data: bytes, **kwargs) -> list[ProcessingResult]:
+        :param func: the function to be executed threaded
+        :param args: args for the function call
+        :param kwargs: kwargs for the function call
+        :return: a result of the func call.
+        """
+        return await self.write_queue.run(func, *args, **kwargs)
+
+    async def process_compressed_mdblob_threaded(self, compressed_data: bytes,
+                                                 skip_personal_metadata_payload: bool = True) -> list[ProcessingResult]:
         """
         Decompress the given data in a thread and return a list of uncompressed results.
+
+        The data is decompressed, parsed and verified by the ingestion executor (a process pool, if configured). Only
+        the verified payloads are written to the database, each as a separate operation of the write queue. The writer
+        thread commits these (together with writes from other sources) in grouped transactions.
         """
         try:
-            return await self.run_threaded(self.process_compressed_mdblob, compressed_data, **kwargs)
+            contents = await get_running_loop().run_in_executor(self.ingestion_executor, read_mdblob, compressed_data)
+            self.ingestion_stats.add(contents)
+
+            write_start = time()
+            futures = []
+            if contents.health:
+                futures.append(self.write_queue.submit(self.process_torrent_health_batch, contents.health))
+            health_count = len(futures)
+            futures.extend(self.write_queue.submit(self.process_verified_payload,
+                                                   TorrentMetadataPayload.from_dict(**payload),
+                                                   skip_personal_metadata_payload)
+                           for payload in contents.payloads)
+            results = await gather(*(wrap_future(future) for future in futures))
+            self.ingestion_stats.write.add(len(contents.payloads), time() - write_start)
         except Exception as e:
             self._logger.exception("DB transaction error when tried to process compressed mdblob: %s: %s",
                                    e.__class__.__name__, str(e), exc_info=e)
             return []
+        return [result for payload_results in results[health_count:] for result in payload_results]
 
     def process_compressed_mdblob(self, compressed_data: bytes,
                                   skip_personal_metadata_payload: bool = True) -> list[ProcessingResult]:
@@ -326,23 +469,11 @@ class MetadataStore:
         Decompress the given data and return a list of uncompressed results.
         """
         try:
-            with LZ4FrameDecompressor() as decompressor:
-                decompressed_data = decompressor.decompress(compressed_data)
-                unused_data = decompressor.unused_data
+            decompressed_data, health_info = decompress_mdblob(compressed_data)
         except RuntimeError as e:
             self._logger.warning("Unable to decompress mdblob: %s", str(e))
             return []
-
-        health_info = None
-        if unused_data:
-            try:
-                health_info = HealthItemsPayload.unpack(unused_data)
-            except Exception as e:
-                self._logger.warning("Unable to parse health information: %s: %s", type(e).__name__, str(e))
-                raise
-
-        return self.process_squashed_mdblob(decompressed_data, health_info=health_info,
-                                            skip_personal_metadata_payload=skip_personal_metadata_payload)
+        return self.process_payloads(parse_mdblob(decompressed_data), health_info, skip_personal_metadata_payload)
 
     def process_torrent_health(self, health: HealthInfo) -> bool:
         """
@@ -370,80 +501,73 @@ class MetadataStore:
 
         return False
 
-    def process_squashed_mdblob(self, chunk_data: bytes, external_thread: bool = False,  # noqa: C901
-                                health_info: list[tuple[int, int, int]] | None = None,
+    @db_session(immediate=True)
+    def process_torrent_health_batch(self, health_list: list[HealthInfo]) -> set[bytes]:
+        """
+        Adds or updates the health of multiple torrents in a single transaction.
+
+        Invalid health info is ignored. Of multiple health infos for the same torrent, the one that should replace the
+        others is used. The known torrent states are selected with one query per ``SELECT_IN_BATCH_SIZE``
+        infohashes, the new torrent states are inserted when the transaction is flushed.
+
+        :param health_list: the health infos of torrents
+        :return: the infohashes of the torrents for which a new TorrentState object was added
+        """
+        best_health: dict[bytes, HealthInfo] = {}
+        for health in health_list:
+            if not health.is_valid():
+                self._logger.warning("Invalid health info ignored: %s", str(health))
+                continue
+            current = best_health.get(health.infohash)
+            if current is None or health.should_replace(current):
+                best_health[health.infohash] = health
+
+        infohashes = list(best_health)
+        for start in range(0, len(infohashes), SELECT_IN_BATCH_SIZE):
+            selected = infohashes[start:start + SELECT_IN_BATCH_SIZE]
+            for torrent_state in select(s for s in self.TorrentState if s.infohash in selected).for_update():
+                health = best_health.pop(torrent_state.infohash)
+                if health.should_replace(torrent_state.to_health()):
+                    torrent_state.set(seeders=health.seeders, leechers=health.leechers,
+                                      last_check=health.last_check, self_checked=False)
+
+        for health in best_health.values():
+            self.TorrentState.from_health(health)
+        self._logger.debug("Processed %d health infos, added %d torrent states", len(health_list), len(best_health))
+        return set(best_health)
+
+    def process_squashed_mdblob(self, chunk_data: bytes, health_info: list[tuple[int, int, int]] | None = None,
                                 skip_personal_metadata_payload: bool = True) -> list[ProcessingResult]:
         """
-        Process raw concatenated payloads blob. This routine breaks the database access into smaller batches.
-        It uses a congestion-control like algorithm to determine the optimal batch size, targeting the
-        batch processing time value of self.reference_timedelta.
+        Process raw concatenated payloads blob.
 
         :param chunk_data: the blob itself, consists of one or more GigaChannel payloads concatenated together
-        :param external_thread: if this is set to True, we add some sleep between batches to allow other threads
-            to get the database lock. This is an ugly workaround for Python and asynchronous programming (locking)
-            imperfections. It only makes sense to use it when this routine runs on a non-reactor thread.
         :return: a list of tuples of (<metadata or payload>, <action type>)
         """
-        offset = 0
-        payload_list = []
-        while offset < len(chunk_data):
-            payload, offset = read_payload_with_offset(chunk_data, offset)
-            if payload:
-                payload_list.append(payload)
-
-        if health_info and len(health_info) == len(payload_list):
-            with db_session:
-                for payload, (seeders, leechers, last_check) in zip(payload_list, health_info):
-                    if hasattr(payload, "infohash"):
-                        health = HealthInfo(payload.infohash, last_check=last_check,
-                                            seeders=seeders, leechers=leechers)
-                        self.process_torrent_health(health)
+        return self.process_payloads(parse_mdblob(chunk_data), health_info, skip_personal_metadata_payload)
 
+    def process_payloads(self, payload_list: list[TorrentMetadataPayload],
+                         health_info: list[tuple[int, int, int]] | None = None,
+                         skip_personal_metadata_payload: bool = True) -> list[ProcessingResult]:
+        """
+        Write the given payloads and their health info to the database in a single transaction.
+        """
         result = []
-        total_size = len(payload_list)
-        start = 0
-        while start < total_size:
-            end = start + self.batch_size
-            batch = payload_list[start:end]
-            batch_start_time = datetime.now()  # noqa: DTZ005
-
-            # We separate the sessions to minimize database locking.
-            with db_session(immediate=True):
-                for payload in batch:
-                    result.extend(self.process_payload(payload, skip_personal_metadata_payload))
-
-            # Batch size adjustment
-            batch_end_time = datetime.now() - batch_start_time  # noqa: DTZ005
-            target_coeff = batch_end_time.total_seconds() / self.reference_timedelta.total_seconds()
-            if len(batch) == self.batch_size:
-                # Adjust batch size only for full batches
-                if target_coeff < 0.8:
-                    self.batch_size += self.batch_size
-                elif target_coeff > 1.0:
-                    self.batch_size = int(float(self.batch_size) / target_coeff)
-                # we want to guarantee that at least something
-                # will go through, but not too much
-                self.batch_size = min(max(self.batch_size, MIN_BATCH_SIZE), MAX_BATCH_SIZE)
-            self._logger.debug(
-                (
-                    "Added payload batch to DB (entries, seconds): %i %f",
-                    (self.batch_size, float(batch_end_time.total_seconds())),
-                )
-            )
-            start = end
-            if self._shutting_down:
-                break
-
-            if external_thread:
-                sleep(self.sleep_on_external_thread)
-
+        with db_session(immediate=True):
+            self.process_torrent_health_batch(get_health_list([payload.infohash for payload in payload_list],
+                                                              health_info))
+            for payload in payload_list:
+                result.extend(self.process_payload(payload, skip_personal_metadata_payload))
+        self.increment_write_generation()
         return result
 
     @db_session
-    def process_payload(self, payload: TorrentMetadataPayload,
-                        skip_personal_metadata_payload: bool = True) -> list[ProcessingResult]:
+    def process_payload(self, payload: TorrentMetadataPayload, skip_personal_metadata_payload: bool = True,
+                        signature_checked: bool = False) -> list[ProcessingResult]:
         """
         Write a payload to our database (if necessary).
+
+        :param signature_checked: whether the signature of the payload was already verified (see ``read_mdblob``).
         """
         # Don't process our own torrents
         if skip_personal_metadata_payload and payload.public_key == self.my_public_key_bin:
@@ -454,7 +578,7 @@ class MetadataStore:
             return []
 
         # Don't process torrents with a bad signature
-        if payload.has_signature() and not payload.check_signature():
+        if not signature_checked and payload.has_signature() and not payload.check_signature():
             return []
 
         # Process unsigned torrents
@@ -471,6 +595,21 @@ class MetadataStore:
         obj = self.TorrentMetadata.from_payload(payload)
         return [ProcessingResult(md_obj=obj, obj_state=ObjState.NEW_OBJECT)]
 
+    @db_session
+    def process_verified_payload(self, payload: TorrentMetadataPayload,
+                                 skip_personal_metadata_payload: bool = True) -> list[ProcessingResult]:
+        """
+        Write a payload with an already verified signature and create the simple dicts of the new or updated entries.
+
+        The simple dicts are created in the same session as the write, so the event loop does not need to access the
+        written entries.
+        """
+        results = self.process_payload(payload, skip_personal_metadata_payload, signature_checked=True)
+        for result in results:
+            if result.obj_state in (ObjState.NEW_OBJECT, ObjState.UPDATED_LOCAL_VERSION):
+                result.simple_dict = result.md_obj.to_simple_dict()
+        return results
+
     @db_session
     def get_num_torrents(self) -> int:
         """
@@ -478,6 +617,18 @@ class MetadataStore:
         """
         return orm.count(self.TorrentMetadata.select(lambda g: g.metadata_type == REGULAR_TORRENT))
 
+    @db_session
+    def get_unknown_infohashes(self, infohashes: set[bytes]) -> set[bytes]:
+        """
+        Get the infohashes of the given set that we have no torrent metadata for.
+        """
+        unknown = set(infohashes)
+        ordered = list(infohashes)
+        for start in range(0, len(ordered), SELECT_IN_BATCH_SIZE):
+            selected = ordered[start:start + SELECT_IN_BATCH_SIZE]
+            unknown.difference_update(select(g.infohash for g in self.TorrentMetadata if g.infohash in selected))
+        return unknown
+
     def search_keyword(self, query: str, origin_id: int | None = None) -> Query:
         """
         Search for an FTS query, potentially restricted to a given origin id.
@@ -501,8 +652,6 @@ class MetadataStore:
             # of thousands of matching torrents. The ranking of this number of torrents may be very expensive: we need
             # to retrieve each matching torrent info and the torrent state from the database for proper ordering.
             # They are scattered randomly through the entire database file, so fetching all these torrents is slow.
-            # Also, the torrent_rank function used inside the final ORDER BY section is written in Python. It is about
-            # 30 times slower than a possible similar function written in C due to SQLite-Python communication cost.
             #
             # To speed up the query, we limit and filter search results in several iterations, and each time apply
             # a more expensive ranking algorithm:
@@ -512,11 +661,10 @@ class MetadataStore:
             #     matching torrents is not that big.
             #   * Then, we sort these 10000 torrents to prioritize torrents with seeders and restrict the number
             #     of torrents to just 1000.
-            #   * Finally, in the main query, we apply a slow ranking function to these 1000 torrents to show the most
-            #     relevant torrents at the top of the search result list.
+            #   * Finally, the get_ranked_entries method fetches these 1000 torrents in a single pass and ranks them
+            #     in one batch to show the most relevant torrents at the top of the search result list.
             #
-            # This multistep sort+limit sequence allows speedup queries up to two orders of magnitude. To further
-            # speed up full-text search queries, we can rewrite the torrent_rank function to C one day.
+            # This multistep sort+limit sequence allows speedup queries up to two orders of magnitude.
             fts_ids = raw_sql("""
                 SELECT fts.rowid
                 FROM (
@@ -530,7 +678,7 @@ class MetadataStore:
         return left_join(g for g in self.TorrentMetadata if g.rowid in fts_ids)
 
     @db_session
-    def get_entries_query(  # noqa: C901, PLR0912, PLR0913
+    def get_entries_query(  # noqa: C901, PLR0913
             self,
             metadata_type: int | None = None,
             channel_pk: bytes | None = None,
@@ -547,10 +695,12 @@ class MetadataStore:
             self_checked_torrent: bool | None = None,
             health_checked_after: int | None = None,
             popular: bool | None = None,
+            cursor: str | None = None,
     ) -> Query:
         """
         This method implements REST-friendly way to get entries from the database.
 
+        :param cursor: only include the entries that are sorted after the entry that this cursor points to.
         :return: PonyORM query object corresponding to the given params.
         """
         # Warning! For Pony magic to work, iteration variable name (e.g. 'g') should be the same everywhere!
@@ -606,7 +756,8 @@ class MetadataStore:
             pony_query = pony_query.where(lambda g: g.health.has_data == 1  # Has to be written this way for index
                                           and g.health.last_check >= health_checked_after)
 
-        # Sort the query
+        # Sort the query, by attributes that get_sort_key allows
+        sort_key = self.get_sort_key(sort_by, sort_desc, popular)
         pony_query = pony_query.sort_by("desc(g.rowid)" if sort_desc else "g.rowid")
 
         if sort_by == "HEALTH":
@@ -624,57 +775,74 @@ class MetadataStore:
             sort_expression = raw_sql(f"g.{sort_by} COLLATE NOCASE" + (" DESC" if sort_desc else ""))
             pony_query = pony_query.sort_by(sort_expression)
 
-        if sort_by is None:
-            if txt_filter:
-                """
-                The following call of `sort_by` produces an ORDER BY expression that looks like this:
-
-                ORDER BY
-                    case when "g"."metadata_type" = $CHANNEL_TORRENT then 1
-                         when "g"."metadata_type" = $COLLECTION_NODE then 2
-                         else 3 end,
-
-                    search_rank(
-                        $QUERY_STRING,
-                        g.title,
-                        torrentstate.seeders,
-                        torrentstate.leechers,
-                        $CURRENT_TIME - strftime('%s', g.torrent_date)
-                    ) DESC,
-
-                    "torrentstate"."last_check" DESC,
-
-                So, the channel torrents and channel folders are always on top if they are not filtered out.
-                Then regular torrents are selected in order of their relevance according to a search_rank() result.
-                If two torrents have the same search rank, they are ordered by the last time they were checked.
-
-                The search_rank() function is called directly from the SQLite query, but is implemented in Python,
-                it is actually the torrent_rank() function from core/utilities/search_utils.py, wrapped with
-                keep_exception() to return possible exception from SQLite to Python.
-
-                The search_rank() function receives the following arguments:
-                  - the current query string (like "Big Buck Bunny");
-                  - the title of the current torrent;
-                  - the number of seeders;
-                  - the number of leechers;
-                  - the number of seconds since the torrent's creation time.
-                """
-
-                pony_query = pony_query.sort_by(
-                    f"""
-                    (1 if g.metadata_type == {CHANNEL_TORRENT} else 2 if g.metadata_type == {COLLECTION_NODE} else 3),
-                    raw_sql('''search_rank(
-                        $txt_filter, g.title, torrentstate.seeders, torrentstate.leechers,
-                        $int(time()) - strftime('%s', g.torrent_date)
-                    ) DESC'''),
-                    desc(g.health.last_check)  # just to trigger the TorrentState table inclusion into the left join
-                """
-                )
-            elif popular:
-                pony_query = pony_query.sort_by('(desc(g.health.seeders), desc(g.health.leechers))')
+        # Text search results without an explicit sort order are ranked by relevance in get_ranked_entries.
+        if sort_by is None and not txt_filter and popular:
+            pony_query = pony_query.sort_by('(desc(g.health.seeders), desc(g.health.leechers))')
+
+        if cursor is not None:
+            pony_query = self.get_entries_after_cursor(pony_query, cursor, sort_key)
 
         return pony_query
 
+    def get_entries_after_cursor(self, pony_query: Query, cursor: str, sort_key: list[tuple[str, bool]]) -> Query:
+        """
+        Only include the entries of the given query that are sorted after the entry that the given cursor points to.
+
+        This is keyset pagination: the query compares with the sort key of the last entry, instead of skipping the
+        entries before it.
+        """
+        key = decode_cursor(cursor, self.get_sort_order(sort_key))
+        if len(key) != len(sort_key):
+            msg = f"Malformed cursor: {cursor}"
+            raise ValueError(msg)
+        condition = ""
+        for i, (attribute, descending) in reversed(list(enumerate(sort_key))):
+            expression = SORT_EXPRESSIONS[attribute]
+            comparison = f"{expression} {'<' if descending else '>'} key[{i}]"
+            condition = f"{comparison} or ({expression} == key[{i}] and ({condition}))" if condition else comparison
+        return pony_query.where(condition)
+
+    def get_sort_key(self, sort_by: str | None, sort_desc: bool = True,
+                     popular: bool | None = None) -> list[tuple[str, bool]]:
+        """
+        Get the attributes that non-ranked entries are ordered by, from most to least significant.
+
+        The row id is always the last attribute, which makes the sort key of every entry unique.
+
+        :return: a list of tuples of (<attribute>, <sorted in descending order>).
+        :raises ValueError: if the entries cannot be sorted by the given attribute.
+        """
+        if sort_by == "HEALTH":
+            sort_key = [("health.seeders", sort_desc), ("health.leechers", sort_desc)]
+        elif sort_by:
+            if sort_by not in SORT_EXPRESSIONS:
+                msg = f"Cannot sort by {sort_by}"
+                raise ValueError(msg)
+            sort_key = [(sort_by, sort_desc)]
+        elif popular:
+            sort_key = [("health.seeders", True), ("health.leechers", True)]
+        else:
+            sort_key = []
+        return [*sort_key, ("rowid", sort_desc)]
+
+    def get_sort_order(self, sort_key: list[tuple[str, bool]]) -> str:
+        """
+        Get a textual representation of a sort key, to tell cursors of different sort orders apart.
+        """
+        return ",".join(("-" if descending else "") + attribute for attribute, descending in sort_key)
+
+    def get_cursor(self, entry: TorrentMetadata, sort_key: list[tuple[str, bool]]) -> str:
+        """
+        Get the cursor that points to the given entry.
+        """
+        values = []
+        for attribute, _ in sort_key:
+            value = entry
+            for name in attribute.split("."):
+                value = getattr(value, name)
+            values.append(value)
+        return encode_cursor(self.get_sort_order(sort_key), values)
+
     async def get_entries_threaded(self, **kwargs) -> list[TorrentMetadata]:
         """
         Retrieve entries in a thread and return a list of results.
@@ -689,20 +857,83 @@ class MetadataStore:
 
         :return: A list of class members
         """
-        pony_query = self.get_entries_query(**kwargs)
-        result = pony_query[(first or 1) - 1: last]
+        return self.get_entries_page(first, last, **kwargs)[0]
+
+    @db_session
+    def get_entries_page(self, first: int = 1, last: int | None = None, cursor: str | None = None,
+                         **kwargs) -> tuple[list[TorrentMetadata], str | None]:
+        """
+        Get some torrents and the cursor that points to the last of them.
+
+        If a cursor is given, ``first`` and ``last`` only determine the page size and the page starts right after the
+        entry that the cursor points to. Unlike an offset, this does not require the database to step over all of the
+        preceding entries.
+
+        :return: A list of class members and the cursor of the next page (or None if the list is empty).
+        """
+        first = first or 1
+        page_size = None if last is None else last - first + 1
+        txt_filter = kwargs.get("txt_filter")
+        if txt_filter and kwargs.get("sort_by") is None:
+            # Ranked entries are sorted in Python, their cursor simply holds the position in the ranking.
+            start = decode_cursor(cursor, RANKED_SORT_ORDER)[0] if cursor is not None else first - 1
+            if not isinstance(start, int) or start < 0:
+                msg = f"Malformed cursor: {cursor}"
+                raise ValueError(msg)
+            result = self.get_ranked_entries(self.get_entries_query(**kwargs), txt_filter, start + 1,
+                                             None if page_size is None else start + page_size)
+            next_cursor = encode_cursor(RANKED_SORT_ORDER, [start + len(result)]) if result else None
+        else:
+            pony_query = self.get_entries_query(cursor=cursor, **kwargs)
+            result = pony_query[:page_size] if cursor is not None else pony_query[first - 1: last]
+            sort_key = self.get_sort_key(kwargs.get("sort_by"), kwargs.get("sort_desc", True), kwargs.get("popular"))
+            next_cursor = self.get_cursor(result[-1], sort_key) if result else None
         for entry in result:
             # ACHTUNG! This is necessary in order to load entry.health inside db_session,
             # to be able to perform successfully `entry.to_simple_dict()` later
             entry.to_simple_dict()
-        return result
+        return result, next_cursor
+
+    @db_session
+    def get_ranked_entries(self, pony_query: Query, txt_filter: str, first: int = 1,
+                           last: int | None = None) -> list[TorrentMetadata]:
+        """
+        Sort the entries of a text search query by their relevance and return the requested page.
+
+        All candidates of the query (at most 1000 for an FTS query, see search_keyword) are fetched in a single pass,
+        ranked in one batch by torrent_ranks and only the entries of the requested page are loaded afterwards.
+
+        Channel torrents and channel folders are always on top if they are not filtered out. Then regular torrents
+        are ordered by their search rank. If two torrents have the same search rank, they are ordered by the last time
+        they were checked.
+        """
+        now = int(time())
+        candidates = list(left_join((g.rowid, g.metadata_type, g.title, g.health.seeders, g.health.leechers,
+                                     g.torrent_date, g.health.last_check) for g in pony_query))
+        ranks = torrent_ranks(txt_filter, [
+            (title, seeders, leechers, None if torrent_date is None else now - time2int(torrent_date))
+            for _, _, title, seeders, leechers, torrent_date, _ in candidates
+        ])
+        type_order = {CHANNEL_TORRENT: 1, COLLECTION_NODE: 2}
+        ordered = sorted(zip(candidates, ranks), key=lambda candidate: (
+            type_order.get(candidate[0][1], 3),
+            -candidate[1],
+            -(candidate[0][6] or 0),
+            -candidate[0][0]
+        ))
+        page = [rowid for (rowid, *_), _ in ordered[(first or 1) - 1: last]]
+        if not page:
+            return []
+
+        entries = {entry.rowid: entry for entry in self.TorrentMetadata.select(lambda g: g.rowid in page)}
+        return [entries[rowid] for rowid in page]
 
     @db_session
     def get_total_count(self, **kwargs) -> int | None:
         """
         Get total count of torrents that would be returned if there would be no pagination/limits/sort.
         """
-        for p in ["first", "last", "sort_by", "sort_desc"]:
+        for p in ["first", "last", "cursor", "sort_by", "sort_desc"]:
             kwargs.pop(p, None)
         return self.get_entries_query(**kwargs).count()
 
@@ -711,7 +942,7 @@ class MetadataStore:
         """
         Get the count of torrents that would be returned if there would be no pagination/limits.
         """
-        for p in ["first", "last"]:
+        for p in ["first", "last", "cursor"]:
             kwargs.pop(p, None)
         return self.get_entries_query(**kwargs).count()
 
@@ -722,6 +953,51 @@ class MetadataStore:
         """
         return select(max(obj.rowid) for obj in self.TorrentMetadata).get() or 0
 
+    def increment_write_generation(self) -> None:
+        """
+        Signal that the database was changed outside of the write queue, after the transaction was committed.
+        """
+        self.write_generation += 1
+
+    def get_data_version(self) -> tuple[int, int, int]:
+        """
+        Get a value that changes whenever the data of the database (may have) changed.
+        """
+        return self.write_generation, self.write_queue.transactions_committed, self.get_max_rowid()
+
+    def get_metadata_version(self) -> tuple[int, int]:
+        """
+        Get a value that changes whenever torrent metadata is inserted, updated or deleted, without a query.
+
+        Unlike the data version, this value does not change when only the health of torrents changes. The changes
+        of the write queue only count once they are committed.
+        """
+        return self.TorrentMetadata.metadata_version.get()
+
+    @db_session
+    def get_search_results(self, include_total: bool = False,
+                           **kwargs) -> tuple[list[dict], int | None, int | None, str | None]:
+        """
+        Get the simple dicts of a page of entries and the cursor of the next page, served from the search cache if the
+        database has not changed since the same search was last performed.
+
+        :param include_total: also get the total number of results and the max rowid.
+        :return: the entry dicts, the total (or None), the max rowid (or None) and the cursor of the next page.
+        """
+        key = make_key(include_total=include_total, **kwargs)
+        version = self.get_data_version()
+        cached = self.search_cache.get(key, version)
+        if cached is None:
+            entries, next_cursor = self.get_entries_page(**kwargs)
+            results = [entry.to_simple_dict() for entry in entries]
+            total = self.get_total_count(**kwargs) if include_total else None
+            max_rowid = version[2] if include_total else None
+            cached = (results, total, max_rowid, next_cursor)
+            self.search_cache.put(key, version, cached)
+        results, total, max_rowid, next_cursor = cached
+        # The results are extended by the caller, so every caller gets its own copy.
+        return [dict(result) for result in results], total, max_rowid, next_cursor
+
     fts_keyword_search_re = re.compile(r'\w+', re.UNICODE)
 
     def get_auto_complete_terms(self, text: str, max_terms: int) -> list[str]:
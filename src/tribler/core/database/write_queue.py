@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from asyncio import wrap_future
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from queue import Empty, SimpleQueue
+from typing import TYPE_CHECKING, Any, Callable
+
+from pony.orm import db_session
+
+if TYPE_CHECKING:
+    from pony.orm import Database
+
+MAX_GROUP_SIZE = 1000  # The maximum number of operations that are committed in a single transaction
+MAX_TRANSACTION_TIME = 0.1  # The maximum number of seconds to keep adding operations to a running transaction
+
+
+@dataclass
+class WriteOperation:
+    """
+    A single database write operation that was submitted to the write queue.
+    """
+
+    func: Callable
+    args: tuple
+    kwargs: dict
+    future: Future = field(default_factory=Future)
+
+
+class TransactionListener:
+    """
+    A listener that is told when the writer thread starts and ends a write transaction.
+    """
+
+    def on_transaction_start(self) -> None:
+        """
+        Called by the writer thread before it starts a write transaction.
+        """
+
+    def on_transaction_end(self, committed: bool) -> None:
+        """
+        Called by the writer thread after a write transaction was committed or rolled back.
+        """
+
+
+class WriteQueue:
+    """
+    A queue of database write operations that is drained by a single writer thread.
+
+    The writer thread commits the queued operations in groups: all operations that are waiting in the queue share
+    a single transaction, until either the group size or the transaction time budget is exhausted. This way, many
+    small writes only cost a single commit and the database write lock is never held for long.
+    """
+
+    def __init__(self, db: Database, max_group_size: int = MAX_GROUP_SIZE,
+                 max_transaction_time: float = MAX_TRANSACTION_TIME) -> None:
+        """
+        Create a new write queue. The writer thread is started when the first operation is submitted.
+        """
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.db = db
+        self.max_group_size = max_group_size
+        self.max_transaction_time = max_transaction_time
+
+        self.queue: SimpleQueue[WriteOperation | None] = SimpleQueue()
+        self.thread: threading.Thread | None = None
+        self.lock = threading.Lock()
+        self.shutting_down = False
+
+        self.operations_committed = 0
+        self.transactions_committed = 0
+        self.listeners: list[TransactionListener] = []
+
+    def add_listener(self, listener: TransactionListener) -> None:
+        """
+        Tell the given listener about the write transactions of the writer thread.
+        """
+        self.listeners.append(listener)
+
+    def start_transaction(self) -> None:
+        """
+        Notify the listeners that a write transaction starts.
+        """
+        for listener in self.listeners:
+            listener.on_transaction_start()
+
+    def end_transaction(self, committed: bool) -> None:
+        """
+        Notify the listeners that a write transaction was committed or rolled back.
+        """
+        for listener in self.listeners:
+            listener.on_transaction_end(committed)
+
+    def submit(self, func: Callable, *args: Any, **kwargs) -> Future:  # noqa: ANN401
+        """
+        Queue ``func`` to be called on the writer thread, inside a write transaction.
+
+        :returns: a (thread-safe) future that is resolved with the result of the call once it is committed.
+        """
+        with self.lock:
+            if self.shutting_down:
+                msg = "The write queue is shut down"
+                raise RuntimeError(msg)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run_writer, name="MetadataStoreWriter", daemon=True)
+                self.thread.start()
+            operation = WriteOperation(func, args, kwargs)
+            self.queue.put(operation)
+        return operation.future
+
+    async def run(self, func: Callable, *args: Any, **kwargs) -> Any:  # noqa: ANN401
+        """
+        Queue ``func`` to be called on the writer thread and wait for its result.
+        """
+        return await wrap_future(self.submit(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """
+        Commit the operations that are still queued and stop the writer thread.
+        """
+        with self.lock:
+            self.shutting_down = True
+            thread = self.thread
+            if thread is not None:
+                self.queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    def run_writer(self) -> None:
+        """
+        Keep committing groups of queued operations until the queue is shut down.
+        """
+        try:
+            while (operation := self.queue.get()) is not None:
+                self.commit_group(operation)
+        finally:
+            self.db.disconnect()
+
+    def next_operation(self) -> WriteOperation | None:
+        """
+        Get the next operation if it is already queued.
+        """
+        try:
+            operation = self.queue.get_nowait()
+        except Empty:
+            return None
+        if operation is None:
+            self.queue.put(None)  # Leave the stop signal for the main loop, after finishing the current group.
+        return operation
+
+    def commit_group(self, operation: WriteOperation) -> None:
+        """
+        Call the given operation and any queued operations that fit in the budget in a single transaction.
+
+        If the transaction fails, the operations of the group are retried in separate transactions. This way, only
+        the operation that is actually at fault receives the exception.
+        """
+        group: list[WriteOperation] = []
+        results = []
+        deadline = time.monotonic() + self.max_transaction_time
+        self.start_transaction()
+        try:
+            with db_session(immediate=True):
+                next_operation: WriteOperation | None = operation
+                while next_operation is not None:
+                    if next_operation.future.set_running_or_notify_cancel():  # Skip operations that were cancelled
+                        group.append(next_operation)
+                        results.append(next_operation.func(*next_operation.args, **next_operation.kwargs))
+                    if len(group) >= self.max_group_size or time.monotonic() >= deadline:
+                        break
+                    next_operation = self.next_operation()
+        except Exception as e:
+            self.end_transaction(committed=False)
+            if len(group) == 1:
+                group[0].future.set_exception(e)
+                return
+            self._logger.warning("Write transaction of %d operations failed, retrying them separately: %s: %s",
+                                 len(group), type(e).__name__, str(e))
+            for failed_operation in group:
+                self.commit_single(failed_operation)
+            return
+
+        self.end_transaction(committed=True)
+        self.operations_committed += len(group)
+        self.transactions_committed += 1
+        for committed_operation, result in zip(group, results):
+            committed_operation.future.set_result(result)
+
+    def commit_single(self, operation: WriteOperation) -> None:
+        """
+        Call the given operation in its own transaction.
+        """
+        self.start_transaction()
+        try:
+            with db_session(immediate=True):
+                result = operation.func(*operation.args, **operation.kwargs)
+        except Exception as e:
+            self.end_transaction(committed=False)
+            operation.future.set_exception(e)
+            return
+        self.end_transaction(committed=True)
+        self.operations_committed += 1
+        self.transactions_committed += 1
+        operation.future.set_result(result)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import math
-from asyncio import Future
+import sys
+import time
+from asyncio import Future, gather
 from binascii import hexlify
+from collections import deque
 from typing import Awaitable
 
 import libtorrent as lt
@@ -10,64 +13,125 @@ from ipv8.taskmanager import TaskManager
 
 from tribler.core.torrent_checker.dataclasses import HealthInfo
 
+BLOOM_FILTER_SIZE = 256  # bytes, as specified by BEP33
+BLOOM_FILTER_BITS = BLOOM_FILTER_SIZE * 8
+MAX_BLOOM_FILTER_CAPACITY = 6000  # The maximum capacity of the bloom filter used in BEP33
+DHT_DISPATCH_INTERVAL = 0.5  # seconds between two windows of get_peers lookups
+MAX_LOOKUPS_PER_WINDOW = 10  # The max number of get_peers lookups to start in a single window
+
+if sys.version_info >= (3, 10):
+    popcount = int.bit_count
+else:
+    def popcount(value: int) -> int:
+        """
+        Count the set bits of the given integer.
+        """
+        return bin(value).count("1")
+
 
 class DHTHealthManager(TaskManager):
     """
     This class manages BEP33 health requests to the libtorrent DHT.
+
+    Lookups are queued and started in windows, so that many concurrent requests do not flood the DHT. The bloom
+    filters of a lookup are kept as integers, to merge and count them without looping over their bytes.
     """
 
-    def __init__(self, lt_session: lt.session) -> None:
+    def __init__(self, lt_session: lt.session, dispatch_interval: float = DHT_DISPATCH_INTERVAL,
+                 max_lookups_per_window: int = MAX_LOOKUPS_PER_WINDOW) -> None:
         """
         Initialize the DHT health manager.
 
         :param lt_session: The session used to perform health lookups.
+        :param dispatch_interval: The number of seconds between two windows of lookups.
+        :param max_lookups_per_window: The max number of lookups to start in a single window.
         """
         TaskManager.__init__(self)
         self.lookup_futures: dict[bytes, Future[HealthInfo]] = {}  # Map from binary infohash to future
-        self.bf_seeders: dict[bytes, bytearray] = {}  # Map from infohash to (final) seeders bloomfilter
-        self.bf_peers: dict[bytes, bytearray] = {}  # Map from infohash to (final) peers bloomfilter
+        self.bf_seeders: dict[bytes, int] = {}  # Map from infohash to (final) seeders bloomfilter
+        self.bf_peers: dict[bytes, int] = {}  # Map from infohash to (final) peers bloomfilter
         self.outstanding: dict[str, bytes] = {}  # Map from transaction_id to infohash
+        self.transactions: dict[bytes, set[str]] = {}  # Map from infohash to its outstanding transaction_ids
         self.lt_session = lt_session
 
+        self.dispatch_interval = dispatch_interval
+        self.max_lookups_per_window = max_lookups_per_window
+        self.queue: deque[tuple[bytes, float]] = deque()  # Lookups that wait for a window, with their timeouts
+        self.dispatch_scheduled = False
+        self.last_dispatch = 0.0
+
     def get_health(self, infohash: bytes, timeout: float = 15) -> Awaitable[HealthInfo]:
         """
         Lookup the health of a given infohash.
 
         :param infohash: The 20-byte infohash to lookup.
-        :param timeout: The timeout of the lookup.
+        :param timeout: The timeout of the lookup, from the moment that it is started.
         """
         if infohash in self.lookup_futures:
             return self.lookup_futures[infohash]
 
         lookup_future: Future[HealthInfo] = Future()
         self.lookup_futures[infohash] = lookup_future
-        self.bf_seeders[infohash] = bytearray(256)
-        self.bf_peers[infohash] = bytearray(256)
-
-        # Perform a get_peers request. This should result in get_peers responses with the BEP33 bloom filters.
-        self.lt_session.dht_get_peers(lt.sha1_hash(bytes(infohash)))
+        self.bf_seeders[infohash] = 0
+        self.bf_peers[infohash] = 0
 
-        self.register_task(f"lookup_{hexlify(infohash).decode}", self.finalize_lookup, infohash, delay=timeout)
+        self.queue.append((infohash, timeout))
+        self.schedule_dispatch()
 
         return lookup_future
 
+    async def get_health_batch(self, infohashes: list[bytes], timeout: float = 15) -> list[HealthInfo]:
+        """
+        Lookup the health of the given infohashes.
+
+        :param infohashes: The 20-byte infohashes to lookup.
+        :param timeout: The timeout of every lookup, from the moment that it is started.
+        """
+        return list(await gather(*[self.get_health(infohash, timeout) for infohash in infohashes]))
+
+    def schedule_dispatch(self) -> None:
+        """
+        Schedule the next window of lookups, if it is not scheduled yet.
+        """
+        if self.dispatch_scheduled:
+            return
+        self.dispatch_scheduled = True
+        delay = max(0.0, self.last_dispatch + self.dispatch_interval - time.time())
+        self.register_anonymous_task("dispatch", self.dispatch, delay=delay)
+
+    def dispatch(self) -> None:
+        """
+        Start the next window of queued lookups.
+        """
+        self.dispatch_scheduled = False
+        self.last_dispatch = time.time()
+
+        for _ in range(min(len(self.queue), self.max_lookups_per_window)):
+            infohash, timeout = self.queue.popleft()
+
+            # Perform a get_peers request. This should result in get_peers responses with the BEP33 bloom filters.
+            self.lt_session.dht_get_peers(lt.sha1_hash(bytes(infohash)))
+
+            self.register_task(f"lookup_{hexlify(infohash).decode()}", self.finalize_lookup, infohash, delay=timeout)
+
+        if self.queue:
+            self.schedule_dispatch()
+
     def finalize_lookup(self, infohash: bytes) -> None:
         """
         Finalize the lookup of the provided infohash and invoke the appropriate deferred.
 
         :param infohash: The infohash of the lookup we finialize.
         """
-        for transaction_id in [key for key, value in self.outstanding.items() if value == infohash]:
+        for transaction_id in self.transactions.pop(infohash, ()):
             self.outstanding.pop(transaction_id, None)
 
         if infohash not in self.lookup_futures:
             return
 
         # Determine the seeders/peers
-        bf_seeders = self.bf_seeders.pop(infohash)
-        bf_peers = self.bf_peers.pop(infohash)
-        seeders = DHTHealthManager.get_size_from_bloomfilter(bf_seeders)
-        peers = DHTHealthManager.get_size_from_bloomfilter(bf_peers)
+        seeders = DHTHealthManager.get_size_from_bloomfilter(self.bf_seeders.pop(infohash))
+        peers = DHTHealthManager.get_size_from_bloomfilter(self.bf_peers.pop(infohash))
         if not self.lookup_futures[infohash].done():
             health = HealthInfo(infohash, seeders=seeders, leechers=peers)
             self.lookup_futures[infohash].set_result(health)
@@ -75,7 +139,7 @@ class DHTHealthManager(TaskManager):
         self.lookup_futures.pop(infohash, None)
 
     @staticmethod
-    def combine_bloomfilters(bf1: bytearray, bf2: bytearray) -> bytearray:
+    def combine_bloomfilters(bf1: bytes, bf2: bytes) -> bytearray:
         """
         Combine two given bloom filters by ORing the bits.
 
@@ -84,38 +148,26 @@ class DHTHealthManager(TaskManager):
         :return: A bytearray with the combined bloomfilter.
         """
         final_bf_len = min(len(bf1), len(bf2))
-        final_bf = bytearray(final_bf_len)
-        for bf_index in range(final_bf_len):
-            final_bf[bf_index] = bf1[bf_index] | bf2[bf_index]
-        return final_bf
+        combined = int.from_bytes(bf1[:final_bf_len], "big") | int.from_bytes(bf2[:final_bf_len], "big")
+        return bytearray(combined.to_bytes(final_bf_len, "big"))
 
     @staticmethod
-    def get_size_from_bloomfilter(bf: bytearray) -> int:
+    def get_size_from_bloomfilter(bf: bytes | int) -> int:
         """
         Return the estimated number of items in the bloom filter.
 
-        :param bf: The bloom filter of which we estimate the size.
+        :param bf: The bloom filter of which we estimate the size, as bytes or as an integer of its bits.
         :return: A rounded integer, approximating the number of items in the filter.
         """
-
-        def tobits(s: bytes) -> list[int]:
-            result = []
-            for num in s:
-                bits = bin(num)[2:]
-                bits = "00000000"[len(bits):] + bits
-                result.extend([int(b) for b in bits])
-            return result
-
-        bits_array = tobits(bytes(bf))
-        total_zeros = 0
-        for bit in bits_array:
-            if bit == 0:
-                total_zeros += 1
+        if isinstance(bf, int):
+            total_zeros = BLOOM_FILTER_BITS - popcount(bf)
+        else:
+            total_zeros = len(bf) * 8 - popcount(int.from_bytes(bf, "big"))
 
         if total_zeros == 0:
-            return 6000  # The maximum capacity of the bloom filter used in BEP33
+            return MAX_BLOOM_FILTER_CAPACITY
 
-        m = 256 * 8
+        m = BLOOM_FILTER_BITS
         c = min(m - 1, total_zeros)
         return int(math.log(c / float(m)) / (2 * math.log(1 - 1 / float(m))))
 
@@ -127,14 +179,17 @@ class DHTHealthManager(TaskManager):
         :param transaction_id: The ID of the query
         :param infohash: The infohash for which the query was sent.
         """
+        # Libtorrent may reuse a transaction_id, possibly for an infohash that we're not interested in.
+        previous = self.outstanding.pop(transaction_id, None)
+        if previous is not None:
+            self.transactions.get(previous, set()).discard(transaction_id)
+
         if infohash in self.lookup_futures:
             self.outstanding[transaction_id] = infohash
-        elif transaction_id in self.outstanding:
-            # Libtorrent is reusing the transaction_id, and is now using it for a infohash that we're not interested in.
-            self.outstanding.pop(transaction_id, None)
+            self.transactions.setdefault(infohash, set()).add(transaction_id)
 
-    def received_bloomfilters(self, transaction_id: str, bf_seeds: bytearray = bytearray(256),  # noqa: B008
-                              bf_peers: bytearray = bytearray(256)) -> None:  # noqa: B008
+    def received_bloomfilters(self, transaction_id: str, bf_seeds: bytes = bytes(BLOOM_FILTER_SIZE),
+                              bf_peers: bytes = bytes(BLOOM_FILTER_SIZE)) -> None:
         """
         We have received bloom filters from the libtorrent DHT. Register the bloom filters and process them.
 
@@ -146,6 +201,9 @@ class DHTHealthManager(TaskManager):
         if not infohash:
             self._logger.info("Could not find lookup infohash for incoming BEP33 bloomfilters")
             return
+        if len(bf_seeds) != BLOOM_FILTER_SIZE or len(bf_peers) != BLOOM_FILTER_SIZE:
+            self._logger.info("Ignoring BEP33 bloomfilters of an invalid size")
+            return
 
-        self.bf_seeders[infohash] = DHTHealthManager.combine_bloomfilters(self.bf_seeders[infohash], bf_seeds)
-        self.bf_peers[infohash] = DHTHealthManager.combine_bloomfilters(self.bf_peers[infohash], bf_peers)
+        self.bf_seeders[infohash] |= int.from_bytes(bf_seeds, "big")
+        self.bf_peers[infohash] |= int.from_bytes(bf_peers, "big")
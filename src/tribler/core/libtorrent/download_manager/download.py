@@ -36,6 +36,13 @@ if TYPE_CHECKING:
 
 Getter = Callable[[Any], Any]
 
+# The alerts that downloads handle or wait for, which the download manager routes to the download of their torrent
+DOWNLOAD_ALERT_TYPES = frozenset({"add_torrent_alert", "metadata_received_alert", "performance_alert",
+                                  "save_resume_data_alert", "save_resume_data_failed_alert", "state_changed_alert",
+                                  "torrent_checked_alert", "torrent_error_alert", "torrent_finished_alert",
+                                  "torrent_removed_alert", "tracker_error_alert", "tracker_reply_alert",
+                                  "tracker_warning_alert"})
+
 
 class SaveResumeDataError(Exception):
     """This error is used when the resume data of a download fails to save."""
@@ -12,7 +12,7 @@ import os
 import time
 from asyncio import CancelledError, gather, iscoroutine, shield, sleep, wait_for
 from binascii import hexlify, unhexlify
-from collections import defaultdict
+from collections import defaultdict, deque
 from copy import deepcopy
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -24,7 +24,7 @@ from ipv8.taskmanager import TaskManager
 from validate import Validator
 from yarl import URL
 
-from tribler.core.libtorrent.download_manager.download import Download
+from tribler.core.libtorrent.download_manager.download import DOWNLOAD_ALERT_TYPES, Download
 from tribler.core.libtorrent.download_manager.download_config import DownloadConfig
 from tribler.core.libtorrent.download_manager.download_state import DownloadState, DownloadStatus
 from tribler.core.libtorrent.torrentdef import MetainfoDict, TorrentDef, TorrentDefNoMetainfo
@@ -51,8 +51,36 @@ DEFAULT_LT_EXTENSIONS = [
     lt.create_smart_ban_plugin
 ]
 
+ALERT_TICK_BUDGET = 0.5  # seconds of alert processing per tick, the remaining alerts wait for the next tick
+ALERT_CHUNK_BUDGET = 0.02  # seconds of alert processing between two yields to the event loop
+ALERT_CATEGORY = lt.alert.category_t
+# The categories of the alerts that we handle. Libtorrent only posts the alerts of the categories in the mask of a
+# session, so the mask of a session consists of the categories of the alerts that it has handlers for.
+ALERT_CATEGORIES = {
+    "add_torrent_alert": ALERT_CATEGORY.status_notification,
+    "dht_pkt_alert": ALERT_CATEGORY.dht_log_notification,
+    "listen_succeeded_alert": ALERT_CATEGORY.status_notification,
+    "metadata_received_alert": ALERT_CATEGORY.status_notification,
+    "peer_disconnected_alert": ALERT_CATEGORY.connect_notification,
+    "performance_alert": ALERT_CATEGORY.performance_warning,
+    "save_resume_data_alert": ALERT_CATEGORY.storage_notification,
+    "save_resume_data_failed_alert": ALERT_CATEGORY.storage_notification | ALERT_CATEGORY.error_notification,
+    "session_stats_alert": 0,  # Posted regardless of the mask
+    "state_changed_alert": ALERT_CATEGORY.status_notification,
+    "state_update_alert": ALERT_CATEGORY.status_notification,
+    "torrent_checked_alert": ALERT_CATEGORY.status_notification,
+    "torrent_error_alert": ALERT_CATEGORY.error_notification | ALERT_CATEGORY.status_notification,
+    "torrent_finished_alert": ALERT_CATEGORY.status_notification,
+    "torrent_removed_alert": ALERT_CATEGORY.status_notification,
+    "tracker_error_alert": ALERT_CATEGORY.tracker_notification | ALERT_CATEGORY.error_notification,
+    "tracker_reply_alert": ALERT_CATEGORY.tracker_notification,
+    "tracker_warning_alert": ALERT_CATEGORY.tracker_notification | ALERT_CATEGORY.error_notification,
+}
+
 logger = logging.getLogger(__name__)
 
+AlertHandler = Callable[[Any, int], None]
+
 
 @dataclasses.dataclass
 class MetainfoLookup:
@@ -64,6 +92,16 @@ class MetainfoLookup:
     pending: int
 
 
+@dataclasses.dataclass
+class AlertStats:
+    """
+    The number of processed alerts of a type and the total time that processing them took, in seconds.
+    """
+
+    count: int = 0
+    time: float = 0.0
+
+
 def encode_atp(atp: dict) -> dict:
     """
     Encode the "Add Torrent Params" dictionary to only include bytes, instead of strings and Paths.
@@ -92,7 +130,7 @@ class DownloadManager(TaskManager):
         self.state_dir = Path(config.get("state_dir"))
         self.ltsettings: dict[lt.session, dict] = {}  # Stores a copy of the settings dict for each libtorrent session
         self.ltsessions: dict[int, lt.session] = {}
-        self.dht_health_manager: DHTHealthManager | None = None
+        self._dht_health_manager: DHTHealthManager | None = None
         self.listen_ports: dict[int, dict[str, int]] = defaultdict(dict)
 
         self.socks_listen_ports = config.get("libtorrent/socks_listen_ports")
@@ -116,9 +154,17 @@ class DownloadManager(TaskManager):
         self.metainfo_requests: dict[bytes, MetainfoLookup] = {}
         self.metainfo_cache: dict[bytes, MetainfoDict] = {}  # Dictionary that maps infohashes to cached metainfo items
 
-        self.default_alert_mask = lt.alert.category_t.error_notification | lt.alert.category_t.status_notification | \
-                                  lt.alert.category_t.storage_notification | lt.alert.category_t.performance_warning | \
-                                  lt.alert.category_t.tracker_notification | lt.alert.category_t.debug_notification
+        self.alert_handlers: dict[str, AlertHandler] = {}
+        self.alert_handler_hops: dict[str, int] = {}  # The sessions that handlers are limited to, by alert type
+        self.alert_queues: dict[int, deque[lt.alert]] = defaultdict(deque)  # The alerts left to process, by session
+        self.alert_stats: dict[str, AlertStats] = defaultdict(AlertStats)
+        alert_handlers: dict[str, AlertHandler] = {"state_update_alert": self.on_state_update_alert,
+                                                   "state_changed_alert": self.on_state_changed_alert,
+                                                   "listen_succeeded_alert": self.on_listen_succeeded_alert,
+                                                   "peer_disconnected_alert": self.on_peer_disconnected_alert,
+                                                   "session_stats_alert": self.on_session_stats_alert}
+        for alert_type, alert_handler in alert_handlers.items():
+            self.register_alert_handler(alert_type, alert_handler)
         self.session_stats_callback: Callable | None = None
         self.state_cb_count = 0
         self.queued_write_bytes = -1
@@ -129,6 +175,24 @@ class DownloadManager(TaskManager):
         self.dht_readiness_timeout = config.get("libtorrent/dht_readiness_timeout")
         self._last_states_list: list[DownloadState] = []
 
+    @property
+    def dht_health_manager(self) -> DHTHealthManager | None:
+        """
+        The manager of BEP33 health lookups through the DHT of the session without hops, if any.
+        """
+        return self._dht_health_manager
+
+    @dht_health_manager.setter
+    def dht_health_manager(self, dht_health_manager: DHTHealthManager | None) -> None:
+        """
+        Set the manager of BEP33 health lookups, which needs the DHT packets of the session without hops.
+        """
+        self._dht_health_manager = dht_health_manager
+        if dht_health_manager is None:
+            self.unregister_alert_handler("dht_pkt_alert")
+        else:
+            self.register_alert_handler("dht_pkt_alert", self.on_dht_pkt_alert, hops=0)
+
     def is_shutting_down(self) -> bool:
         """
         Whether the download manager is currently shutting down.
@@ -183,7 +247,7 @@ class DownloadManager(TaskManager):
             self.get_session().start_upnp()
 
         # Register tasks
-        self.register_task("process_alerts", self._task_process_alerts, interval=1, ignore=(Exception, ))
+        self.register_task("process_alerts", self.process_alerts, interval=1, ignore=(Exception, ))
         if self.dht_readiness_timeout > 0 and self.config.get("libtorrent/dht"):
             self.dht_ready_task = self.register_task("check_dht_ready", self._check_dht_ready)
         self.register_task("request_torrent_updates", self._request_torrent_updates, interval=1)
@@ -311,7 +375,7 @@ class DownloadManager(TaskManager):
             settings["force_proxy"] = True
 
         self.set_session_settings(ltsession, settings)
-        ltsession.set_alert_mask(self.default_alert_mask)
+        ltsession.set_alert_mask(self.get_alert_mask(hops))
 
         if hops == 0:
             self.set_proxy_settings(ltsession, *self.get_libtorrent_proxy_settings())
@@ -429,31 +493,79 @@ class DownloadManager(TaskManager):
         libtorrent_rate = self.get_session(hops=hops).download_rate_limit()
         return self.reverse_convert_rate(rate=libtorrent_rate)
 
-    def process_alert(self, alert: lt.alert, hops: int = 0) -> None:  # noqa: C901, PLR0912
+    def register_alert_handler(self, alert_type: str, handler: AlertHandler, hops: int | None = None) -> None:
+        """
+        Set (replace) the callback for a given alert type and add its category to the alert masks of the sessions.
+
+        :param hops: the hop count of the only session that should post these alerts, or None for all sessions.
+        """
+        self.alert_handlers[alert_type] = handler
+        if hops is None:
+            self.alert_handler_hops.pop(alert_type, None)
+        else:
+            self.alert_handler_hops[alert_type] = hops
+        self.update_alert_masks()
+
+    def unregister_alert_handler(self, alert_type: str) -> None:
+        """
+        Remove the callback for a given alert type and stop the sessions from posting alerts that no longer have one.
+        """
+        self.alert_handlers.pop(alert_type, None)
+        self.alert_handler_hops.pop(alert_type, None)
+        self.update_alert_masks()
+
+    def get_alert_mask(self, hops: int) -> int:
+        """
+        Get the alert categories for the session with the given hop count: those of the alerts that are handled.
+        """
+        mask = 0
+        for alert_type in DOWNLOAD_ALERT_TYPES:
+            mask |= ALERT_CATEGORIES.get(alert_type, 0)
+        for alert_type in self.alert_handlers:
+            if self.alert_handler_hops.get(alert_type, hops) == hops:
+                mask |= ALERT_CATEGORIES.get(alert_type, 0)
+        return int(mask)
+
+    def update_alert_masks(self) -> None:
+        """
+        Apply the alert masks to the existing sessions.
+        """
+        for hops, ltsession in self.ltsessions.items():
+            if ltsession:
+                ltsession.set_alert_mask(self.get_alert_mask(hops))
+
+    def get_alert_stats(self) -> dict[str, AlertStats]:
+        """
+        Get the number of processed alerts and the time it took to process them, by alert type.
+        """
+        return dict(self.alert_stats)
+
+    def process_alert(self, alert: lt.alert, hops: int = 0) -> None:
         """
         Process a libtorrent alert.
+
+        The alert goes to the handler of its type. Alerts of the types that downloads handle, and alerts without a
+        handler, also go to the download of their torrent.
         """
         alert_type = alert.__class__.__name__
+        start = time.perf_counter()
 
-        # Periodically, libtorrent will send us a state_update_alert, which contains the torrent status of
-        # all torrents changed since the last time we received this alert.
-        if alert_type == "state_update_alert":
-            for status in cast(lt.state_update_alert, alert).status:
-                infohash = status.info_hash.to_bytes()
-                if infohash not in self.downloads:
-                    logger.debug("Got state_update for unknown torrent %s", hexlify(infohash))
-                    continue
-                self.downloads[infohash].update_lt_status(status)
-
-        if alert_type == "state_changed_alert":
-            handle = cast(lt.state_changed_alert, alert).handle
-            infohash = handle.info_hash().to_bytes()
-            if infohash not in self.downloads:
-                logger.debug("Got state_change for unknown torrent %s", hexlify(infohash))
-            else:
-                self.downloads[infohash].update_lt_status(handle.status())
+        handler = self.alert_handlers.get(alert_type)
+        if handler is not None:
+            handler(alert, hops)
+        if handler is None or alert_type in DOWNLOAD_ALERT_TYPES:
+            self.process_download_alert(alert, alert_type)
+
+        stats = self.alert_stats[alert_type]
+        stats.count += 1
+        stats.time += time.perf_counter() - start
 
-        infohash = (alert.handle.info_hash().to_bytes() if hasattr(alert, "handle") and alert.handle.is_valid()
+    def process_download_alert(self, alert: lt.alert, alert_type: str) -> None:
+        """
+        Pass an alert to the download of its torrent, if we have that download.
+        """
+        handle = getattr(alert, "handle", None)
+        infohash = (handle.info_hash().to_bytes() if handle is not None and handle.is_valid()
                     else getattr(alert, "info_hash", b""))
         download = self.downloads.get(infohash)
         if download:
@@ -467,44 +579,84 @@ class DownloadManager(TaskManager):
         elif infohash:
             logger.debug("Got alert for unknown download %s: %s", infohash, alert)
 
-        if alert_type == "listen_succeeded_alert":
-            ls_alert = cast(lt.listen_succeeded_alert, alert)
-            self.listen_ports[hops][ls_alert.address] = ls_alert.port
-
-        elif alert_type == "peer_disconnected_alert":
-            self.notifier.notify(Notification.peer_disconnected,
-                                 peer_id=cast(lt.peer_disconnected_alert, alert).pid.to_bytes())
-
-        elif alert_type == "session_stats_alert":
-            ss_alert = cast(lt.session_stats_alert, alert)
-            queued_disk_jobs = ss_alert.values["disk.queued_disk_jobs"]
-            self.queued_write_bytes = ss_alert.values["disk.queued_write_bytes"]
-            num_write_jobs = ss_alert.values["disk.num_write_jobs"]
-            if queued_disk_jobs == self.queued_write_bytes == num_write_jobs == 0:
-                self.lt_session_shutdown_ready[hops] = True
-
-            if self.session_stats_callback:
-                self.session_stats_callback(ss_alert)
-
-        elif alert_type == "dht_pkt_alert" and self.dht_health_manager is not None:
-            # Unfortunately, the Python bindings don't have a direction attribute.
-            # So, we'll have to resort to using the string representation of the alert instead.
-            incoming = str(alert).startswith("<==")
-            decoded = cast(dict[bytes, Any], lt.bdecode(cast(lt.dht_pkt_alert, alert).pkt_buf))
-            if not decoded:
-                return
-
-            # We are sending a raw DHT message - notify the DHTHealthManager of the outstanding request.
-            if not incoming and decoded.get(b"y") == b"q" \
-                    and decoded.get(b"q") == b"get_peers" and decoded[b"a"].get(b"scrape") == 1:
-                self.dht_health_manager.requesting_bloomfilters(decoded[b"t"],
-                                                                decoded[b"a"][b"info_hash"])
-
-            # We received a raw DHT message - decode it and check whether it is a BEP33 message.
-            if incoming and b"r" in decoded and b"BFsd" in decoded[b"r"] and b"BFpe" in decoded[b"r"]:
-                self.dht_health_manager.received_bloomfilters(decoded[b"t"],
-                                                              bytearray(decoded[b"r"][b"BFsd"]),
-                                                              bytearray(decoded[b"r"][b"BFpe"]))
+    def on_state_update_alert(self, alert: lt.state_update_alert, hops: int) -> None:
+        """
+        Periodically, libtorrent will send us a state_update_alert, which contains the torrent status of all torrents
+        changed since the last time we received this alert.
+        """
+        for status in alert.status:
+            infohash = status.info_hash.to_bytes()
+            if infohash not in self.downloads:
+                logger.debug("Got state_update for unknown torrent %s", hexlify(infohash))
+                continue
+            self.downloads[infohash].update_lt_status(status)
+
+    def on_state_changed_alert(self, alert: lt.state_changed_alert, hops: int) -> None:
+        """
+        Update the status of a download that changed state.
+        """
+        handle = alert.handle
+        infohash = handle.info_hash().to_bytes()
+        if infohash not in self.downloads:
+            logger.debug("Got state_change for unknown torrent %s", hexlify(infohash))
+        else:
+            self.downloads[infohash].update_lt_status(handle.status())
+
+    def on_listen_succeeded_alert(self, alert: lt.listen_succeeded_alert, hops: int) -> None:
+        """
+        Remember the port that a session listens on.
+        """
+        self.listen_ports[hops][alert.address] = alert.port
+
+    def on_peer_disconnected_alert(self, alert: lt.peer_disconnected_alert, hops: int) -> None:
+        """
+        Notify others that a peer disconnected.
+        """
+        self.notifier.notify(Notification.peer_disconnected, peer_id=alert.pid.to_bytes())
+
+    def on_session_stats_alert(self, alert: lt.session_stats_alert, hops: int) -> None:
+        """
+        Check whether a session has no pending disk writes left, for the shutdown, and pass the statistics on.
+        """
+        queued_disk_jobs = alert.values["disk.queued_disk_jobs"]
+        self.queued_write_bytes = alert.values["disk.queued_write_bytes"]
+        num_write_jobs = alert.values["disk.num_write_jobs"]
+        if queued_disk_jobs == self.queued_write_bytes == num_write_jobs == 0:
+            self.lt_session_shutdown_ready[hops] = True
+
+        if self.session_stats_callback:
+            self.session_stats_callback(alert)
+
+    def on_dht_pkt_alert(self, alert: lt.dht_pkt_alert, hops: int) -> None:
+        """
+        Pass BEP33 scrape requests and their bloom filter responses on to the DHT health manager.
+        """
+        if self.dht_health_manager is None:
+            return
+
+        # Only get_peers scrape queries and responses with bloom filters matter: skip other packets without decoding
+        pkt_buf = alert.pkt_buf
+        if not (b"4:BFsd" in pkt_buf or (b"9:get_peers" in pkt_buf and b"6:scrapei1e" in pkt_buf)):
+            return
+
+        # Unfortunately, the Python bindings don't have a direction attribute.
+        # So, we'll have to resort to using the string representation of the alert instead.
+        incoming = str(alert).startswith("<==")
+        decoded = cast(dict[bytes, Any], lt.bdecode(pkt_buf))
+        if not decoded:
+            return
+
+        # We are sending a raw DHT message - notify the DHTHealthManager of the outstanding request.
+        if not incoming and decoded.get(b"y") == b"q" \
+                and decoded.get(b"q") == b"get_peers" and decoded[b"a"].get(b"scrape") == 1:
+            self.dht_health_manager.requesting_bloomfilters(decoded[b"t"],
+                                                            decoded[b"a"][b"info_hash"])
+
+        # We received a raw DHT message - decode it and check whether it is a BEP33 message.
+        if incoming and b"r" in decoded and b"BFsd" in decoded[b"r"] and b"BFpe" in decoded[b"r"]:
+            self.dht_health_manager.received_bloomfilters(decoded[b"t"],
+                                                          bytearray(decoded[b"r"][b"BFsd"]),
+                                                          bytearray(decoded[b"r"][b"BFpe"]))
 
     def update_ip_filter(self, lt_session: lt.session, ip_addresses: Iterable[str]) -> None:
         """
@@ -600,11 +752,33 @@ class DownloadManager(TaskManager):
             if ltsession:
                 ltsession.post_torrent_updates(0xffffffff)
 
-    def _task_process_alerts(self) -> None:
+    async def process_alerts(self, tick_budget: float = ALERT_TICK_BUDGET,
+                             chunk_budget: float = ALERT_CHUNK_BUDGET) -> None:
+        """
+        Process the alerts of all sessions, yielding to the event loop between chunks.
+
+        Alerts that do not fit in the time budget of a tick are processed in the next tick. Libtorrent invalidates
+        the alerts of a session when it pops new ones, so a session is only popped once all of its alerts are done.
+
+        :param tick_budget: the seconds of alert processing in this tick.
+        :param chunk_budget: the seconds of alert processing between two yields to the event loop.
+        """
         for hops, ltsession in list(self.ltsessions.items()):
-            if ltsession:
-                for alert in ltsession.pop_alerts():
-                    self.process_alert(alert, hops=hops)
+            if ltsession and not self.alert_queues[hops]:
+                self.alert_queues[hops].extend(ltsession.pop_alerts())
+
+        spent = 0.0
+        for hops, queue in list(self.alert_queues.items()):
+            while queue and spent < tick_budget:
+                chunk_start = time.perf_counter()
+                while queue and time.perf_counter() - chunk_start < chunk_budget:
+                    alert = queue.popleft()
+                    try:
+                        self.process_alert(alert, hops=hops)
+                    except Exception as e:
+                        logger.exception("Failed to process %s: %s", alert.__class__.__name__, e)
+                spent += time.perf_counter() - chunk_start
+                await sleep(0)
 
     def _map_call_on_ltsessions(self, hops: int | None, funcname: str, *args: Any, **kwargs) -> None:  # noqa: ANN401
         if hops is None:
@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 from aiohttp import web
 from aiohttp_apispec import docs
 from ipv8.REST.schema import schema
-from marshmallow.fields import Integer
+from marshmallow.fields import Float, Integer
 
 from tribler.core.restapi.rest_endpoint import RESTEndpoint, RESTResponse
 
@@ -32,7 +32,8 @@ class LibTorrentEndpoint(RESTEndpoint):
         super().__init__()
         self.download_manager = download_manager
         self.app.add_routes([web.get("/settings", self.get_libtorrent_settings),
-                             web.get("/session", self.get_libtorrent_session_info)])
+                             web.get("/session", self.get_libtorrent_session_info),
+                             web.get("/alerts", self.get_libtorrent_alert_stats)])
 
     @docs(
         tags=["Libtorrent"],
@@ -114,3 +115,27 @@ class LibTorrentEndpoint(RESTEndpoint):
         self.download_manager.ltsessions[hop].post_session_stats()
         stats = await session_stats
         return RESTResponse({"hop": hop, "session": stats})
+
+    @docs(
+        tags=["Libtorrent"],
+        summary="Return the number of processed Libtorrent alerts and the time it took to process them.",
+        responses={
+            200: {
+                "description": "Return a dictionary with the alert statistics by alert type and the number of alerts "
+                               "that wait to be processed",
+                "schema": schema(LibtorrentAlertsResponse={
+                    "alerts": schema(LibtorrentAlertStats={"count": Integer, "time": Float}),
+                    "queued": Integer
+                })
+            }
+        }
+    )
+    async def get_libtorrent_alert_stats(self, request: Request) -> RESTResponse:
+        """
+        Return the number of processed Libtorrent alerts and the time it took to process them, by alert type.
+        """
+        return RESTResponse({
+            "alerts": {alert_type: {"count": stats.count, "time": stats.time}
+                       for alert_type, stats in self.download_manager.get_alert_stats().items()},
+            "queued": sum(len(queue) for queue in self.download_manager.alert_queues.values())
+        })
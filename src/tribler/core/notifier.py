@@ -28,6 +28,8 @@ class Notification(Enum):
     tribler_shutdown_state = Desc("tribler_shutdown_state", ["state"], [str])
     tribler_new_version = Desc("tribler_new_version", ["version"], [str])
     remote_query_results = Desc("remote_query_results", ["query", "results", "uuid", "peer"], [str, list, str, str])
+    remote_query_update = Desc("remote_query_update", ["uuid", "query", "inserted", "moved", "removed", "complete"],
+                               [str, str, list, list, list, bool])
     local_query_results = Desc("local_query_results", ["query", "results"], [str, list])
     circuit_removed = Desc("circuit_removed", ["circuit", "additional_info"], [str, Circuit])
     tunnel_removed = Desc("tunnel_removed", ["circuit_id", "bytes_up", "bytes_down", "uptime", "additional_info"],
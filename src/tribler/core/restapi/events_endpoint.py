@@ -27,6 +27,7 @@ topics_to_send_to_gui = [
     Notification.torrent_health_updated,
     Notification.tribler_shutdown_state,
     Notification.remote_query_results,
+    Notification.remote_query_update,
     Notification.low_space,
     Notification.report_config_error,
 ]
@@ -5,16 +5,24 @@ from typing import TYPE_CHECKING
 from aiohttp import web
 from aiohttp_apispec import docs
 from ipv8.REST.schema import schema
-from marshmallow.fields import Integer, String
+from marshmallow.fields import Float, Integer, String
 
 from tribler.core.restapi.rest_endpoint import MAX_REQUEST_SIZE, RESTEndpoint, RESTResponse
 
 if TYPE_CHECKING:
     from ipv8.types import IPv8
 
+    from tribler.core.content_discovery.community import ContentDiscoveryCommunity
     from tribler.core.database.store import MetadataStore
 
 
+IngestionStageStats = schema(IngestionStageStats={
+    "items": Integer,
+    "seconds": Float,
+    "throughput": Float
+})
+
+
 class StatisticsEndpoint(RESTEndpoint):
     """
     This endpoint is responsible for handing requests regarding statistics in Tribler.
@@ -29,6 +37,7 @@ class StatisticsEndpoint(RESTEndpoint):
         super().__init__(middlewares, client_max_size)
 
         self.mds: MetadataStore | None = None
+        self.content_discovery_community: ContentDiscoveryCommunity | None = None
         self.ipv8: IPv8 | None = None
 
         self.app.add_routes([web.get("/tribler", self.get_tribler_stats),
@@ -42,6 +51,34 @@ class StatisticsEndpoint(RESTEndpoint):
                 "schema": schema(TriblerStatisticsResponse={
                     "statistics": schema(TriblerStatistics={
                         "database_size": Integer,
+                        "search_cache": schema(SearchCacheStats={
+                            "size": Integer,
+                            "hits": Integer,
+                            "misses": Integer
+                        }),
+                        "ingestion": schema(IngestionStats={
+                            "decompress": IngestionStageStats,
+                            "parse": IngestionStageStats,
+                            "verify": IngestionStageStats,
+                            "write": IngestionStageStats,
+                            "rejected": Integer
+                        }),
+                        "remote_queries": schema(RemoteQueryStats={
+                            "queue_depth": Integer,
+                            "running": Integer,
+                            "processed": Integer,
+                            "mean_wait": Float,
+                            "dropped": schema(RemoteQueryDrops={
+                                "rate_limited": Integer,
+                                "queue_full": Integer,
+                                "expired": Integer
+                            })
+                        }),
+                        "response_cache": schema(ResponseCacheStats={
+                            "size": Integer,
+                            "hits": Integer,
+                            "misses": Integer
+                        }),
                         "torrent_queue_stats": [
                             schema(TorrentQueueStats={
                                 "failed": Integer,
@@ -63,7 +100,12 @@ class StatisticsEndpoint(RESTEndpoint):
         stats_dict = {}
         if self.mds:
             stats_dict = {"db_size": self.mds.get_db_file_size(),
-                          "num_torrents": self.mds.get_num_torrents()}
+                          "num_torrents": self.mds.get_num_torrents(),
+                          "search_cache": self.mds.search_cache.get_stats(),
+                          "ingestion": self.mds.ingestion_stats.to_dict()}
+        if self.content_discovery_community:
+            stats_dict["remote_queries"] = self.content_discovery_community.query_scheduler.get_stats()
+            stats_dict["response_cache"] = self.content_discovery_community.response_cache.get_stats()
 
         return RESTResponse({"tribler_statistics": stats_dict})
 
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from pony.orm import db_session, desc
+
+from tribler.core.torrent_checker.dataclasses import HEALTH_FRESHNESS_SECONDS
+from tribler.core.torrent_checker.torrentchecker_session import MAX_INFOHASHES_IN_SCRAPE
+
+if TYPE_CHECKING:
+    from tribler.core.torrent_checker.torrent_checker import TorrentChecker
+
+DHT_GROUP = "DHT"  # The group of the torrents that have no usable trackers
+SCHEDULER_POOL_SIZE = 500  # The number of stale torrents to load into the queue at once
+SCHEDULER_ROUND_SIZE = 50  # The max number of torrents to check per round
+MAX_CONCURRENT_SCRAPES = 4  # The max number of tracker sessions to run at once
+MAX_DHT_CHECKS_PER_ROUND = 2  # DHT checks join the swarm of a torrent, which is expensive
+
+
+def check_priority(seeders: int, leechers: int, last_check: int, now: float) -> float:
+    """
+    Get the priority of checking a torrent: the more stale and the more popular the torrent, the higher.
+    """
+    return max(0.0, now - last_check) * (1 + math.log1p(seeders + leechers))
+
+
+class HealthCheckScheduler:
+    """
+    A priority queue of the torrents that are due for a health check.
+
+    Torrents are checked in rounds. The torrents of a round are grouped by tracker, so that every tracker is scraped
+    for many torrents at once instead of once per torrent.
+    """
+
+    def __init__(self, torrent_checker: TorrentChecker, pool_size: int = SCHEDULER_POOL_SIZE,
+                 round_size: int = SCHEDULER_ROUND_SIZE, max_concurrent: int = MAX_CONCURRENT_SCRAPES,
+                 max_dht_checks: int = MAX_DHT_CHECKS_PER_ROUND) -> None:
+        """
+        Create a new empty scheduler for the given torrent checker.
+
+        :param pool_size: the number of stale torrents to load from the database when the queue runs low.
+        :param round_size: the max number of torrents to check per round.
+        :param max_concurrent: the max number of tracker sessions to run at once.
+        :param max_dht_checks: the max number of torrents without usable trackers to check per round.
+        """
+        self.torrent_checker = torrent_checker
+        self.pool_size = pool_size
+        self.round_size = round_size
+        self.max_concurrent = max_concurrent
+        self.max_dht_checks = max_dht_checks
+
+        self.queue: list[tuple[float, bytes]] = []  # Min-heap of (negated priority, infohash)
+        self.queued: set[bytes] = set()
+
+    def push(self, infohash: bytes, priority: float) -> bool:
+        """
+        Queue the given infohash for checking, if it is not queued yet.
+        """
+        if infohash in self.queued:
+            return False
+        self.queued.add(infohash)
+        heapq.heappush(self.queue, (-priority, infohash))
+        return True
+
+    def pop(self, count: int) -> list[bytes]:
+        """
+        Take the given number of infohashes with the highest priority from the queue.
+        """
+        infohashes: list[bytes] = []
+        while self.queue and len(infohashes) < count:
+            _, infohash = heapq.heappop(self.queue)
+            self.queued.discard(infohash)
+            infohashes.append(infohash)
+        return infohashes
+
+    @db_session
+    def refill(self) -> int:
+        """
+        Queue the most popular and the oldest stale torrents of the database.
+
+        :returns: the number of newly queued torrents.
+        """
+        now = time.time()
+        last_fresh_time = now - HEALTH_FRESHNESS_SECONDS
+        torrent_state = self.torrent_checker.mds.TorrentState
+        popular_torrents = list(torrent_state.select(
+            lambda g: g.has_data == 1  # The condition had to be written this way for the partial index to work
+            and g.last_check < last_fresh_time
+        ).order_by(lambda g: (desc(g.seeders), g.last_check)).limit(self.pool_size // 2))
+        old_torrents = list(torrent_state.select(
+            lambda g: g.has_data == 1  # The condition had to be written this way for the partial index to work
+            and g.last_check < last_fresh_time
+        ).order_by(lambda g: (g.last_check, desc(g.seeders))).limit(self.pool_size - self.pool_size // 2))
+
+        return sum(self.push(torrent.infohash, check_priority(torrent.seeders, torrent.leechers,
+                                                              torrent.last_check, now))
+                   for torrent in popular_torrents + old_torrents)
+
+    @db_session
+    def group_by_tracker(self, infohashes: list[bytes]) -> dict[str, list[bytes]]:
+        """
+        Assign every given infohash to a single tracker, so that as few trackers as possible are scraped.
+
+        Trackers that are shared by many of the infohashes are filled first, up to the max number of infohashes per
+        scrape. Infohashes without usable trackers are checked through the DHT, up to the max number of DHT checks.
+        Infohashes that do not fit in any scrape are left out.
+        """
+        candidates: dict[str, list[bytes]] = defaultdict(list)
+        dht = []
+        for infohash in infohashes:
+            urls = self.get_alive_trackers(infohash)
+            for url in urls:
+                candidates[url].append(infohash)
+            if not urls:
+                dht.append(infohash)
+
+        groups: dict[str, list[bytes]] = {}
+        assigned: set[bytes] = set()
+        for url in sorted(candidates, key=lambda url: len(candidates[url]), reverse=True):
+            group = [infohash for infohash in candidates[url] if infohash not in assigned][:MAX_INFOHASHES_IN_SCRAPE]
+            if group:
+                groups[url] = group
+                assigned.update(group)
+        if dht and self.max_dht_checks > 0:
+            groups[DHT_GROUP] = dht[:self.max_dht_checks]
+        return groups
+
+    def get_alive_trackers(self, infohash: bytes) -> list[str]:
+        """
+        Get the valid trackers of the given torrent that are not blacklisted and not dead.
+        """
+        torrent_state = self.torrent_checker.mds.TorrentState.get(infohash=infohash)
+        if torrent_state is None:
+            return []
+        return [tracker.url for tracker in torrent_state.trackers
+                if tracker.alive and self.torrent_checker.is_valid_tracker(tracker.url)
+                and not self.torrent_checker.is_blacklisted_tracker(tracker.url)]
+
+    async def run_round(self) -> dict:
+        """
+        Check the torrents with the highest priority.
+
+        :returns: the resulting health info, by infohash.
+        """
+        if len(self.queue) < self.round_size:
+            self.refill()
+        infohashes = self.pop(self.round_size)
+        if not infohashes:
+            return {}
+        return await self.torrent_checker.check_torrents_health(infohashes)
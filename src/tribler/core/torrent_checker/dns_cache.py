@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import time
+from asyncio import Future, ensure_future, get_running_loop, shield, wait_for
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List
+
+from aiohttp.abc import AbstractResolver
+
+DNS_CACHE_TTL = 300  # seconds to remember the addresses of a tracker
+DNS_NEGATIVE_TTL = 120  # seconds to remember that the hostname of a tracker could not be resolved
+DNS_RESOLVE_TIMEOUT = 5  # seconds to wait for the resolver before giving up on a hostname
+DNS_REFRESH_INTERVAL = 60  # seconds between background refreshes of the most-used trackers
+DNS_REFRESH_COUNT = 20  # The number of most-used hostnames to keep fresh in the background
+MAX_DNS_CACHE_SIZE = 1000  # The max number of hostnames to remember
+
+
+class DNSCacheEntry:
+    """
+    The outcome of resolving a hostname: its addresses, or the error that resolving it gave.
+    """
+
+    def __init__(self, addresses: list[str], error: str | None, expires: float) -> None:
+        """
+        Create a new cache entry that is valid until the given time.
+        """
+        self.addresses = addresses
+        self.error = error
+        self.expires = expires
+
+    def is_expired(self, now: float) -> bool:
+        """
+        Whether this entry should be resolved again.
+        """
+        return now >= self.expires
+
+
+class DNSCache:
+    """
+    A cache of the IPv4 addresses of tracker hostnames.
+
+    Hostnames that do not resolve are remembered too, so that dead trackers do not keep the resolver busy. Concurrent
+    lookups of the same hostname share a single request to the resolver.
+    """
+
+    def __init__(self, *, ttl: float = DNS_CACHE_TTL, negative_ttl: float = DNS_NEGATIVE_TTL,
+                 resolve_timeout: float = DNS_RESOLVE_TIMEOUT, refresh_count: int = DNS_REFRESH_COUNT,
+                 max_size: int = MAX_DNS_CACHE_SIZE) -> None:
+        """
+        Create a new empty cache.
+
+        :param ttl: the number of seconds to remember the addresses of a hostname.
+        :param negative_ttl: the number of seconds to remember that a hostname could not be resolved.
+        :param resolve_timeout: the number of seconds to wait for the resolver.
+        :param refresh_count: the number of most-used hostnames to refresh in the background.
+        :param max_size: the max number of hostnames to remember.
+        """
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.resolve_timeout = resolve_timeout
+        self.refresh_count = refresh_count
+        self.max_size = max_size
+
+        self.entries: OrderedDict[str, DNSCacheEntry] = OrderedDict()
+        self.pending: dict[str, Future[DNSCacheEntry]] = {}
+        self.uses: Counter[str] = Counter()
+
+    async def resolve(self, hostname: str) -> list[str]:
+        """
+        Get the IPv4 addresses of the given hostname, from the cache if possible.
+
+        :raises socket.gaierror: if the hostname could not be resolved (recently).
+        """
+        self.uses[hostname] += 1
+        entry = self.entries.get(hostname)
+        if entry is None or entry.is_expired(time.time()):
+            entry = await self.lookup(hostname)
+        else:
+            self.entries.move_to_end(hostname)
+        if entry.error is not None:
+            raise socket.gaierror(socket.EAI_NONAME, entry.error)
+        return entry.addresses
+
+    async def lookup(self, hostname: str) -> DNSCacheEntry:
+        """
+        Ask the resolver for the addresses of the given hostname, joining a lookup that is already in progress.
+        """
+        future = self.pending.get(hostname)
+        if future is None:
+            future = self.pending[hostname] = ensure_future(self._lookup(hostname))
+            future.add_done_callback(lambda _: self.pending.pop(hostname, None))
+        # Shielded, so that a caller that gives up does not cancel the lookup for the other callers
+        return await shield(future)
+
+    async def _lookup(self, hostname: str) -> DNSCacheEntry:
+        """
+        Resolve the given hostname and store the outcome.
+        """
+        addresses: list[str] = []
+        try:
+            infos = await wait_for(get_running_loop().getaddrinfo(hostname, 0, family=socket.AF_INET),
+                                   timeout=self.resolve_timeout)
+            addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+            error = None if addresses else "no addresses"
+        except asyncio.TimeoutError:
+            error = "resolving timed out"
+        except OSError as e:
+            error = str(e)
+
+        if error is None:
+            entry = DNSCacheEntry(addresses, None, time.time() + self.ttl)
+        else:
+            self._logger.debug("Could not resolve %s: %s", hostname, error)
+            entry = DNSCacheEntry([], error, time.time() + self.negative_ttl)
+
+        self.entries[hostname] = entry
+        self.entries.move_to_end(hostname)
+        while len(self.entries) > self.max_size:
+            forgotten, _ = self.entries.popitem(last=False)
+            self.uses.pop(forgotten, None)
+        return entry
+
+    async def refresh(self) -> None:
+        """
+        Resolve the most-used hostnames again before their addresses expire, so that checks do not wait for them.
+
+        Hostnames that could not be resolved are left alone. The use counts are halved, so that hostnames that are no
+        longer used make way for others.
+        """
+        refresh_before = time.time() + DNS_REFRESH_INTERVAL
+        for hostname, _ in self.uses.most_common(self.refresh_count):
+            entry = self.entries.get(hostname)
+            if entry is not None and entry.error is None and entry.expires <= refresh_before:
+                await self.lookup(hostname)
+        self.uses = Counter({hostname: count // 2 for hostname, count in self.uses.items() if count > 1})
+
+
+class CachedResolver(AbstractResolver):
+    """
+    An aiohttp resolver that looks up hostnames through a DNS cache.
+    """
+
+    def __init__(self, dns_cache: DNSCache) -> None:
+        """
+        Create a new resolver for the given cache.
+        """
+        self.dns_cache = dns_cache
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict[str, Any]]:
+        """
+        Resolve a host to its cached IPv4 addresses.
+        """
+        return [{"hostname": host,
+                 "host": address, "port": port,
+                 "family": socket.AF_INET, "proto": 0,
+                 "flags": socket.AI_NUMERICHOST}
+                for address in await self.dns_cache.resolve(host)]
+
+    async def close(self) -> None:
+        """
+        Close this resolver. The cache is shared, so it is left alone.
+        """
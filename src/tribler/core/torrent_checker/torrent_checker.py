@@ -7,17 +7,26 @@ import time
 from asyncio import CancelledError, DatagramTransport
 from binascii import hexlify
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Dict, List, Tuple, cast
+from typing import TYPE_CHECKING, Dict, List, Tuple, cast
 
 from ipv8.taskmanager import TaskManager
 from pony.orm import db_session, desc, select
 from pony.utils import between
 
-from tribler.core.libtorrent.trackers import MalformedTrackerURLException, is_valid_url
+from tribler.core.libtorrent.trackers import MalformedTrackerURLException
 from tribler.core.notifier import Notification, Notifier
+from tribler.core.torrent_checker.check_scheduler import (
+    DHT_GROUP,
+    MAX_CONCURRENT_SCRAPES,
+    MAX_DHT_CHECKS_PER_ROUND,
+    SCHEDULER_ROUND_SIZE,
+    HealthCheckScheduler,
+)
 from tribler.core.torrent_checker.dataclasses import HEALTH_FRESHNESS_SECONDS, HealthInfo, TrackerResponse
+from tribler.core.torrent_checker.dns_cache import DNS_REFRESH_INTERVAL, DNSCache
 from tribler.core.torrent_checker.torrentchecker_session import (
     FakeDHTSession,
+    HttpSessionPool,
     TrackerSession,
     UdpSocketManager,
     create_tracker_session,
@@ -27,6 +36,7 @@ from tribler.core.torrent_checker.tracker_manager import MAX_TRACKER_FAILURES, T
 if TYPE_CHECKING:
     from tribler.core.database.store import MetadataStore
     from tribler.core.libtorrent.download_manager.download_manager import DownloadManager
+    from tribler.core.torrent_checker.tracker_registry import TrackerRecord
     from tribler.tribler_config import TriblerConfigManager
 
 TRACKER_SELECTION_INTERVAL = 1  # The interval for querying a random tracker
@@ -63,9 +73,17 @@ class TorrentChecker(TaskManager):
                  notifier: Notifier,
                  tracker_manager: TrackerManager,
                  metadata_store: MetadataStore,
-                 socks_listen_ports: List[int] | None = None) -> None:
+                 socks_listen_ports: List[int] | None = None,
+                 *,
+                 round_size: int = SCHEDULER_ROUND_SIZE,
+                 max_concurrent: int = MAX_CONCURRENT_SCRAPES,
+                 max_dht_checks: int = MAX_DHT_CHECKS_PER_ROUND) -> None:
         """
         Create a new TorrentChecker.
+
+        :param round_size: the max number of torrents to check every ``TORRENT_SELECTION_INTERVAL`` seconds.
+        :param max_concurrent: the max number of tracker sessions to run at once.
+        :param max_dht_checks: the max number of torrents without usable trackers to check through the DHT per round.
         """
         super().__init__()
         self._logger = logging.getLogger(self.__class__.__name__)
@@ -80,18 +98,26 @@ class TorrentChecker(TaskManager):
         self._should_stop = False
         self.sessions: dict[str, list[TrackerSession]] = defaultdict(list)
         self.socket_mgr = UdpSocketManager()
+        self.dns_cache = DNSCache()
+        self.http_session_pool = HttpSessionPool(dns_cache=self.dns_cache)
         self.udp_transport: DatagramTransport | None = None
 
         # We keep track of the results of popular torrents checked by you.
         # The content_discovery community gossips this information around.
         self._torrents_checked: Dict[bytes, HealthInfo] | None = None
 
+        self.check_scheduler = HealthCheckScheduler(self, round_size=round_size, max_concurrent=max_concurrent,
+                                                    max_dht_checks=max_dht_checks)
+
     async def initialize(self) -> None:
         """
         Start all the looping tasks for the checker and creata socket.
         """
         self.register_task("check random tracker", self.check_random_tracker, interval=TRACKER_SELECTION_INTERVAL)
-        self.register_task("check local torrents", self.check_local_torrents, interval=TORRENT_SELECTION_INTERVAL)
+        self.register_task("check scheduled torrents", self.check_scheduled_torrents,
+                           interval=TORRENT_SELECTION_INTERVAL)
+        self.register_task("refresh tracker addresses", self.dns_cache.refresh, interval=DNS_REFRESH_INTERVAL,
+                           delay=DNS_REFRESH_INTERVAL)
         await self.create_socket_or_schedule()
 
     async def listen_on_udp(self) -> DatagramTransport:
@@ -127,6 +153,7 @@ class TorrentChecker(TaskManager):
             self.udp_transport = None
 
         await self.shutdown_task_manager()
+        await self.http_session_pool.close()
 
     async def check_random_tracker(self) -> None:
         """
@@ -146,8 +173,12 @@ class TorrentChecker(TaskManager):
         # get the torrents that should be checked
         url = tracker.url
         with db_session:
+            tracker_state = self.tracker_manager.TrackerState.get(url=url)
+            if tracker_state is None:
+                self.tracker_manager.registry.remove(url)
+                return
             dynamic_interval = TORRENT_CHECK_RETRY_INTERVAL * (2 ** tracker.failures)
-            torrents = select(ts for ts in tracker.torrents
+            torrents = select(ts for ts in tracker_state.torrents
                               if ts.has_data == 1  # The condition had to be written this way for the index to work
                               and ts.last_check + dynamic_interval < int(time.time()))
             infohashes = [t.infohash for t in torrents[:MAX_TORRENTS_CHECKED_PER_SESSION]]
@@ -191,20 +222,21 @@ class TorrentChecker(TaskManager):
         t1 = time.time()
         try:
             result = await session.connect_to_tracker()
+            session.latency = time.time() - t1
         except CancelledError:
             self._logger.info("Tracker session is being cancelled: %s", session.tracker_url)
             raise
         except Exception as e:
             exception_str = str(e).replace('\n]', ']')
             self._logger.warning("Got session error for the tracker: %s\n%s", session.tracker_url, exception_str)
-            self.tracker_manager.update_tracker_info(session.tracker_url, False)
+            # The failure is recorded once, when the session is cleaned
+            session.is_failed = True
             raise e  # noqa: TRY201
         finally:
             await self.clean_session(session)
 
-        t2 = time.time()
-        self._logger.info("Got response from %s in %f seconds: %s", session.__class__.__name__, round(t2 - t1, 3),
-                          str(result))
+        self._logger.info("Got response from %s in %f seconds: %s", session.__class__.__name__,
+                          round(session.latency, 3), str(result))
 
         with db_session:
             for health in result.torrent_health_list:
@@ -277,18 +309,72 @@ class TorrentChecker(TaskManager):
         """
         selected_torrents = self.torrents_to_check()
         self._logger.info("Check %d local torrents", len(selected_torrents))
-        results = [await self.check_torrent_health(t.infohash) for t in selected_torrents]
+        health = await self.check_torrents_health([t.infohash for t in selected_torrents])
+        results = [health.get(t.infohash) for t in selected_torrents]
         self._logger.info("Results for local torrents check: %s", str(results))
         return selected_torrents, results
 
-    def get_next_tracker(self) -> Any | None:  # noqa: ANN401
+    async def check_scheduled_torrents(self) -> Dict[bytes, HealthInfo]:
+        """
+        Check the torrents that are most due for a health check, according to the check scheduler.
+        """
+        if self._should_stop:
+            return {}
+        return await self.check_scheduler.run_round()
+
+    async def check_torrents_health(self, infohashes: List[bytes], timeout: float = 20) -> Dict[bytes, HealthInfo]:
+        """
+        Check the health of many torrents at once, scraping every tracker once for all of its torrents.
+
+        Infohashes that the scheduler could not fit into a scrape are not checked.
+
+        :param infohashes: the infohashes of the torrents to check.
+        :param timeout: the timeout to use in the performed requests.
+        :returns: the resulting health info, by infohash.
+        """
+        groups = self.check_scheduler.group_by_tracker(infohashes)
+        self._logger.info("Check %d torrents on %d trackers", sum(len(group) for group in groups.values()),
+                          len(groups))
+        semaphore = asyncio.Semaphore(self.check_scheduler.max_concurrent)
+
+        async def check_group(url: str, group: List[bytes]) -> TrackerResponse | None:
+            async with semaphore:
+                session: TrackerSession | None
+                if url == DHT_GROUP:
+                    dht_session = FakeDHTSession(self.download_manager, timeout)
+                    self.sessions["DHT"].append(dht_session)
+                    session = dht_session
+                else:
+                    session = self.create_session_for_request(url, timeout=timeout)
+                if session is None:
+                    return None
+                for infohash in group:
+                    session.add_infohash(infohash)
+                return await self.get_tracker_response(session)
+
+        responses = await asyncio.gather(*(check_group(url, group) for url, group in groups.items()),
+                                         return_exceptions=True)
+        successful_responses = [response for response in responses if isinstance(response, TrackerResponse)]
+
+        results = {}
+        for group in groups.values():
+            for infohash in group:
+                health = aggregate_responses_for_infohash(infohash, successful_responses)
+                if health.last_check == 0:  # if not zero, was already updated in get_tracker_response
+                    health.last_check = int(time.time())
+                    health.self_checked = True
+                    self.update_torrent_health(health)
+                results[infohash] = health
+        return results
+
+    def get_next_tracker(self) -> TrackerRecord | None:
         """
         Return the next unchecked tracker.
         """
         while tracker := self.tracker_manager.get_next_tracker():
             url = tracker.url
 
-            if not is_valid_url(url):
+            if not self.is_valid_tracker(url):
                 self.tracker_manager.remove_tracker(url)
             elif tracker.failures >= MAX_TRACKER_FAILURES:
                 self.tracker_manager.update_tracker_info(url, is_successful=False)
@@ -301,7 +387,13 @@ class TorrentChecker(TaskManager):
         """
         Check if a given url is in the blacklist.
         """
-        return tracker_url in self.tracker_manager.blacklist
+        return self.tracker_manager.is_blacklisted(tracker_url)
+
+    def is_valid_tracker(self, tracker_url: str) -> bool:
+        """
+        Check if a given url is a valid tracker url.
+        """
+        return self.tracker_manager.is_valid(tracker_url)
 
     @db_session
     def get_valid_trackers_of_torrent(self, infohash: bytes) -> set[str]:
@@ -310,7 +402,7 @@ class TorrentChecker(TaskManager):
         """
         db_tracker_list = self.mds.TorrentState.get(infohash=infohash).trackers
         return {tracker.url for tracker in db_tracker_list
-                if is_valid_url(tracker.url) and not self.is_blacklisted_tracker(tracker.url)}
+                if self.is_valid_tracker(tracker.url) and not self.is_blacklisted_tracker(tracker.url)}
 
     async def check_torrent_health(self, infohash: bytes, timeout: float = 20, scrape_now: bool = False) -> HealthInfo:
         """
@@ -366,6 +458,8 @@ class TorrentChecker(TaskManager):
     def create_session_for_request(self, tracker_url: str, timeout: float = 20) -> TrackerSession | None:
         """
         Create a tracker session for a given url.
+
+        :param timeout: the max timeout of the session, the tracker manager adapts it to the tracker's response times.
         """
         self._logger.debug("Creating a session for the request: %s", tracker_url)
 
@@ -377,7 +471,9 @@ class TorrentChecker(TaskManager):
             return None
         listen_ports = cast(List[int], self.socks_listen_ports)  # Guaranteed by check above
         proxy = ('127.0.0.1', listen_ports[required_hops - 1]) if required_hops > 0 else None
-        session = create_tracker_session(tracker_url, timeout, proxy, self.socket_mgr)
+        timeout = self.tracker_manager.get_tracker_timeout(tracker_url, timeout)
+        session = create_tracker_session(tracker_url, timeout, proxy, self.socket_mgr, self.http_session_pool,
+                                         self.dns_cache)
         self._logger.info("Tracker session has been created: %s", str(session))
         self.sessions[tracker_url].append(session)
         return session
@@ -388,7 +484,7 @@ class TorrentChecker(TaskManager):
         """
         url = session.tracker_url
 
-        self.tracker_manager.update_tracker_info(url, not session.is_failed)
+        self.tracker_manager.update_tracker_info(url, not session.is_failed, session.latency)
         # Remove the session from our session list dictionary
         self.sessions[url].remove(session)
         if len(self.sessions[url]) == 0 and url != "DHT":
@@ -426,6 +522,7 @@ class TorrentChecker(TaskManager):
 
             torrent_state.set(seeders=health.seeders, leechers=health.leechers, last_check=health.last_check,
                               self_checked=True)
+        self.mds.increment_write_generation()
 
         if health.seeders > 0 or health.leechers > 0:
             self.torrents_checked[health.infohash] = health
@@ -6,18 +6,19 @@ import socket
 import struct
 import time
 from abc import ABCMeta, abstractmethod
-from asyncio import DatagramProtocol, Future, TimeoutError, ensure_future, get_event_loop
+from asyncio import DatagramProtocol, Future, TimeoutError
 from typing import TYPE_CHECKING, Any, List, NoReturn, cast
 
 import async_timeout
 import libtorrent as lt
-from aiohttp import ClientResponseError, ClientSession, ClientTimeout
+from aiohttp import ClientResponseError, ClientSession, ClientTimeout, TCPConnector
 from ipv8.taskmanager import TaskManager
 
 from tribler.core.libtorrent.trackers import add_url_params, parse_tracker_url
 from tribler.core.socks5.aiohttp_connector import Socks5Connector
 from tribler.core.socks5.client import Socks5Client
 from tribler.core.torrent_checker.dataclasses import HealthInfo, TrackerResponse
+from tribler.core.torrent_checker.dns_cache import CachedResolver, DNSCache
 
 if TYPE_CHECKING:
     from ipv8.messaging.interfaces.udp.endpoint import DomainAddress
@@ -29,10 +30,14 @@ if TYPE_CHECKING:
 TRACKER_ACTION_CONNECT = 0
 TRACKER_ACTION_ANNOUNCE = 1
 TRACKER_ACTION_SCRAPE = 2
+TRACKER_ACTION_ERROR = 3
 
 UDP_TRACKER_INIT_CONNECTION_ID = 0x41727101980
 
 MAX_INFOHASHES_IN_SCRAPE = 60
+CONNECTION_ID_TTL = 60  # seconds that a UDP tracker accepts a connection ID for, per BEP 15
+HTTP_LIMIT_PER_HOST = 2  # The max number of simultaneous connections to a single HTTP tracker
+HTTP_KEEPALIVE_TIMEOUT = 30  # seconds to keep idle connections to HTTP trackers open
 
 
 class TrackerSession(TaskManager):
@@ -59,6 +64,7 @@ class TrackerSession(TaskManager):
         self.timeout = timeout
         self.infohash_list: list[bytes] = []
         self.last_contact = 0
+        self.latency: float | None = None  # The response time of the tracker in seconds, once it answered
 
         # some flags
         self.is_initiated = False  # you cannot add requests to a session if it has been initiated
@@ -115,20 +121,71 @@ class TrackerSession(TaskManager):
         """Does some work when a connection has been established."""
 
 
+class HttpSessionPool:
+    """
+    Shared HTTP client sessions for tracker scrapes, one per proxy, that keep connections to trackers alive.
+    """
+
+    def __init__(self, limit_per_host: int = HTTP_LIMIT_PER_HOST, keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+                 dns_cache: DNSCache | None = None) -> None:
+        """
+        Create a new empty pool.
+
+        :param limit_per_host: the max number of simultaneous connections to a single tracker.
+        :param keepalive_timeout: the number of seconds to keep idle connections open.
+        :param dns_cache: the cache to resolve tracker hostnames with, when not using a proxy.
+        """
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache = dns_cache
+        self.sessions: dict[tuple | None, ClientSession] = {}
+
+    def get(self, proxy: tuple | None) -> ClientSession:
+        """
+        Get the session for the given proxy (or None for direct connections), creating it if needed.
+        """
+        session = self.sessions.get(proxy)
+        if session is None or session.closed:
+            if proxy:
+                connector = Socks5Connector(proxy, limit_per_host=self.limit_per_host,
+                                            keepalive_timeout=self.keepalive_timeout)
+            elif self.dns_cache is not None:
+                connector = TCPConnector(resolver=CachedResolver(self.dns_cache), use_dns_cache=False,
+                                         limit_per_host=self.limit_per_host, keepalive_timeout=self.keepalive_timeout)
+            else:
+                connector = TCPConnector(limit_per_host=self.limit_per_host, keepalive_timeout=self.keepalive_timeout)
+            session = self.sessions[proxy] = ClientSession(connector=connector, raise_for_status=True)
+        return session
+
+    async def close(self) -> None:
+        """
+        Close all sessions.
+        """
+        sessions, self.sessions = list(self.sessions.values()), {}
+        for session in sessions:
+            await session.close()
+
+
 class HttpTrackerSession(TrackerSession):
     """
     A session for HTTP tracker checks.
     """
 
-    def __init__(self, tracker_url: str, tracker_address: tuple[str, int], announce_page: str, timeout: float,
-                 proxy: tuple) -> None:
+    def __init__(self, tracker_url: str, tracker_address: tuple[str, int], announce_page: str,  # noqa: PLR0913
+                 timeout: float, proxy: tuple, session_pool: HttpSessionPool | None = None) -> None:
         """
         Create a new HTTP tracker session.
+
+        :param session_pool: the pool to take a shared client session from, or None to use a private client session.
         """
         super().__init__("http", tracker_url, tracker_address, announce_page, timeout)
-        self.session = ClientSession(connector=Socks5Connector(proxy) if proxy else None,
-                                     raise_for_status=True,
-                                     timeout=ClientTimeout(total=self.timeout))
+        self.owns_session = session_pool is None
+        if session_pool is None:
+            self.session = ClientSession(connector=Socks5Connector(proxy) if proxy else None,
+                                         raise_for_status=True,
+                                         timeout=ClientTimeout(total=self.timeout))
+        else:
+            self.session = session_pool.get(proxy)
 
     async def connect_to_tracker(self) -> TrackerResponse:
         """
@@ -149,7 +206,8 @@ class HttpTrackerSession(TrackerSession):
 
         try:
             self._logger.debug("%s HTTP SCRAPE message sent: %s", self, url)
-            async with self.session, self.session.get(url.encode("ascii").decode()) as response:
+            async with self.session.get(url.encode("ascii").decode(),
+                                        timeout=ClientTimeout(total=self.timeout)) as response:
                 body = await response.read()
         except UnicodeEncodeError:
             raise
@@ -203,8 +261,11 @@ class HttpTrackerSession(TrackerSession):
     async def cleanup(self) -> None:
         """
         Cleans the session by cancelling all deferreds and closing sockets.
+
+        Shared client sessions are left open for other tracker sessions.
         """
-        await self.session.close()
+        if self.owns_session:
+            await self.session.close()
         await super().cleanup()
 
 
@@ -221,6 +282,33 @@ class UdpSocketManager(DatagramProtocol):
         self.tracker_sessions: dict[int, Future[bytes]] = {}
         self.transport: Socks5Client | None = None
         self.proxy_transports: dict[tuple, Socks5Client] = {}
+        # The connection IDs that trackers gave us and the time they expire, by tracker address and proxy
+        self.connection_ids: dict[tuple, tuple[int, float]] = {}
+
+    def get_connection_id(self, key: tuple) -> int | None:
+        """
+        Get the connection ID for the given tracker address and proxy, if we have one that did not expire yet.
+        """
+        connection_id, expires = self.connection_ids.get(key, (None, 0.0))
+        if expires <= time.time():
+            self.connection_ids.pop(key, None)
+            return None
+        return connection_id
+
+    def set_connection_id(self, key: tuple, connection_id: int) -> None:
+        """
+        Remember the connection ID that a tracker gave us, so that other sessions can skip the connect round trip.
+        """
+        now = time.time()
+        for expired in [key for key, (_, expires) in self.connection_ids.items() if expires <= now]:
+            del self.connection_ids[expired]
+        self.connection_ids[key] = (connection_id, now + CONNECTION_ID_TTL)
+
+    def invalidate_connection_id(self, key: tuple) -> None:
+        """
+        Forget the connection ID for the given tracker address and proxy.
+        """
+        self.connection_ids.pop(key, None)
 
     def connection_made(self, transport: Socks5Client) -> None:
         """
@@ -284,9 +372,12 @@ class UdpTrackerSession(TrackerSession):
     _active_session_dict: dict[UdpTrackerSession, int] = {}
 
     def __init__(self, tracker_url: str, tracker_address: tuple[str, int], announce_page: str,  # noqa: PLR0913
-                 timeout: float, proxy: tuple, socket_mgr: UdpSocketManager) -> None:
+                 timeout: float, proxy: tuple, socket_mgr: UdpSocketManager, *,
+                 dns_cache: DNSCache | None = None) -> None:
         """
         Create a session for UDP trackers.
+
+        :param dns_cache: the cache to resolve the tracker hostname with, or None to use a private cache.
         """
         super().__init__("udp", tracker_url, tracker_address, announce_page, timeout)
 
@@ -297,12 +388,43 @@ class UdpTrackerSession(TrackerSession):
         self.ip_address = None
         self.socket_mgr = socket_mgr
         self.proxy = proxy
+        self.dns_cache = dns_cache or DNSCache()
+        self.reused_connection = False
 
         # prepare connection message
         self._connection_id = UDP_TRACKER_INIT_CONNECTION_ID
         self.action = TRACKER_ACTION_CONNECT
         self.generate_transaction_id()
 
+    @property
+    def connection_key(self) -> tuple:
+        """
+        The key of the connection ID of this tracker in the socket manager.
+        """
+        return self.ip_address or self.tracker_address[0], self.port, self.proxy
+
+    def reuse_connection(self) -> bool:
+        """
+        Skip the connect round trip if the socket manager has a connection ID for this tracker.
+        """
+        connection_id = self.socket_mgr.get_connection_id(self.connection_key)
+        if connection_id is None:
+            return False
+        self._connection_id = connection_id
+        self.action = TRACKER_ACTION_SCRAPE
+        self.reused_connection = True
+        return True
+
+    def reset_connection(self) -> None:
+        """
+        Forget the (expired) connection ID, to connect to the tracker again.
+        """
+        self.socket_mgr.invalidate_connection_id(self.connection_key)
+        self._connection_id = UDP_TRACKER_INIT_CONNECTION_ID
+        self.action = TRACKER_ACTION_CONNECT
+        self.reused_connection = False
+        self.generate_transaction_id()
+
     def generate_transaction_id(self) -> None:
         """
         Generates a unique transaction id and stores this in the _active_session_dict set.
@@ -347,21 +469,17 @@ class UdpTrackerSession(TrackerSession):
 
         # Clean old tasks if present
         await self.cancel_pending_task("result")
-        await self.cancel_pending_task("resolve")
 
         try:
             async with async_timeout.timeout(self.timeout):
                 # We only resolve the hostname if we're not using a proxy.
                 # If a proxy is used, the TunnelCommunity will resolve the hostname at the exit nodes.
                 if not self.proxy:
-                    # Resolve the hostname to an IP address if not done already
-                    coro = get_event_loop().getaddrinfo(self.tracker_address[0], 0, family=socket.AF_INET)
-                    if isinstance(coro, Future):
-                        infos = await coro  # In Python <=3.6 getaddrinfo returns a Future
-                    else:
-                        infos = await self.register_anonymous_task("resolve", ensure_future(coro))
-                    self.ip_address = infos[0][-1][0]
-                await self.connect()
+                    # Resolve the hostname to an IP address, through the cache of recent resolutions
+                    addresses = await self.dns_cache.resolve(self.tracker_address[0])
+                    self.ip_address = addresses[0]
+                if not self.reuse_connection():
+                    await self.connect()
                 return await self.scrape()
         except TimeoutError:
             self.failed(msg="request timed out")
@@ -401,6 +519,7 @@ class UdpTrackerSession(TrackerSession):
 
         # update action and IDs
         self._connection_id = struct.unpack_from("!q", response, 8)[0]
+        self.socket_mgr.set_connection_id(self.connection_key, self._connection_id)
         self.action = TRACKER_ACTION_SCRAPE
         self.generate_transaction_id()
         self.last_contact = int(time.time())
@@ -425,6 +544,12 @@ class UdpTrackerSession(TrackerSession):
 
         # check response
         action, transaction_id = struct.unpack_from("!ii", response, 0)
+        if action == TRACKER_ACTION_ERROR and transaction_id == self.transaction_id and self.reused_connection:
+            # The tracker may no longer accept the connection ID that another session got: connect again
+            self._logger.debug("%s Error response for UDP SCRAPE with a reused connection ID, reconnecting", self)
+            self.reset_connection()
+            await self.connect()
+            return await self.scrape()
         if action != self.action or transaction_id != self.transaction_id:
             # get error message
             errmsg_length = len(response) - 8
@@ -501,26 +626,26 @@ class FakeBep33DHTSession(FakeDHTSession):
         """
         Query the bittorrent DHT using BEP33 to avoid joining the swarm.
         """
-        coros = [self.download_manager.dht_health_manager.get_health(infohash, timeout=self.timeout)
-                 for infohash in self.infohash_list]
-        results: list[HealthInfo] = []
-        for coroutine in coros:
-            local_results = [result for result in (await coroutine) if not isinstance(result, Exception)]
-            results = [*results, *local_results]
+        results = await self.download_manager.dht_health_manager.get_health_batch(self.infohash_list,
+                                                                                 timeout=self.timeout)
         return TrackerResponse(url="DHT", torrent_health_list=results)
 
 
 def create_tracker_session(tracker_url: str, timeout: float, proxy: tuple,
-                           socket_manager: UdpSocketManager) -> TrackerSession:
+                           socket_manager: UdpSocketManager, http_session_pool: HttpSessionPool | None = None,
+                           dns_cache: DNSCache | None = None) -> TrackerSession:
     """
     Creates a tracker session with the given tracker URL.
 
     :param tracker_url: The given tracker URL.
     :param timeout: The timeout for the session.
+    :param http_session_pool: The shared client sessions for HTTP trackers, if any.
+    :param dns_cache: The shared cache of tracker hostname resolutions, if any.
     :return: The tracker session.
     """
     tracker_type, tracker_address, announce_page = parse_tracker_url(tracker_url)
 
     if tracker_type == "udp":
-        return UdpTrackerSession(tracker_url, tracker_address, announce_page, timeout, proxy, socket_manager)
-    return HttpTrackerSession(tracker_url, tracker_address, announce_page, timeout, proxy)
+        return UdpTrackerSession(tracker_url, tracker_address, announce_page, timeout, proxy, socket_manager,
+                                 dns_cache=dns_cache)
+    return HttpTrackerSession(tracker_url, tracker_address, announce_page, timeout, proxy, http_session_pool)
@@ -1,19 +1,52 @@
 from __future__ import annotations
 
 import logging
+import math
+import random
 import time
+from collections import deque
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from pony.orm import count, db_session
 
-from tribler.core.libtorrent.trackers import get_uniformed_tracker_url
+from tribler.core.torrent_checker.tracker_registry import TrackerRegistry
 
 if TYPE_CHECKING:
+    from tribler.core.database.orm_bindings.tracker_state import TrackerState
     from tribler.core.database.store import MetadataStore
+    from tribler.core.torrent_checker.tracker_registry import TrackerRecord
 
 MAX_TRACKER_FAILURES = 5  # if a tracker fails this amount of times in a row, its 'is_alive' will be marked as 0 (dead).
 TRACKER_RETRY_INTERVAL = 60  # A "dead" tracker will be retired every 60 seconds
+REGISTRY_SYNC_INTERVAL = 60  # seconds between loading the trackers that others added to the database
+
+LATENCY_SMOOTHING = 0.125  # The weight of a new response time in the latency EWMA, as for TCP round-trip times
+DEVIATION_SMOOTHING = 0.25  # The weight of a new deviation in the latency deviation EWMA
+SUCCESS_SMOOTHING = 0.2  # The weight of the latest check in the success rate EWMA
+MAX_LATENCY_DEVIATION = 60  # seconds, the deviation stops doubling after failures here
+TIMEOUT_DEVIATIONS = 4  # The timeout of a tracker is this many deviations above its mean response time
+MIN_TRACKER_TIMEOUT = 5  # seconds
+LATENCY_SAMPLES = 200  # The number of recent response times of all trackers to keep
+MIN_LATENCY_SAMPLES = 20  # The number of response times needed to derive a timeout for trackers without statistics
+LATENCY_PERCENTILE = 0.95  # Trackers without statistics get twice this percentile of recent response times
+TRACKER_CANDIDATES = 10  # The number of most overdue trackers to pick the next tracker from
+MIN_TRACKER_QUALITY = 0.05  # The quality of a tracker that never answers, to still retry it once in a while
+
+
+def tracker_quality(success_rate: float, latency: float) -> float:
+    """
+    Get the weight of a tracker in the selection of the next tracker: the more reliable and the faster, the higher.
+    """
+    return (MIN_TRACKER_QUALITY + success_rate) / (1 + latency)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Get the value below which the given fraction of the values falls (nearest-rank).
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
 
 
 class TrackerManager:
@@ -29,9 +62,14 @@ class TrackerManager:
         self.state_dir = state_dir
         self.TrackerState = metadata_store.TrackerState
 
-        self.blacklist: list[str] = []
+        self.registry = TrackerRegistry(TRACKER_RETRY_INTERVAL)
+        self.last_sync = 0.0
+
+        self.blacklist = self.registry.blacklist
         self.load_blacklist()
 
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)  # Recent response times of all trackers
+
     def load_blacklist(self) -> None:
         """
         Load the tracker blacklist from tracker_blacklist.txt in the session state directory.
@@ -41,8 +79,8 @@ class TrackerManager:
         blacklist_file = (Path(self.state_dir or ".") / "tracker_blacklist.txt").absolute()
         if blacklist_file.exists():
             with open(blacklist_file) as blacklist_file_handle:
-                # Note that get_uniformed_tracker_url will strip the newline at the end of .readlines()
-                self.blacklist.extend([get_uniformed_tracker_url(url) for url in blacklist_file_handle.readlines()])
+                # Note that uniforming the URLs strips the newline at the end of .readlines()
+                self.registry.add_to_blacklist(blacklist_file_handle.readlines())
         else:
             self._logger.info("No tracker blacklist file found at %s.", blacklist_file)
 
@@ -53,7 +91,7 @@ class TrackerManager:
         :param tracker_url: The given tracker URL.
         :return: The tracker info dict if exists, None otherwise.
         """
-        sanitized_tracker_url = get_uniformed_tracker_url(tracker_url) if tracker_url != "DHT" else tracker_url
+        sanitized_tracker_url = self.registry.uniform(tracker_url) if tracker_url != "DHT" else tracker_url
 
         with db_session:
             tracker = list(self.TrackerState.select(lambda g: g.url == sanitized_tracker_url))
@@ -62,7 +100,9 @@ class TrackerManager:
                     "id": tracker[0].url,
                     "last_check": tracker[0].last_check,
                     "failures": tracker[0].failures,
-                    "is_alive": tracker[0].alive
+                    "is_alive": tracker[0].alive,
+                    "latency": tracker[0].latency,
+                    "success_rate": tracker[0].success_rate
                 }
             return None
 
@@ -72,7 +112,7 @@ class TrackerManager:
 
         :param tracker_url: The new tracker URL to be added.
         """
-        sanitized_tracker_url = get_uniformed_tracker_url(tracker_url)
+        sanitized_tracker_url = self.registry.uniform(tracker_url)
         if sanitized_tracker_url is None:
             self._logger.warning("skip invalid tracker: %s", repr(tracker_url))
             return
@@ -84,11 +124,12 @@ class TrackerManager:
                 return
 
             # insert into database
-            self.TrackerState(url=sanitized_tracker_url,
-                              last_check=0,
-                              failures=0,
-                              alive=True,
-                              torrents={})
+            tracker = self.TrackerState(url=sanitized_tracker_url,
+                                        last_check=0,
+                                        failures=0,
+                                        alive=True,
+                                        torrents={})
+            self.registry.update(tracker)
 
     def remove_tracker(self, tracker_url: str) -> None:
         """
@@ -98,7 +139,10 @@ class TrackerManager:
 
         :param tracker_url: The URL of the tracker to be deleted.
         """
-        sanitized_tracker_url = get_uniformed_tracker_url(tracker_url)
+        sanitized_tracker_url = self.registry.uniform(tracker_url)
+        self.registry.remove(tracker_url)
+        if sanitized_tracker_url:
+            self.registry.remove(sanitized_tracker_url)
 
         with db_session:
             options = self.TrackerState.select(lambda g: g.url in [tracker_url, sanitized_tracker_url])
@@ -106,17 +150,21 @@ class TrackerManager:
                 option.delete()
 
     @db_session
-    def update_tracker_info(self, tracker_url: str, is_successful: bool = True) -> None:
+    def update_tracker_info(self, tracker_url: str, is_successful: bool = True, latency: float | None = None) -> None:
         """
         Updates a tracker information.
 
+        The statistics of the tracker are only updated for checks that contacted the tracker: failed checks and
+        successful checks with a response time.
+
         :param tracker_url: The given tracker_url.
         :param is_successful: If the check was successful.
+        :param latency: The response time of a successful check in seconds, None if the tracker was not contacted.
         """
         if tracker_url == "DHT":
             return
 
-        sanitized_tracker_url = get_uniformed_tracker_url(tracker_url)
+        sanitized_tracker_url = self.registry.uniform(tracker_url)
         tracker = self.TrackerState.get(lambda g: g.url == sanitized_tracker_url)
 
         if not tracker:
@@ -131,21 +179,95 @@ class TrackerManager:
         tracker.last_check = current_time
         tracker.failures = failures
         tracker.alive = is_alive
+        if not is_successful:
+            self.update_tracker_stats(tracker, None)
+        elif latency is not None:
+            self.update_tracker_stats(tracker, latency)
+        self.registry.update(tracker)
         self._logger.info("Tracker updated: %s. Alive: %s. Failures: %d.", tracker.url, str(is_alive), failures)
 
-    @db_session
-    def get_next_tracker(self) -> str | None:
+    def sync_registry(self, force: bool = False) -> None:
+        """
+        Load the trackers that were added to the database since the last sync, at most once per sync interval.
+
+        Trackers are also added to the database when torrents are stored, which does not go through this manager.
+        """
+        now = time.time()
+        if not force and now - self.last_sync < REGISTRY_SYNC_INTERVAL:
+            return
+        self.last_sync = now
+
+        max_rowid = self.registry.max_rowid
+        with db_session:
+            for tracker in self.TrackerState.select(lambda g: g.rowid > max_rowid):
+                self.registry.update(tracker)
+
+    def is_blacklisted(self, tracker_url: str) -> bool:
+        """
+        Whether the given tracker URL is blacklisted.
+        """
+        return self.registry.is_blacklisted(tracker_url)
+
+    def is_valid(self, tracker_url: str) -> bool:
+        """
+        Whether the given tracker URL is valid.
+        """
+        return self.registry.is_valid(tracker_url)
+
+    def update_tracker_stats(self, tracker: TrackerState, latency: float | None) -> None:
+        """
+        Update the EWMAs of a tracker with a check that was answered in ``latency`` seconds, or failed if None.
+
+        A failure doubles the deviation of the tracker, so that its timeout backs off in case it was too tight.
+        """
+        tracker.success_rate += SUCCESS_SMOOTHING * (float(latency is not None) - tracker.success_rate)
+        if latency is None:
+            tracker.latency_deviation = min(MAX_LATENCY_DEVIATION, tracker.latency_deviation * 2)
+            return
+
+        self.latencies.append(latency)
+        if not tracker.latency:
+            tracker.latency = latency
+            tracker.latency_deviation = latency / 2
+        else:
+            tracker.latency_deviation += DEVIATION_SMOOTHING * (abs(latency - tracker.latency)
+                                                                - tracker.latency_deviation)
+            tracker.latency += LATENCY_SMOOTHING * (latency - tracker.latency)
+
+    def get_tracker_timeout(self, tracker_url: str, max_timeout: float) -> float:
+        """
+        Get the time to wait for a response of the given tracker.
+
+        The timeout is a high percentile of the response times of the tracker, estimated from its EWMAs. Trackers that
+        never answered get a timeout that is derived from the recent response times of all trackers instead.
+
+        :param tracker_url: The given tracker_url.
+        :param max_timeout: The timeout to never exceed, and to use when there are not enough statistics.
+        """
+        self.sync_registry()
+        sanitized_tracker_url = self.registry.uniform(tracker_url)
+        tracker = self.registry.get(sanitized_tracker_url) if sanitized_tracker_url else None
+
+        if tracker is not None and tracker.latency:
+            timeout = tracker.latency + TIMEOUT_DEVIATIONS * tracker.latency_deviation
+        elif len(self.latencies) >= MIN_LATENCY_SAMPLES:
+            timeout = 2 * percentile(list(self.latencies), LATENCY_PERCENTILE)
+        else:
+            return max_timeout
+        return min(max_timeout, max(MIN_TRACKER_TIMEOUT, timeout))
+
+    def get_next_tracker(self) -> TrackerRecord | None:
         """
         Gets the next tracker.
 
+        The next tracker is one of the most overdue trackers, picked at random by its quality. This way, most checks go
+        to trackers that actually answer.
+
         :return: The next tracker for torrent-checking.
         """
-        tracker = self.TrackerState.select(
-            lambda g: str(g.url)
-                      and g.alive
-                      and g.last_check + TRACKER_RETRY_INTERVAL <= int(time.time())
-                      and str(g.url) not in self.blacklist
-        ).order_by(self.TrackerState.last_check).limit(1)
-        if not tracker:
+        self.sync_registry()
+        trackers = self.registry.get_due(int(time.time()), TRACKER_CANDIDATES)
+        if not trackers:
             return None
-        return tracker[0]
+        return random.choices(trackers, weights=[tracker_quality(tracker.success_rate, tracker.latency)
+                                                 for tracker in trackers])[0]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import heapq
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+
+from tribler.core.libtorrent.trackers import get_uniformed_tracker_url, is_valid_url
+
+if TYPE_CHECKING:
+    from tribler.core.database.orm_bindings.tracker_state import TrackerState
+
+MAX_URL_CACHE_SIZE = 10000  # The max number of raw URLs to remember the uniformed form and validity of
+
+
+@dataclass
+class TrackerRecord:
+    """
+    The in-memory copy of a TrackerState.
+    """
+
+    url: str
+    rowid: int = 0
+    last_check: int = 0
+    failures: int = 0
+    alive: bool = True
+    latency: float = 0
+    latency_deviation: float = 0
+    success_rate: float = 1
+
+    @classmethod
+    def from_state(cls: type[TrackerRecord], tracker: TrackerState) -> TrackerRecord:
+        """
+        Copy the given database object.
+        """
+        return cls(sys.intern(tracker.url), tracker.rowid or 0, tracker.last_check or 0, tracker.failures or 0,
+                   bool(tracker.alive), tracker.latency or 0, tracker.latency_deviation or 0,
+                   1 if tracker.success_rate is None else tracker.success_rate)
+
+
+class TrackerRegistry:
+    """
+    The trackers of the database, kept in memory to select trackers and validate tracker URLs without queries.
+
+    The trackers that may be checked are kept in a min-heap by the time that they are due. Entries of the heap are
+    never updated in place: an entry is stale when its time does not match the current due time of its tracker.
+    """
+
+    def __init__(self, retry_interval: int) -> None:
+        """
+        Create a new empty registry.
+
+        :param retry_interval: the number of seconds to wait between checks of a tracker.
+        """
+        self.retry_interval = retry_interval
+
+        self.trackers: dict[str, TrackerRecord] = {}
+        self.blacklist: set[str] = set()
+        self.due: list[tuple[int, str]] = []  # Min-heap of (due time, url)
+        self.max_rowid = 0
+
+        self.uniformed_urls: dict[str, str | None] = {}
+        self.valid_urls: dict[str, bool] = {}
+
+    def uniform(self, url: str) -> str | None:
+        """
+        Get the interned uniformed form of the given tracker URL, or None if it is malformed.
+        """
+        if url in self.uniformed_urls:
+            return self.uniformed_urls[url]
+        if len(self.uniformed_urls) >= MAX_URL_CACHE_SIZE:
+            self.uniformed_urls.clear()
+        uniformed = get_uniformed_tracker_url(url)
+        uniformed = self.uniformed_urls[url] = sys.intern(uniformed) if uniformed else None
+        return uniformed
+
+    def is_valid(self, url: str) -> bool:
+        """
+        Whether the given tracker URL is valid.
+        """
+        valid = self.valid_urls.get(url)
+        if valid is None:
+            if len(self.valid_urls) >= MAX_URL_CACHE_SIZE:
+                self.valid_urls.clear()
+            valid = self.valid_urls[url] = bool(is_valid_url(url))
+        return valid
+
+    def is_blacklisted(self, url: str) -> bool:
+        """
+        Whether the given tracker URL, or its uniformed form, is blacklisted.
+        """
+        return url in self.blacklist or self.uniform(url) in self.blacklist
+
+    def add_to_blacklist(self, urls: Iterable[str]) -> None:
+        """
+        Blacklist the given tracker URLs.
+        """
+        for url in urls:
+            uniformed = self.uniform(url)
+            if uniformed:
+                self.blacklist.add(uniformed)
+
+    def get(self, url: str) -> TrackerRecord | None:
+        """
+        Get the record of the tracker with the given (uniformed) URL.
+        """
+        return self.trackers.get(url)
+
+    def update(self, tracker: TrackerState) -> TrackerRecord:
+        """
+        Copy the given database object into the registry and schedule its next check.
+        """
+        record = self.trackers[tracker.url] = TrackerRecord.from_state(tracker)
+        self.max_rowid = max(self.max_rowid, record.rowid)
+        self.schedule(record)
+        return record
+
+    def remove(self, url: str) -> None:
+        """
+        Forget the tracker with the given URL. Its heap entry is dropped once it surfaces.
+        """
+        self.trackers.pop(url, None)
+
+    def schedule(self, record: TrackerRecord) -> None:
+        """
+        Push the tracker onto the heap at its due time, if it may be checked at all.
+        """
+        if record.alive and record.url not in self.blacklist:
+            heapq.heappush(self.due, (record.last_check + self.retry_interval, record.url))
+
+    def get_due(self, now: int, count: int) -> list[TrackerRecord]:
+        """
+        Get at most ``count`` trackers that are due at the given time, most overdue first.
+
+        The trackers stay scheduled until their next check updates them.
+        """
+        records: list[TrackerRecord] = []
+        while self.due and self.due[0][0] <= now and len(records) < count:
+            due_time, url = heapq.heappop(self.due)
+            record = self.trackers.get(url)
+            if record is None or record in records or not record.alive or url in self.blacklist \
+                    or record.last_check + self.retry_interval != due_time:
+                continue  # Stale entry
+            records.append(record)
+        for record in records:
+            self.schedule(record)
+        return records
@@ -0,0 +1,401 @@
+"""
+Measure the throughput of the torrent checker against local mock trackers.
+
+Run from the ``src`` directory: ``python -m tribler.test_integration.benchmark_torrent_checker --help``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import logging
+import random
+import time
+from asyncio import Task, ensure_future, sleep
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from ipv8.keyvault.crypto import default_eccrypto
+from pony.orm import db_session
+
+from tribler.core.database.store import MetadataStore
+from tribler.core.notifier import Notifier
+from tribler.core.torrent_checker.dataclasses import HEALTH_FRESHNESS_SECONDS
+from tribler.core.torrent_checker.torrent_checker import TorrentChecker
+from tribler.core.torrent_checker.tracker_manager import TrackerManager, percentile
+from tribler.test_integration.mock_trackers import MockHttpTracker, MockUdpTracker, TrackerBehavior, TrackerStats
+from tribler.tribler_config import DEFAULT_CONFIG, TriblerConfigManager
+
+if TYPE_CHECKING:
+    from tribler.core.torrent_checker.dataclasses import HealthInfo
+
+LAG_SAMPLE_INTERVAL = 0.01  # seconds between two event loop lag samples
+STALE_SPREAD = 86400  # seconds over which the last checks of the seeded torrents are spread
+
+
+@dataclass
+class BenchmarkSettings:
+    """
+    The setup of a benchmark run.
+    """
+
+    torrents: int = 1000
+    udp_trackers: int = 10
+    http_trackers: int = 10
+    trackers_per_torrent: int = 3
+    behavior: TrackerBehavior = field(default_factory=TrackerBehavior)
+    timeout: float = 5  # The max timeout of a check_torrent_health request, the other checks use their own
+    concurrency: int = 8  # The number of checks to run at once
+    tracker_checks: int | None = None  # The number of check_random_tracker calls, None for one per tracker
+    local_checks: int = 20  # The number of check_local_torrents calls
+    health_checks: int = 100  # The number of check_torrent_health calls
+    seed: int = 42
+
+
+@dataclass
+class Summary:
+    """
+    The distribution of a series of timings, in seconds.
+    """
+
+    count: int = 0
+    mean: float = 0
+    p95: float = 0
+    max: float = 0
+
+    @classmethod
+    def of(cls: type[Summary], samples: list[float]) -> Summary:
+        """
+        Summarize the given samples.
+        """
+        if not samples:
+            return cls()
+        return cls(len(samples), sum(samples) / len(samples), percentile(samples, 0.95), max(samples))
+
+    def __str__(self) -> str:
+        """
+        Format the summary in milliseconds.
+        """
+        return (f"n={self.count} mean={self.mean * 1000:.2f}ms p95={self.p95 * 1000:.2f}ms "
+                f"max={self.max * 1000:.2f}ms")
+
+
+@dataclass
+class WorkloadReport:
+    """
+    The measurements of a single workload.
+    """
+
+    name: str
+    calls: int
+    errors: int
+    results: int  # The number of torrent health results that were written (or offered) to the database
+    duration: float
+    health_writes: Summary
+    tracker_writes: Summary
+    loop_lag: Summary
+
+    @property
+    def calls_per_second(self) -> float:
+        """
+        The number of completed calls per second.
+        """
+        return self.calls / self.duration if self.duration else 0
+
+    @property
+    def results_per_second(self) -> float:
+        """
+        The number of torrent health results per second.
+        """
+        return self.results / self.duration if self.duration else 0
+
+    def __str__(self) -> str:
+        """
+        Format the report as human-readable lines.
+        """
+        return (f"{self.name}: {self.calls} calls ({self.errors} errors) in {self.duration:.2f}s, "
+                f"{self.calls_per_second:.1f} calls/s, {self.results_per_second:.1f} results/s\n"
+                f"  torrent health writes: {self.health_writes}\n"
+                f"  tracker info writes:   {self.tracker_writes}\n"
+                f"  event loop lag:        {self.loop_lag}")
+
+
+class LoopLagMonitor:
+    """
+    Sample how late the event loop wakes up a sleeping task.
+    """
+
+    def __init__(self, interval: float = LAG_SAMPLE_INTERVAL) -> None:
+        """
+        Create a new monitor, which does not sample until it is started.
+        """
+        self.interval = interval
+        self.samples: list[float] = []
+        self.task: Task | None = None
+
+    def start(self) -> None:
+        """
+        Start sampling.
+        """
+        self.task = ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stop sampling.
+        """
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def run(self) -> None:
+        """
+        Sleep repeatedly and record how much later than requested every sleep ends.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - before - self.interval))
+
+
+class BenchmarkTrackerManager(TrackerManager):
+    """
+    A tracker manager that times its writes of tracker info.
+    """
+
+    def __init__(self, metadata_store: MetadataStore) -> None:
+        """
+        Create a new tracker manager, without a blacklist.
+        """
+        super().__init__(metadata_store=metadata_store)
+        self.write_latencies: list[float] = []
+
+    def update_tracker_info(self, tracker_url: str, is_successful: bool = True, latency: float | None = None) -> None:
+        """
+        Update the tracker info and record how long it took.
+        """
+        start = time.perf_counter()
+        super().update_tracker_info(tracker_url, is_successful, latency)
+        self.write_latencies.append(time.perf_counter() - start)
+
+
+class BenchmarkTorrentChecker(TorrentChecker):
+    """
+    A torrent checker that times its writes of torrent health.
+    """
+
+    def __init__(self, *args: Any, **kwargs) -> None:  # noqa: ANN401
+        """
+        Create a new torrent checker.
+        """
+        super().__init__(*args, **kwargs)
+        self.write_latencies: list[float] = []
+
+    def update_torrent_health(self, health: HealthInfo) -> bool:
+        """
+        Update the torrent health and record how long it took.
+        """
+        start = time.perf_counter()
+        result = super().update_torrent_health(health)
+        self.write_latencies.append(time.perf_counter() - start)
+        return result
+
+
+class OfflineDownloadManager:
+    """
+    A download manager without a DHT: the DHT never finds a torrent.
+    """
+
+    async def get_metainfo(self, infohash: bytes, timeout: float = 7, **kwargs) -> None:
+        """
+        Give up on the metainfo immediately.
+        """
+
+
+def random_infohash(rng: random.Random) -> bytes:
+    """
+    Create a random infohash.
+    """
+    return bytes(rng.getrandbits(8) for _ in range(20))
+
+
+def stale_time(rng: random.Random) -> int:
+    """
+    Get a random time at which a torrent was last checked, long enough ago for it to be checked again.
+    """
+    return int(time.time()) - HEALTH_FRESHNESS_SECONDS - rng.randint(1, STALE_SPREAD)
+
+
+@db_session
+def seed_database(mds: MetadataStore, tracker_urls: list[str], settings: BenchmarkSettings,
+                  rng: random.Random) -> list[bytes]:
+    """
+    Add the given trackers and a number of stale torrents on random subsets of them to the database.
+
+    :returns: the infohashes of the torrents.
+    """
+    trackers = [mds.TrackerState(url=url) for url in tracker_urls]
+    infohashes = []
+    for _ in range(settings.torrents):
+        infohash = random_infohash(rng)
+        mds.TorrentState(infohash=infohash, seeders=rng.randint(0, 100), leechers=rng.randint(0, 100),
+                         last_check=stale_time(rng),
+                         trackers=rng.sample(trackers, min(settings.trackers_per_torrent, len(trackers))))
+        infohashes.append(infohash)
+    return infohashes
+
+
+@db_session
+def reset_health(mds: MetadataStore, rng: random.Random) -> None:
+    """
+    Make the torrents that were checked stale again, so that every workload starts with the same number of torrents
+    to check.
+    """
+    for torrent in mds.TorrentState.select(lambda g: g.self_checked):
+        torrent.set(last_check=stale_time(rng), self_checked=False)
+
+
+async def run_workload(name: str, calls: int, check: Callable[[int], Awaitable[Any]], settings: BenchmarkSettings,
+                       torrent_checker: BenchmarkTorrentChecker) -> WorkloadReport:
+    """
+    Perform the given number of checks, a number of them at once, and measure them.
+
+    :param check: performs the check with the given sequence number.
+    """
+    tracker_manager: BenchmarkTrackerManager = torrent_checker.tracker_manager  # type: ignore[assignment]
+    torrent_checker.write_latencies.clear()
+    tracker_manager.write_latencies.clear()
+    semaphore = asyncio.Semaphore(settings.concurrency)
+    monitor = LoopLagMonitor()
+    errors = 0
+
+    async def limited_check(number: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                await check(number)
+            except Exception:
+                errors += 1
+
+    monitor.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(limited_check(number) for number in range(calls)))
+    duration = time.perf_counter() - start
+    await monitor.stop()
+
+    return WorkloadReport(name, calls, errors, len(torrent_checker.write_latencies), duration,
+                          Summary.of(torrent_checker.write_latencies), Summary.of(tracker_manager.write_latencies),
+                          Summary.of(monitor.samples))
+
+
+@dataclass
+class BenchmarkReport:
+    """
+    The measurements of all workloads of a benchmark run, with the counters of the mock trackers.
+    """
+
+    workloads: list[WorkloadReport]
+    tracker_stats: TrackerStats
+
+    def __str__(self) -> str:
+        """
+        Format the report as human-readable lines.
+        """
+        stats = self.tracker_stats
+        return "\n".join([str(workload) for workload in self.workloads]
+                         + [(f"trackers: {stats.requests} requests, {stats.connects} connects, {stats.scrapes} scrapes, "
+                             f"{stats.lost} lost, {stats.failed} failed")])
+
+
+async def run_benchmark(settings: BenchmarkSettings) -> BenchmarkReport:
+    """
+    Start the mock trackers, seed an in-memory database and run every workload of the torrent checker.
+    """
+    rng = random.Random(settings.seed)
+    udp_trackers = [MockUdpTracker(settings.behavior, rng.getrandbits(32)) for _ in range(settings.udp_trackers)]
+    http_trackers = [MockHttpTracker(settings.behavior, rng.getrandbits(32)) for _ in range(settings.http_trackers)]
+    for tracker in [*udp_trackers, *http_trackers]:
+        await tracker.start()
+
+    mds = MetadataStore(":memory:", default_eccrypto.generate_key("curve25519"), disable_sync=True)
+    infohashes = seed_database(mds, [tracker.url for tracker in [*udp_trackers, *http_trackers]], settings, rng)
+
+    config = TriblerConfigManager()
+    config.configuration = copy.deepcopy(DEFAULT_CONFIG)  # Do not change the defaults of others in this process
+    config.set("libtorrent/download_defaults/number_hops", 0)
+    tracker_manager = BenchmarkTrackerManager(mds)
+    torrent_checker = BenchmarkTorrentChecker(config, OfflineDownloadManager(), Notifier(),  # type: ignore[arg-type]
+                                              tracker_manager, mds)
+    await torrent_checker.create_socket_or_schedule()
+
+    try:
+        workloads = [
+            await run_workload("check_random_tracker",
+                               len(udp_trackers) + len(http_trackers) if settings.tracker_checks is None
+                               else settings.tracker_checks,
+                               lambda _: torrent_checker.check_random_tracker(), settings, torrent_checker)
+        ]
+        reset_health(mds, rng)
+        workloads.append(await run_workload("check_local_torrents", settings.local_checks,
+                                            lambda _: torrent_checker.check_local_torrents(), settings,
+                                            torrent_checker))
+        reset_health(mds, rng)
+        sample = rng.sample(infohashes, min(settings.health_checks, len(infohashes)))
+        workloads.append(await run_workload("check_torrent_health", len(sample),
+                                            lambda number: torrent_checker.check_torrent_health(
+                                                sample[number], timeout=settings.timeout, scrape_now=True),
+                                            settings, torrent_checker))
+    finally:
+        await torrent_checker.shutdown()
+        for tracker in udp_trackers:
+            tracker.stop()
+        for tracker in http_trackers:
+            await tracker.stop()
+        mds.shutdown()
+
+    stats = TrackerStats()
+    for tracker in [*udp_trackers, *http_trackers]:
+        for name, value in vars(tracker.stats).items():
+            setattr(stats, name, getattr(stats, name) + value)
+    return BenchmarkReport(workloads, stats)
+
+
+def parse_args() -> BenchmarkSettings:
+    """
+    Parse the command-line arguments into benchmark settings.
+    """
+    defaults = BenchmarkSettings()
+    parser = argparse.ArgumentParser(description="Benchmark the torrent checker against local mock trackers.")
+    parser.add_argument("--torrents", type=int, default=defaults.torrents, help="The number of torrents to seed.")
+    parser.add_argument("--udp-trackers", type=int, default=defaults.udp_trackers,
+                        help="The number of mock UDP trackers.")
+    parser.add_argument("--http-trackers", type=int, default=defaults.http_trackers,
+                        help="The number of mock HTTP trackers.")
+    parser.add_argument("--trackers-per-torrent", type=int, default=defaults.trackers_per_torrent,
+                        help="The number of trackers of every torrent.")
+    parser.add_argument("--latency", type=float, default=0, help="The response time of the trackers in seconds.")
+    parser.add_argument("--jitter", type=float, default=0, help="The variation of the response time in seconds.")
+    parser.add_argument("--loss-rate", type=float, default=0, help="The fraction of requests that are not answered.")
+    parser.add_argument("--failure-rate", type=float, default=0,
+                        help="The fraction of requests that are answered with an error.")
+    parser.add_argument("--timeout", type=float, default=defaults.timeout, help="The max timeout of a check_torrent_health request.")
+    parser.add_argument("--concurrency", type=int, default=defaults.concurrency,
+                        help="The number of checks to run at once.")
+    parser.add_argument("--tracker-checks", type=int, default=None,
+                        help="The number of check_random_tracker calls, one per tracker by default.")
+    parser.add_argument("--local-checks", type=int, default=defaults.local_checks,
+                        help="The number of check_local_torrents calls.")
+    parser.add_argument("--health-checks", type=int, default=defaults.health_checks,
+                        help="The number of check_torrent_health calls.")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="The seed of the random setup.")
+    args = parser.parse_args()
+    return BenchmarkSettings(args.torrents, args.udp_trackers, args.http_trackers, args.trackers_per_torrent,
+                             TrackerBehavior(args.latency, args.jitter, args.loss_rate, args.failure_rate),
+                             args.timeout, args.concurrency, args.tracker_checks, args.local_checks,
+                             args.health_checks, args.seed)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)  # Some tracker sessions force their own log level
+    print(asyncio.run(run_benchmark(parse_args())))  # noqa: T201
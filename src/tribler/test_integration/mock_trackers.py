@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import struct
+from asyncio import DatagramProtocol, DatagramTransport, Future, TimerHandle
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, cast
+from urllib.parse import parse_qsl
+
+import libtorrent as lt
+from aiohttp import web
+
+from tribler.core.torrent_checker.torrentchecker_session import (
+    TRACKER_ACTION_CONNECT,
+    TRACKER_ACTION_ERROR,
+    TRACKER_ACTION_SCRAPE,
+    UDP_TRACKER_INIT_CONNECTION_ID,
+)
+
+if TYPE_CHECKING:
+    from aiohttp.web_request import Request
+
+MAX_CONNECTION_IDS = 10000  # The max number of connection IDs that the mock UDP tracker remembers
+
+
+@dataclass
+class TrackerBehavior:
+    """
+    How a mock tracker answers: after how long, and how often it does not answer or answers with an error.
+    """
+
+    latency: float = 0  # seconds before a request is answered
+    jitter: float = 0  # seconds that the latency randomly varies by, in either direction
+    loss_rate: float = 0  # The fraction of requests that are never answered
+    failure_rate: float = 0  # The fraction of requests that are answered with an error
+
+    def get_delay(self, rng: random.Random) -> float:
+        """
+        Get the time to wait before answering a request.
+        """
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+
+def swarm_health(infohash: bytes) -> tuple[int, int, int]:
+    """
+    Get the (seeders, completed, leechers) that the mock trackers report for the given infohash.
+
+    The health is derived from the infohash, so that the outcome of a check can be verified.
+    """
+    return infohash[0], infohash[1], infohash[2]
+
+
+@dataclass
+class TrackerStats:
+    """
+    The counters of a mock tracker.
+    """
+
+    requests: int = 0
+    connects: int = 0
+    scrapes: int = 0
+    lost: int = 0
+    failed: int = 0
+
+
+class MockUdpTracker(DatagramProtocol):
+    """
+    An in-process BEP15 UDP tracker that answers connect and scrape requests.
+    """
+
+    def __init__(self, behavior: TrackerBehavior | None = None, seed: int | None = None) -> None:
+        """
+        Create a new tracker, which does not listen until it is started.
+
+        :param behavior: how the tracker answers requests.
+        :param seed: the seed of the random outcomes of requests, for reproducible runs.
+        """
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.behavior = behavior or TrackerBehavior()
+        self.rng = random.Random(seed)
+        self.stats = TrackerStats()
+        self.transport: DatagramTransport | None = None
+        self.connection_ids: dict[int, None] = {}  # Ordered, to forget the oldest connection IDs first
+        self.pending: set[TimerHandle] = set()
+
+    @property
+    def port(self) -> int:
+        """
+        The port that the tracker listens on.
+        """
+        return cast(DatagramTransport, self.transport).get_extra_info("sockname")[1]
+
+    @property
+    def url(self) -> str:
+        """
+        The tracker URL to scrape this tracker with.
+        """
+        return f"udp://127.0.0.1:{self.port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        Start listening on the given address, or on a free port.
+        """
+        await asyncio.get_running_loop().create_datagram_endpoint(lambda: self, local_addr=(host, port))
+
+    def stop(self) -> None:
+        """
+        Stop listening and drop the requests that were not answered yet.
+        """
+        for handle in self.pending:
+            handle.cancel()
+        self.pending.clear()
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    def connection_made(self, transport: DatagramTransport) -> None:  # type: ignore[override]
+        """
+        Remember the transport to answer requests over.
+        """
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """
+        Answer a connect or scrape request, according to the behavior of this tracker.
+        """
+        if len(data) < 16:
+            return
+        self.stats.requests += 1
+        connection_id, action, transaction_id = struct.unpack_from("!qii", data, 0)
+
+        if self.rng.random() < self.behavior.loss_rate:
+            self.stats.lost += 1
+            return
+        if self.rng.random() < self.behavior.failure_rate:
+            self.stats.failed += 1
+            response = self.error(transaction_id, b"internal error")
+        elif action == TRACKER_ACTION_CONNECT and connection_id == UDP_TRACKER_INIT_CONNECTION_ID:
+            self.stats.connects += 1
+            response = self.connect(transaction_id)
+        elif action == TRACKER_ACTION_SCRAPE and connection_id in self.connection_ids:
+            self.stats.scrapes += 1
+            response = self.scrape(transaction_id, data[16:])
+        else:
+            response = self.error(transaction_id, b"invalid request")
+
+        self.send(response, addr, self.behavior.get_delay(self.rng))
+
+    def connect(self, transaction_id: int) -> bytes:
+        """
+        Hand out a new connection ID.
+        """
+        connection_id = self.rng.getrandbits(63)
+        self.connection_ids[connection_id] = None
+        while len(self.connection_ids) > MAX_CONNECTION_IDS:
+            del self.connection_ids[next(iter(self.connection_ids))]
+        return struct.pack("!iiq", TRACKER_ACTION_CONNECT, transaction_id, connection_id)
+
+    def scrape(self, transaction_id: int, infohashes: bytes) -> bytes:
+        """
+        Report the health of the given concatenated infohashes.
+        """
+        response = struct.pack("!ii", TRACKER_ACTION_SCRAPE, transaction_id)
+        for offset in range(0, len(infohashes) - 19, 20):
+            response += struct.pack("!iii", *swarm_health(infohashes[offset:offset + 20]))
+        return response
+
+    def error(self, transaction_id: int, message: bytes) -> bytes:
+        """
+        Create an error response.
+        """
+        return struct.pack("!ii", TRACKER_ACTION_ERROR, transaction_id) + message
+
+    def send(self, data: bytes, addr: tuple[str, int], delay: float) -> None:
+        """
+        Send the given response after the given delay.
+        """
+        if delay <= 0:
+            self._sendto(data, addr)
+            return
+        handle: TimerHandle | None = None
+
+        def answer() -> None:
+            self.pending.discard(cast(TimerHandle, handle))
+            self._sendto(data, addr)
+
+        handle = asyncio.get_running_loop().call_later(delay, answer)
+        self.pending.add(handle)
+
+    def _sendto(self, data: bytes, addr: tuple[str, int]) -> None:
+        """
+        Send the given data, if the tracker is still listening.
+        """
+        if self.transport is not None:
+            self.transport.sendto(data, addr)
+
+
+class MockHttpTracker:
+    """
+    An in-process HTTP tracker that answers scrape requests.
+    """
+
+    def __init__(self, behavior: TrackerBehavior | None = None, seed: int | None = None) -> None:
+        """
+        Create a new tracker, which does not listen until it is started.
+
+        :param behavior: how the tracker answers requests.
+        :param seed: the seed of the random outcomes of requests, for reproducible runs.
+        """
+        self.behavior = behavior or TrackerBehavior()
+        self.rng = random.Random(seed)
+        self.stats = TrackerStats()
+        self.port = 0
+        self.lost: set[Future[None]] = set()
+
+        self.app = web.Application()
+        self.app.add_routes([web.get("/scrape", self.handle_scrape)])
+        self.runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        """
+        The tracker URL to scrape this tracker with.
+        """
+        return f"http://127.0.0.1:{self.port}/announce"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        Start listening on the given address, or on a free port.
+        """
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """
+        Stop listening and drop the requests that were not answered yet.
+        """
+        for future in self.lost:
+            future.cancel()
+        self.lost.clear()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def handle_scrape(self, request: Request) -> web.Response:
+        """
+        Answer a scrape request, according to the behavior of this tracker.
+        """
+        self.stats.requests += 1
+        if self.rng.random() < self.behavior.loss_rate:
+            self.stats.lost += 1
+            # Never answer: wait until the client gives up or the tracker stops
+            future: Future[None] = Future()
+            self.lost.add(future)
+            try:
+                await future
+            finally:
+                self.lost.discard(future)
+        failed = self.rng.random() < self.behavior.failure_rate
+        await asyncio.sleep(self.behavior.get_delay(self.rng))
+
+        if failed:
+            self.stats.failed += 1
+            return web.Response(body=lt.bencode({b"failure reason": b"internal error"}))
+
+        self.stats.scrapes += 1
+        # The infohashes are raw bytes, which the decoded query of aiohttp does not preserve
+        infohashes = [value.encode("latin-1")
+                      for key, value in parse_qsl(request.rel_url.raw_query_string, encoding="latin-1")
+                      if key == "info_hash"]
+        files = {}
+        for infohash in infohashes:
+            seeders, completed, leechers = swarm_health(infohash)
+            files[infohash] = {b"complete": seeders, b"downloaded": completed, b"incomplete": leechers}
+        return web.Response(body=lt.bencode({b"files": files}))
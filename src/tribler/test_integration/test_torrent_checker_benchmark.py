@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from ipv8.test.base import TestBase
+
+from tribler.core.torrent_checker.torrentchecker_session import (
+    HttpSessionPool,
+    UdpSocketManager,
+    create_tracker_session,
+)
+from tribler.test_integration.benchmark_torrent_checker import BenchmarkSettings, run_benchmark
+from tribler.test_integration.mock_trackers import MockHttpTracker, MockUdpTracker, TrackerBehavior, swarm_health
+
+
+class TestMockTrackers(TestBase):
+    """
+    Tests for the mock trackers of the torrent checker benchmark.
+    """
+
+    INFOHASHES = [b"\x01\x02\x03" + b"a" * 17, b"\x04\x05\x06" + b"b" * 17]
+
+    async def setUp(self) -> None:
+        """
+        Create a socket manager and a session pool to scrape trackers with, like the torrent checker does.
+        """
+        super().setUp()
+        self.session_pool = HttpSessionPool()
+        self.socket_mgr = UdpSocketManager()
+        self.transport, _ = await self.loop.create_datagram_endpoint(lambda: self.socket_mgr,
+                                                                     local_addr=("127.0.0.1", 0))
+        self.trackers = []
+
+    async def tearDown(self) -> None:
+        """
+        Stop the trackers and the socket manager.
+        """
+        for tracker in self.trackers:
+            if isinstance(tracker, MockUdpTracker):
+                tracker.stop()
+            else:
+                await tracker.stop()
+        self.transport.close()
+        await self.session_pool.close()
+        await super().tearDown()
+
+    async def start_tracker(self, tracker: MockUdpTracker | MockHttpTracker) -> MockUdpTracker | MockHttpTracker:
+        """
+        Start the given tracker and stop it after the test.
+        """
+        await tracker.start()
+        self.trackers.append(tracker)
+        return tracker
+
+    async def scrape(self, url: str, timeout: float = 5) -> dict[bytes, tuple[int, int]]:
+        """
+        Scrape the given tracker for the test infohashes.
+        """
+        session = create_tracker_session(url, timeout, None, self.socket_mgr, self.session_pool)
+        for infohash in self.INFOHASHES:
+            session.add_infohash(infohash)
+        try:
+            response = await session.connect_to_tracker()
+        finally:
+            await session.cleanup()
+        return {health.infohash: (health.seeders, health.leechers) for health in response.torrent_health_list}
+
+    async def test_udp_scrape(self) -> None:
+        """
+        Test if the mock UDP tracker answers a BEP15 connect and scrape.
+        """
+        tracker = await self.start_tracker(MockUdpTracker())
+
+        health = await self.scrape(tracker.url)
+
+        self.assertEqual({(1, 3), (4, 6)}, set(health.values()))
+        self.assertEqual(1, tracker.stats.connects)
+        self.assertEqual(1, tracker.stats.scrapes)
+
+    async def test_udp_failure(self) -> None:
+        """
+        Test if the mock UDP tracker answers with an error at its failure rate.
+        """
+        tracker = await self.start_tracker(MockUdpTracker(TrackerBehavior(failure_rate=1)))
+
+        with self.assertRaises(ValueError):
+            await self.scrape(tracker.url)
+
+        self.assertEqual(1, tracker.stats.failed)
+
+    async def test_udp_loss(self) -> None:
+        """
+        Test if the mock UDP tracker does not answer at its loss rate.
+        """
+        tracker = await self.start_tracker(MockUdpTracker(TrackerBehavior(loss_rate=1)))
+
+        with self.assertRaises(ValueError):
+            await self.scrape(tracker.url, timeout=0.1)
+
+        self.assertEqual(1, tracker.stats.lost)
+
+    async def test_http_scrape(self) -> None:
+        """
+        Test if the mock HTTP tracker answers a scrape with the health of the binary infohashes.
+        """
+        tracker = await self.start_tracker(MockHttpTracker())
+
+        health = await self.scrape(tracker.url)
+
+        self.assertEqual({infohash: swarm_health(infohash)[::2] for infohash in self.INFOHASHES}, health)
+        self.assertEqual(1, tracker.stats.scrapes)
+
+    async def test_http_failure(self) -> None:
+        """
+        Test if the mock HTTP tracker answers with a failure reason at its failure rate.
+        """
+        tracker = await self.start_tracker(MockHttpTracker(TrackerBehavior(failure_rate=1)))
+
+        with self.assertRaises(ValueError):
+            await self.scrape(tracker.url)
+
+        self.assertEqual(1, tracker.stats.failed)
+
+    async def test_http_loss(self) -> None:
+        """
+        Test if the mock HTTP tracker does not answer at its loss rate, until it is stopped.
+        """
+        tracker = await self.start_tracker(MockHttpTracker(TrackerBehavior(loss_rate=1)))
+
+        with self.assertRaises(ValueError):
+            await self.scrape(tracker.url, timeout=0.1)
+
+        self.assertEqual(1, tracker.stats.lost)
+
+
+class TestTorrentCheckerBenchmark(TestBase):
+    """
+    Tests for the torrent checker benchmark.
+    """
+
+    async def test_run_benchmark(self) -> None:
+        """
+        Test if a small benchmark checks torrents in every workload.
+        """
+        settings = BenchmarkSettings(torrents=50, udp_trackers=2, http_trackers=2, trackers_per_torrent=2,
+                                     local_checks=2, health_checks=5)
+
+        report = await run_benchmark(settings)
+
+        self.assertEqual(["check_random_tracker", "check_local_torrents", "check_torrent_health"],
+                         [workload.name for workload in report.workloads])
+        for workload in report.workloads:
+            self.assertEqual(0, workload.errors)
+            self.assertGreater(workload.results, 0)
+            self.assertEqual(workload.results, workload.health_writes.count)
+        self.assertEqual(0, report.tracker_stats.lost)
+        self.assertGreater(report.tracker_stats.scrapes, 0)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from ipv8.test.base import TestBase
+
+from tribler.core.content_discovery.aggregator import ResultAggregator
+
+
+def result(infohash: str, name: str, seeders: int = 0) -> dict:
+    """
+    Create a result dict, like the simple dict of a torrent.
+    """
+    return {"infohash": infohash, "name": name, "num_seeders": seeders, "num_leechers": 0, "created": 0}
+
+
+class TestResultAggregator(TestBase):
+    """
+    Tests for the ResultAggregator class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a new aggregator that keeps the top 2 results for "ubuntu".
+        """
+        super().setUp()
+        self.aggregator = ResultAggregator("ubuntu", top_k=2, stable_responses=1)
+
+    def test_add_ranked(self) -> None:
+        """
+        Test if results are ranked by relevance.
+        """
+        self.aggregator.add([result("a", "debian"), result("b", "ubuntu")])
+
+        self.assertEqual(["b", "a"], self.aggregator.get_ranking())
+
+    def test_add_duplicate(self) -> None:
+        """
+        Test if a duplicate result only replaces the earlier one if it ranks better.
+        """
+        self.aggregator.add([result("a", "ubuntu", seeders=10)])
+
+        changed_worse = self.aggregator.add([result("a", "ubuntu")])
+        changed_better = self.aggregator.add([result("a", "ubuntu", seeders=100)])
+
+        self.assertFalse(changed_worse)
+        self.assertTrue(changed_better)
+        self.assertEqual(["a"], self.aggregator.get_ranking())
+        self.assertEqual(100, self.aggregator.entries["a"][1]["num_seeders"])
+
+    def test_add_top_k(self) -> None:
+        """
+        Test if only the top-K results are kept.
+        """
+        self.aggregator.add([result("a", "ubuntu"), result("b", "debian")])
+
+        self.aggregator.add([result("c", "ubuntu 24.04"), result("d", "fedora")])
+
+        self.assertEqual(["a", "c"], self.aggregator.get_ranking())
+
+    def test_is_stable(self) -> None:
+        """
+        Test if a full top-K is stable after a response without changes.
+        """
+        self.aggregator.add([result("a", "ubuntu"), result("b", "ubuntu 24.04")])
+        stable_before = self.aggregator.is_stable()
+
+        self.aggregator.add([result("c", "fedora")])
+
+        self.assertFalse(stable_before)
+        self.assertTrue(self.aggregator.is_stable())
+
+    def test_is_stable_not_full(self) -> None:
+        """
+        Test if a top-K that is not full is never stable.
+        """
+        self.aggregator.add([result("a", "ubuntu")])
+        self.aggregator.add([])
+
+        self.assertFalse(self.aggregator.is_stable())
+
+    def test_get_diff_inserted(self) -> None:
+        """
+        Test if the first diff inserts all entries with their positions.
+        """
+        self.aggregator.add([result("a", "debian"), result("b", "ubuntu")])
+
+        diff = self.aggregator.get_diff()
+
+        self.assertEqual([("b", 0), ("a", 1)], [(item["infohash"], item["position"]) for item in diff["inserted"]])
+        self.assertEqual([], diff["moved"])
+        self.assertEqual([], diff["removed"])
+
+    def test_get_diff_moved_removed(self) -> None:
+        """
+        Test if later diffs only give the entries that changed.
+        """
+        self.aggregator.add([result("a", "debian"), result("b", "ubuntu linux")])
+        self.aggregator.get_diff()
+
+        self.aggregator.add([result("c", "ubuntu")])
+        diff = self.aggregator.get_diff()
+
+        self.assertEqual([("c", 0)], [(item["infohash"], item["position"]) for item in diff["inserted"]])
+        self.assertEqual([{"infohash": "b", "position": 1}], diff["moved"])
+        self.assertEqual(["a"], diff["removed"])
+
+    def test_get_diff_empty(self) -> None:
+        """
+        Test if a diff without changes is empty.
+        """
+        self.aggregator.add([result("a", "ubuntu")])
+        self.aggregator.get_diff()
+
+        self.assertEqual({"inserted": [], "moved": [], "removed": []}, self.aggregator.get_diff())
@@ -1,27 +1,41 @@
 from __future__ import annotations
 
+import json
 import os
 import sys
+import time
+from asyncio import sleep
 from binascii import hexlify
 from typing import TYPE_CHECKING, cast
 from unittest import skipIf
 from unittest.mock import AsyncMock, Mock
+from uuid import UUID
 
 from ipv8.messaging.payload import IntroductionRequestPayload, NewIntroductionRequestPayload
 from ipv8.test.base import TestBase
 from ipv8.test.mocking.endpoint import MockEndpointListener
 
-from tribler.core.content_discovery.community import ContentDiscoveryCommunity, ContentDiscoverySettings
+from tribler.core.content_discovery.aggregator import RemoteSearch, ResultAggregator
+from tribler.core.content_discovery.community import (
+    CAPABILITY_HEALTH_SKETCH,
+    CAPABILITY_INFOHASH_SET,
+    ContentDiscoveryCommunity,
+    ContentDiscoverySettings,
+)
 from tribler.core.content_discovery.payload import (
+    HealthSketchPayload,
     PopularTorrentsRequest,
+    RemoteSelectPayload,
     SelectResponsePayload,
     TorrentsHealthPayload,
     VersionRequest,
     VersionResponse,
 )
+from tribler.core.database.compression import LATEST_DICTIONARY_VERSION, is_dictionary_chunk
 from tribler.core.database.layers.knowledge import ResourceType
 from tribler.core.database.orm_bindings.torrent_metadata import LZ4_EMPTY_ARCHIVE
 from tribler.core.database.serialization import REGULAR_TORRENT
+from tribler.core.database.store import ObjState, ProcessingResult
 from tribler.core.notifier import Notification, Notifier
 from tribler.core.torrent_checker.torrent_checker import TorrentChecker
 from tribler.core.torrent_checker.torrentchecker_session import HealthInfo
@@ -71,7 +85,9 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
         """
         overwrite_settings = ContentDiscoverySettings(
             torrent_checker=MockTorrentChecker(),
-            metadata_store=Mock(get_entries_threaded=AsyncMock(), process_compressed_mdblob_threaded=AsyncMock())
+            metadata_store=Mock(get_entries_threaded=AsyncMock(), process_compressed_mdblob_threaded=AsyncMock(),
+                                run_threaded_write=AsyncMock(return_value=set()),
+                                get_metadata_version=Mock(return_value=(0, 0)))
         )
         out = super().create_node(overwrite_settings, create_dht, enable_statistics)
         out.overlay.cancel_all_pending_tasks()
@@ -87,6 +103,8 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
         """
         Test whether torrent health information is periodically gossiped around.
         """
+        self.overlay(0).composition.reconcile_health = False
+
         with self.assertReceivedBy(1, [TorrentsHealthPayload], message_filter=[TorrentsHealthPayload]):
             self.overlay(0).gossip_random_torrents_health()
             await self.deliver_messages()
@@ -105,6 +123,8 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
         """
         Test whether torrent health information is spread when no live torrents are known.
         """
+        self.overlay(0).composition.reconcile_health = False
+
         with self.assertReceivedBy(1, [TorrentsHealthPayload],
                                    message_filter=[TorrentsHealthPayload]) as received:
             self.overlay(0).gossip_random_torrents_health()
@@ -114,6 +134,194 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
         self.assertEqual(1, message.random_torrents_length)
         self.assertEqual(0, message.torrents_checked_length)
 
+    async def test_torrents_health_resolve_unknown(self) -> None:
+        """
+        Test if the unknown infohashes of received torrent health are asked for in a single remote select.
+        """
+        await self.introduce_nodes()
+        self.overlay(0).composition.reconcile_health = False
+        self.overlay(1).composition.metadata_store.run_threaded_write = AsyncMock(return_value={b"\x01" * 20,
+                                                                                                b"\x02" * 20})
+
+        with self.assertReceivedBy(0, [RemoteSelectPayload], message_filter=[RemoteSelectPayload]):
+            self.overlay(0).gossip_random_torrents_health()
+            await self.deliver_messages()
+        kwargs = self.overlay(0).composition.metadata_store.get_entries_threaded.call_args.kwargs
+
+        self.assertEqual({b"\x01" * 20, b"\x02" * 20}, kwargs["infohash_set"])
+        self.assertEqual(2, kwargs["last"])
+
+    async def test_torrents_health_resolve_unknown_old_peer(self) -> None:
+        """
+        Test if the unknown infohashes of received torrent health are asked for one by one from older peers.
+        """
+        self.overlay(0).composition.reconcile_health = False
+        self.overlay(1).composition.metadata_store.run_threaded_write = AsyncMock(return_value={b"\x01" * 20,
+                                                                                                b"\x02" * 20})
+
+        with self.assertReceivedBy(0, [RemoteSelectPayload, RemoteSelectPayload],
+                                   message_filter=[RemoteSelectPayload]):
+            self.overlay(0).gossip_random_torrents_health()
+            await self.deliver_messages()
+        calls = self.overlay(0).composition.metadata_store.get_entries_threaded.call_args_list
+
+        self.assertEqual({b"\x01" * 20, b"\x02" * 20}, {call.kwargs["infohash"] for call in calls})
+        self.assertTrue(all("infohash_set" not in call.kwargs for call in calls))
+
+    async def test_health_sketch_gossip(self) -> None:
+        """
+        Test whether a sketch of the known health is gossiped in reconciliation mode.
+        """
+        await self.introduce_nodes()
+
+        with self.assertReceivedBy(1, [HealthSketchPayload],
+                                   message_filter=[HealthSketchPayload, TorrentsHealthPayload]):
+            self.overlay(0).gossip_random_torrents_health()
+            await self.deliver_messages()
+
+    async def test_health_sketch_gossip_old_peer(self) -> None:
+        """
+        Test whether peers that did not announce that they answer health sketches are pushed health instead.
+        """
+        with self.assertReceivedBy(1, [TorrentsHealthPayload],
+                                   message_filter=[HealthSketchPayload, TorrentsHealthPayload]):
+            self.overlay(0).gossip_random_torrents_health()
+            await self.deliver_messages()
+
+    async def test_health_sketch_missing(self) -> None:
+        """
+        Test whether only the health that is missing from a sketch, or is fresher than in the sketch, is sent back.
+        """
+        now = int(time.time())
+        self.torrent_checker(0).set_torrents_checked({
+            b"\x01" * 20: HealthInfo(b"\x01" * 20, 1, 1, now - 10),
+            b"\x02" * 20: HealthInfo(b"\x02" * 20, 2, 2, now - 20),
+            b"\x03" * 20: HealthInfo(b"\x03" * 20, 3, 3, now - 30),
+        })
+        self.torrent_checker(1).set_torrents_checked({
+            b"\x01" * 20: HealthInfo(b"\x01" * 20, 1, 1, now - 10),
+            b"\x02" * 20: HealthInfo(b"\x02" * 20, 2, 2, now - 100),
+        })
+        self.overlay(1).composition.health_sketch_false_positive_rate = 1e-9
+        await self.introduce_nodes()
+
+        with self.assertReceivedBy(1, [TorrentsHealthPayload], message_filter=[TorrentsHealthPayload]) as received:
+            self.overlay(1).gossip_random_torrents_health()
+            await self.deliver_messages()
+        message, = received
+
+        self.assertEqual([(b"\x02" * 20, 2, 2, now - 20), (b"\x03" * 20, 3, 3, now - 30)], message.random_torrents)
+
+    async def test_health_sketch_nothing_missing(self) -> None:
+        """
+        Test whether nothing is sent back for a sketch that holds all of our health.
+        """
+        health = HealthInfo(b"\x01" * 20, 1, 1)
+        self.torrent_checker(0).set_torrents_checked({health.infohash: health})
+        self.torrent_checker(1).set_torrents_checked({health.infohash: health})
+        await self.introduce_nodes()
+
+        with self.assertReceivedBy(1, [], message_filter=[TorrentsHealthPayload]):
+            self.overlay(1).gossip_random_torrents_health()
+            await self.deliver_messages()
+
+    async def test_health_sketch_invalid(self) -> None:
+        """
+        Test whether sketches with too many hash functions are ignored.
+        """
+        self.torrent_checker(0).set_torrents_checked({b"\x01" * 20: HealthInfo(b"\x01" * 20, 1, 1)})
+
+        with self.assertReceivedBy(1, [], message_filter=[TorrentsHealthPayload]):
+            self.overlay(1).ez_send(self.peer(0), HealthSketchPayload(0, 255, b"\x00"))
+            await self.deliver_messages()
+
+    async def test_remember_health(self) -> None:
+        """
+        Test whether received health is remembered, to pass on in later reconciliations.
+        """
+        self.overlay(0).composition.reconcile_health = False
+        self.torrent_checker(0).set_torrents_checked({b"\x01" * 20: HealthInfo(b"\x01" * 20, 1, 1)})
+
+        self.overlay(0).gossip_random_torrents_health()
+        await self.deliver_messages()
+
+        self.assertIn(b"\x01" * 20, self.overlay(1).get_fresh_health())
+
+    def test_remember_health_bounded(self) -> None:
+        """
+        Test whether only the most recently received health is remembered.
+        """
+        self.overlay(0).composition.max_known_health = 1
+
+        self.overlay(0).remember_health([HealthInfo(b"\x01" * 20, 1, 1), HealthInfo(b"\x02" * 20, 1, 1)])
+
+        self.assertEqual([b"\x02" * 20], list(self.overlay(0).known_health))
+
+    async def test_resolve_infohashes_batches(self) -> None:
+        """
+        Test if infohashes are resolved in batches of at most the maximum batch size.
+        """
+        self.overlay(0).on_capability_announcement(self.peer(1), bytes([CAPABILITY_INFOHASH_SET]))
+        self.overlay(0).composition.max_resolve_batch_size = 2
+
+        requests = self.overlay(0).resolve_infohashes(self.peer(1), {b"\x01" * 20, b"\x02" * 20, b"\x03" * 20})
+
+        self.assertEqual([2, 1], [len(request.request_kwargs["infohash_set"]) for request in requests])
+        self.assertEqual({b"\x01" * 20, b"\x02" * 20, b"\x03" * 20}, self.overlay(0).infohashes_in_flight)
+
+    async def test_resolve_infohashes_in_flight(self) -> None:
+        """
+        Test if infohashes that are already asked for are not asked for again.
+        """
+        self.overlay(0).on_capability_announcement(self.peer(1), bytes([CAPABILITY_INFOHASH_SET]))
+        self.overlay(0).infohashes_in_flight = {b"\x01" * 20}
+
+        requests = self.overlay(0).resolve_infohashes(self.peer(1), {b"\x01" * 20, b"\x02" * 20})
+
+        self.assertEqual(1, len(requests))
+        self.assertEqual({b"\x02" * 20}, requests[0].request_kwargs["infohash_set"])
+
+    async def test_resolve_infohashes_no_capability(self) -> None:
+        """
+        Test if infohashes are resolved one by one from peers that did not announce infohash set selects.
+        """
+        requests = self.overlay(0).resolve_infohashes(self.peer(1), {b"\x01" * 20, b"\x02" * 20})
+
+        self.assertEqual([b"\x01" * 20, b"\x02" * 20], [request.request_kwargs["infohash"] for request in requests])
+        self.assertTrue(all("infohash_set" not in request.request_kwargs for request in requests))
+        self.assertEqual({b"\x01" * 20, b"\x02" * 20}, self.overlay(0).infohashes_in_flight)
+
+    async def test_on_infohashes_resolved(self) -> None:
+        """
+        Test if resolved infohashes are no longer in flight.
+        """
+        request, = self.overlay(0).resolve_infohashes(self.peer(1), {b"\x01" * 20})
+
+        self.overlay(0).on_infohashes_resolved(request, [])
+
+        self.assertEqual(set(), self.overlay(0).infohashes_in_flight)
+
+    async def test_resolve_infohashes_timeout(self) -> None:
+        """
+        Test if the infohashes of an unanswered request are no longer in flight.
+        """
+        request, = self.overlay(0).resolve_infohashes(self.peer(1), {b"\x01" * 20})
+
+        request.on_timeout()
+
+        self.assertEqual(set(), self.overlay(0).infohashes_in_flight)
+
+    async def test_query_timeout_forget_score(self) -> None:
+        """
+        Test if a peer that did not respond to a request is removed together with its score.
+        """
+        request = self.overlay(0).send_remote_select(self.peer(1), txt_filter="ubuntu")
+
+        request.on_timeout()
+
+        self.assertNotIn(self.peer(1), self.overlay(0).get_peers())
+        self.assertNotIn(self.peer(1).mid, self.overlay(0).peer_scores.scores)
+
     def test_get_alive_torrents(self) -> None:
         """
         Test if get_alive_checked_torrents returns a known alive torrent.
@@ -163,6 +371,93 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
         self.assertEqual([], notifications["results"])
         self.assertEqual(hexlify(peers[0].mid).decode(), notifications["peer"])
 
+    async def test_popularity_search_complete(self) -> None:
+        """
+        Test if a search is completed once all peers were queried.
+        """
+        updates = []
+        self.overlay(0).composition.notifier = Notifier()
+        self.overlay(0).composition.notifier.add(Notification.remote_query_update, lambda **kw: updates.append(kw))
+
+        uuid, _ = self.overlay(0).send_search_request(txt_filter="ubuntu*")
+        await self.deliver_messages()
+
+        self.assertEqual(1, len(updates))
+        self.assertEqual(str(uuid), updates[0]["uuid"])
+        self.assertTrue(updates[0]["complete"])
+        self.assertNotIn(uuid, self.overlay(0).remote_searches)
+
+    async def test_popularity_search_waves(self) -> None:
+        """
+        Test if a search queries its peers in waves.
+        """
+        self.overlay(0).composition.search_wave_size = 1
+        self.overlay(0).get_scored_peers = Mock(return_value=[self.peer(1), self.peer(1)])
+
+        uuid, peers = self.overlay(0).send_search_request(txt_filter="ubuntu*")
+        remaining = list(self.overlay(0).remote_searches[uuid].remaining_peers)
+        await self.deliver_messages()
+
+        self.assertEqual([self.peer(1)], peers)
+        self.assertEqual([self.peer(1)], remaining)
+        self.assertEqual(2, self.overlay(0).peer_scores.get(self.peer(1).mid).requests)
+
+    async def test_popularity_search_stable(self) -> None:
+        """
+        Test if a search stops querying peers once its ranking is stable.
+        """
+        self.overlay(0).composition.search_top_k = 0
+        self.overlay(0).composition.search_stable_responses = 1
+        self.overlay(0).composition.search_wave_size = 1
+        self.overlay(0).get_scored_peers = Mock(return_value=[self.peer(1), self.peer(1)])
+
+        uuid, _ = self.overlay(0).send_search_request(txt_filter="ubuntu*")
+        await self.deliver_messages()
+
+        self.assertNotIn(uuid, self.overlay(0).remote_searches)
+        self.assertEqual(1, self.overlay(0).peer_scores.get(self.peer(1).mid).requests)
+
+    async def test_on_search_results_update(self) -> None:
+        """
+        Test if new results of a search lead to a ranking update.
+        """
+        updates = []
+        self.overlay(0).composition.notifier = Notifier()
+        self.overlay(0).composition.notifier.add(Notification.remote_query_update, lambda **kw: updates.append(kw))
+        request = self.overlay(0).send_remote_select(self.peer(1), txt_filter="ubuntu")
+        search = RemoteSearch(ResultAggregator("ubuntu"), {"txt_filter": "ubuntu"}, [self.peer(1)], {request.number})
+        self.overlay(0).remote_searches[UUID(int=1)] = search
+        result = ProcessingResult(Mock(), ObjState.NEW_OBJECT, simple_dict={"infohash": "01" * 20, "name": "ubuntu"})
+
+        self.overlay(0).on_search_results(UUID(int=1), request, [result])
+        await sleep(0)
+
+        self.assertEqual(1, len(updates))
+        self.assertEqual("01" * 20, updates[0]["inserted"][0]["infohash"])
+        self.assertFalse(updates[0]["complete"])
+        self.assertEqual(1, len(search.outstanding))  # The next wave
+
+    async def test_popularity_search_scores(self) -> None:
+        """
+        Test if searching records the requests and responses of the queried peers.
+        """
+        _, peers = self.overlay(0).send_search_request(txt_filter="ubuntu*")
+        await self.deliver_messages()
+        score = self.overlay(0).peer_scores.get(peers[0].mid)
+
+        self.assertEqual(1, score.requests)
+        self.assertEqual(1, score.responses)
+
+    def test_get_scored_peers(self) -> None:
+        """
+        Test if the peers with the best scores are sampled first.
+        """
+        self.overlay(0).composition.search_exploration = 0.0
+        self.overlay(0).peer_scores.record_request(self.peer(1).mid)
+
+        self.assertEqual([], self.overlay(0).get_scored_peers(0))
+        self.assertEqual([self.peer(1)], self.overlay(0).get_scored_peers(1))
+
     async def test_popularity_search_deprecated(self) -> None:
         """
         Test searching several nodes for metadata entries with a deprecated parameter.
@@ -265,6 +560,126 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
         select_request = mock_callback.call_args[0][0]
         self.assertTrue(select_request.peer_responded)
 
+    async def test_dictionary_negotiated(self) -> None:
+        """
+        Test if peers select a shared compression dictionary when they introduce themselves.
+        """
+        await self.introduce_nodes()
+
+        self.assertEqual(LATEST_DICTIONARY_VERSION, self.overlay(0).peer_dictionaries[self.peer(1).mid])
+        self.assertEqual(LATEST_DICTIONARY_VERSION, self.overlay(1).peer_dictionaries[self.peer(0).mid])
+
+    async def test_capability_announced(self) -> None:
+        """
+        Test if peers learn that they answer infohash set selects when they introduce themselves.
+        """
+        self.overlay(0).composition.compression_dictionaries = False
+
+        await self.introduce_nodes()
+
+        self.assertIn(self.peer(1).mid, self.overlay(0).infohash_set_peers)
+        self.assertIn(self.peer(0).mid, self.overlay(1).infohash_set_peers)
+        self.assertIn(self.peer(1).mid, self.overlay(0).health_sketch_peers)
+        self.assertIn(self.peer(0).mid, self.overlay(1).health_sketch_peers)
+
+    def test_capability_not_announced(self) -> None:
+        """
+        Test if peers that do not announce capabilities, like older versions, are not sent infohash set selects.
+        """
+        self.overlay(0).on_capability_announcement(self.peer(1), bytes([CAPABILITY_INFOHASH_SET,
+                                                                        CAPABILITY_HEALTH_SKETCH]))
+
+        self.overlay(0).on_capability_announcement(self.peer(1), b"")
+
+        self.assertNotIn(self.peer(1).mid, self.overlay(0).infohash_set_peers)
+        self.assertNotIn(self.peer(1).mid, self.overlay(0).health_sketch_peers)
+
+    def test_dictionary_not_announced(self) -> None:
+        """
+        Test if peers that do not announce dictionaries, like older versions, get plain LZ4 frames.
+        """
+        self.overlay(0).on_dictionary_announcement(self.peer(1), b"")
+
+        self.assertNotIn(self.peer(1).mid, self.overlay(0).peer_dictionaries)
+
+    async def test_remote_select_dictionary(self) -> None:
+        """
+        Test if remote selects are answered with dictionary chunks to peers that support them.
+        """
+        await self.introduce_nodes()
+        self.overlay(0).composition.metadata_store.get_entries_threaded = AsyncMock(return_value=[Mock(
+            serialized=Mock(return_value=b"\x01" * 100), serialized_health=Mock(return_value=b"\x07")
+        )])
+
+        with self.assertReceivedBy(1, [SelectResponsePayload]) as received:
+            self.overlay(1).send_remote_select(self.peer(0), infohash="01" * 20)
+            await self.deliver_messages()
+        response, = received
+
+        self.assertTrue(is_dictionary_chunk(response.raw_blob))
+
+    async def test_remote_select_no_dictionary(self) -> None:
+        """
+        Test if remote selects are answered with plain LZ4 frames to peers that do not support dictionaries.
+        """
+        await self.introduce_nodes()
+        self.overlay(0).on_dictionary_announcement(self.peer(1), b"")
+        self.overlay(0).composition.metadata_store.get_entries_threaded = AsyncMock(return_value=[Mock(
+            serialized=Mock(return_value=b"\x01" * 100), serialized_health=Mock(return_value=b"\x07")
+        )])
+
+        with self.assertReceivedBy(1, [SelectResponsePayload]) as received:
+            self.overlay(1).send_remote_select(self.peer(0), infohash="01" * 20)
+            await self.deliver_messages()
+        response, = received
+
+        self.assertFalse(is_dictionary_chunk(response.raw_blob))
+
+    async def test_remote_select_cached(self) -> None:
+        """
+        Test if identical remote selects are answered from the response cache.
+        """
+        get_entries_threaded = self.overlay(0).composition.metadata_store.get_entries_threaded
+        get_entries_threaded.return_value = []
+
+        with self.assertReceivedBy(1, [SelectResponsePayload, SelectResponsePayload]) as responses:
+            self.overlay(1).send_remote_select(self.peer(0), txt_filter="ubuntu*")
+            await self.deliver_messages()
+            self.overlay(1).send_remote_select(self.peer(0), txt_filter="ubuntu*")
+            await self.deliver_messages()
+
+        self.assertEqual(1, get_entries_threaded.call_count)
+        self.assertEqual({"size": 1, "hits": 1, "misses": 1}, self.overlay(0).response_cache.get_stats())
+        self.assertNotEqual(responses[0].id, responses[1].id)
+
+    async def test_remote_select_cache_invalidated(self) -> None:
+        """
+        Test if remote selects are not answered from the response cache after torrent metadata was written.
+        """
+        metadata_store = self.overlay(0).composition.metadata_store
+        metadata_store.get_entries_threaded.return_value = []
+
+        self.overlay(1).send_remote_select(self.peer(0), txt_filter="ubuntu*")
+        await self.deliver_messages()
+        metadata_store.get_metadata_version.return_value = (1, 0)
+        self.overlay(1).send_remote_select(self.peer(0), txt_filter="ubuntu*")
+        await self.deliver_messages()
+
+        self.assertEqual(2, metadata_store.get_entries_threaded.call_count)
+
+    async def test_remote_select_dropped_not_cached(self) -> None:
+        """
+        Test if the empty response to a dropped remote select is not cached.
+        """
+        self.overlay(0).query_scheduler.peer_burst = 0.0
+
+        with self.assertReceivedBy(1, [SelectResponsePayload]) as responses:
+            self.overlay(1).send_remote_select(self.peer(0), txt_filter="ubuntu*")
+            await self.deliver_messages()
+
+        self.assertEqual(LZ4_EMPTY_ARCHIVE, responses[0].raw_blob)
+        self.assertEqual(0, self.overlay(0).response_cache.get_stats()["size"])
+
     async def test_remote_select_deprecated(self) -> None:
         """
         Test deprecated search keys receiving an empty archive response.
@@ -276,6 +691,52 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
 
         assert response.raw_blob == LZ4_EMPTY_ARCHIVE
 
+    async def test_process_rpc_query_rate_limited_lookup(self) -> None:
+        """
+        Test if lookups without a text filter are not scheduled.
+        """
+        self.overlay(0).query_scheduler.max_concurrent = 0
+
+        await self.overlay(0).process_rpc_query_rate_limited({"infohash": b"\x01" * 20, "first": 0, "last": 1})
+
+        self.overlay(0).composition.metadata_store.get_entries_threaded.assert_called_once()
+        self.assertEqual(0, self.overlay(0).query_scheduler.processed)
+
+    async def test_process_rpc_query_rate_limited_text(self) -> None:
+        """
+        Test if text queries are scheduled.
+        """
+        self.overlay(0).composition.metadata_store.get_entries_threaded = AsyncMock(return_value=["result"])
+
+        results = await self.overlay(0).process_rpc_query_rate_limited({"txt_filter": "ubuntu", "first": 0,
+                                                                        "last": 100}, self.peer(1))
+
+        self.assertEqual(["result"], results)
+        self.assertEqual(1, self.overlay(0).query_scheduler.processed)
+
+    async def test_process_rpc_query_rate_limited_dropped(self) -> None:
+        """
+        Test if text queries that are dropped give None.
+        """
+        self.overlay(0).query_scheduler.peer_burst = 0.0
+
+        results = await self.overlay(0).process_rpc_query_rate_limited({"txt_filter": "ubuntu", "first": 0,
+                                                                        "last": 100}, self.peer(1))
+
+        self.assertIsNone(results)
+        self.assertEqual(1, self.overlay(0).query_scheduler.dropped["rate_limited"])
+
+    def test_estimate_query_cost(self) -> None:
+        """
+        Test if the cost of text queries grows with the number of results and short search terms.
+        """
+        cost_small = self.overlay(0).estimate_query_cost({"txt_filter": "ubuntu", "first": 0, "last": 10})
+        cost_large = self.overlay(0).estimate_query_cost({"txt_filter": "ubuntu", "first": 0, "last": 100})
+        cost_short = self.overlay(0).estimate_query_cost({"txt_filter": "u*", "first": 0, "last": 100})
+
+        self.assertLess(cost_small, cost_large)
+        self.assertLess(cost_large, cost_short)
+
     def test_sanitize_query(self) -> None:
         """
         Test if queries are properly sanitized.
@@ -301,6 +762,25 @@ class TestContentDiscoveryCommunity(TestBase[ContentDiscoveryCommunity]):
             field_in_hex = hexlify(field_in_b).decode()
             self.assertEqual(field_in_b, self.overlay(0).sanitize_query({field: field_in_hex})[field])
 
+    def test_convert_to_json_binary_fields(self) -> None:
+        """
+        Test if binary fields are converted to the hex format that sanitize_query expects.
+        """
+        json_str = self.overlay(0).convert_to_json({"infohash": b"\x01" * 20})
+
+        self.assertEqual(b"\x01" * 20, self.overlay(0).sanitize_query(json.loads(json_str))["infohash"])
+
+    def test_sanitize_query_binary_set_fields(self) -> None:
+        """
+        Test if binary set fields are properly sanitized and capped.
+        """
+        infohashes = [bytes([i]) * 20 for i in range(5)]
+
+        sanitized = self.overlay(0).sanitize_query({"infohash_set": [hexlify(i).decode() for i in infohashes]}, 3)
+
+        self.assertEqual(3, len(sanitized["infohash_set"]))
+        self.assertTrue(sanitized["infohash_set"] <= set(infohashes))
+
     async def test_process_rpc_query_match_none(self) -> None:
         """
         Check if a correct query with no match in our database returns no result.
@@ -3,6 +3,7 @@ from __future__ import annotations
 from ipv8.test.base import TestBase
 
 from tribler.core.content_discovery.payload import (
+    HealthSketchPayload,
     PopularTorrentsRequest,
     RemoteSelectPayload,
     SelectResponsePayload,
@@ -103,6 +104,17 @@ class TestContentDiscoveryPayloads(TestBase):
 
         self.assertEqual(2, ptr.msg_id)
 
+    def test_health_sketch_payload(self) -> None:
+        """
+        Test if HealthSketchPayload initializes correctly.
+        """
+        hsp = HealthSketchPayload(42, 7, b"\x00\xff")
+
+        self.assertEqual(3, hsp.msg_id)
+        self.assertEqual(42, hsp.salt)
+        self.assertEqual(7, hsp.num_hashes)
+        self.assertEqual(b"\x00\xff", hsp.bloom_filter)
+
     def test_version_request(self) -> None:
         """
         Test if VersionRequest initializes correctly.
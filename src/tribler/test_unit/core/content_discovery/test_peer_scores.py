@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from ipv8.test.base import TestBase
+
+from tribler.core.content_discovery.peer_scores import PeerScore, PeerScores
+
+
+class TestPeerScore(TestBase):
+    """
+    Tests for the PeerScore class.
+    """
+
+    def test_response_rate_unknown(self) -> None:
+        """
+        Test if the response rate of an unknown peer is neutral.
+        """
+        self.assertEqual(0.5, PeerScore().response_rate)
+
+    def test_score_responsive(self) -> None:
+        """
+        Test if a peer that responds scores better than one that does not.
+        """
+        self.assertGreater(PeerScore(requests=2, responses=2).score, PeerScore(requests=2).score)
+
+    def test_score_fast(self) -> None:
+        """
+        Test if a peer that responds fast scores better than one that responds slowly.
+        """
+        self.assertGreater(PeerScore(latency=0.1).score, PeerScore(latency=5.0).score)
+
+    def test_score_new_objects(self) -> None:
+        """
+        Test if a peer that sent new entries scores better than one that did not.
+        """
+        self.assertGreater(PeerScore(new_objects=10).score, PeerScore().score)
+
+
+class TestPeerScores(TestBase):
+    """
+    Tests for the PeerScores class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a new score table.
+        """
+        super().setUp()
+        self.peer_scores = PeerScores(max_size=2)
+
+    def test_record_response(self) -> None:
+        """
+        Test if a response is counted and its latency is averaged.
+        """
+        self.peer_scores.record_request(b"peer")
+        self.peer_scores.record_response(b"peer", 0.0)
+
+        score = self.peer_scores.get(b"peer")
+        self.assertEqual((1, 1), (score.requests, score.responses))
+        self.assertLess(score.latency, PeerScore().latency)
+
+    def test_record_new_objects(self) -> None:
+        """
+        Test if new objects are counted.
+        """
+        self.peer_scores.record_new_objects(b"peer", 3)
+        self.peer_scores.record_new_objects(b"peer", 2)
+
+        self.assertEqual(5, self.peer_scores.get(b"peer").new_objects)
+
+    def test_remove(self) -> None:
+        """
+        Test if a removed peer is forgotten.
+        """
+        self.peer_scores.record_request(b"peer")
+
+        self.peer_scores.remove(b"peer")
+        self.peer_scores.remove(b"unknown")
+
+        self.assertEqual({}, dict(self.peer_scores.scores))
+
+    def test_forget_least_recently_updated(self) -> None:
+        """
+        Test if the least recently updated peer is forgotten when the table is full.
+        """
+        self.peer_scores.record_request(b"peer1")
+        self.peer_scores.record_request(b"peer2")
+        self.peer_scores.record_request(b"peer1")
+
+        self.peer_scores.record_request(b"peer3")
+
+        self.assertEqual([b"peer1", b"peer3"], list(self.peer_scores.scores))
+
+    def test_select_best(self) -> None:
+        """
+        Test if the peers with the best scores are selected.
+        """
+        self.peer_scores.record_new_objects(b"peer2", 10)
+
+        self.assertEqual(["p2"], self.peer_scores.select({b"peer1": "p1", b"peer2": "p2"}, 1))
+
+    def test_select_exploration(self) -> None:
+        """
+        Test if part of the selection is random.
+        """
+        self.peer_scores.max_size = 10
+        for i in range(4):
+            self.peer_scores.record_new_objects(bytes([i]), 10 - i)
+
+        selected = self.peer_scores.select({bytes([i]): i for i in range(4)}, 2, exploration=0.5)
+
+        self.assertEqual(0, selected[0])
+        self.assertIn(selected[1], [1, 2, 3])
+
+    def test_select_too_many(self) -> None:
+        """
+        Test if all peers are selected when more peers are asked for than there are.
+        """
+        self.assertEqual({"p1", "p2"}, set(self.peer_scores.select({b"peer1": "p1", b"peer2": "p2"}, 5, 0.5)))
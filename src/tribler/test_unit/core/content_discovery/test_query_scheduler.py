@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from asyncio import Event, ensure_future, sleep
+
+from ipv8.test.base import TestBase
+
+from tribler.core.content_discovery.query_scheduler import QueryScheduler, TokenBucket
+
+
+class TestTokenBucket(TestBase):
+    """
+    Tests for the TokenBucket class.
+    """
+
+    def test_take(self) -> None:
+        """
+        Test if tokens can be taken until the bucket is empty.
+        """
+        bucket = TokenBucket(1.0, 2.0, 0.0)
+
+        self.assertTrue(bucket.take(2.0, 0.0))
+        self.assertFalse(bucket.take(1.0, 0.0))
+
+    def test_refill(self) -> None:
+        """
+        Test if tokens are refilled over time, up to the capacity.
+        """
+        bucket = TokenBucket(1.0, 2.0, 0.0)
+        bucket.take(2.0, 0.0)
+
+        bucket.refill(10.0)
+
+        self.assertEqual(2.0, bucket.tokens)
+
+
+class TestQueryScheduler(TestBase):
+    """
+    Tests for the QueryScheduler class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a scheduler that runs one query at a time.
+        """
+        super().setUp()
+        self.scheduler = QueryScheduler(max_concurrent=1, max_queue_size=2, peer_rate=0.0, peer_burst=10.0)
+        self.blocker = Event()
+
+    async def blocking_query(self) -> str:
+        """
+        A query that runs until the blocker is set.
+        """
+        await self.blocker.wait()
+        return "blocked"
+
+    async def fast_query(self) -> str:
+        """
+        A query that finishes immediately.
+        """
+        return "fast"
+
+    async def test_run_immediately(self) -> None:
+        """
+        Test if a query runs immediately when there is a free slot.
+        """
+        result = await self.scheduler.run(b"peer", 1.0, self.fast_query)
+
+        self.assertEqual("fast", result)
+        self.assertEqual({"queue_depth": 0, "running": 0, "processed": 1, "mean_wait": 0.0,
+                          "dropped": {"rate_limited": 0, "queue_full": 0, "expired": 0}}, self.scheduler.get_stats())
+
+    async def test_run_queued(self) -> None:
+        """
+        Test if a query waits for a free slot.
+        """
+        blocked = ensure_future(self.scheduler.run(b"peer1", 1.0, self.blocking_query))
+        await sleep(0)
+        queued = ensure_future(self.scheduler.run(b"peer2", 1.0, self.fast_query))
+        await sleep(0)
+        depth = self.scheduler.queue_depth
+
+        self.blocker.set()
+
+        self.assertEqual(["blocked", "fast"], [await blocked, await queued])
+        self.assertEqual(1, depth)
+        self.assertEqual(0, self.scheduler.queue_depth)
+
+    async def test_rate_limited(self) -> None:
+        """
+        Test if a query is dropped when its peer spent its tokens.
+        """
+        await self.scheduler.run(b"peer", 10.0, self.fast_query)
+
+        result = await self.scheduler.run(b"peer", 1.0, self.fast_query)
+
+        self.assertIsNone(result)
+        self.assertEqual(1, self.scheduler.dropped["rate_limited"])
+
+    async def test_queue_full(self) -> None:
+        """
+        Test if a query is dropped when the queue is full.
+        """
+        blocked = ensure_future(self.scheduler.run(b"peer1", 1.0, self.blocking_query))
+        await sleep(0)
+        queued = [ensure_future(self.scheduler.run(b"peer2", 1.0, self.fast_query)) for _ in range(2)]
+        await sleep(0)
+
+        result = await self.scheduler.run(b"peer3", 1.0, self.fast_query)
+        self.blocker.set()
+        await blocked
+        for future in queued:
+            await future
+
+        self.assertIsNone(result)
+        self.assertEqual(1, self.scheduler.dropped["queue_full"])
+
+    async def test_expired(self) -> None:
+        """
+        Test if a query is dropped when it waited too long.
+        """
+        self.scheduler.max_wait = -1.0
+        blocked = ensure_future(self.scheduler.run(b"peer1", 1.0, self.blocking_query))
+        await sleep(0)
+        queued = ensure_future(self.scheduler.run(b"peer2", 1.0, self.fast_query))
+        await sleep(0)
+
+        self.blocker.set()
+        await blocked
+
+        self.assertIsNone(await queued)
+        self.assertEqual(1, self.scheduler.dropped["expired"])
+
+    async def test_round_robin(self) -> None:
+        """
+        Test if queued queries are served round-robin per peer.
+        """
+        order = []
+
+        async def query(name: str) -> None:
+            order.append(name)
+
+        self.scheduler.max_queue_size = 3
+        blocked = ensure_future(self.scheduler.run(b"peer0", 1.0, self.blocking_query))
+        await sleep(0)
+        queued = [ensure_future(self.scheduler.run(peer, 1.0, lambda name=name: query(name)))
+                  for peer, name in [(b"peer1", "a1"), (b"peer1", "a2"), (b"peer2", "b1")]]
+        await sleep(0)
+
+        self.blocker.set()
+        await blocked
+        for future in queued:
+            await future
+
+        self.assertEqual(["a1", "b1", "a2"], order)
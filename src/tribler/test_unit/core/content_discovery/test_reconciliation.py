@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from ipv8.test.base import TestBase
+
+from tribler.core.content_discovery.reconciliation import (
+    MAX_FILTER_SIZE,
+    BloomFilter,
+    create_health_sketch,
+    get_missing_health,
+    health_key,
+)
+from tribler.core.torrent_checker.dataclasses import HealthInfo
+
+
+class TestBloomFilter(TestBase):
+    """
+    Tests for the BloomFilter class.
+    """
+
+    def test_contains(self) -> None:
+        """
+        Test if added keys are in the filter.
+        """
+        bloom_filter = BloomFilter.for_capacity(100, 0.01)
+
+        for i in range(100):
+            bloom_filter.add(bytes([i]))
+
+        self.assertTrue(all(bytes([i]) in bloom_filter for i in range(100)))
+
+    def test_false_positive_rate(self) -> None:
+        """
+        Test if keys that were not added are rarely in the filter.
+        """
+        bloom_filter = BloomFilter.for_capacity(100, 0.01)
+        for i in range(100):
+            bloom_filter.add(i.to_bytes(2, "big"))
+
+        false_positives = sum(i.to_bytes(2, "big") in bloom_filter for i in range(100, 10100))
+
+        self.assertLess(false_positives, 500)
+
+    def test_false_positive_rate_small(self) -> None:
+        """
+        Test if keys that were not added are rarely in a small filter, of which the size is not a prime.
+        """
+        bloom_filter = BloomFilter.for_capacity(1, 1e-9)
+        bloom_filter.add(b"key")
+
+        false_positives = sum(i.to_bytes(2, "big") in bloom_filter for i in range(10000))
+
+        self.assertEqual(0, false_positives)
+
+    def test_for_capacity_max_size(self) -> None:
+        """
+        Test if filters are never larger than the maximum size.
+        """
+        self.assertEqual(MAX_FILTER_SIZE, BloomFilter.for_capacity(100000, 0.01).size)
+
+    def test_from_data(self) -> None:
+        """
+        Test if a filter can be reconstructed from its bits, hash count and salt.
+        """
+        bloom_filter = BloomFilter.for_capacity(10, 0.01)
+        bloom_filter.add(b"key")
+
+        copy = BloomFilter(bloom_filter.size, bloom_filter.num_hashes, bloom_filter.salt, bytes(bloom_filter.data))
+
+        self.assertIn(b"key", copy)
+
+
+class TestHealthReconciliation(TestBase):
+    """
+    Tests for the health reconciliation functions.
+    """
+
+    def test_health_key(self) -> None:
+        """
+        Test if different checks of the same torrent have different keys.
+        """
+        self.assertNotEqual(health_key(b"\x01" * 20, 1), health_key(b"\x01" * 20, 2))
+
+    def test_create_health_sketch_freshest(self) -> None:
+        """
+        Test if only the freshest checks are added to a sketch.
+        """
+        sketch = create_health_sketch({b"\x01" * 20: 1, b"\x02" * 20: 2}, 1, 1e-9)
+
+        self.assertIn(health_key(b"\x02" * 20, 2), sketch)
+        self.assertNotIn(health_key(b"\x01" * 20, 1), sketch)
+
+    def test_get_missing_health(self) -> None:
+        """
+        Test if the health that is missing from a sketch is given, freshest first.
+        """
+        sketch = create_health_sketch({b"\x01" * 20: 1}, 10, 1e-9)
+        health_list = [HealthInfo(b"\x01" * 20, 1, 1, 1), HealthInfo(b"\x02" * 20, 1, 1, 2),
+                       HealthInfo(b"\x03" * 20, 1, 1, 3)]
+
+        missing = get_missing_health(sketch, health_list, 10)
+
+        self.assertEqual([b"\x03" * 20, b"\x02" * 20], [health.infohash for health in missing])
+
+    def test_get_missing_health_limit(self) -> None:
+        """
+        Test if no more missing health than the limit is given.
+        """
+        sketch = create_health_sketch({}, 10, 0.01)
+        health_list = [HealthInfo(bytes([i]) * 20, 1, 1, i) for i in range(5)]
+
+        self.assertEqual(2, len(get_missing_health(sketch, health_list, 2)))
@@ -1,8 +1,22 @@
 from __future__ import annotations
 
-from ipv8.test.base import TestBase
+from unittest.mock import Mock, patch
 
-from tribler.core.database.orm_bindings.torrent_metadata import entries_to_chunk, infohash_to_id, tdef_to_metadata_dict
+from ipv8.test.base import TestBase
+from lz4.frame import LZ4FrameDecompressor
+
+from tribler.core.database.compression import (
+    LATEST_DICTIONARY_VERSION,
+    compress_with_dictionary,
+    decompress_with_dictionary,
+)
+from tribler.core.database.orm_bindings.torrent_metadata import (
+    SerializedEntryCache,
+    entries_to_chunk,
+    entries_to_dictionary_chunk,
+    infohash_to_id,
+    tdef_to_metadata_dict,
+)
 from tribler.core.libtorrent.torrentdef import TorrentDefNoMetainfo
 
 
@@ -87,3 +101,131 @@ class TestTorrentMetadata(TestBase):
 
         self.assertEqual(1, last_index)
         self.assertEqual(7, health)
+
+    def test_entries_to_chunk_contents(self) -> None:
+        """
+        Test if entries_to_chunk puts the serialized entries that fit into the chunk.
+        """
+        chunk, _ = entries_to_chunk([MockTorrentMetadata(0, 99), MockTorrentMetadata(100, 199)], 400)
+
+        self.assertEqual(bytes(list(range(99)) + list(range(100, 199))), LZ4FrameDecompressor().decompress(chunk))
+
+
+    def test_entries_to_chunk_dictionary(self) -> None:
+        """
+        Test if entries_to_chunk compresses the entries that fit with the given dictionary.
+        """
+        chunk, last_index = entries_to_chunk([MockTorrentMetadata(0, 99), MockTorrentMetadata(100, 199)], 400,
+                                             dictionary_version=LATEST_DICTIONARY_VERSION)
+
+        self.assertEqual(2, last_index)
+        self.assertEqual((bytes(list(range(99)) + list(range(100, 199))), b""), decompress_with_dictionary(chunk))
+
+    def test_entries_to_chunk_dictionary_no_fit(self) -> None:
+        """
+        Test if entries_to_chunk with a dictionary always adds the first entry, but no entries that do not fit.
+        """
+        chunk, last_index = entries_to_chunk([MockTorrentMetadata(0, 99), MockTorrentMetadata(100, 199)], 1, 0, True,
+                                             dictionary_version=LATEST_DICTIONARY_VERSION)
+        data, health = decompress_with_dictionary(chunk)
+
+        self.assertEqual(1, last_index)
+        self.assertEqual(bytes(range(99)), data)
+        self.assertEqual(7, health[-1])
+
+
+    def test_entries_to_chunk_dictionary_steps(self) -> None:
+        """
+        Test if entries_to_chunk with a dictionary fills the chunk without compressing it once per entry.
+        """
+        metadata_list = [MockTorrentMetadata(i % 200, i % 200 + 50) for i in range(200)]
+
+        with patch("tribler.core.database.orm_bindings.torrent_metadata.compress_with_dictionary",
+                   Mock(wraps=compress_with_dictionary)) as compress:
+            chunk, last_index = entries_to_chunk(metadata_list, 1300, include_health=True,
+                                                 dictionary_version=LATEST_DICTIONARY_VERSION)
+        data, _ = decompress_with_dictionary(chunk)
+
+        self.assertLessEqual(len(chunk), 1300)
+        self.assertGreater(len(chunk), 1200)
+        self.assertEqual(b"".join(m.serialized() for m in metadata_list[:last_index]), data)
+        self.assertLess(compress.call_count, last_index)
+
+    def test_entries_to_chunk_dictionary_start_index(self) -> None:
+        """
+        Test if entries_to_dictionary_chunk refuses a start index beyond the given entries.
+        """
+        with self.assertRaisesRegex(Exception, "incorrect start_index"):
+            entries_to_dictionary_chunk([MockTorrentMetadata(0, 99)], 400, 1, False, LATEST_DICTIONARY_VERSION)
+
+class TestSerializedEntryCache(TestBase):
+    """
+    Tests for the SerializedEntryCache class.
+    """
+
+    def test_get_miss(self) -> None:
+        """
+        Test if an unknown entry is counted as a miss.
+        """
+        cache = SerializedEntryCache()
+
+        self.assertIsNone(cache.get(1, 10))
+        self.assertEqual({"size": 0, "hits": 0, "misses": 1}, cache.get_stats())
+
+    def test_get_hit(self) -> None:
+        """
+        Test if a stored entry is counted as a hit.
+        """
+        cache = SerializedEntryCache()
+        cache.put(1, 10, b"serialized")
+
+        self.assertEqual(b"serialized", cache.get(1, 10))
+        self.assertEqual({"size": 1, "hits": 1, "misses": 0}, cache.get_stats())
+
+    def test_invalidate(self) -> None:
+        """
+        Test if an invalidated entry is forgotten.
+        """
+        cache = SerializedEntryCache()
+        cache.put(1, 10, b"serialized")
+
+        cache.invalidate(1)
+
+        self.assertIsNone(cache.get(1, 10))
+
+    def test_evict_least_recently_used(self) -> None:
+        """
+        Test if the least recently used entry is evicted when the cache is full.
+        """
+        cache = SerializedEntryCache(max_size=2)
+        cache.put(1, 10, b"one")
+        cache.put(2, 10, b"two")
+        cache.get(1, 10)
+
+        cache.put(3, 10, b"three")
+
+        self.assertEqual(b"one", cache.get(1, 10))
+        self.assertIsNone(cache.get(2, 10))
+        self.assertEqual(b"three", cache.get(3, 10))
+
+    def test_get_other_timestamp(self) -> None:
+        """
+        Test if the serialized form of another version of an entry is not handed out.
+        """
+        cache = SerializedEntryCache()
+        cache.put(1, 10, b"serialized")
+
+        self.assertIsNone(cache.get(1, 11))
+        self.assertEqual({"size": 1, "hits": 0, "misses": 1}, cache.get_stats())
+
+    def test_put_older_timestamp(self) -> None:
+        """
+        Test if the serialized form of an older version of an entry does not replace the cached newer version.
+        """
+        cache = SerializedEntryCache()
+        cache.put(1, 11, b"new")
+
+        cache.put(1, 10, b"old")
+
+        self.assertEqual(b"new", cache.get(1, 11))
+        self.assertIsNone(cache.get(1, 10))
@@ -99,7 +99,7 @@ class TestDatabaseEndpoint(TestBase):
         soiled = MultiDictProxy(MultiDict([("first", "7"), ("last", "42"), ("sort_by", "name"), ("sort_desc", "0"),
                                            ("hide_xxx", "0"), ("category", "TEST"), ("origin_id", "13"),
                                            ("tags", "tag1"), ("tags", "tag2"), ("tags", "tag3"),
-                                           ("max_rowid", "1337"), ("channel_pk", "AA")]))
+                                           ("max_rowid", "1337"), ("channel_pk", "AA"), ("cursor", "abc")]))
 
         sanitized = DatabaseEndpoint.sanitize_parameters(soiled)
 
@@ -113,6 +113,7 @@ class TestDatabaseEndpoint(TestBase):
         self.assertEqual(["tag1", "tag2", "tag3"], sanitized["tags"])
         self.assertEqual(1337, sanitized["max_rowid"])
         self.assertEqual(b"\xaa", sanitized["channel_pk"])
+        self.assertEqual("abc", sanitized["cursor"])
 
     def test_parse_bool(self) -> None:
         """
@@ -227,7 +228,8 @@ class TestDatabaseEndpoint(TestBase):
         download = Mock(get_state=Mock(return_value=Mock(get_progress=Mock(return_value=1.0))),
                         tdef=Mock(infohash="AA"))
         endpoint.download_manager = Mock(get_download=Mock(return_value=download), metainfo_requests=[])
-        endpoint.mds = Mock(get_entries=Mock(return_value=[Mock(to_simple_dict=Mock(return_value=metadata))]))
+        endpoint.mds = Mock(get_entries_page=Mock(return_value=([Mock(to_simple_dict=Mock(return_value=metadata))],
+                                                                "cursor")))
 
         response = await endpoint.get_popular_torrents(PopularTorrentsRequest(metadata, endpoint.mds))
         response_body_json = await response_to_json(response)
@@ -236,6 +238,7 @@ class TestDatabaseEndpoint(TestBase):
         self.assertEqual(200, response.status)
         self.assertEqual(1, response_body_json["first"])
         self.assertEqual(50, response_body_json["last"])
+        self.assertEqual("cursor", response_body_json["next_cursor"])
         self.assertEqual(300, response_results["type"])
         self.assertEqual("AA", response_results["infohash"])
         self.assertEqual(1.0, response_results["progress"])
@@ -273,9 +276,8 @@ class TestDatabaseEndpoint(TestBase):
         """
         endpoint = DatabaseEndpoint()
         endpoint.tribler_db = Mock()
-        endpoint.mds = Mock(run_threaded=self.mds_run_now, get_total_count=Mock(), get_max_rowid=Mock(),
-                            get_entries=Mock(return_value=[Mock(to_simple_dict=Mock(return_value={"test": "test",
-                                                                                                  "type": -1}))]))
+        endpoint.mds = Mock(run_threaded=self.mds_run_now, get_search_results=Mock(return_value=(
+            [{"test": "test", "type": -1}], None, None, "cursor")))
 
         response = await endpoint.local_search(SearchLocalRequest({}, endpoint.mds))
         response_body_json = await response_to_json(response)
@@ -293,10 +295,8 @@ class TestDatabaseEndpoint(TestBase):
         """
         endpoint = DatabaseEndpoint()
         endpoint.tribler_db = Mock()
-        endpoint.mds = Mock(run_threaded=self.mds_run_now, get_total_count=Mock(return_value=1),
-                            get_max_rowid=Mock(return_value=7),
-                            get_entries=Mock(return_value=[Mock(to_simple_dict=Mock(return_value={"test": "test",
-                                                                                                  "type": -1}))]))
+        endpoint.mds = Mock(run_threaded=self.mds_run_now, get_search_results=Mock(return_value=(
+            [{"test": "test", "type": -1}], 1, 7, "cursor")))
 
         response = await endpoint.local_search(SearchLocalRequest({"include_total": "I would like this"}, endpoint.mds))
         response_body_json = await response_to_json(response)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from ipv8.test.base import TestBase
+
+from tribler.core.database.compression import (
+    DICTIONARY_CHUNK_HEADER,
+    LATEST_DICTIONARY_VERSION,
+    announce_dictionary_versions,
+    compress_with_dictionary,
+    decompress_with_dictionary,
+    is_dictionary_chunk,
+    select_dictionary_version,
+)
+from tribler.core.database.orm_bindings.torrent_metadata import LZ4_EMPTY_ARCHIVE
+
+
+class TestCompression(TestBase):
+    """
+    Tests for the dictionary compression of metadata chunks.
+    """
+
+    def test_round_trip(self) -> None:
+        """
+        Test if compressed data decompresses to the original data, followed by the trailing data.
+        """
+        data = b"udp://tracker.opentrackr.org:1337/announce 1080p WEB-DL x264"
+
+        chunk = compress_with_dictionary(data, LATEST_DICTIONARY_VERSION) + b"health"
+
+        self.assertEqual((data, b"health"), decompress_with_dictionary(chunk))
+
+    def test_dictionary_helps(self) -> None:
+        """
+        Test if common strings compress better with the dictionary than without.
+        """
+        data = b"udp://tracker.opentrackr.org:1337/announce"
+
+        chunk = compress_with_dictionary(data, LATEST_DICTIONARY_VERSION)
+
+        self.assertLess(len(chunk) - DICTIONARY_CHUNK_HEADER.size, len(data) // 2)
+
+    def test_is_dictionary_chunk(self) -> None:
+        """
+        Test if dictionary chunks are distinguished from plain LZ4 frames.
+        """
+        self.assertTrue(is_dictionary_chunk(compress_with_dictionary(b"", LATEST_DICTIONARY_VERSION)))
+        self.assertFalse(is_dictionary_chunk(LZ4_EMPTY_ARCHIVE))
+
+    def test_decompress_unknown_version(self) -> None:
+        """
+        Test if chunks with an unknown dictionary version cannot be decompressed.
+        """
+        chunk = bytearray(compress_with_dictionary(b"data", LATEST_DICTIONARY_VERSION))
+        chunk[2] = 255
+
+        with self.assertRaises(RuntimeError):
+            decompress_with_dictionary(bytes(chunk))
+
+    def test_decompress_malformed(self) -> None:
+        """
+        Test if truncated chunks cannot be decompressed.
+        """
+        chunk = compress_with_dictionary(b"data" * 100, LATEST_DICTIONARY_VERSION)
+
+        with self.assertRaises(RuntimeError):
+            decompress_with_dictionary(chunk[:-2])
+        with self.assertRaises(RuntimeError):
+            decompress_with_dictionary(chunk[:3])
+
+    def test_select_dictionary_version(self) -> None:
+        """
+        Test if the newest shared dictionary version is selected.
+        """
+        self.assertEqual(LATEST_DICTIONARY_VERSION, select_dictionary_version(announce_dictionary_versions() + b"\xff"))
+        self.assertIsNone(select_dictionary_version(b"\xff"))
+        self.assertIsNone(select_dictionary_version(b""))
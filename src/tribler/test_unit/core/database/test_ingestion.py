@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from ipv8.keyvault.crypto import default_eccrypto
+from ipv8.test.base import TestBase
+from lz4.frame import LZ4FrameCompressor
+
+from tribler.core.database.compression import LATEST_DICTIONARY_VERSION, compress_with_dictionary
+from tribler.core.database.ingestion import IngestionStats, MdblobContents, read_mdblob
+from tribler.core.database.serialization import HealthItemsPayload, TorrentMetadataPayload, int2time
+
+
+class TestIngestion(TestBase):
+    """
+    Tests for the mdblob ingestion stages.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a key to sign payloads with.
+        """
+        super().setUp()
+        self.key = default_eccrypto.generate_key("curve25519")
+
+    def create_payload(self, i: int) -> TorrentMetadataPayload:
+        """
+        Create a signed payload.
+        """
+        payload = TorrentMetadataPayload(metadata_type=300, reserved_flags=0, public_key=b"\x00" * 64, id_=i,
+                                         origin_id=0, timestamp=i, infohash=bytes([i]) * 20, size=i,
+                                         torrent_date=int2time(i), title=f"torrent {i}", tags="", tracker_info="")
+        payload.add_signature(self.key)
+        return payload
+
+    def compress(self, data: bytes, health: bytes = b"") -> bytes:
+        """
+        Compress the given data and append the given serialized health.
+        """
+        with LZ4FrameCompressor(auto_flush=True) as compressor:
+            return compressor.begin() + compressor.compress(data) + compressor.flush() + health
+
+    def test_read_mdblob(self) -> None:
+        """
+        Test if the payloads and health of a valid mdblob are read.
+        """
+        payloads = [self.create_payload(i) for i in range(3)]
+        data = b"".join(payload.serialized() + payload.signature for payload in payloads)
+        health = HealthItemsPayload(b"1,2,3;4,5,6;7,8,9;").serialize()
+
+        contents = read_mdblob(self.compress(data, health))
+
+        self.assertEqual([payload.to_dict() for payload in payloads], contents.payloads)
+        self.assertEqual([(1, 2, 3), (4, 5, 6), (7, 8, 9)],
+                         [(health.seeders, health.leechers, health.last_check) for health in contents.health])
+        self.assertEqual(0, contents.rejected)
+        self.assertEqual(3, contents.timings["verify"][0])
+
+    def test_read_mdblob_dictionary(self) -> None:
+        """
+        Test if the payloads and health of an mdblob that is compressed with a dictionary are read.
+        """
+        payloads = [self.create_payload(i) for i in range(2)]
+        data = b"".join(payload.serialized() + payload.signature for payload in payloads)
+        health = HealthItemsPayload(b"1,2,3;4,5,6;").serialize()
+
+        contents = read_mdblob(compress_with_dictionary(data, LATEST_DICTIONARY_VERSION) + health)
+
+        self.assertEqual([payload.to_dict() for payload in payloads], contents.payloads)
+        self.assertEqual([(1, 2, 3), (4, 5, 6)],
+                         [(health.seeders, health.leechers, health.last_check) for health in contents.health])
+
+    def test_read_mdblob_invalid_signature(self) -> None:
+        """
+        Test if payloads with an invalid signature are rejected.
+        """
+        valid, invalid = self.create_payload(1), self.create_payload(2)
+        invalid.signature = bytes(127 ^ byte for byte in invalid.signature)
+        data = valid.serialized() + valid.signature + invalid.serialized() + invalid.signature
+
+        contents = read_mdblob(self.compress(data))
+
+        self.assertEqual([valid.to_dict()], contents.payloads)
+        self.assertEqual(1, contents.rejected)
+
+    def test_read_mdblob_invalid_compression(self) -> None:
+        """
+        Test if data that cannot be decompressed leads to empty contents.
+        """
+        self.assertEqual(MdblobContents(), read_mdblob(b"abcdefg"))
+
+    def test_stats_add(self) -> None:
+        """
+        Test if the stage counters add up the timings of mdblob contents.
+        """
+        stats = IngestionStats()
+
+        stats.add(MdblobContents(rejected=1, timings={"decompress": (100, 0.5), "parse": (3, 0.25)}))
+        stats.add(MdblobContents(rejected=2, timings={"decompress": (100, 0.5), "parse": (1, 0.25)}))
+
+        self.assertEqual(200, stats.to_dict()["decompress"]["items"])
+        self.assertEqual(200.0, stats.to_dict()["decompress"]["throughput"])
+        self.assertEqual(8.0, stats.to_dict()["parse"]["throughput"])
+        self.assertEqual(0.0, stats.to_dict()["verify"]["throughput"])
+        self.assertEqual(3, stats.to_dict()["rejected"])
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from ipv8.test.base import TestBase
+
+from tribler.core.database.pagination import decode_cursor, encode_cursor
+
+
+class TestPagination(TestBase):
+    """
+    Tests for the cursor helpers.
+    """
+
+    def test_encode_decode(self) -> None:
+        """
+        Test if a sort key survives being encoded to a cursor.
+        """
+        key = [1, 0.5, "test", b"\x01\x02", datetime(2024, 1, 2, 3, 4, 5), None]  # noqa: DTZ001
+
+        self.assertEqual(key, decode_cursor(encode_cursor("-size,-rowid", key), "-size,-rowid"))
+
+    def test_decode_other_sort_order(self) -> None:
+        """
+        Test if a cursor of a different sort order is rejected.
+        """
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor("-size,-rowid", [1, 2]), "-rowid")
+
+    def test_decode_malformed(self) -> None:
+        """
+        Test if a malformed cursor is rejected.
+        """
+        with self.assertRaises(ValueError):
+            decode_cursor("not a cursor!", "-rowid")
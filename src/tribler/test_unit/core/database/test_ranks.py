@@ -10,6 +10,7 @@ from tribler.core.database.ranks import (
     seeders_rank,
     title_rank,
     torrent_rank,
+    torrent_ranks,
 )
 
 
@@ -167,6 +168,22 @@ class TestRanks(TestBase):
         self.assertGreaterEqual(rank2, rank3)
         self.assertGreaterEqual(rank3, rank4)
 
+    def test_torrent_ranks_empty(self) -> None:
+        """
+        Test if ranking an empty batch leads to an empty list of ranks.
+        """
+        self.assertEqual([], torrent_ranks("Big Buck Bunny", []))
+
+    def test_torrent_ranks_equal_to_torrent_rank(self) -> None:
+        """
+        Test if batch ranking produces the same ranks as ranking torrents one by one.
+        """
+        items = [("Big Buck Bunny", 10, 2, 100), ("Big Bunny Buck", 0, 0, None), (None, None, None, -1),
+                 ("Boring Big Buck Bunny", 1000, 0, 1)]
+
+        self.assertEqual([torrent_rank("Big Buck Bunny", *item) for item in items],
+                         torrent_ranks("Big Buck Bunny", items))
+
     def test_find_word_first(self) -> None:
         """
         Test if a matched first word gets popped from the queue.
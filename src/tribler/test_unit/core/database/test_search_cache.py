@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from ipv8.test.base import TestBase
+
+from tribler.core.database.search_cache import SearchCache, make_key
+
+
+class TestSearchCache(TestBase):
+    """
+    Tests for the SearchCache class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a new small search cache.
+        """
+        super().setUp()
+        self.search_cache = SearchCache(max_size=2)
+
+    def test_make_key_normalized(self) -> None:
+        """
+        Test if the key of the same parameters does not depend on their order.
+        """
+        self.assertEqual(make_key(first=1, infohash_set={b"a", b"b"}), make_key(infohash_set={b"b", b"a"}, first=1))
+
+    def test_get_miss(self) -> None:
+        """
+        Test if an unknown key is a miss.
+        """
+        self.assertIsNone(self.search_cache.get("key", 1))
+        self.assertEqual({"size": 0, "hits": 0, "misses": 1}, self.search_cache.get_stats())
+
+    def test_get_hit(self) -> None:
+        """
+        Test if a result of the same version is a hit.
+        """
+        self.search_cache.put("key", 1, "result")
+
+        self.assertEqual("result", self.search_cache.get("key", 1))
+        self.assertEqual({"size": 1, "hits": 1, "misses": 0}, self.search_cache.get_stats())
+
+    def test_get_other_version(self) -> None:
+        """
+        Test if a result of another version is a miss and is dropped.
+        """
+        self.search_cache.put("key", 1, "result")
+
+        self.assertIsNone(self.search_cache.get("key", 2))
+        self.assertEqual({"size": 0, "hits": 0, "misses": 1}, self.search_cache.get_stats())
+
+    def test_put_evict_least_recently_used(self) -> None:
+        """
+        Test if the least recently used result is evicted when the cache is full.
+        """
+        self.search_cache.put("key1", 1, "result1")
+        self.search_cache.put("key2", 1, "result2")
+        self.search_cache.get("key1", 1)
+
+        self.search_cache.put("key3", 1, "result3")
+
+        self.assertEqual("result1", self.search_cache.get("key1", 1))
+        self.assertIsNone(self.search_cache.get("key2", 1))
+        self.assertEqual("result3", self.search_cache.get("key3", 1))
+
+    def test_get_expired(self) -> None:
+        """
+        Test if a result that outlived the time-to-live is a miss.
+        """
+        search_cache = SearchCache(ttl=-1.0)
+        search_cache.put("key", 1, "result")
+
+        self.assertIsNone(search_cache.get("key", 1))
+        self.assertEqual({"size": 0, "hits": 0, "misses": 1}, search_cache.get_stats())
@@ -13,6 +13,7 @@ from tribler.core.database.serialization import (
     UnknownBlobTypeException,
     int2time,
     read_payload_with_offset,
+    read_torrent_metadata_batch,
     time2int,
 )
 
@@ -54,7 +55,7 @@ class TestSerialization(TestBase):
                                          id_=7, origin_id=1337, timestamp=10, infohash=b"\x01" * 20, size=42,
                                          torrent_date=int2time(0), title="test", tags="tags", tracker_info="")
 
-        unserialized, offset = read_payload_with_offset(payload.serialized())
+        unserialized, _offset = read_payload_with_offset(payload.serialized())
 
         self.assertEqual(payload.metadata_type, unserialized.metadata_type)
         self.assertEqual(payload.reserved_flags, unserialized.reserved_flags)
@@ -188,3 +189,57 @@ class TestSerialization(TestBase):
         payload = HealthItemsPayload(b"-1,-1,-1;1,2,3;")
 
         self.assertEqual([(0, 0, 0), (1, 2, 3)], HealthItemsPayload.unpack(payload.serialize()))
+
+    def create_signed_payload(self, i: int, title: str = "test") -> TorrentMetadataPayload:
+        """
+        Create a TorrentMetadataPayload with a signature.
+        """
+        payload = TorrentMetadataPayload(metadata_type=REGULAR_TORRENT, reserved_flags=0, public_key=b"\x00" * 64,
+                                         id_=i, origin_id=1337, timestamp=10, infohash=bytes([i]) * 20, size=42,
+                                         torrent_date=int2time(i), title=title, tags="tags", tracker_info="tracker")
+        payload.add_signature(default_eccrypto.generate_key("curve25519"))
+        return payload
+
+    def test_read_torrent_metadata_batch(self) -> None:
+        """
+        Test if a batch holds the same payloads as read by read_payload_with_offset.
+        """
+        payloads = [self.create_signed_payload(i, title) for i, title in enumerate(["test", "t\u00ebst", ""])]
+        data = b"".join(payload.serialized() + payload.signature for payload in payloads)
+
+        batch = read_torrent_metadata_batch(data)
+
+        self.assertEqual(3, len(batch))
+        self.assertEqual([p.infohash for p in payloads], batch.infohashes)
+        self.assertEqual([p.to_dict() for p in payloads], [batch.to_dict(i) for i in range(3)])
+        self.assertEqual(read_payload_with_offset(data, batch.starts[1])[0].to_dict(), batch.to_payload(1).to_dict())
+
+    def test_read_torrent_metadata_batch_check_signatures(self) -> None:
+        """
+        Test if the signatures of a batch are checked against the original serialized data.
+        """
+        valid, invalid = self.create_signed_payload(1), self.create_signed_payload(2)
+        invalid.signature = bytes(127 ^ byte for byte in invalid.signature)
+        unsigned = TorrentMetadataPayload(metadata_type=REGULAR_TORRENT, reserved_flags=0, public_key=b"\x00" * 64,
+                                          id_=3, origin_id=0, timestamp=0, infohash=b"\x03" * 20, size=0,
+                                          torrent_date=int2time(0), title="", tags="", tracker_info="")
+
+        batch = read_torrent_metadata_batch(b"".join(p.serialized() + p.signature for p in [valid, invalid, unsigned]))
+
+        self.assertEqual([True, False, True], batch.check_signatures())
+
+    def test_read_torrent_metadata_batch_unknown(self) -> None:
+        """
+        Test if unknown payload formats in a batch throw a UnknownBlobTypeException.
+        """
+        with self.assertRaises(UnknownBlobTypeException):
+            read_torrent_metadata_batch(b"\xFF\xFF" + b"\x00" * 200)
+
+    def test_read_torrent_metadata_batch_truncated(self) -> None:
+        """
+        Test if a truncated batch throws a ValueError.
+        """
+        payload = self.create_signed_payload(1)
+
+        with self.assertRaises(ValueError):
+            read_torrent_metadata_batch((payload.serialized() + payload.signature)[:-1])
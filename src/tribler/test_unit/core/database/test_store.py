@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import sqlite3
+import threading
+from asyncio import get_running_loop, wrap_future
+from contextlib import closing
+from pathlib import Path
+
 from ipv8.community import Community, CommunitySettings
 from ipv8.keyvault.crypto import default_eccrypto
 from ipv8.test.base import TestBase
 from ipv8.test.mocking.ipv8 import MockIPv8
-from pony.orm import db_session
+from pony.orm import db_session, flush
 
 from tribler.core.database.orm_bindings.torrent_metadata import entries_to_chunk
 from tribler.core.database.serialization import NULL_KEY, int2time
 from tribler.core.database.store import MetadataStore, ObjState
+from tribler.core.torrent_checker.dataclasses import HealthInfo
 
 
 class MockCommunity(Community):
@@ -39,6 +46,114 @@ class TestMetadataStore(TestBase[MockCommunity]):
         """
         return MockIPv8("curve25519", MockCommunity, settings, create_dht, enable_statistics)
 
+    def test_serialized_cached(self) -> None:
+        """
+        Test if the serialized form of an unchanged entry is cached.
+        """
+        with db_session:
+            md = self.metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20)
+            expected = md.serialized()
+        self.metadata_store.TorrentMetadata.serialized_cache.entries.clear()
+
+        with db_session:
+            md = self.metadata_store.TorrentMetadata.get(infohash=b"\x01" * 20)
+            first = md.serialized()
+            second = md.serialized()
+
+        self.assertEqual(expected, first)
+        self.assertIs(first, second)
+        self.assertIn(md.rowid, self.metadata_store.TorrentMetadata.serialized_cache.entries)
+
+    def test_serialized_invalidated(self) -> None:
+        """
+        Test if the cached serialized form of an entry is dropped when the entry is updated.
+        """
+        with db_session:
+            self.metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20)
+        with db_session:
+            md = self.metadata_store.TorrentMetadata.get(infohash=b"\x01" * 20)
+            rowid = md.rowid
+            md.serialized()
+
+        with db_session:
+            md = self.metadata_store.TorrentMetadata[rowid]
+            md.title = "changed"
+            uncached = md.serialized()
+        with db_session:
+            updated = self.metadata_store.TorrentMetadata[rowid].serialized()
+
+        self.assertEqual(uncached, updated)
+        self.assertIn(b"changed", updated)
+
+    def test_metadata_version_insert(self) -> None:
+        """
+        Test if the metadata version changes when torrent metadata is inserted.
+        """
+        before = self.metadata_store.get_metadata_version()
+
+        with db_session:
+            metadata = self.metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20)
+        rowid = metadata.rowid
+
+        self.assertNotEqual(before, self.metadata_store.get_metadata_version())
+        self.assertEqual(rowid, self.metadata_store.get_metadata_version()[1])
+
+    def test_metadata_version_update_delete(self) -> None:
+        """
+        Test if the metadata version changes when torrent metadata is updated or deleted.
+        """
+        with db_session:
+            self.metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20)
+        inserted = self.metadata_store.get_metadata_version()
+
+        with db_session:
+            self.metadata_store.TorrentMetadata.get(infohash=b"\x01" * 20).title = "changed"
+        updated = self.metadata_store.get_metadata_version()
+        with db_session:
+            self.metadata_store.TorrentMetadata.get(infohash=b"\x01" * 20).delete()
+
+        self.assertNotEqual(inserted, updated)
+        self.assertNotEqual(updated, self.metadata_store.get_metadata_version())
+
+    async def test_metadata_version_open_write_group(self) -> None:
+        """
+        Test if the metadata version only changes once the write group that changed the metadata is committed.
+        """
+        db_path = Path(self.temporary_directory()) / "metadata.db"
+        metadata_store = MetadataStore(str(db_path), self.private_key(0))
+        flushed = threading.Event()
+        commit = threading.Event()
+
+        def insert() -> None:
+            metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20)
+            flush()
+            flushed.set()
+            commit.wait()
+
+        before = metadata_store.get_metadata_version()
+        future = metadata_store.write_queue.submit(insert)
+        await get_running_loop().run_in_executor(None, flushed.wait)
+        during = metadata_store.get_metadata_version()
+        commit.set()
+        await wrap_future(future)
+        after = metadata_store.get_metadata_version()
+        metadata_store.shutdown()
+
+        self.assertEqual(before, during)
+        self.assertNotEqual(before, after)
+
+    def test_metadata_version_health(self) -> None:
+        """
+        Test if the metadata version does not change when only the health of a torrent changes.
+        """
+        with db_session:
+            self.metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20)
+        before = self.metadata_store.get_metadata_version()
+
+        self.metadata_store.process_torrent_health_batch([HealthInfo(b"\x01" * 20, 1, 2, 3)])
+
+        self.assertEqual(before, self.metadata_store.get_metadata_version())
+
     @db_session
     def test_squash_mdblobs(self) -> None:
         """
@@ -91,6 +206,72 @@ class TestMetadataStore(TestBase[MockCommunity]):
         """
         self.assertEqual([], self.metadata_store.process_compressed_mdblob(b"abcdefg"))
 
+    def test_add_missing_columns(self) -> None:
+        """
+        Test if columns that were added to a table later are added to a database that was created before.
+        """
+        db_path = Path(self.temporary_directory()) / "metadata.db"
+        metadata_store = MetadataStore(str(db_path), self.private_key(0))
+        with db_session:
+            metadata_store.TrackerState(url="http://tracker.com/announce")
+        metadata_store.shutdown()
+        with closing(sqlite3.connect(db_path)) as connection:
+            for column in ("latency", "latency_deviation", "success_rate"):
+                connection.execute(f'ALTER TABLE "TrackerState" DROP COLUMN "{column}"')
+            connection.commit()
+
+        metadata_store = MetadataStore(str(db_path), self.private_key(0))
+        with db_session:
+            tracker = metadata_store.TrackerState.get(url="http://tracker.com/announce")
+            stats = tracker.latency, tracker.latency_deviation, tracker.success_rate
+        metadata_store.shutdown()
+
+        self.assertEqual((0, 0, 1), stats)
+
+    async def test_process_compressed_mdblob_threaded(self) -> None:
+        """
+        Test if mdblobs can be processed by the writer thread.
+        """
+        db_path = Path(self.temporary_directory()) / "metadata.db"
+        metadata_store = MetadataStore(str(db_path), self.private_key(0))
+        with db_session:
+            md_list = [
+                metadata_store.TorrentMetadata(title=f'test torrent {i}', infohash=bytes([i]) * 20,
+                                               torrent_date=int2time(i))
+                for i in range(10)
+            ]
+            chunk, _ = entries_to_chunk(md_list, chunk_size=999999999999999)
+            signatures = [d.signature for d in md_list]
+            for d in md_list:
+                d.delete()
+
+        results = await metadata_store.process_compressed_mdblob_threaded(chunk, skip_personal_metadata_payload=False)
+        with db_session:
+            stored_signatures = {md.signature for md in metadata_store.TorrentMetadata.select()}
+        metadata_store.shutdown()
+
+        self.assertEqual([ObjState.NEW_OBJECT] * 10, [r.obj_state for r in results])
+        self.assertEqual(set(signatures), stored_signatures)
+        self.assertEqual(10, metadata_store.write_queue.operations_committed)
+
+    async def test_process_compressed_mdblob_process_pool(self) -> None:
+        """
+        Test if mdblobs can be decompressed, parsed and verified by worker processes.
+        """
+        db_path = Path(self.temporary_directory()) / "metadata.db"
+        metadata_store = MetadataStore(str(db_path), self.private_key(0), ingestion_processes=1)
+        with db_session:
+            md = metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20, torrent_date=int2time(1))
+            chunk, _ = entries_to_chunk([md], chunk_size=999999999999999)
+            md.delete()
+
+        results = await metadata_store.process_compressed_mdblob_threaded(chunk, skip_personal_metadata_payload=False)
+        metadata_store.shutdown()
+
+        self.assertEqual([ObjState.NEW_OBJECT], [r.obj_state for r in results])
+        self.assertEqual(1, metadata_store.ingestion_stats.verify.items)
+        self.assertEqual(1, metadata_store.ingestion_stats.write.items)
+
     @db_session
     def test_process_forbidden_null_key_payload(self) -> None:
         """
@@ -133,6 +314,24 @@ class TestMetadataStore(TestBase[MockCommunity]):
         result, = self.metadata_store.process_payload(payload)
         self.assertEqual(ObjState.DUPLICATE_OBJECT, result.obj_state)
 
+    @db_session
+    def test_process_verified_payload_simple_dicts(self) -> None:
+        """
+        Test if simple dicts are only created for new entries.
+        """
+        other_key = default_eccrypto.generate_key("curve25519")
+        md = self.metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20, id_=0, timestamp=0,
+                                                 torrent_date=int2time(0), public_key=other_key.key_to_bin())
+        payload = md.payload_class.from_signed_blob(md.serialized(other_key))
+        md.delete()
+
+        new_result, = self.metadata_store.process_verified_payload(payload)
+        duplicate_result, = self.metadata_store.process_verified_payload(payload)
+
+        self.assertEqual("test torrent", new_result.simple_dict["name"])
+        self.assertEqual(ObjState.DUPLICATE_OBJECT, duplicate_result.obj_state)
+        self.assertIsNone(duplicate_result.simple_dict)
+
     @db_session
     def test_process_external_payload_invalid_sig(self) -> None:
         """
@@ -210,3 +409,242 @@ class TestMetadataStore(TestBase[MockCommunity]):
         self.assertEqual(20, ordered1.size)
         self.assertEqual(10, ordered2.size)
         self.assertEqual(1, ordered3.size)
+
+    @db_session
+    def test_get_entries_txt_filter_ranked(self) -> None:
+        """
+        Test if text search results are ordered by their search rank.
+        """
+        for i, title in enumerate(["buck", "the big buck bunny movie", "big buck bunny", "bunny big buck"]):
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20, "title": title})
+
+        entries = self.metadata_store.get_entries(txt_filter='"big"* "buck"* "bunny"*')
+
+        self.assertEqual(["big buck bunny", "bunny big buck", "the big buck bunny movie"],
+                         [entry.title for entry in entries])
+
+    @db_session
+    def test_get_entries_txt_filter_ranked_page(self) -> None:
+        """
+        Test if the requested page of ranked text search results is returned.
+        """
+        for i, title in enumerate(["buck", "the big buck bunny movie", "big buck bunny", "bunny big buck"]):
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20, "title": title})
+
+        entries = self.metadata_store.get_entries(first=2, last=3, txt_filter='"big"* "buck"* "bunny"*')
+
+        self.assertEqual(["bunny big buck", "the big buck bunny movie"], [entry.title for entry in entries])
+
+    @db_session
+    def test_get_entries_page_cursor(self) -> None:
+        """
+        Test if the cursor of a page points to the start of the next page.
+        """
+        for i in range(5):
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20, "title": f"t{i}",
+                                                                   "size": i % 2})
+
+        page1, cursor = self.metadata_store.get_entries_page(first=1, last=3, sort_by="size")
+        page2, _ = self.metadata_store.get_entries_page(first=1, last=3, sort_by="size", cursor=cursor)
+
+        self.assertEqual(self.metadata_store.get_entries(sort_by="size"), page1 + page2)
+        self.assertEqual(3, len(page1))
+
+    @db_session
+    def test_get_entries_page_cursor_title(self) -> None:
+        """
+        Test if cursors work for case-insensitively sorted text columns.
+        """
+        for i, title in enumerate(["b", "A", "a", "B", "c"]):
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20, "title": title})
+
+        _, cursor = self.metadata_store.get_entries_page(first=1, last=2, sort_by="title", sort_desc=False)
+        page, _ = self.metadata_store.get_entries_page(first=1, last=2, sort_by="title", sort_desc=False,
+                                                       cursor=cursor)
+
+        self.assertEqual(["b", "B"], [entry.title for entry in page])
+
+    @db_session
+    def test_get_entries_page_cursor_ranked(self) -> None:
+        """
+        Test if cursors work for ranked text search results.
+        """
+        for i, title in enumerate(["buck", "the big buck bunny movie", "big buck bunny", "bunny big buck"]):
+            self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": bytes([i]) * 20, "title": title})
+
+        _, cursor = self.metadata_store.get_entries_page(first=1, last=1, txt_filter='"big"* "buck"* "bunny"*')
+        page, _ = self.metadata_store.get_entries_page(first=1, last=2, txt_filter='"big"* "buck"* "bunny"*',
+                                                       cursor=cursor)
+
+        self.assertEqual(["bunny big buck", "the big buck bunny movie"], [entry.title for entry in page])
+
+    @db_session
+    def test_get_entries_page_cursor_end(self) -> None:
+        """
+        Test if no cursor is given for an empty page.
+        """
+        self.assertEqual(([], None), self.metadata_store.get_entries_page(first=1, last=3))
+
+    @db_session
+    def test_get_entries_page_cursor_other_sort(self) -> None:
+        """
+        Test if a cursor cannot be used with a different sort order.
+        """
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "test"})
+        _, cursor = self.metadata_store.get_entries_page(first=1, last=3, sort_by="size")
+
+        with self.assertRaises(ValueError):
+            self.metadata_store.get_entries_page(first=1, last=3, sort_by="title", cursor=cursor)
+
+    @db_session
+    def test_get_entries_page_unsortable(self) -> None:
+        """
+        Test if entries cannot be paginated by an attribute that is not a sortable column.
+        """
+        with self.assertRaises(ValueError):
+            self.metadata_store.get_entries_page(first=1, last=3, sort_by="title) or (1")
+
+    @db_session
+    def test_get_search_results_cached(self) -> None:
+        """
+        Test if a repeated search is served from the search cache.
+        """
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "test"})
+
+        results1 = self.metadata_store.get_search_results(include_total=True, txt_filter='"test"')
+        results2 = self.metadata_store.get_search_results(include_total=True, txt_filter='"test"')
+
+        self.assertEqual(results1, results2)
+        self.assertEqual(1, results1[1])
+        self.assertEqual({"size": 1, "hits": 1, "misses": 1}, self.metadata_store.search_cache.get_stats())
+
+    @db_session
+    def test_get_search_results_insert(self) -> None:
+        """
+        Test if an insert invalidates the cached search results.
+        """
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "test"})
+        self.metadata_store.get_search_results(txt_filter='"test"')
+
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x02" * 20, "title": "test 2"})
+        results, _, _, _ = self.metadata_store.get_search_results(txt_filter='"test"')
+
+        self.assertEqual(2, len(results))
+        self.assertEqual(0, self.metadata_store.search_cache.get_stats()["hits"])
+
+    @db_session
+    def test_get_search_results_write_generation(self) -> None:
+        """
+        Test if a write that is signaled through the write generation invalidates the cached search results.
+        """
+        self.metadata_store.TorrentMetadata.add_ffa_from_dict({"infohash": b"\x01" * 20, "title": "test"})
+        self.metadata_store.get_search_results(txt_filter='"test"')
+
+        self.metadata_store.TorrentState.get(infohash=b"\x01" * 20).seeders = 42
+        self.metadata_store.increment_write_generation()
+        (result, ), _, _, _ = self.metadata_store.get_search_results(txt_filter='"test"')
+
+        self.assertEqual(42, result["num_seeders"])
+
+    async def test_pooled_connections_wal(self) -> None:
+        """
+        Test if a store with WAL mode enabled uses write-ahead logging and pooled, persistent connections.
+        """
+        db_path = Path(self.temporary_directory()) / "metadata.db"
+        metadata_store = MetadataStore(str(db_path), self.private_key(0), wal_mode=True, read_pool_size=1)
+        self.addCleanup(metadata_store.shutdown)
+
+        def get_journal_mode_and_thread() -> tuple[str, threading.Thread]:
+            with db_session:
+                return metadata_store.db.select("journal_mode FROM pragma_journal_mode")[0], threading.current_thread()
+
+        journal_mode, thread1 = await metadata_store.run_threaded(get_journal_mode_and_thread)
+        _, thread2 = await metadata_store.run_threaded(get_journal_mode_and_thread)
+        _, writer_thread = await metadata_store.run_threaded_write(get_journal_mode_and_thread)
+
+        self.assertEqual("wal", journal_mode)
+        self.assertEqual(thread1, thread2)
+        self.assertNotEqual(thread1, writer_thread)
+        self.assertTrue(thread1.name.startswith("MetadataStoreReader"))
+
+    def test_process_torrent_health_batch_add(self) -> None:
+        """
+        Test if unknown torrents are added and reported by a health batch.
+        """
+        added = self.metadata_store.process_torrent_health_batch([HealthInfo(b"\x01" * 20, 1, 2, 3),
+                                                                  HealthInfo(b"\x02" * 20, 4, 5, 6)])
+
+        with db_session:
+            health = self.metadata_store.TorrentState.get(infohash=b"\x02" * 20).to_health()
+        self.assertEqual({b"\x01" * 20, b"\x02" * 20}, added)
+        self.assertEqual((4, 5, 6), (health.seeders, health.leechers, health.last_check))
+
+    def test_process_torrent_health_batch_update(self) -> None:
+        """
+        Test if known torrents are updated but not reported by a health batch.
+        """
+        self.metadata_store.process_torrent_health_batch([HealthInfo(b"\x01" * 20, 1, 2, 3)])
+
+        added = self.metadata_store.process_torrent_health_batch([HealthInfo(b"\x01" * 20, 7, 8, 9)])
+
+        with db_session:
+            health = self.metadata_store.TorrentState.get(infohash=b"\x01" * 20).to_health()
+            count = self.metadata_store.TorrentState.select().count()
+        self.assertEqual(set(), added)
+        self.assertEqual(1, count)
+        self.assertEqual((7, 8, 9), (health.seeders, health.leechers, health.last_check))
+
+    def test_process_torrent_health_batch_duplicates(self) -> None:
+        """
+        Test if only the best of multiple health infos for the same torrent is stored.
+        """
+        added = self.metadata_store.process_torrent_health_batch([HealthInfo(b"\x01" * 20, 1, 2, 3),
+                                                                  HealthInfo(b"\x01" * 20, 7, 8, 9000)])
+
+        with db_session:
+            health = self.metadata_store.TorrentState.get(infohash=b"\x01" * 20).to_health()
+        self.assertEqual({b"\x01" * 20}, added)
+        self.assertEqual((7, 8, 9000), (health.seeders, health.leechers, health.last_check))
+
+    def test_process_torrent_health_batch_same_session(self) -> None:
+        """
+        Test if the added torrent states are known to the ORM within the same session.
+        """
+        with db_session:
+            self.metadata_store.process_torrent_health_batch([HealthInfo(b"\x01" * 20, 1, 2, 3)])
+            state = self.metadata_store.TorrentState.get(infohash=b"\x01" * 20)
+            metadata = self.metadata_store.TorrentMetadata(title="test", infohash=b"\x01" * 20)
+
+            self.assertIs(state, metadata.health)
+
+    def test_process_torrent_health_batch_invalid(self) -> None:
+        """
+        Test if invalid health infos are ignored.
+        """
+        added = self.metadata_store.process_torrent_health_batch([HealthInfo(b"\x01" * 20, -1, 2, 3)])
+
+        with db_session:
+            count = self.metadata_store.TorrentState.select().count()
+        self.assertEqual(set(), added)
+        self.assertEqual(0, count)
+
+    @db_session
+    def test_get_unknown_infohashes(self) -> None:
+        """
+        Test if only the infohashes without torrent metadata are unknown.
+        """
+        self.metadata_store.TorrentMetadata(title="test torrent", infohash=b"\x01" * 20)
+        self.metadata_store.TorrentState(infohash=b"\x02" * 20)
+
+        unknown = self.metadata_store.get_unknown_infohashes({b"\x01" * 20, b"\x02" * 20, b"\x03" * 20})
+
+        self.assertEqual({b"\x02" * 20, b"\x03" * 20}, unknown)
+
+    def test_pooled_connections_memory(self) -> None:
+        """
+        Test if in-memory stores never use pooled connections.
+        """
+        metadata_store = MetadataStore(":memory:", self.private_key(0), wal_mode=True)
+
+        self.assertFalse(metadata_store.pooled_connections)
+        self.assertIsNone(metadata_store.read_executor)
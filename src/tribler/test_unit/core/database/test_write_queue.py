@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable
+from unittest.mock import Mock, call
+
+from ipv8.test.base import TestBase
+from pony.orm import Database
+
+from tribler.core.database.write_queue import WriteOperation, WriteQueue
+
+
+def fail() -> None:
+    """
+    Raise an error, like a write that violates a constraint.
+    """
+    msg = "Failed write"
+    raise ValueError(msg)
+
+
+class TestWriteQueue(TestBase):
+    """
+    Tests for the WriteQueue class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a new write queue for an in-memory database.
+        """
+        super().setUp()
+        self.write_queue = WriteQueue(Database("sqlite", ":memory:"))
+
+    async def tearDown(self) -> None:
+        """
+        Stop the writer thread.
+        """
+        self.write_queue.shutdown()
+        await super().tearDown()
+
+    def queue_operations(self, *funcs: Callable) -> list[WriteOperation]:
+        """
+        Put operations on the queue without starting the writer thread.
+        """
+        operations = [WriteOperation(func, (), {}) for func in funcs]
+        for operation in operations:
+            self.write_queue.queue.put(operation)
+        return operations
+
+    def test_commit_group(self) -> None:
+        """
+        Test if queued operations are committed in a single transaction.
+        """
+        operation, *queued = self.queue_operations(lambda: 1, lambda: 2, lambda: 3)
+
+        self.write_queue.commit_group(self.write_queue.queue.get())
+
+        self.assertEqual([1, 2, 3], [op.future.result() for op in [operation, *queued]])
+        self.assertEqual(3, self.write_queue.operations_committed)
+        self.assertEqual(1, self.write_queue.transactions_committed)
+
+    def test_commit_group_size_limit(self) -> None:
+        """
+        Test if a group does not exceed the maximum group size.
+        """
+        self.write_queue.max_group_size = 2
+        operations = self.queue_operations(lambda: 1, lambda: 2, lambda: 3)
+
+        self.write_queue.commit_group(self.write_queue.queue.get())
+
+        self.assertEqual([True, True, False], [op.future.done() for op in operations])
+        self.assertEqual(1, self.write_queue.transactions_committed)
+
+    def test_commit_group_cancelled(self) -> None:
+        """
+        Test if cancelled operations are not called.
+        """
+        operations = self.queue_operations(lambda: 1, fail)
+        operations[1].future.cancel()
+
+        self.write_queue.commit_group(self.write_queue.queue.get())
+
+        self.assertEqual(1, operations[0].future.result())
+        self.assertEqual(1, self.write_queue.operations_committed)
+
+    def test_commit_group_failure(self) -> None:
+        """
+        Test if a failing operation is retried separately and does not fail the rest of its group.
+        """
+        operations = self.queue_operations(lambda: 1, lambda: 2, fail)
+
+        self.write_queue.commit_group(self.write_queue.queue.get())
+
+        self.assertEqual(1, operations[0].future.result())
+        self.assertEqual(2, operations[1].future.result())
+        self.assertIsInstance(operations[2].future.exception(), ValueError)
+        self.assertEqual(2, self.write_queue.transactions_committed)
+
+    def test_listeners(self) -> None:
+        """
+        Test if listeners are told about the start and the commit of a transaction.
+        """
+        listener = Mock()
+        self.write_queue.add_listener(listener)
+        self.queue_operations(lambda: 1)
+
+        self.write_queue.commit_group(self.write_queue.queue.get())
+
+        self.assertEqual([call.on_transaction_start(), call.on_transaction_end(True)], listener.method_calls)
+
+    def test_listeners_failure(self) -> None:
+        """
+        Test if listeners are told about the rollback of a failed group and the transactions of its retries.
+        """
+        listener = Mock()
+        self.write_queue.add_listener(listener)
+        self.queue_operations(lambda: 1, fail)
+
+        self.write_queue.commit_group(self.write_queue.queue.get())
+
+        self.assertEqual([False, True, False],
+                         [c.args[0] for c in listener.method_calls if c[0] == "on_transaction_end"])
+
+    def test_next_operation_stop(self) -> None:
+        """
+        Test if the stop signal is left on the queue when it ends a group.
+        """
+        self.write_queue.queue.put(None)
+
+        self.assertIsNone(self.write_queue.next_operation())
+        self.assertIsNone(self.write_queue.queue.get_nowait())
+
+    async def test_run(self) -> None:
+        """
+        Test if operations are run on the writer thread.
+        """
+        thread = await self.write_queue.run(threading.current_thread)
+
+        self.assertEqual("MetadataStoreWriter", thread.name)
+        self.assertNotEqual(threading.current_thread(), thread)
+
+    async def test_run_failure(self) -> None:
+        """
+        Test if the exception of a failing operation is raised to the caller.
+        """
+        with self.assertRaises(ValueError):
+            await self.write_queue.run(fail)
+
+    async def test_shutdown(self) -> None:
+        """
+        Test if no more operations can be submitted after the writer thread is stopped.
+        """
+        await self.write_queue.run(lambda: None)
+
+        self.write_queue.shutdown()
+
+        self.assertFalse(self.write_queue.thread.is_alive())
+        with self.assertRaises(RuntimeError):
+            self.write_queue.submit(lambda: None)
@@ -1,4 +1,4 @@
-from asyncio import Future
+from asyncio import Future, sleep
 from binascii import unhexlify
 from unittest.mock import Mock
 
@@ -52,6 +52,109 @@ class TestDHTHealthManager(TestBase):
         self.assertEqual(lookup_future, self.manager.get_health(b"a" * 20, timeout=0.01))
         await lookup_future
 
+    async def test_get_health_batch(self) -> None:
+        """
+        Test if the health of many trackerless torrents can be fetched at once.
+        """
+        health_list = await self.manager.get_health_batch([b"a" * 20, b"b" * 20], timeout=0.01)
+
+        self.assertEqual([b"a" * 20, b"b" * 20], [health.infohash for health in health_list])
+        self.assertEqual(2, self.manager.lt_session.dht_get_peers.call_count)
+
+    async def test_dispatch_window(self) -> None:
+        """
+        Test if no more than the max number of lookups are started per window.
+        """
+        self.manager.max_lookups_per_window = 2
+        self.manager.dispatch_interval = 10
+
+        for i in range(5):
+            self.manager.get_health(bytes([i]) * 20, timeout=10)
+        await sleep(0)
+
+        self.assertEqual(2, self.manager.lt_session.dht_get_peers.call_count)
+        self.assertEqual(3, len(self.manager.queue))
+        self.assertTrue(self.manager.dispatch_scheduled)
+
+    async def test_dispatch_window_next(self) -> None:
+        """
+        Test if queued lookups are started in the next window.
+        """
+        self.manager.max_lookups_per_window = 2
+        self.manager.dispatch_interval = 0.01
+
+        health_list = await self.manager.get_health_batch([bytes([i]) * 20 for i in range(5)], timeout=0.01)
+
+        self.assertEqual(5, len(health_list))
+        self.assertEqual(5, self.manager.lt_session.dht_get_peers.call_count)
+        self.assertEqual(0, len(self.manager.queue))
+
+    async def test_finalize_lookup(self) -> None:
+        """
+        Test if finalizing a lookup estimates the health from the received bloom filters.
+        """
+        infohash = b"a" * 20
+        lookup_future = self.manager.get_health(infohash, timeout=10)
+        self.manager.requesting_bloomfilters("1", infohash)
+        self.manager.received_bloomfilters("1", bf_seeds=TestDHTHealthManager.bf_contents,
+                                           bf_peers=bytearray(b"\xff" * 256))
+
+        self.manager.finalize_lookup(infohash)
+        health = await lookup_future
+
+        self.assertEqual(1224, health.seeders)
+        self.assertEqual(6000, health.leechers)
+        self.assertEqual({}, self.manager.outstanding)
+        self.assertEqual({}, self.manager.transactions)
+
+    def test_requesting_bloomfilters_index(self) -> None:
+        """
+        Test if the transactions of a lookup are indexed by infohash.
+        """
+        self.manager.lookup_futures[b"a" * 20] = Future()
+
+        self.manager.requesting_bloomfilters("1", b"a" * 20)
+        self.manager.requesting_bloomfilters("2", b"a" * 20)
+
+        self.assertEqual({"1", "2"}, self.manager.transactions[b"a" * 20])
+        self.assertEqual({"1": b"a" * 20, "2": b"a" * 20}, self.manager.outstanding)
+
+    def test_requesting_bloomfilters_reused(self) -> None:
+        """
+        Test if a transaction id that is reused for an uninteresting infohash is forgotten.
+        """
+        self.manager.lookup_futures[b"a" * 20] = Future()
+        self.manager.requesting_bloomfilters("1", b"a" * 20)
+
+        self.manager.requesting_bloomfilters("1", b"b" * 20)
+
+        self.assertEqual({}, self.manager.outstanding)
+        self.assertEqual(set(), self.manager.transactions[b"a" * 20])
+
+    def test_receive_bloomfilters_invalid_size(self) -> None:
+        """
+        Test if bloom filters of an invalid size are ignored.
+        """
+        infohash = b"a" * 20
+        self.manager.lookup_futures[infohash] = Future()
+        self.manager.bf_seeders[infohash] = 0
+        self.manager.bf_peers[infohash] = 0
+        self.manager.requesting_bloomfilters("1", infohash)
+
+        self.manager.received_bloomfilters("1", bf_seeds=b"\xff" * 10, bf_peers=b"\xff" * 256)
+
+        self.assertEqual(0, self.manager.bf_seeders[infohash])
+        self.assertEqual(0, self.manager.bf_peers[infohash])
+
+    def test_get_size_from_bloom_filter_int(self) -> None:
+        """
+        Test if the size estimate of a bloom filter is the same for its bytes and its integer.
+        """
+        bf = TestDHTHealthManager.bf_contents
+
+        self.assertEqual(self.manager.get_size_from_bloomfilter(bf),
+                         self.manager.get_size_from_bloomfilter(int.from_bytes(bf, "big")))
+
     async def test_combine_bloom_filters_equal(self) -> None:
         """
         Test if two bloom equal filters can be combined.
@@ -103,13 +206,13 @@ class TestDHTHealthManager(TestBase):
         """
         infohash = b"a" * 20
         self.manager.lookup_futures[infohash] = Future()
-        self.manager.bf_seeders[infohash] = bytearray(256)
-        self.manager.bf_peers[infohash] = bytearray(256)
+        self.manager.bf_seeders[infohash] = 0
+        self.manager.bf_peers[infohash] = 0
         self.manager.requesting_bloomfilters("1", infohash)
 
         self.manager.received_bloomfilters("1",
                                            bf_seeds=bytearray(b"\xee" * 256),
                                            bf_peers=bytearray(b"\xff" * 256))
 
-        self.assertEqual(bytearray(b"\xee" * 256), self.manager.bf_seeders[infohash])
-        self.assertEqual(bytearray(b"\xff" * 256), self.manager.bf_peers[infohash])
+        self.assertEqual(int.from_bytes(b"\xee" * 256, "big"), self.manager.bf_seeders[infohash])
+        self.assertEqual(int.from_bytes(b"\xff" * 256, "big"), self.manager.bf_peers[infohash])
@@ -11,7 +11,12 @@ from ipv8.util import succeed
 from validate import Validator
 
 import tribler
-from tribler.core.libtorrent.download_manager.download import Download, IllegalFileIndex, SaveResumeDataError
+from tribler.core.libtorrent.download_manager.download import (
+    DOWNLOAD_ALERT_TYPES,
+    Download,
+    IllegalFileIndex,
+    SaveResumeDataError,
+)
 from tribler.core.libtorrent.download_manager.download_config import SPEC_CONTENT, DownloadConfig
 from tribler.core.libtorrent.torrentdef import TorrentDef, TorrentDefNoMetainfo
 from tribler.core.notifier import Notification, Notifier
@@ -57,6 +62,15 @@ class TestDownload(TestBase):
 
         self.assertIsNone(download.get_magnet_link())
 
+    def test_download_alert_types(self) -> None:
+        """
+        Test if the download manager routes all alerts that a download handles or waits for to the download.
+        """
+        download = Download(TorrentDef.load_from_memory(TORRENT_WITH_DIRS_CONTENT), None, checkpoint_disabled=True,
+                            config=self.create_mock_download_config())
+
+        self.assertLessEqual(set(download.alert_handlers) | set(download.futures), DOWNLOAD_ALERT_TYPES)
+
     def test_download_get_atp(self) -> None:
         """
         Test if the atp can be retrieved from a download.
@@ -1,20 +1,26 @@
 import asyncio
 import functools
+import time
 from asyncio import Future, ensure_future, sleep
 from binascii import hexlify
 from io import StringIO
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, Mock, call, patch
 
+import libtorrent
 from configobj import ConfigObj
 from configobj.validate import Validator, VdtParamError
 from ipv8.test.base import TestBase
 from ipv8.util import succeed
 
 import tribler
-from tribler.core.libtorrent.download_manager.download import Download
+from tribler.core.libtorrent.download_manager.download import DOWNLOAD_ALERT_TYPES, Download
 from tribler.core.libtorrent.download_manager.download_config import SPEC_CONTENT, DownloadConfig
-from tribler.core.libtorrent.download_manager.download_manager import DownloadManager, MetainfoLookup
+from tribler.core.libtorrent.download_manager.download_manager import (
+    ALERT_CATEGORIES,
+    DownloadManager,
+    MetainfoLookup,
+)
 from tribler.core.libtorrent.download_manager.download_state import DownloadState
 from tribler.core.libtorrent.torrentdef import TorrentDef, TorrentDefNoMetainfo
 from tribler.core.notifier import Notifier
@@ -498,3 +504,151 @@ class TestDownloadManager(TestBase):
         self.manager.set_upload_rate_limit(42)
 
         self.assertEqual(42, self.manager.get_upload_rate_limit())
+
+    def test_alert_handler_table(self) -> None:
+        """
+        Test if alerts go to the handler of their type.
+        """
+        handler = Mock()
+        self.manager.register_alert_handler("test_alert", handler)
+        alert = type("test_alert", (object,), {})()
+
+        self.manager.process_alert(alert, hops=2)
+
+        handler.assert_called_once_with(alert, 2)
+
+    def test_alert_handler_download_types(self) -> None:
+        """
+        Test if handled alerts of the types that downloads handle also go to their download.
+        """
+        download = Mock(handle=Mock(is_valid=Mock(return_value=True)))
+        self.manager.downloads[b"\x01" * 20] = download
+        handle = Mock(info_hash=Mock(return_value=Mock(to_bytes=Mock(return_value=b"\x01" * 20))))
+        alert = type("state_changed_alert", (object,), {"handle": handle})()
+
+        self.manager.process_alert(alert)
+
+        download.update_lt_status.assert_called_once_with(handle.status())
+        download.process_alert.assert_called_once_with(alert, "state_changed_alert")
+
+    def test_alert_handler_skip_download(self) -> None:
+        """
+        Test if handled alerts of types that downloads do not handle do not look up a download.
+        """
+        handle = Mock()
+        alert = type("peer_disconnected_alert", (object,), {"handle": handle, "pid": Mock()})()
+
+        self.manager.process_alert(alert)
+
+        handle.is_valid.assert_not_called()
+
+    def test_alert_stats(self) -> None:
+        """
+        Test if the number of processed alerts is counted by type.
+        """
+        self.manager.register_alert_handler("test_alert", Mock())
+        alert_type = type("test_alert", (object,), {})
+
+        self.manager.process_alert(alert_type())
+        self.manager.process_alert(alert_type())
+
+        self.assertEqual(2, self.manager.get_alert_stats()["test_alert"].count)
+        self.assertGreaterEqual(self.manager.get_alert_stats()["test_alert"].time, 0)
+
+    def test_alert_categories_known(self) -> None:
+        """
+        Test if the categories of all handled alerts are known.
+        """
+        self.assertLessEqual(set(self.manager.alert_handlers), set(ALERT_CATEGORIES))
+        self.assertLessEqual(DOWNLOAD_ALERT_TYPES, set(ALERT_CATEGORIES))
+
+    def test_alert_mask_dht_health_manager(self) -> None:
+        """
+        Test if only the session without hops posts DHT packets, once there is a DHT health manager.
+        """
+        dht_log = int(libtorrent.alert.category_t.dht_log_notification)
+        self.assertFalse(self.manager.get_alert_mask(0) & dht_log)
+
+        self.manager.dht_health_manager = Mock()
+
+        self.assertTrue(self.manager.get_alert_mask(0) & dht_log)
+        self.assertFalse(self.manager.get_alert_mask(1) & dht_log)
+        self.manager.ltsessions[0].set_alert_mask.assert_called_with(self.manager.get_alert_mask(0))
+
+    def test_alert_mask_unregister(self) -> None:
+        """
+        Test if the sessions stop posting alerts that no longer have a handler.
+        """
+        self.manager.dht_health_manager = Mock()
+        self.manager.dht_health_manager = None
+
+        self.assertNotIn("dht_pkt_alert", self.manager.alert_handlers)
+        self.assertFalse(self.manager.get_alert_mask(0) & int(libtorrent.alert.category_t.dht_log_notification))
+
+    def test_dht_pkt_alert_skip(self) -> None:
+        """
+        Test if DHT packets that are not about BEP33 scrapes are not decoded.
+        """
+        self.manager.dht_health_manager = Mock()
+        alert = type("dht_pkt_alert", (object,), {"pkt_buf": libtorrent.bencode({b"y": b"q", b"q": b"ping"})})()
+
+        with patch.object(libtorrent, "bdecode") as bdecode:
+            self.manager.process_alert(alert)
+
+        bdecode.assert_not_called()
+
+    def test_dht_pkt_alert_request(self) -> None:
+        """
+        Test if outgoing BEP33 scrape requests are passed to the DHT health manager.
+        """
+        self.manager.dht_health_manager = Mock()
+        packet = libtorrent.bencode({b"t": b"ab", b"y": b"q", b"q": b"get_peers",
+                                     b"a": {b"info_hash": b"\x01" * 20, b"scrape": 1}})
+        alert = type("dht_pkt_alert", (object,), {"pkt_buf": packet, "__str__": lambda _: "==> get_peers"})()
+
+        self.manager.process_alert(alert)
+
+        self.manager.dht_health_manager.requesting_bloomfilters.assert_called_once_with(b"ab", b"\x01" * 20)
+
+    def test_dht_pkt_alert_response(self) -> None:
+        """
+        Test if incoming BEP33 bloom filters are passed to the DHT health manager.
+        """
+        self.manager.dht_health_manager = Mock()
+        packet = libtorrent.bencode({b"t": b"ab", b"y": b"r", b"r": {b"BFsd": b"\x01" * 256, b"BFpe": b"\x02" * 256}})
+        alert = type("dht_pkt_alert", (object,), {"pkt_buf": packet, "__str__": lambda _: "<== response"})()
+
+        self.manager.process_alert(alert)
+
+        self.manager.dht_health_manager.received_bloomfilters.assert_called_once_with(
+            b"ab", bytearray(b"\x01" * 256), bytearray(b"\x02" * 256))
+
+    async def test_process_alerts_budget(self) -> None:
+        """
+        Test if alerts that do not fit in the budget of a tick wait for the next tick, without popping new alerts.
+        """
+        handler = Mock(side_effect=lambda alert, hops: time.sleep(0.01))
+        self.manager.register_alert_handler("test_alert", handler)
+        alerts = [type("test_alert", (object,), {})() for _ in range(5)]
+        self.manager.ltsessions = {0: Mock(pop_alerts=Mock(return_value=alerts))}
+
+        await self.manager.process_alerts(tick_budget=0.02, chunk_budget=0.01)
+        processed = handler.call_count
+        await self.manager.process_alerts(tick_budget=0.02, chunk_budget=0.01)
+
+        self.assertLess(processed, 5)
+        self.assertEqual(1, self.manager.ltsessions[0].pop_alerts.call_count)
+
+    async def test_process_alerts_error(self) -> None:
+        """
+        Test if an alert that fails to process does not stop the processing of the other alerts.
+        """
+        handler = Mock(side_effect=[RuntimeError, None])
+        self.manager.register_alert_handler("test_alert", handler)
+        alert_type = type("test_alert", (object,), {})
+        self.manager.ltsessions = {0: Mock(pop_alerts=Mock(return_value=[alert_type(), alert_type()]))}
+
+        await self.manager.process_alerts()
+
+        self.assertEqual(2, handler.call_count)
+        self.assertEqual(0, len(self.manager.alert_queues[0]))
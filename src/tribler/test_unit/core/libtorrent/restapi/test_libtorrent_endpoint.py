@@ -4,6 +4,7 @@ from unittest.mock import Mock
 
 from ipv8.test.base import TestBase
 
+from tribler.core.libtorrent.download_manager.download_manager import AlertStats
 from tribler.core.libtorrent.restapi.libtorrent_endpoint import LibTorrentEndpoint
 from tribler.test_unit.base_restapi import MockRequest, response_to_json
 
@@ -32,6 +33,18 @@ class GetLibtorrentSessionInfoRequest(MockRequest):
         super().__init__(query, "GET", "/libtorrent/session")
 
 
+class GetLibtorrentAlertStatsRequest(MockRequest):
+    """
+    A MockRequest that mimics GetLibtorrentAlertStatsRequests.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a new GetLibtorrentAlertStatsRequest.
+        """
+        super().__init__({}, "GET", "/libtorrent/alerts")
+
+
 class TestLibTorrentEndpoint(TestBase):
     """
     Tests for the LibTorrentEndpoint class.
@@ -143,3 +156,17 @@ class TestLibTorrentEndpoint(TestBase):
         self.assertEqual(200, response.status)
         self.assertEqual(0, response_body_json["hop"])
         self.assertEqual("test", response_body_json["session"]["test"])
+
+    async def test_get_alert_stats(self) -> None:
+        """
+        Test if the alert statistics of the download manager are returned with the number of queued alerts.
+        """
+        self.download_manager.get_alert_stats = Mock(return_value={"state_update_alert": AlertStats(3, 0.5)})
+        self.download_manager.alert_queues = {0: [Mock(), Mock()], 1: [Mock()]}
+
+        response = await self.endpoint.get_libtorrent_alert_stats(GetLibtorrentAlertStatsRequest())
+        response_body_json = await response_to_json(response)
+
+        self.assertEqual(200, response.status)
+        self.assertEqual({"state_update_alert": {"count": 3, "time": 0.5}}, response_body_json["alerts"])
+        self.assertEqual(3, response_body_json["queued"])
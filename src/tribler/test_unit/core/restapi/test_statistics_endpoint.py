@@ -51,13 +51,31 @@ class TestStatisticsEndpoint(TestBase):
         Test if getting Tribler stats forwards MetadataStore statistics.
         """
         endpoint = StatisticsEndpoint()
-        endpoint.mds = Mock(get_db_file_size=Mock(return_value=42), get_num_torrents=Mock(return_value=7))
+        endpoint.mds = Mock(get_db_file_size=Mock(return_value=42), get_num_torrents=Mock(return_value=7),
+                            search_cache=Mock(get_stats=Mock(return_value={"size": 1, "hits": 2, "misses": 3})),
+                            ingestion_stats=Mock(to_dict=Mock(return_value={"rejected": 4})))
 
         response = endpoint.get_tribler_stats(TriblerStatsRequest())
         response_body_json = await response_to_json(response)
 
         self.assertEqual(42, response_body_json["tribler_statistics"]["db_size"])
         self.assertEqual(7, response_body_json["tribler_statistics"]["num_torrents"])
+        self.assertEqual(2, response_body_json["tribler_statistics"]["search_cache"]["hits"])
+        self.assertEqual(4, response_body_json["tribler_statistics"]["ingestion"]["rejected"])
+
+    async def test_get_tribler_stats_with_community(self) -> None:
+        """
+        Test if getting Tribler stats forwards the remote query statistics of the content discovery community.
+        """
+        endpoint = StatisticsEndpoint()
+        endpoint.content_discovery_community = Mock(query_scheduler=Mock(get_stats=Mock(return_value={"running": 1})),
+                                                    response_cache=Mock(get_stats=Mock(return_value={"hits": 2})))
+
+        response = endpoint.get_tribler_stats(TriblerStatsRequest())
+        response_body_json = await response_to_json(response)
+
+        self.assertEqual(1, response_body_json["tribler_statistics"]["remote_queries"]["running"])
+        self.assertEqual(2, response_body_json["tribler_statistics"]["response_cache"]["hits"])
 
     async def test_get_ipv8_stats_no_ipv8(self) -> None:
         """
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import itertools
 from typing import TYPE_CHECKING, Callable, Iterator, Set
 
 from tribler.core.torrent_checker.dataclasses import HealthInfo
@@ -99,20 +100,25 @@ class MockTrackerState(MockEntity):
     """
 
     instances = []
+    rowids = itertools.count(1)
 
-    def __init__(self, url: str = "", last_check: int = 0, alive: bool = True, torrents: Set | None = None,
-                 failures: int = 0) -> None:
+    def __init__(self, url: str = "", *, last_check: int = 0, alive: bool = True,  # noqa: PLR0913
+                 torrents: Set | None = None, failures: int = 0, latency: float = 0, latency_deviation: float = 0,
+                 success_rate: float = 1) -> None:
         """
         Create a new MockTrackerState and add it to our known instances.
         """
         self.__class__.instances.append(self)
 
-        self.rowid = 0
+        self.rowid = next(self.rowids)
         self.url = url
         self.last_check = last_check
         self.alive = alive
         self.torrents = torrents or set()
         self.failures = failures
+        self.latency = latency
+        self.latency_deviation = latency_deviation
+        self.success_rate = success_rate
 
 
 class MockTorrentState(MockEntity):
@@ -122,8 +128,8 @@ class MockTorrentState(MockEntity):
 
     instances = []
 
-    def __init__(self, infohash: bytes = b"", seeders: int = 0, leechers: int = 0, last_check: int = 0,  # noqa: PLR0913
-                 self_checked: bool = False, has_data: bool = True, metadata: Set | None = None,
+    def __init__(self, infohash: bytes = b"", seeders: int = 0, *, leechers: int = 0,  # noqa: PLR0913
+                 last_check: int = 0, self_checked: bool = False, has_data: bool = True, metadata: Set | None = None,
                  trackers: Set | None = None) -> None:
         """
         Create a new MockTrackerState and add it to our known instances.
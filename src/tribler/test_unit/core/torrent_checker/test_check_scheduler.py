@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import time
+from unittest.mock import AsyncMock, Mock
+
+from ipv8.test.base import TestBase
+
+from tribler.core.libtorrent.trackers import is_valid_url
+from tribler.core.torrent_checker.check_scheduler import DHT_GROUP, HealthCheckScheduler, check_priority
+from tribler.core.torrent_checker.torrentchecker_session import MAX_INFOHASHES_IN_SCRAPE
+from tribler.test_unit.core.torrent_checker.mocks import MockTorrentState, MockTrackerState
+
+
+class TestHealthCheckScheduler(TestBase):
+    """
+    Tests for the HealthCheckScheduler class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a new scheduler for a mocked torrent checker.
+        """
+        super().setUp()
+        self.torrent_checker = Mock(mds=Mock(TorrentState=MockTorrentState()),
+                                    is_blacklisted_tracker=Mock(return_value=False),
+                                    is_valid_tracker=Mock(side_effect=is_valid_url))
+        MockTorrentState.instances = []
+        MockTrackerState.instances = []
+        self.scheduler = HealthCheckScheduler(self.torrent_checker, pool_size=10, round_size=3, max_dht_checks=1)
+
+    def test_check_priority(self) -> None:
+        """
+        Test if more stale and more popular torrents have a higher priority.
+        """
+        self.assertGreater(check_priority(0, 0, 0, 100), check_priority(0, 0, 50, 100))
+        self.assertGreater(check_priority(10, 0, 50, 100), check_priority(0, 0, 50, 100))
+
+    def test_pop_priority(self) -> None:
+        """
+        Test if infohashes are taken from the queue by priority.
+        """
+        self.scheduler.push(b"low", 1.0)
+        self.scheduler.push(b"high", 2.0)
+
+        self.assertEqual([b"high", b"low"], self.scheduler.pop(5))
+
+    def test_push_duplicate(self) -> None:
+        """
+        Test if infohashes are queued only once.
+        """
+        self.scheduler.push(b"a", 1.0)
+
+        self.assertFalse(self.scheduler.push(b"a", 2.0))
+        self.assertEqual([b"a"], self.scheduler.pop(5))
+
+    def test_refill_stale(self) -> None:
+        """
+        Test if only torrents with stale health are queued.
+        """
+        MockTorrentState(b"\x01" * 20, last_check=0)
+        MockTorrentState(b"\x02" * 20, last_check=int(time.time()))
+
+        added = self.scheduler.refill()
+
+        self.assertEqual(1, added)
+        self.assertEqual([b"\x01" * 20], self.scheduler.pop(5))
+
+    def test_group_shared_tracker(self) -> None:
+        """
+        Test if torrents that share a tracker are scraped together.
+        """
+        shared = MockTrackerState("http://shared.com/announce")
+        other = MockTrackerState("http://other.com/announce")
+        MockTorrentState(b"\x01" * 20, trackers={shared, other})
+        MockTorrentState(b"\x02" * 20, trackers={shared})
+
+        groups = self.scheduler.group_by_tracker([b"\x01" * 20, b"\x02" * 20])
+
+        self.assertEqual({"http://shared.com/announce": [b"\x01" * 20, b"\x02" * 20]}, groups)
+
+    def test_group_max_infohashes(self) -> None:
+        """
+        Test if a scrape holds no more infohashes than a tracker accepts.
+        """
+        tracker = MockTrackerState("http://tracker.com/announce")
+        infohashes = [i.to_bytes(20, "big") for i in range(MAX_INFOHASHES_IN_SCRAPE + 1)]
+        for infohash in infohashes:
+            MockTorrentState(infohash, trackers={tracker})
+
+        groups = self.scheduler.group_by_tracker(infohashes)
+
+        self.assertEqual(infohashes[:MAX_INFOHASHES_IN_SCRAPE], groups["http://tracker.com/announce"])
+
+    def test_group_dht(self) -> None:
+        """
+        Test if torrents without usable trackers are checked through the DHT, up to the limit.
+        """
+        dead = MockTrackerState("http://dead.com/announce", alive=False)
+        MockTorrentState(b"\x01" * 20, trackers={dead})
+        MockTorrentState(b"\x02" * 20)
+
+        groups = self.scheduler.group_by_tracker([b"\x01" * 20, b"\x02" * 20])
+
+        self.assertEqual({DHT_GROUP: [b"\x01" * 20]}, groups)
+
+    def test_group_blacklisted(self) -> None:
+        """
+        Test if blacklisted trackers are not scraped.
+        """
+        MockTorrentState(b"\x01" * 20, trackers={MockTrackerState("http://blacklisted.com/announce")})
+        self.torrent_checker.is_blacklisted_tracker = Mock(return_value=True)
+
+        self.assertEqual({DHT_GROUP: [b"\x01" * 20]}, self.scheduler.group_by_tracker([b"\x01" * 20]))
+
+    async def test_run_round(self) -> None:
+        """
+        Test if a round checks the torrents with the highest priority.
+        """
+        self.torrent_checker.check_torrents_health = AsyncMock(return_value={})
+        for i in range(4):
+            MockTorrentState(bytes([i]) * 20, seeders=i)
+
+        await self.scheduler.run_round()
+
+        self.assertEqual([bytes([i]) * 20 for i in (3, 2, 1)],
+                         self.torrent_checker.check_torrents_health.call_args.args[0])
+        self.assertEqual([bytes([0]) * 20], self.scheduler.pop(5))
+
+    async def test_run_round_nothing_due(self) -> None:
+        """
+        Test if a round without due torrents checks nothing.
+        """
+        self.torrent_checker.check_torrents_health = AsyncMock()
+
+        self.assertEqual({}, await self.scheduler.run_round())
+        self.torrent_checker.check_torrents_health.assert_not_called()
@@ -0,0 +1,186 @@
+import asyncio
+import socket
+import time
+from asyncio import ensure_future, gather, get_running_loop, sleep
+from unittest.mock import AsyncMock, patch
+
+from ipv8.test.base import TestBase
+
+from tribler.core.torrent_checker.dns_cache import CachedResolver, DNSCache
+
+
+def addrinfo(*addresses: str) -> list:
+    """
+    Create the getaddrinfo result for the given IPv4 addresses.
+    """
+    return [(socket.AF_INET, socket.SOCK_DGRAM, 17, "", (address, 0)) for address in addresses]
+
+
+class TestDNSCache(TestBase):
+    """
+    Tests for the DNSCache class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a new cache.
+        """
+        super().setUp()
+        self.cache = DNSCache(ttl=100, negative_ttl=10)
+
+    async def test_resolve(self) -> None:
+        """
+        Test if a hostname is resolved to its (unique) addresses.
+        """
+        with patch.object(get_running_loop(), "getaddrinfo", AsyncMock(return_value=addrinfo("1.2.3.4", "1.2.3.4",
+                                                                                              "5.6.7.8"))):
+            addresses = await self.cache.resolve("tracker.test")
+
+        self.assertEqual(["1.2.3.4", "5.6.7.8"], addresses)
+
+    async def test_resolve_cached(self) -> None:
+        """
+        Test if a resolved hostname is not resolved again before it expires.
+        """
+        getaddrinfo = AsyncMock(return_value=addrinfo("1.2.3.4"))
+        with patch.object(get_running_loop(), "getaddrinfo", getaddrinfo):
+            await self.cache.resolve("tracker.test")
+            addresses = await self.cache.resolve("tracker.test")
+
+        self.assertEqual(["1.2.3.4"], addresses)
+        self.assertEqual(1, getaddrinfo.call_count)
+
+    async def test_resolve_expired(self) -> None:
+        """
+        Test if a resolved hostname is resolved again after it expires.
+        """
+        getaddrinfo = AsyncMock(side_effect=[addrinfo("1.2.3.4"), addrinfo("5.6.7.8")])
+        with patch.object(get_running_loop(), "getaddrinfo", getaddrinfo):
+            await self.cache.resolve("tracker.test")
+            self.cache.entries["tracker.test"].expires = time.time() - 1
+            addresses = await self.cache.resolve("tracker.test")
+
+        self.assertEqual(["5.6.7.8"], addresses)
+
+    async def test_resolve_negative_cached(self) -> None:
+        """
+        Test if a hostname that does not resolve is not resolved again before its negative entry expires.
+        """
+        getaddrinfo = AsyncMock(side_effect=socket.gaierror(socket.EAI_NONAME, "Name or service not known"))
+        with patch.object(get_running_loop(), "getaddrinfo", getaddrinfo):
+            with self.assertRaises(socket.gaierror):
+                await self.cache.resolve("dead.test")
+            with self.assertRaises(socket.gaierror):
+                await self.cache.resolve("dead.test")
+
+        self.assertEqual(1, getaddrinfo.call_count)
+        self.assertLessEqual(self.cache.entries["dead.test"].expires, time.time() + 10)
+
+    async def test_resolve_timeout(self) -> None:
+        """
+        Test if a hostname that times out is remembered as a failure.
+        """
+        self.cache.resolve_timeout = 0.01
+
+        async def slow_getaddrinfo(*args: object, **kwargs) -> list:
+            await sleep(1)
+            return addrinfo("1.2.3.4")
+
+        with patch.object(get_running_loop(), "getaddrinfo", slow_getaddrinfo), \
+                self.assertRaises(socket.gaierror):
+            await self.cache.resolve("slow.test")
+
+        self.assertEqual("resolving timed out", self.cache.entries["slow.test"].error)
+
+    async def test_resolve_coalesced(self) -> None:
+        """
+        Test if concurrent lookups of the same hostname share a single request to the resolver.
+        """
+        calls = []
+
+        async def slow_getaddrinfo(*args: object, **kwargs) -> list:
+            calls.append(args)
+            await sleep(0.01)
+            return addrinfo("1.2.3.4")
+
+        with patch.object(get_running_loop(), "getaddrinfo", slow_getaddrinfo):
+            results = await gather(*[self.cache.resolve("tracker.test") for _ in range(5)])
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual([["1.2.3.4"]] * 5, results)
+        self.assertEqual({}, self.cache.pending)
+
+    async def test_resolve_cancelled_caller(self) -> None:
+        """
+        Test if a caller that gives up does not cancel the lookup for the other callers.
+        """
+        async def slow_getaddrinfo(*args: object, **kwargs) -> list:
+            await sleep(0.01)
+            return addrinfo("1.2.3.4")
+
+        with patch.object(get_running_loop(), "getaddrinfo", slow_getaddrinfo):
+            first = ensure_future(self.cache.resolve("tracker.test"))
+            second = ensure_future(self.cache.resolve("tracker.test"))
+            await sleep(0)
+            first.cancel()
+            addresses = await second
+
+        self.assertEqual(["1.2.3.4"], addresses)
+
+    async def test_max_size(self) -> None:
+        """
+        Test if the least recently used hostnames are forgotten when the cache is full.
+        """
+        self.cache.max_size = 2
+        with patch.object(get_running_loop(), "getaddrinfo", AsyncMock(return_value=addrinfo("1.2.3.4"))):
+            await self.cache.resolve("a.test")
+            await self.cache.resolve("b.test")
+            await self.cache.resolve("a.test")
+            await self.cache.resolve("c.test")
+
+        self.assertEqual(["a.test", "c.test"], list(self.cache.entries))
+        self.assertNotIn("b.test", self.cache.uses)
+
+    async def test_refresh(self) -> None:
+        """
+        Test if the most-used hostnames that are about to expire are resolved again.
+        """
+        self.cache.refresh_count = 1
+        getaddrinfo = AsyncMock(return_value=addrinfo("1.2.3.4"))
+        with patch.object(get_running_loop(), "getaddrinfo", getaddrinfo):
+            for _ in range(3):
+                await self.cache.resolve("popular.test")
+            await self.cache.resolve("rare.test")
+            for entry in self.cache.entries.values():
+                entry.expires = time.time() + 1
+            await self.cache.refresh()
+
+        self.assertEqual(3, getaddrinfo.call_count)
+        self.assertGreater(self.cache.entries["popular.test"].expires, time.time() + 50)
+        self.assertLess(self.cache.entries["rare.test"].expires, time.time() + 50)
+        self.assertEqual({"popular.test": 1}, self.cache.uses)
+
+    async def test_refresh_skip_failed(self) -> None:
+        """
+        Test if hostnames that could not be resolved are not refreshed in the background.
+        """
+        getaddrinfo = AsyncMock(side_effect=asyncio.TimeoutError)
+        with patch.object(get_running_loop(), "getaddrinfo", getaddrinfo):
+            with self.assertRaises(socket.gaierror):
+                await self.cache.resolve("dead.test")
+            await self.cache.refresh()
+
+        self.assertEqual(1, getaddrinfo.call_count)
+
+    async def test_cached_resolver(self) -> None:
+        """
+        Test if the aiohttp resolver gives the addresses of the cache.
+        """
+        resolver = CachedResolver(self.cache)
+        with patch.object(get_running_loop(), "getaddrinfo", AsyncMock(return_value=addrinfo("1.2.3.4"))):
+            hosts = await resolver.resolve("tracker.test", 80)
+
+        self.assertEqual(1, len(hosts))
+        self.assertEqual("1.2.3.4", hosts[0]["host"])
+        self.assertEqual(80, hosts[0]["port"])
+        self.assertEqual("tracker.test", hosts[0]["hostname"])
@@ -101,7 +101,7 @@ class TestTorrentChecker(TestBase):
         self.torrent_checker.mds.TorrentState.instances = [MockTorrentState(infohash=b'a' * 20, seeders=5, leechers=10,
                                                                             trackers={tracker},
                                                                             last_check=int(time.time()))]
-        self.torrent_checker.tracker_manager.blacklist.append("http://localhost/tracker")
+        self.torrent_checker.tracker_manager.blacklist.add("http://localhost/tracker")
 
         result = await self.torrent_checker.check_torrent_health(b'a' * 20)
 
@@ -122,6 +122,50 @@ class TestTorrentChecker(TestBase):
         self.assertEqual(5, result.seeders)
         self.assertEqual(10, result.leechers)
 
+    async def test_get_tracker_response_latency(self) -> None:
+        """
+        Test if the response time of a tracker is recorded in its statistics.
+        """
+        tracker = MockTrackerState(url="http://localhost/tracker")
+        self.torrent_checker.mds.TrackerState.instances = [tracker]
+        session = HttpTrackerSession("http://localhost/tracker", ("localhost", 8475), "/announce", 5, None)
+        session.connect_to_tracker = AsyncMock(return_value=TrackerResponse("http://localhost/tracker", []))
+        self.torrent_checker.sessions[session.tracker_url].append(session)
+
+        await self.torrent_checker.get_tracker_response(session)
+
+        self.assertIsNotNone(session.latency)
+        self.assertEqual(session.latency, tracker.latency)
+        self.assertEqual(1.0, tracker.success_rate)
+
+    async def test_get_tracker_response_failure_once(self) -> None:
+        """
+        Test if a failing tracker check is recorded as a single failure.
+        """
+        tracker = MockTrackerState(url="http://localhost/tracker")
+        self.torrent_checker.mds.TrackerState.instances = [tracker]
+        session = HttpTrackerSession("http://localhost/tracker", ("localhost", 8475), "/announce", 5, None)
+        session.connect_to_tracker = AsyncMock(side_effect=RuntimeError)
+        self.torrent_checker.sessions[session.tracker_url].append(session)
+
+        with self.assertRaises(RuntimeError):
+            await self.torrent_checker.get_tracker_response(session)
+
+        self.assertEqual(1, tracker.failures)
+        self.assertAlmostEqual(0.8, tracker.success_rate)
+
+    async def test_create_session_for_request_adaptive_timeout(self) -> None:
+        """
+        Test if tracker sessions get a timeout that is adapted to the response times of the tracker.
+        """
+        self.torrent_checker.config.set("libtorrent/download_defaults/number_hops", 0)
+        self.torrent_checker.mds.TrackerState.instances = [MockTrackerState(url="http://localhost:8475/announce",
+                                                                            latency=3.0, latency_deviation=1.0)]
+
+        session = self.torrent_checker.create_session_for_request("http://localhost:8475/announce", timeout=30)
+
+        self.assertEqual(7.0, session.timeout)
+
     def test_load_torrents_check_from_db_no_self_checked(self) -> None:
         """
         Test if the torrents_checked only considers self-checked torrents.
@@ -297,6 +341,91 @@ class TestTorrentChecker(TestBase):
         for t in selected_torrents:
             self.assertIn(t.infohash, selection_range)
 
+    async def test_check_scheduler_settings(self) -> None:
+        """
+        Test if the check scheduler is created with the given limits.
+        """
+        torrent_checker = TorrentChecker(config=TriblerConfigManager(), tracker_manager=self.tracker_manager,
+                                         download_manager=MagicMock(), notifier=MagicMock(),
+                                         metadata_store=self.metadata_store, round_size=10, max_concurrent=2,
+                                         max_dht_checks=0)
+
+        self.assertEqual(10, torrent_checker.check_scheduler.round_size)
+        self.assertEqual(2, torrent_checker.check_scheduler.max_concurrent)
+        self.assertEqual(0, torrent_checker.check_scheduler.max_dht_checks)
+        await torrent_checker.shutdown()
+
+    async def test_check_torrents_health_shared_tracker(self) -> None:
+        """
+        Test if a tracker that is shared by many torrents is scraped once for all of them.
+        """
+        tracker = MockTrackerState(url="http://localhost/tracker")
+        self.torrent_checker.mds.TorrentState.instances = [MockTorrentState(bytes([i]) * 20, trackers={tracker})
+                                                           for i in range(3)]
+        session = HttpTrackerSession("http://localhost/tracker", ("localhost", 8475), "/announce", 5, None)
+        session.connect_to_tracker = AsyncMock(return_value=TrackerResponse("http://localhost/tracker", [
+            HealthInfo(bytes([i]) * 20, i, 0, self_checked=True) for i in range(3)
+        ]))
+        self.torrent_checker.sessions[session.tracker_url].append(session)
+        self.torrent_checker.create_session_for_request = Mock(return_value=session)
+
+        results = await self.torrent_checker.check_torrents_health([bytes([i]) * 20 for i in range(3)])
+
+        self.assertEqual(1, self.torrent_checker.create_session_for_request.call_count)
+        self.assertEqual([0, 1, 2], [results[bytes([i]) * 20].seeders for i in range(3)])
+
+    async def test_check_torrents_health_failed(self) -> None:
+        """
+        Test if torrents of a failing tracker are marked as checked without seeders or leechers.
+        """
+        tracker = MockTrackerState(url="http://localhost/tracker")
+        self.torrent_checker.mds.TorrentState.instances = [MockTorrentState(b"\x01" * 20, trackers={tracker})]
+        session = HttpTrackerSession("http://localhost/tracker", ("localhost", 8475), "/announce", 5, None)
+        session.connect_to_tracker = AsyncMock(side_effect=ValueError)
+        self.torrent_checker.sessions[session.tracker_url].append(session)
+        self.torrent_checker.create_session_for_request = Mock(return_value=session)
+
+        results = await self.torrent_checker.check_torrents_health([b"\x01" * 20])
+
+        self.assertEqual(0, results[b"\x01" * 20].seeders)
+        self.assertNotEqual(0, self.torrent_checker.mds.TorrentState.instances[0].last_check)
+
+    async def test_create_session_for_request_pooled(self) -> None:
+        """
+        Test if HTTP tracker sessions share the pooled client session of their proxy.
+        """
+        self.torrent_checker.config.set("libtorrent/download_defaults/number_hops", 1)
+        self.torrent_checker.socks_listen_ports = [1080]
+
+        session1 = self.torrent_checker.create_session_for_request("http://localhost:8475/announce")
+        session2 = self.torrent_checker.create_session_for_request("http://localhost:8476/announce")
+
+        self.assertIs(session1.session, session2.session)
+        self.assertIs(session1.session, self.torrent_checker.http_session_pool.sessions[("127.0.0.1", 1080)])
+
+    async def test_create_session_for_request_dns_cache(self) -> None:
+        """
+        Test if UDP tracker sessions share the DNS cache of the torrent checker.
+        """
+        self.torrent_checker.config.set("libtorrent/download_defaults/number_hops", 0)
+
+        session = self.torrent_checker.create_session_for_request("udp://localhost:8475")
+
+        self.assertIs(self.torrent_checker.dns_cache, session.dns_cache)
+
+    async def test_shutdown_closes_pooled_sessions(self) -> None:
+        """
+        Test if shutting down the torrent checker closes the pooled client sessions.
+        """
+        self.torrent_checker.config.set("libtorrent/download_defaults/number_hops", 1)
+        self.torrent_checker.socks_listen_ports = [1080]
+        session = self.torrent_checker.create_session_for_request("http://localhost:8475/announce")
+
+        await self.torrent_checker.shutdown()
+
+        self.assertTrue(session.session.closed)
+        self.assertEqual({}, self.torrent_checker.http_session_pool.sessions)
+
     def test_update_torrent_health_invalid_health(self) -> None:
         """
         Tests if invalid health is ignored in TorrentChecker.update_torrent_health().
@@ -1,6 +1,7 @@
+import socket
 import struct
 from asyncio import CancelledError, Future, ensure_future, sleep
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 from aiohttp.web_exceptions import HTTPBadRequest
 from ipv8.test.base import TestBase
@@ -8,9 +9,11 @@ from ipv8.util import succeed
 from libtorrent import bencode
 
 from tribler.core.torrent_checker.dataclasses import HealthInfo
+from tribler.core.torrent_checker.dns_cache import DNSCache
 from tribler.core.torrent_checker.torrentchecker_session import (
     FakeBep33DHTSession,
     FakeDHTSession,
+    HttpSessionPool,
     HttpTrackerSession,
     UdpSocketManager,
     UdpTrackerSession,
@@ -29,13 +32,21 @@ class MockUdpSocketManager:
         Create a new MockUdpSocketManager.
         """
         self.response = None
+        self.responses = []
+        self.requests = []
         self.tracker_sessions = {}
+        self.connection_ids = {}
+
+    get_connection_id = UdpSocketManager.get_connection_id
+    set_connection_id = UdpSocketManager.set_connection_id
+    invalidate_connection_id = UdpSocketManager.invalidate_connection_id
 
     def send_request(self, data: bytes, tracker_session: UdpTrackerSession) -> Future:
         """
-        Fake sending a request and return the registered response.
+        Fake sending a request and return the next registered response.
         """
-        return succeed(self.response)
+        self.requests.append(data)
+        return succeed(self.responses.pop(0) if self.responses else self.response)
 
 
 class TestTrackerSession(TestBase):
@@ -88,7 +99,7 @@ class TestTrackerSession(TestBase):
         """
         self.session = HttpTrackerSession("localhost", ("localhost", 8475), "/announce", 5, None)
 
-        def fake_request(_: str) -> None:
+        def fake_request(_: str, **kwargs) -> None:
             raise HTTPBadRequest
 
         with self.assertRaises(ValueError), patch.object(self.session.session, "get", fake_request):
@@ -120,6 +131,64 @@ class TestTrackerSession(TestBase):
 
         self.assertFalse(self.session.is_failed)
 
+    async def test_httpsession_pool_shared(self) -> None:
+        """
+        Test if HTTP sessions with the same proxy share a pooled client session.
+        """
+        pool = HttpSessionPool()
+        self.session = HttpTrackerSession("localhost", ("localhost", 8475), "/announce", 5, None, pool)
+        other = HttpTrackerSession("localhost", ("localhost", 8476), "/announce", 5, None, pool)
+        proxied = HttpTrackerSession("localhost", ("localhost", 8475), "/announce", 5, ("localhost", 1080), pool)
+
+        self.assertIs(self.session.session, other.session)
+        self.assertIsNot(self.session.session, proxied.session)
+        self.assertEqual(2, len(pool.sessions))
+
+        await pool.close()
+
+    async def test_httpsession_pool_cleanup(self) -> None:
+        """
+        Test if cleaning up a pooled HTTP session leaves the shared client session open.
+        """
+        pool = HttpSessionPool()
+        self.session = HttpTrackerSession("localhost", ("localhost", 8475), "/announce", 5, None, pool)
+
+        await self.session.cleanup()
+
+        self.assertFalse(self.session.session.closed)
+        self.assertIs(self.session.session, pool.get(None))
+
+        await pool.close()
+
+        self.assertTrue(self.session.session.closed)
+        self.assertEqual({}, pool.sessions)
+
+    async def test_httpsession_pool_reopen(self) -> None:
+        """
+        Test if the pool replaces a client session that was closed.
+        """
+        pool = HttpSessionPool()
+        session = pool.get(None)
+        await session.close()
+
+        self.assertIsNot(session, pool.get(None))
+        self.assertFalse(pool.get(None).closed)
+
+        await pool.close()
+
+    async def test_httpsession_pool_connector(self) -> None:
+        """
+        Test if the pooled client sessions limit the connections per tracker and keep them alive.
+        """
+        pool = HttpSessionPool(limit_per_host=3, keepalive_timeout=10)
+
+        connector = pool.get(None).connector
+
+        self.assertEqual(3, connector.limit_per_host)
+        self.assertEqual(10, connector._keepalive_timeout)  # noqa: SLF001
+
+        await pool.close()
+
     async def test_pop_finished_transaction(self) -> None:
         """
         Test if receiving a datagram for an already finished tracker session does not result in InvalidStateError.
@@ -334,6 +403,115 @@ class TestTrackerSession(TestBase):
 
         self.assertTrue(self.session.is_finished)
 
+    def test_connection_id_cache(self) -> None:
+        """
+        Test if connection IDs are remembered until they expire.
+        """
+        mgr = UdpSocketManager()
+        mgr.set_connection_id(("localhost", 4782, None), 42)
+        mgr.connection_ids[("expired", 4782, None)] = (43, 0.0)
+
+        self.assertEqual(42, mgr.get_connection_id(("localhost", 4782, None)))
+        self.assertIsNone(mgr.get_connection_id(("expired", 4782, None)))
+        self.assertIsNone(mgr.get_connection_id(("other", 4782, None)))
+
+    def test_connection_id_invalidate(self) -> None:
+        """
+        Test if connection IDs can be forgotten.
+        """
+        mgr = UdpSocketManager()
+        mgr.set_connection_id(("localhost", 4782, None), 42)
+
+        mgr.invalidate_connection_id(("localhost", 4782, None))
+
+        self.assertIsNone(mgr.get_connection_id(("localhost", 4782, None)))
+
+    async def test_udpsession_connection_id_stored(self) -> None:
+        """
+        Test if the connection ID that a tracker gives us is stored in the socket manager.
+        """
+        self.session = UdpTrackerSession("localhost", ("localhost", 4782), "/announce", 5, None,
+                                         self.fake_udp_socket_manager)
+        self.fake_udp_socket_manager.response = struct.pack("!iiq", 0, self.session.transaction_id, 126)
+
+        await self.session.connect()
+
+        self.assertEqual(126, self.fake_udp_socket_manager.get_connection_id(("localhost", 4782, None)))
+
+    async def test_udpsession_connection_id_reused(self) -> None:
+        """
+        Test if a session with a known connection ID scrapes without connecting first.
+        """
+        proxy = ("127.0.0.1", 1080)
+        self.session = UdpTrackerSession("localhost", ("localhost", 4782), "/announce", 5, proxy,
+                                         self.fake_udp_socket_manager)
+        self.session.infohash_list.append(b"\x01" * 20)
+        self.fake_udp_socket_manager.set_connection_id(("localhost", 4782, proxy), 126)
+        self.fake_udp_socket_manager.response = struct.pack("!iiiii", 2, self.session.transaction_id, 1, 2, 3)
+
+        response = await self.session.connect_to_tracker()
+
+        self.assertEqual(1, len(self.fake_udp_socket_manager.requests))
+        self.assertEqual((126, 2), struct.unpack_from("!qi", self.fake_udp_socket_manager.requests[0]))
+        self.assertEqual(1, response.torrent_health_list[0].seeders)
+
+    async def test_udpsession_resolve_cached(self) -> None:
+        """
+        Test if a session resolves the tracker hostname through the shared DNS cache.
+        """
+        dns_cache = DNSCache()
+        dns_cache.resolve = AsyncMock(return_value=["1.2.3.4"])
+        self.session = UdpTrackerSession("localhost", ("tracker.test", 4782), "/announce", 5, None,
+                                         self.fake_udp_socket_manager, dns_cache=dns_cache)
+        self.session.infohash_list.append(b"\x01" * 20)
+        self.fake_udp_socket_manager.set_connection_id(("1.2.3.4", 4782, None), 126)
+        self.fake_udp_socket_manager.response = struct.pack("!iiiii", 2, self.session.transaction_id, 1, 2, 3)
+
+        await self.session.connect_to_tracker()
+
+        dns_cache.resolve.assert_called_once_with("tracker.test")
+        self.assertEqual("1.2.3.4", self.session.ip_address)
+
+    async def test_udpsession_resolve_failed(self) -> None:
+        """
+        Test if a session fails when the tracker hostname does not resolve.
+        """
+        dns_cache = DNSCache()
+        dns_cache.resolve = AsyncMock(side_effect=socket.gaierror(socket.EAI_NONAME, "Name or service not known"))
+        self.session = UdpTrackerSession("localhost", ("dead.test", 4782), "/announce", 5, None,
+                                         self.fake_udp_socket_manager, dns_cache=dns_cache)
+
+        with self.assertRaises(ValueError):
+            await self.session.connect_to_tracker()
+
+        self.assertTrue(self.session.is_failed)
+
+    async def test_udpsession_connection_id_expired(self) -> None:
+        """
+        Test if a session reconnects when the tracker no longer accepts a reused connection ID.
+        """
+        proxy = ("127.0.0.1", 1080)
+        self.session = UdpTrackerSession("localhost", ("localhost", 4782), "/announce", 5, proxy,
+                                         self.fake_udp_socket_manager)
+        self.session.infohash_list.append(b"\x01" * 20)
+        self.fake_udp_socket_manager.set_connection_id(("localhost", 4782, proxy), 126)
+        self.fake_udp_socket_manager.responses = [struct.pack("!ii7s", 3, self.session.transaction_id, b"expired")]
+
+        def respond(data: bytes, _: UdpTrackerSession) -> Future:
+            self.fake_udp_socket_manager.requests.append(data)
+            if self.fake_udp_socket_manager.responses:
+                return succeed(self.fake_udp_socket_manager.responses.pop(0))
+            if self.session.action == 0:
+                return succeed(struct.pack("!iiq", 0, self.session.transaction_id, 127))
+            return succeed(struct.pack("!iiiii", 2, self.session.transaction_id, 1, 2, 3))
+        self.fake_udp_socket_manager.send_request = respond
+
+        response = await self.session.connect_to_tracker()
+
+        self.assertEqual(3, len(self.fake_udp_socket_manager.requests))
+        self.assertEqual(127, self.fake_udp_socket_manager.get_connection_id(("localhost", 4782, proxy)))
+        self.assertEqual(1, response.torrent_health_list[0].seeders)
+
     async def test_http_unprocessed_infohashes(self) -> None:
         """
         Test if a HTTP session that receives infohashes leads to a finished scrape.
@@ -394,7 +572,7 @@ class TestTrackerSession(TestBase):
         Test the metainfo lookup of the BEP33 DHT session.
         """
         infohash_health = HealthInfo(b"a" * 20, seeders=1, leechers=2)
-        mock_dlmgr = Mock(dht_health_manager=Mock(get_health=Mock(return_value=succeed([infohash_health]))))
+        mock_dlmgr = Mock(dht_health_manager=Mock(get_health_batch=AsyncMock(return_value=[infohash_health])))
         self.session = FakeBep33DHTSession(mock_dlmgr, 10)
         self.session.add_infohash(b"a" * 20)
 
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from ipv8.test.base import TestBase
 
-from tribler.core.libtorrent.trackers import get_uniformed_tracker_url
-from tribler.core.torrent_checker.tracker_manager import TrackerManager
+from tribler.core.torrent_checker.tracker_manager import (
+    MIN_LATENCY_SAMPLES,
+    MIN_TRACKER_TIMEOUT,
+    TrackerManager,
+    percentile,
+    tracker_quality,
+)
 from tribler.test_unit.core.torrent_checker.mocks import MockTrackerState
 
 
@@ -27,7 +32,7 @@ class MockTrackerManager(TrackerManager):
         Load the blacklist.
         """
         if self.blacklist_contents:
-            self.blacklist.extend([get_uniformed_tracker_url(url) for url in self.blacklist_contents.split("\n")])
+            self.registry.add_to_blacklist(self.blacklist_contents.split("\n"))
 
 
 class TestTrackerManager(TestBase):
@@ -96,6 +101,114 @@ class TestTrackerManager(TestBase):
         tracker_info = self.tracker_manager.get_tracker_info("http://test1.com/announce")
         self.assertTrue(tracker_info['is_alive'])
 
+    def test_update_tracker_info_first_latency(self) -> None:
+        """
+        Test if the first response time of a tracker becomes its mean latency.
+        """
+        self.tracker_manager.add_tracker("http://test1.com:80/announce")
+        self.tracker_manager.update_tracker_info("http://test1.com/announce", True, 2.0)
+
+        tracker, = MockTrackerState.instances
+        self.assertEqual(2.0, tracker.latency)
+        self.assertEqual(1.0, tracker.latency_deviation)
+        self.assertEqual(1.0, tracker.success_rate)
+        self.assertEqual([2.0], list(self.tracker_manager.latencies))
+
+    def test_update_tracker_info_latency_ewma(self) -> None:
+        """
+        Test if later response times of a tracker are smoothed into its mean latency and deviation.
+        """
+        tracker = MockTrackerState("http://test1.com/announce", latency=2.0, latency_deviation=1.0)
+        self.tracker_manager.update_tracker_info("http://test1.com/announce", True, 4.0)
+
+        self.assertEqual(2.25, tracker.latency)
+        self.assertEqual(1.25, tracker.latency_deviation)
+
+    def test_update_tracker_info_no_latency(self) -> None:
+        """
+        Test if a successful update without a response time does not change the tracker statistics.
+        """
+        tracker = MockTrackerState("http://test1.com/announce", latency=2.0, latency_deviation=1.0, success_rate=0.5)
+        self.tracker_manager.update_tracker_info("http://test1.com/announce", True)
+
+        self.assertEqual((2.0, 1.0, 0.5), (tracker.latency, tracker.latency_deviation, tracker.success_rate))
+
+    def test_update_tracker_info_failed_stats(self) -> None:
+        """
+        Test if a failure lowers the success rate of a tracker and backs off its timeout.
+        """
+        tracker = MockTrackerState("http://test1.com/announce", latency=2.0, latency_deviation=1.0)
+        self.tracker_manager.update_tracker_info("http://test1.com/announce", False)
+
+        self.assertAlmostEqual(0.8, tracker.success_rate)
+        self.assertEqual(2.0, tracker.latency)
+        self.assertEqual(2.0, tracker.latency_deviation)
+
+    def test_get_tracker_timeout_known(self) -> None:
+        """
+        Test if the timeout of a tracker with statistics is a few deviations above its mean latency.
+        """
+        MockTrackerState("http://test1.com/announce", latency=3.0, latency_deviation=1.0)
+
+        self.assertEqual(7.0, self.tracker_manager.get_tracker_timeout("http://test1.com/announce", 30))
+
+    def test_get_tracker_timeout_bounds(self) -> None:
+        """
+        Test if the timeout of a tracker is kept between the min timeout and the given max timeout.
+        """
+        MockTrackerState("http://fast.com/announce", latency=0.1, latency_deviation=0.01)
+        MockTrackerState("http://slow.com/announce", latency=20.0, latency_deviation=10.0)
+
+        self.assertEqual(MIN_TRACKER_TIMEOUT, self.tracker_manager.get_tracker_timeout("http://fast.com/announce", 30))
+        self.assertEqual(30, self.tracker_manager.get_tracker_timeout("http://slow.com/announce", 30))
+
+    def test_get_tracker_timeout_unknown(self) -> None:
+        """
+        Test if a tracker without statistics gets the max timeout when there are few response times of all trackers.
+        """
+        MockTrackerState("http://test1.com/announce")
+        self.tracker_manager.latencies.extend([1.0] * (MIN_LATENCY_SAMPLES - 1))
+
+        self.assertEqual(30, self.tracker_manager.get_tracker_timeout("http://test1.com/announce", 30))
+
+    def test_get_tracker_timeout_percentile(self) -> None:
+        """
+        Test if a tracker without statistics gets a timeout from the response times of all trackers.
+        """
+        MockTrackerState("http://test1.com/announce")
+        self.tracker_manager.latencies.extend([1.0] * 90 + [6.0] * 10)
+
+        self.assertEqual(12.0, self.tracker_manager.get_tracker_timeout("http://test1.com/announce", 30))
+
+    def test_percentile(self) -> None:
+        """
+        Test if the nearest-rank percentile is computed correctly.
+        """
+        self.assertEqual(95, percentile(list(range(100, 0, -1)), 0.95))
+        self.assertEqual(3, percentile([3], 0.95))
+
+    def test_tracker_quality(self) -> None:
+        """
+        Test if fast and reliable trackers have a higher quality, and trackers that never answer still have some.
+        """
+        self.assertGreater(tracker_quality(1.0, 0.5), tracker_quality(1.0, 5.0))
+        self.assertGreater(tracker_quality(1.0, 0.5), tracker_quality(0.5, 0.5))
+        self.assertGreater(tracker_quality(0.0, 0.0), 0)
+
+    def test_get_next_tracker_weighted(self) -> None:
+        """
+        Test if the next tracker is picked from the most overdue trackers, weighted by their quality.
+        """
+        MockTrackerState("http://good.com/announce", last_check=2, latency=0.5, success_rate=1.0)
+        MockTrackerState("http://bad.com/announce", last_check=1, latency=10.0, success_rate=0.1)
+
+        with patch("random.choices", side_effect=lambda population, weights: [population[0]]) as choices:
+            self.tracker_manager.get_next_tracker()
+
+        population, = choices.call_args.args
+        self.assertEqual(["http://bad.com/announce", "http://good.com/announce"], [t.url for t in population])
+        self.assertEqual([tracker_quality(0.1, 10.0), tracker_quality(1.0, 0.5)], choices.call_args.kwargs["weights"])
+
     def test_get_tracker_for_check_unknown(self) -> None:
         """
         Test if the no tracker is returned when fetching from no eligible trackers.
@@ -114,8 +227,50 @@ class TestTrackerManager(TestBase):
         Test if the next tracker for autocheck is not in the blacklist.
         """
         self.tracker_manager.add_tracker("http://test1.com:80/announce")
-        self.tracker_manager.blacklist.append("http://test1.com/announce")
+        self.tracker_manager.blacklist.add("http://test1.com/announce")
+
+        self.assertIsNone(self.tracker_manager.get_next_tracker())
+
+    def test_sync_registry(self) -> None:
+        """
+        Test if trackers that were added to the database by others are loaded into the registry.
+        """
+        self.tracker_manager.sync_registry(force=True)
+        MockTrackerState("http://test1.com/announce")
+
+        self.tracker_manager.sync_registry(force=True)
+
+        self.assertIsNotNone(self.tracker_manager.registry.get("http://test1.com/announce"))
+
+    def test_sync_registry_interval(self) -> None:
+        """
+        Test if the registry is not synced more than once per sync interval.
+        """
+        self.tracker_manager.sync_registry()
+        MockTrackerState("http://test1.com/announce")
+
+        self.tracker_manager.sync_registry()
+
+        self.assertIsNone(self.tracker_manager.registry.get("http://test1.com/announce"))
+
+    def test_update_tracker_info_registry(self) -> None:
+        """
+        Test if updating a tracker reschedules it in the registry.
+        """
+        self.tracker_manager.add_tracker("http://test1.com:80/announce")
+        self.tracker_manager.update_tracker_info("http://test1.com/announce", True, 1.0)
+
+        self.assertIsNone(self.tracker_manager.get_next_tracker())
+        self.assertEqual(1.0, self.tracker_manager.registry.get("http://test1.com/announce").latency)
+
+    def test_remove_tracker_registry(self) -> None:
+        """
+        Test if removing a tracker removes it from the registry.
+        """
+        self.tracker_manager.add_tracker("http://test1.com:80/announce")
+        self.tracker_manager.remove_tracker("http://test1.com:80/announce")
 
+        self.assertIsNone(self.tracker_manager.registry.get("http://test1.com/announce"))
         self.assertIsNone(self.tracker_manager.get_next_tracker())
 
     def test_load_blacklist_from_file_none(self) -> None:
@@ -125,7 +280,7 @@ class TestTrackerManager(TestBase):
         self.tracker_manager.blacklist_contents = ""
         self.tracker_manager.load_blacklist()
 
-        self.assertEqual([], self.tracker_manager.blacklist)
+        self.assertEqual(set(), self.tracker_manager.blacklist)
 
     def test_load_blacklist_from_file_single(self) -> None:
         """
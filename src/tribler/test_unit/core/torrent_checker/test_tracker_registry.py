@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from ipv8.test.base import TestBase
+
+from tribler.core.torrent_checker.tracker_registry import TrackerRecord, TrackerRegistry
+from tribler.test_unit.core.torrent_checker.mocks import MockTrackerState
+
+
+class TestTrackerRegistry(TestBase):
+    """
+    Tests for the TrackerRegistry class.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a new registry.
+        """
+        super().setUp()
+        self.registry = TrackerRegistry(60)
+        MockTrackerState.instances = []
+
+    def test_from_state(self) -> None:
+        """
+        Test if a record copies its database object.
+        """
+        tracker = MockTrackerState("http://tracker.com/announce", last_check=5, failures=2, alive=False, latency=1.5,
+                                   latency_deviation=0.5, success_rate=0.25)
+
+        record = TrackerRecord.from_state(tracker)
+
+        self.assertEqual(TrackerRecord("http://tracker.com/announce", tracker.rowid, 5, 2, False, 1.5, 0.5, 0.25),
+                         record)
+
+    def test_uniform_cached(self) -> None:
+        """
+        Test if tracker URLs are uniformed once and interned.
+        """
+        with patch("tribler.core.torrent_checker.tracker_registry.get_uniformed_tracker_url",
+                   return_value="http://tracker.com/announce") as uniform:
+            first = self.registry.uniform("http://tracker.com:80/announce")
+            second = self.registry.uniform("http://tracker.com:80/announce")
+
+        self.assertEqual("http://tracker.com/announce", first)
+        self.assertIs(first, second)
+        self.assertEqual(1, uniform.call_count)
+
+    def test_uniform_malformed(self) -> None:
+        """
+        Test if malformed tracker URLs have no uniformed form.
+        """
+        self.assertIsNone(self.registry.uniform("http://tracker.com"))
+
+    def test_is_valid_cached(self) -> None:
+        """
+        Test if tracker URLs are validated once.
+        """
+        with patch("tribler.core.torrent_checker.tracker_registry.is_valid_url", return_value=None) as is_valid_url:
+            self.assertFalse(self.registry.is_valid("http://tr acker.com/announce"))
+            self.assertFalse(self.registry.is_valid("http://tr acker.com/announce"))
+
+        self.assertEqual(1, is_valid_url.call_count)
+
+    def test_is_blacklisted(self) -> None:
+        """
+        Test if both the raw and uniformed forms of a blacklisted URL are blacklisted.
+        """
+        self.registry.add_to_blacklist(["http://tracker.com:80/announce\n", "malformed"])
+
+        self.assertEqual({"http://tracker.com/announce"}, self.registry.blacklist)
+        self.assertTrue(self.registry.is_blacklisted("http://tracker.com/announce"))
+        self.assertTrue(self.registry.is_blacklisted("http://tracker.com:80/announce"))
+        self.assertFalse(self.registry.is_blacklisted("http://other.com/announce"))
+
+    def test_get_due_order(self) -> None:
+        """
+        Test if the most overdue trackers are returned first.
+        """
+        self.registry.update(MockTrackerState("http://new.com/announce", last_check=30))
+        self.registry.update(MockTrackerState("http://old.com/announce", last_check=10))
+        self.registry.update(MockTrackerState("http://mid.com/announce", last_check=20))
+
+        due = self.registry.get_due(100, 2)
+
+        self.assertEqual(["http://old.com/announce", "http://mid.com/announce"], [record.url for record in due])
+
+    def test_get_due_not_yet(self) -> None:
+        """
+        Test if trackers that were checked recently are not due.
+        """
+        self.registry.update(MockTrackerState("http://tracker.com/announce", last_check=50))
+
+        self.assertEqual([], self.registry.get_due(100, 10))
+        self.assertEqual(1, len(self.registry.get_due(110, 10)))
+
+    def test_get_due_stays_scheduled(self) -> None:
+        """
+        Test if due trackers stay scheduled until they are updated.
+        """
+        tracker = MockTrackerState("http://tracker.com/announce")
+        self.registry.update(tracker)
+
+        self.assertEqual(1, len(self.registry.get_due(100, 10)))
+        self.assertEqual(1, len(self.registry.get_due(100, 10)))
+
+        tracker.last_check = 100
+        self.registry.update(tracker)
+
+        self.assertEqual([], self.registry.get_due(100, 10))
+
+    def test_get_due_skip(self) -> None:
+        """
+        Test if dead, blacklisted and removed trackers are not due.
+        """
+        self.registry.update(MockTrackerState("http://dead.com/announce", alive=False))
+        self.registry.update(MockTrackerState("http://removed.com/announce"))
+        self.registry.update(MockTrackerState("http://blacklisted.com/announce"))
+        self.registry.remove("http://removed.com/announce")
+        self.registry.add_to_blacklist(["http://blacklisted.com/announce"])
+
+        self.assertEqual([], self.registry.get_due(100, 10))
+        self.assertEqual([], self.registry.due)
+
+    def test_update_max_rowid(self) -> None:
+        """
+        Test if the registry remembers the highest rowid that it has seen.
+        """
+        first = MockTrackerState("http://first.com/announce")
+        second = MockTrackerState("http://second.com/announce")
+        self.registry.update(second)
+        self.registry.update(first)
+
+        self.assertEqual(second.rowid, self.registry.max_rowid)
@@ -57,6 +57,11 @@ class DatabaseConfig(TypedDict):
     """
 
     enabled: bool
+    wal_mode: bool
+    read_pool_size: int
+    mmap_size: int
+    cache_size: int | None
+    ingestion_processes: int
 
 
 class DownloadDefaultsConfig(TypedDict):
@@ -112,6 +117,9 @@ class TorrentCheckerConfig(TypedDict):
     """
 
     enabled: bool
+    round_size: int
+    max_concurrent: int
+    max_dht_checks: int
 
 
 class TunnelCommunityConfig(TypedDict):
@@ -173,7 +181,8 @@ DEFAULT_CONFIG = {
     "statistics": False,
 
     "content_discovery_community": ContentDiscoveryCommunityConfig(enabled=True),
-    "database": DatabaseConfig(enabled=True),
+    "database": DatabaseConfig(enabled=True, wal_mode=False, read_pool_size=4, mmap_size=0, cache_size=None,
+                               ingestion_processes=0),
     "dht_discovery": DHTDiscoveryCommunityConfig(enabled=True),
     "knowledge_community": KnowledgeCommunityConfig(enabled=True),
     "libtorrent": LibtorrentConfig(
@@ -203,7 +212,7 @@ DEFAULT_CONFIG = {
             add_download_to_channel=False)
         ),
     "rendezvous": RendezvousConfig(enabled=True),
-    "torrent_checker": TorrentCheckerConfig(enabled=True),
+    "torrent_checker": TorrentCheckerConfig(enabled=True, round_size=50, max_concurrent=4, max_dht_checks=2),
     "tunnel_community": TunnelCommunityConfig(enabled=True, min_circuits=3, max_circuits=8),
     "user_activity": UserActivityConfig(enabled=True, max_query_history=500, health_check_interval=5.0),
 